@@ -35,7 +35,7 @@ BucketsTestCalculator::~BucketsTestCalculator()
 
 // -----------------------------------------------------------------------------
 //
-double BucketsTestCalculator::backendRateCallbackBuckets(const std::vector<double> geometry,
+double BucketsTestCalculator::backendRateCallbackBuckets(const std::vector<double> & geometry,
                                                          const int len,
                                                          const std::vector<TypeBucket> & occupation,
                                                          const std::vector<TypeBucket> & update,
@@ -130,3 +130,11 @@ std::vector<int> BucketsTestCalculator::excludeFromCaching() const
 {
     return std::vector<int>(0);
 }
+
+
+// -----------------------------------------------------------------------------
+//
+bool BucketsTestCalculator::threadSafe() const
+{
+    return true;
+}
@@ -50,7 +50,7 @@ public:
      * \param global_z       : The global coordinate in the z direction for the central site.
      * \return : The updated rate.
      */
-    virtual double backendRateCallbackBuckets(const std::vector<double> geometry,
+    virtual double backendRateCallbackBuckets(const std::vector<double> & geometry,
                                               const int len,
                                               const std::vector<TypeBucket> & occupation,
                                               const std::vector<TypeBucket> & update,
@@ -59,23 +59,29 @@ public:
                                               const int process_number,
                                               const double global_x,
                                               const double global_y,
-                                              const double global_z) const;
+                                              const double global_z) const override;
 
     /*! \brief Function for getting the cutoff for the calculator.
      *  \return : The cutoff.
      */
-    double cutoff() const;
+    double cutoff() const override;
 
     /*! \brief Function for indicating if caching should be used or not.
      *  \return : true if caching should be used, othewise false.
      */
-    bool cacheRates() const;
+    bool cacheRates() const override;
 
     /*! \brief Function for indicating which process numbers should be
      *         excluded from caching.
      *  \return : A vector containing the process numbers to exclude.
      */
-    std::vector<int> excludeFromCaching() const;
+    std::vector<int> excludeFromCaching() const override;
+
+    /*! \brief Function for indicating that the rates may be calculated
+     *         on several threads at the same time.
+     *  \return : True, the calculator holds no state that is modified.
+     */
+    bool threadSafe() const override;
 
 protected:
 
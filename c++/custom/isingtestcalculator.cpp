@@ -35,7 +35,7 @@ IsingTestCalculator::~IsingTestCalculator()
 
 // -----------------------------------------------------------------------------
 //
-double IsingTestCalculator::backendRateCallback(const std::vector<double> geometry,
+double IsingTestCalculator::backendRateCallback(const std::vector<double> & geometry,
                                                 const int len,
                                                 const std::vector<std::string> & types_before,
                                                 const std::vector<std::string> & types_after,
@@ -81,3 +81,11 @@ std::vector<int> IsingTestCalculator::excludeFromCaching() const
 {
     return std::vector<int>(0);
 }
+
+
+// -----------------------------------------------------------------------------
+//
+bool IsingTestCalculator::threadSafe() const
+{
+    return true;
+}
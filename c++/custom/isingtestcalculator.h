@@ -50,7 +50,7 @@ public:
      * \return : The updated rate constant.
      */
     virtual
-    double backendRateCallback(const std::vector<double> geometry,
+    double backendRateCallback(const std::vector<double> & geometry,
                                const int len,
                                const std::vector<std::string> & types_before,
                                const std::vector<std::string> & types_after,
@@ -58,23 +58,29 @@ public:
                                const int process_number,
                                const double global_x,
                                const double global_y,
-                               const double global_z) const;
+                               const double global_z) const override;
 
     /*! \brief Function for getting the cutoff for the calculator.
      *  \return : The cutoff.
      */
-    double cutoff() const;
+    double cutoff() const override;
 
     /*! \brief Function for indicating if caching should be used or not.
      *  \return : true if caching should be used, othewise false.
      */
-    bool cacheRates() const;
+    bool cacheRates() const override;
 
     /*! \brief Function for indicating which process numbers should be
      *         excluded from caching.
      *  \return : A vector containing the process numbers to exclude.
      */
-    std::vector<int> excludeFromCaching() const;
+    std::vector<int> excludeFromCaching() const override;
+
+    /*! \brief Function for indicating that the rates may be calculated
+     *         on several threads at the same time.
+     *  \return : True, the calculator holds no state that is modified.
+     */
+    bool threadSafe() const override;
 
 protected:
 
@@ -0,0 +1,88 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  exampleratecalculator.cpp
+ *  \brief File for the implementation code of the
+ *         ExampleRateCalculator class.
+ */
+
+#include "exampleratecalculator.h"
+#include "ratecalculatorlibrary.h"
+
+
+// Define the functions used for creating the calculator when the library
+// is loaded.
+KMCLIB_RATE_CALCULATOR_PLUGIN(ExampleRateCalculator)
+
+
+// -----------------------------------------------------------------------------
+//
+ExampleRateCalculator::ExampleRateCalculator(const Configuration & config) :
+    config_(config)
+{
+    // NOTHING HERE.
+}
+
+
+// -----------------------------------------------------------------------------
+//
+ExampleRateCalculator::~ExampleRateCalculator()
+{
+    // NOTHING HERE.
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double ExampleRateCalculator::backendRateCallback(const std::vector<double> & geometry,
+                                                  const int len,
+                                                  const std::vector<std::string> & types_before,
+                                                  const std::vector<std::string> & types_after,
+                                                  const double rate_constant,
+                                                  const int process_number,
+                                                  const double global_x,
+                                                  const double global_y,
+                                                  const double global_z) const
+{
+    // The central atom comes first in the geometry.
+    int n_same = 0;
+    for (int i = 1; i < len; ++i)
+    {
+        if (types_before[i] == types_before[0])
+        {
+            ++n_same;
+        }
+    }
+
+    return rate_constant / (1.0 + n_same);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double ExampleRateCalculator::cutoff() const
+{
+    return 1.0;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+bool ExampleRateCalculator::cacheRates() const
+{
+    return true;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+bool ExampleRateCalculator::threadSafe() const
+{
+    return true;
+}
+
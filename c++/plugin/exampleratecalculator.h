@@ -0,0 +1,91 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  exampleratecalculator.h
+ *  \brief File for the ExampleRateCalculator class definition.
+ */
+
+
+#ifndef __EXAMPLERATECALCULATOR__
+#define __EXAMPLERATECALCULATOR__
+
+
+#include "ratecalculator.h"
+#include "configuration.h"
+
+/*! \brief Template for a custom rate calculator in C++ built as a separate
+ *         shared library and loaded at runtime with
+ *         KMCInteractions.setRateCalculator("path/to/library.so").
+ *         The rate of a process is its rate constant divided by one plus
+ *         the number of atoms in the local geometry with the same type as
+ *         the central atom. Replace the calculation with your own.
+ */
+class ExampleRateCalculator : public RateCalculator {
+
+public:
+
+    /*! \brief Constructor for the calculator.
+     *  \param config : A reference to the configuration in the system.
+     */
+    ExampleRateCalculator(const Configuration & config);
+
+    /*! \brief Destructor.
+     */
+    virtual ~ExampleRateCalculator();
+
+    /*! \brief The backend callback function called from the matcher to obtain
+     *         the updated rate.
+     * \param geometry       : The geometry, with x,y,z coordinates for each atom in contiguous memory.
+     * \param len            : The number of atoms.
+     * \param types_before   : The types before the process.
+     * \param types_after    : The types after the process.
+     * \param rate_constant  : The rate constant associated with the process.
+     * \param process_number : The id number of the process.
+     * \param global_x       : The global coordinate in the x direction for the central site.
+     * \param global_y       : The global coordinate in the y direction for the central site.
+     * \param global_z       : The global coordinate in the z direction for the central site.
+     * \return : The updated rate constant.
+     */
+    virtual
+    double backendRateCallback(const std::vector<double> & geometry,
+                               const int len,
+                               const std::vector<std::string> & types_before,
+                               const std::vector<std::string> & types_after,
+                               const double rate_constant,
+                               const int process_number,
+                               const double global_x,
+                               const double global_y,
+                               const double global_z) const override;
+
+    /*! \brief Function for getting the cutoff for the calculator.
+     *  \return : The cutoff.
+     */
+    virtual double cutoff() const override;
+
+    /*! \brief Function for indicating if caching should be used or not.
+     *  \return : true if caching should be used, othewise false.
+     */
+    virtual bool cacheRates() const override;
+
+    /*! \brief Function for indicating that the rates may be calculated
+     *         on several threads at the same time.
+     *  \return : True, the calculator holds no state that is modified.
+     */
+    virtual bool threadSafe() const override;
+
+protected:
+
+private:
+
+    // A reference to the configuration.
+    const Configuration & config_;
+
+};
+
+#endif // __EXAMPLERATECALCULATOR__
+
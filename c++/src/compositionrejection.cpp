@@ -0,0 +1,178 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  compositionrejection.cpp
+ *  \brief File for the implementation code of the CompositionRejection class.
+ */
+
+#include "compositionrejection.h"
+#include "random.h"
+
+#include <cmath>
+#include <algorithm>
+#include <stdexcept>
+
+
+// The offset from the binary exponent of a rate to its bin index. The
+// exponents from std::frexp of positive finite doubles are in [-1073, 1024].
+static const int bin_offset__ = 1074;
+
+// The number of bins needed to cover all positive finite doubles.
+static const int n_bins__ = 2100;
+
+
+// -----------------------------------------------------------------------------
+//
+CompositionRejection::CompositionRejection(const int n_processes) :
+    bins_(n_bins__),
+    bin_rates_(n_bins__, 0.0),
+    bin_tree_(n_bins__),
+    positions_(n_processes),
+    n_events_(0)
+{
+    // NOTHING HERE
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void CompositionRejection::set(const int process, const int site, const double rate)
+{
+    // Remove any previous entry for the event.
+    remove(process, site);
+
+    if (!(rate > 0.0))
+    {
+        return;
+    }
+
+    // Find the bin such that the rate is in [2^(exp-1), 2^exp).
+    int exponent;
+    std::frexp(rate, &exponent);
+    const int bin = exponent + bin_offset__;
+
+    // Add the event last in the bin.
+    BinnedEvent event;
+    event.process = process;
+    event.site    = site;
+    event.rate    = rate;
+    bins_[bin].push_back(event);
+    positions_[process][site] = std::pair<int, size_t>(bin, bins_[bin].size() - 1);
+    ++n_events_;
+
+    bin_rates_[bin] += rate;
+    bin_tree_.set(bin, bin_rates_[bin]);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void CompositionRejection::remove(const int process, const int site)
+{
+    std::unordered_map<int, std::pair<int, size_t> > & positions = positions_[process];
+    const std::unordered_map<int, std::pair<int, size_t> >::iterator it = positions.find(site);
+
+    if (it == positions.end())
+    {
+        return;
+    }
+
+    const int bin          = it->second.first;
+    const size_t position  = it->second.second;
+    positions.erase(it);
+    removeFromBin(bin, position);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void CompositionRejection::removeFromBin(const int bin, const size_t position)
+{
+    std::vector<BinnedEvent> & events = bins_[bin];
+    const double rate = events[position].rate;
+
+    // Move the last event in the bin into the removed position.
+    const size_t last = events.size() - 1;
+    if (position != last)
+    {
+        events[position] = events[last];
+        positions_[events[position].process][events[position].site].second = position;
+    }
+    events.pop_back();
+    --n_events_;
+
+    // Reset the bin rate exactly when empty to avoid accumulated round-off.
+    if (events.empty())
+    {
+        bin_rates_[bin] = 0.0;
+    }
+    else
+    {
+        bin_rates_[bin] -= rate;
+    }
+    bin_tree_.set(bin, bin_rates_[bin]);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void CompositionRejection::clear(const int n_processes)
+{
+    for (size_t i = 0; i < bins_.size(); ++i)
+    {
+        if (!bins_[i].empty())
+        {
+            bins_[i].clear();
+            bin_rates_[i] = 0.0;
+            bin_tree_.set(i, 0.0);
+        }
+    }
+
+    positions_.assign(n_processes, std::unordered_map<int, std::pair<int, size_t> >());
+    n_events_ = 0;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+std::pair<int,int> CompositionRejection::pick() const
+{
+    // Events with zero rate are never binned, so there may be nothing to
+    // pick even if there are available processes.
+    if (n_events_ == 0 || !(bin_tree_.total() > 0.0))
+    {
+        throw std::runtime_error("No more available processes.");
+    }
+
+    // Composition: pick a bin according to its total rate.
+    const double rnd_bin = randomDouble01() * bin_tree_.total();
+    const int bin = bin_tree_.pick(rnd_bin);
+    const std::vector<BinnedEvent> & events = bins_[bin];
+    const size_t n_events = events.size();
+
+    if (n_events == 0)
+    {
+        throw std::runtime_error("No more available processes.");
+    }
+
+    while (true)
+    {
+        // Pick an event uniformly within the bin.
+        const size_t position = std::min(static_cast<size_t>(randomDouble01() * n_events), n_events - 1);
+        const BinnedEvent & event = events[position];
+
+        // Rejection: accept with the rate relative to the bin upper bound,
+        // which is always at least one half.
+        const double ratio = std::ldexp(event.rate, bin_offset__ - bin);
+        if (randomDouble01() < ratio)
+        {
+            return std::pair<int,int>(event.process, event.site);
+        }
+    }
+}
+
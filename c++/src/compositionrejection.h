@@ -0,0 +1,115 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+
+/*! \file  compositionrejection.h
+ *  \brief File for the CompositionRejection class definition.
+ */
+
+#ifndef __COMPOSITIONREJECTION__
+#define __COMPOSITIONREJECTION__
+
+#include <vector>
+#include <unordered_map>
+#include <utility>
+
+#include "sumtree.h"
+
+
+/// A minimal struct for representing an event in a rate bin.
+struct BinnedEvent
+{
+    int process;
+    int site;
+    double rate;
+};
+
+
+/*! \brief Class for selecting events with the composition-rejection
+ *         algorithm. The events are grouped in bins of rates between
+ *         consecutive powers of two. A bin is picked according to its total
+ *         rate and an event in the bin is then picked uniformly and accepted
+ *         with a probability given by its rate relative to the bin upper
+ *         bound, giving an expected selection cost independent of the
+ *         number of events.
+ */
+class CompositionRejection {
+
+public:
+
+    /*! \brief Constructor for the event bins.
+     *  \param n_processes : The number of processes the events may belong to.
+     */
+    CompositionRejection(const int n_processes=0);
+
+    /*! \brief Add, update or remove an event. Events with a rate that is not
+     *         larger than zero are removed.
+     *  \param process : The process index of the event.
+     *  \param site    : The site index of the event.
+     *  \param rate    : The total rate of the event.
+     */
+    void set(const int process, const int site, const double rate);
+
+    /*! \brief Remove an event. Nothing happens if the event is not present.
+     *  \param process : The process index of the event.
+     *  \param site    : The site index of the event.
+     */
+    void remove(const int process, const int site);
+
+    /*! \brief Remove all events and set the number of processes.
+     *  \param n_processes : The number of processes the events may belong to.
+     */
+    void clear(const int n_processes);
+
+    /*! \brief Query for the number of events.
+     *  \return : The number of events in all bins.
+     */
+    size_t size() const { return n_events_; }
+
+    /*! \brief Query for the sum of the rates of all events.
+     *  \return : The total rate.
+     */
+    double totalRate() const { return bin_tree_.total(); }
+
+    /*! \brief Pick an event according to its rate. Throws a
+     *         std::runtime_error if there are no events with a positive rate.
+     *  \return : The process and site indices of the picked event.
+     */
+    std::pair<int,int> pick() const;
+
+protected:
+
+private:
+
+    /*! \brief Remove the event at the given position in its bin, by moving
+     *         the last event in the bin into its place.
+     *  \param bin      : The bin to remove the event from.
+     *  \param position : The position of the event in the bin.
+     */
+    void removeFromBin(const int bin, const size_t position);
+
+    /// The events in each bin.
+    std::vector< std::vector<BinnedEvent> > bins_;
+
+    /// The sum of the rates in each bin.
+    std::vector<double> bin_rates_;
+
+    /// The sum tree over the bin rates used for picking a bin.
+    SumTree bin_tree_;
+
+    /// The bin and position of each event, per process and site index.
+    std::vector< std::unordered_map<int, std::pair<int, size_t> > > positions_;
+
+    /// The number of events in all bins.
+    size_t n_events_;
+
+};
+
+
+#endif // __COMPOSITIONREJECTION__
+
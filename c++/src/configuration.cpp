@@ -14,14 +14,51 @@
 #include <cstdio>
 #include <algorithm>
 #include <cstdlib>
+#include <cmath>
+#include <atomic>
 
 #include "configuration.h"
 #include "latticemap.h"
 #include "process.h"
 #include "matchlist.h"
+#include "threads.h"
+#include "hash.h"
 
-// Temporary data for the match list return.
-static ConfigBucketMatchList tmp_match_list__(0);
+// Temporary data for the match list return, one per thread.
+static thread_local ConfigBucketMatchList tmp_match_list__(0);
+
+// The latest generated compact match list and the index and types version
+// it was generated for, one per thread.
+static thread_local ConfigBucketMatchList tmp_compact_match_list__(0);
+static thread_local int tmp_compact_index__ = -1;
+static thread_local uint64_t tmp_compact_version__ = 0;
+
+// The source of types versions, unique over all configurations.
+static std::atomic<uint64_t> types_versions__(0);
+
+
+// -----------------------------------------------------------------------------
+//
+static bool sameGeometry(const ConfigBucketMatchList & match_list,
+                         const ConfigBucketMatchList & reference_list)
+{
+    if (match_list.size() != reference_list.size())
+    {
+        return false;
+    }
+
+    for (size_t j = 0; j < match_list.size(); ++j)
+    {
+        if (std::fabs(match_list[j].x - reference_list[j].x) >= 1.0e-12 ||
+            std::fabs(match_list[j].y - reference_list[j].y) >= 1.0e-12 ||
+            std::fabs(match_list[j].z - reference_list[j].z) >= 1.0e-12)
+        {
+            return false;
+        }
+    }
+
+    return true;
+}
 
 
 // -----------------------------------------------------------------------------
@@ -30,12 +67,29 @@ Configuration::Configuration(const std::vector<std::vector<double> >  & coordina
                              const std::vector<std::vector<std::string> > & elements,
                              const std::map<std::string,int> & possible_types) :
     n_moved_(0),
-    elements_(elements),
-    atom_id_elements_(elements_.size()),
-    match_lists_(elements_.size()),
+    atom_id_types_(elements.size()),
+    particles_per_type_(possible_types.size(), 0),
+    type_counts_(0),
+    elements_(0),
+    changed_sites_(0),
+    atom_id_elements_(0),
+    changed_atom_ids_(0),
+    match_lists_(elements.size()),
+    compact_match_lists_(false),
+    match_list_templates_(0),
+    match_list_template_(0),
+    match_list_offsets_(0),
+    match_list_indices_(0),
+    types_version_(++types_versions__),
     possible_types_(possible_types),
     latest_event_process_(0),
-    latest_event_site_(0)
+    latest_event_site_(0),
+    id_updates_(0),
+    local_geometry_basis_(0),
+    local_geometries_(0),
+    hash_cutoffs_(0),
+    hash_lengths_(0),
+    match_list_hashes_(0)
 {
     // ML: FIXME: We assume here that if atom id's are to be used, only one
     //            atom per site is present. If more than one atom per site are
@@ -51,9 +105,6 @@ Configuration::Configuration(const std::vector<std::vector<double> >  & coordina
                                            coordinates[i][2]));
         // FIXME
         atom_id_.push_back(i);
-
-        // FIXME
-        atom_id_elements_[i] = elements_[i][0];
     }
 
     // Set the atom id coordinates to the same as the coordinates to start with.
@@ -81,13 +132,14 @@ Configuration::Configuration(const std::vector<std::vector<double> >  & coordina
      }
 
     // Setup the types from the elements strings.
-    for (size_t i = 0; i < elements_.size(); ++i)
+    types_.reserve(elements.size());
+    for (size_t i = 0; i < elements.size(); ++i)
     {
         TypeBucket tb(type_names_.size());
-        for (size_t j = 0; j < elements_[i].size(); ++j)
+        for (size_t j = 0; j < elements[i].size(); ++j)
         {
             // Get the element out at this point.
-            const std::string element = elements_[i][j];
+            const std::string & element = elements[i][j];
 
             // Get the type a numeric value.
             const int type = possible_types.find(element)->second;
@@ -98,6 +150,120 @@ Configuration::Configuration(const std::vector<std::vector<double> >  & coordina
 
         // Add to the types vector.
         types_.push_back(tb);
+
+        // And to the particle counts.
+        for (size_t j = 0; j < particles_per_type_.size(); ++j)
+        {
+            particles_per_type_[j] += tb[j];
+        }
+
+        // FIXME
+        atom_id_types_[i] = tb.firstPresentType();
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+const std::vector<std::vector<std::string> > & Configuration::elements() const
+{
+    if (elements_.empty() && !types_.empty())
+    {
+        // Generate the elements of all sites.
+        elements_.resize(types_.size());
+        for (size_t i = 0; i < types_.size(); ++i)
+        {
+            generateElements(i);
+        }
+    }
+    else
+    {
+        // Only the sites changed since the last query.
+        for (size_t i = 0; i < changed_sites_.size(); ++i)
+        {
+            generateElements(changed_sites_[i]);
+        }
+    }
+    changed_sites_.clear();
+
+    return elements_;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+const std::vector<std::string> & Configuration::atomIDElements() const
+{
+    const std::string empty;
+
+    if (atom_id_elements_.empty() && !atom_id_types_.empty())
+    {
+        atom_id_elements_.resize(atom_id_types_.size());
+        for (size_t i = 0; i < atom_id_types_.size(); ++i)
+        {
+            const int type = atom_id_types_[i];
+            atom_id_elements_[i] = (type < 0) ? empty : type_names_[type];
+        }
+    }
+    else
+    {
+        for (size_t i = 0; i < changed_atom_ids_.size(); ++i)
+        {
+            const int id = changed_atom_ids_[i];
+            const int type = atom_id_types_[id];
+            atom_id_elements_[id] = (type < 0) ? empty : type_names_[type];
+        }
+    }
+    changed_atom_ids_.clear();
+
+    return atom_id_elements_;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+const std::vector<int> & Configuration::typeCounts() const
+{
+    if (type_counts_.empty() && !types_.empty())
+    {
+        const size_t n_types = type_names_.size();
+        type_counts_.resize(types_.size() * n_types);
+        for (size_t i = 0; i < types_.size(); ++i)
+        {
+            for (size_t j = 0; j < n_types; ++j)
+            {
+                type_counts_[i * n_types + j] = types_[i][j];
+            }
+        }
+    }
+
+    return type_counts_;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Configuration::generateElements(const int index) const
+{
+    // The elements are written in place to reuse the storage.
+    const TypeBucket & types = types_[index];
+    std::vector<std::string> & elements_at_index = elements_[index];
+
+    size_t n_elements = 0;
+    for (int i = 0; i < types.size(); ++i)
+    {
+        n_elements += types[i];
+    }
+    elements_at_index.resize(n_elements);
+
+    size_t element = 0;
+    for (int i = 0; i < types.size(); ++i)
+    {
+        for (int j = 0; j < types[i]; ++j)
+        {
+            elements_at_index[element] = type_names_[i];
+            ++element;
+        }
     }
 }
 
@@ -107,26 +273,35 @@ Configuration::Configuration(const std::vector<std::vector<double> >  & coordina
 void Configuration::initMatchLists( const LatticeMap & lattice_map,
                                     const int range )
 {
+    if (compact_match_lists_)
+    {
+        initCompactMatchLists(lattice_map, range);
+    }
+    else
+    {
+        match_lists_.resize(types_.size());
+
+        // Loop over all lattice sites, in parallel on the threads.
+        parallelFor(types_.size(),
+                    [&](const size_t begin, const size_t end)
+                    {
+                        for (size_t i = begin; i < end; ++i)
+                        {
+                            // Calculate and store the match list.
+                            const int origin_index = i;
+                            const std::vector<int> neighbourhood = lattice_map.neighbourIndices(origin_index, range);
+                            match_lists_[i] = configMatchList(origin_index,
+                                                              neighbourhood,
+                                                              lattice_map);
+                        }
+                    });
+    }
+
     // Store the max size of minimal_match_list_
     size_t max_size = 0;
-    size_t tmp_size;
-
-    // Loop over all lattice sites.
     for (size_t i = 0; i < types_.size(); ++i)
     {
-        // Calculate and store the match list.
-        const int origin_index = i;
-        const std::vector<int> neighbourhood = lattice_map.neighbourIndices(origin_index, range);
-        match_lists_[i] = configMatchList(origin_index,
-                                          neighbourhood,
-                                          lattice_map);
-
-        // Store the maximum size
-        tmp_size = match_lists_[i].size();
-        if ( tmp_size > max_size )
-        {
-            max_size = tmp_size;
-        }
+        max_size = std::max(max_size, matchListSize(i));
     }
 
     // Now that we know the size of the match lists we can allocate
@@ -136,16 +311,394 @@ void Configuration::initMatchLists( const LatticeMap & lattice_map,
 }
 
 
+// -----------------------------------------------------------------------------
+//
+void Configuration::initCompactMatchLists(const LatticeMap & lattice_map,
+                                          const int range)
+{
+    const int n_basis = lattice_map.nBasis();
+    const size_t n_sites = types_.size();
+
+    // Only the geometry is kept in the templates.
+    const TypeBucket no_types(0);
+
+    // The template of each basis site is the geometry around the site in
+    // the most central cell, i.e. the one least affected by any boundaries.
+    const std::vector<int> central = \
+        lattice_map.indicesFromCell(lattice_map.repetitionsA() / 2,
+                                    lattice_map.repetitionsB() / 2,
+                                    lattice_map.repetitionsC() / 2);
+
+    match_list_templates_.assign(n_basis, ConfigBucketMatchList(0));
+    for (int basis = 0; basis < n_basis; ++basis)
+    {
+        const int origin_index = central[basis];
+        const std::vector<int> neighbourhood = lattice_map.neighbourIndices(origin_index, range);
+        match_list_templates_[basis] = configMatchList(origin_index, neighbourhood, lattice_map);
+
+        for (size_t j = 0; j < match_list_templates_[basis].size(); ++j)
+        {
+            match_list_templates_[basis][j].index = -1;
+            match_list_templates_[basis][j].match_types = no_types;
+        }
+    }
+
+    // Find the sites with the geometry of their basis site template, and
+    // the length of the match list of each site.
+    match_list_template_.assign(n_sites, -1);
+    match_list_offsets_.assign(n_sites + 1, 0);
+
+    parallelFor(n_sites,
+                [&](const size_t begin, const size_t end)
+                {
+                    for (size_t i = begin; i < end; ++i)
+                    {
+                        const int basis = lattice_map.basisSiteFromIndex(i);
+                        const std::vector<int> neighbourhood = lattice_map.neighbourIndices(i, range);
+                        const ConfigBucketMatchList & match_list = configMatchList(i, neighbourhood, lattice_map);
+
+                        if (sameGeometry(match_list, match_list_templates_[basis]))
+                        {
+                            match_list_template_[i] = basis;
+                        }
+                        match_list_offsets_[i + 1] = match_list.size();
+                    }
+                });
+
+    // The other sites get templates of their own.
+    int n_templates = n_basis;
+    for (size_t i = 0; i < n_sites; ++i)
+    {
+        if (match_list_template_[i] == -1)
+        {
+            match_list_template_[i] = n_templates;
+            ++n_templates;
+        }
+        match_list_offsets_[i + 1] += match_list_offsets_[i];
+    }
+    match_list_templates_.resize(n_templates, ConfigBucketMatchList(0));
+
+    // Store the neighbour indices in match list order.
+    match_list_indices_.resize(match_list_offsets_[n_sites]);
+
+    parallelFor(n_sites,
+                [&](const size_t begin, const size_t end)
+                {
+                    for (size_t i = begin; i < end; ++i)
+                    {
+                        const std::vector<int> neighbourhood = lattice_map.neighbourIndices(i, range);
+                        const ConfigBucketMatchList & match_list = configMatchList(i, neighbourhood, lattice_map);
+
+                        for (size_t j = 0; j < match_list.size(); ++j)
+                        {
+                            match_list_indices_[match_list_offsets_[i] + j] = match_list[j].index;
+                        }
+
+                        const int template_index = match_list_template_[i];
+                        if (template_index >= n_basis)
+                        {
+                            match_list_templates_[template_index] = match_list;
+                            for (size_t j = 0; j < match_list.size(); ++j)
+                            {
+                                match_list_templates_[template_index][j].index = -1;
+                                match_list_templates_[template_index][j].match_types = no_types;
+                            }
+                        }
+                    }
+                });
+
+    // The full match lists are not used.
+    std::vector<ConfigBucketMatchList>().swap(match_lists_);
+
+    // Match lists generated with the previous layout are outdated.
+    types_version_ = ++types_versions__;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+const ConfigBucketMatchList & Configuration::compactMatchList(const int index) const
+{
+    ConfigBucketMatchList & match_list = tmp_compact_match_list__;
+
+    // Reuse the latest generated list if the types have not changed since.
+    if (index == tmp_compact_index__ && types_version_ == tmp_compact_version__)
+    {
+        return match_list;
+    }
+
+    const ConfigBucketMatchList & geometry = match_list_templates_[match_list_template_[index]];
+    const size_t offset = match_list_offsets_[index];
+
+    match_list.resize(geometry.size());
+    for (size_t j = 0; j < geometry.size(); ++j)
+    {
+        const int neighbour = match_list_indices_[offset + j];
+        match_list[j].index       = neighbour;
+        match_list[j].distance    = geometry[j].distance;
+        match_list[j].x           = geometry[j].x;
+        match_list[j].y           = geometry[j].y;
+        match_list[j].z           = geometry[j].z;
+        match_list[j].match_types = types_[neighbour];
+    }
+
+    tmp_compact_index__   = index;
+    tmp_compact_version__ = types_version_;
+
+    return match_list;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Configuration::initLocalGeometries(const LatticeMap & lattice_map,
+                                        const std::vector<double> & cutoffs)
+{
+    const int n_basis = lattice_map.nBasis();
+
+    // The reference site of each basis site is the first one with the
+    // longest match list, i.e. the one least affected by any boundaries.
+    std::vector<int> reference(n_basis, -1);
+    for (size_t i = 0; i < types_.size(); ++i)
+    {
+        const int basis = lattice_map.basisSiteFromIndex(i);
+        if (reference[basis] == -1 ||
+            matchListSize(i) > matchListSize(reference[basis]))
+        {
+            reference[basis] = i;
+        }
+    }
+
+    // Store the geometries around the reference sites, and keep copies of
+    // the reference match lists for the comparisons below.
+    std::vector<ConfigBucketMatchList> reference_lists(n_basis, ConfigBucketMatchList(0));
+    local_geometries_.assign(n_basis, std::vector<std::pair<double, std::vector<double> > >(0));
+    for (int basis = 0; basis < n_basis; ++basis)
+    {
+        if (reference[basis] == -1)
+        {
+            continue;
+        }
+
+        reference_lists[basis] = configMatchList(reference[basis]);
+        const ConfigBucketMatchList & match_list = reference_lists[basis];
+
+        for (size_t c = 0; c < cutoffs.size(); ++c)
+        {
+            // Skip cutoffs already stored.
+            bool stored = false;
+            for (size_t i = 0; i < local_geometries_[basis].size(); ++i)
+            {
+                stored = stored || (local_geometries_[basis][i].first == cutoffs[c]);
+            }
+            if (stored)
+            {
+                continue;
+            }
+
+            std::vector<double> geometry;
+            for (size_t i = 0; i < match_list.size() && match_list[i].distance <= cutoffs[c]; ++i)
+            {
+                geometry.push_back(match_list[i].x);
+                geometry.push_back(match_list[i].y);
+                geometry.push_back(match_list[i].z);
+            }
+
+            local_geometries_[basis].push_back(std::make_pair(cutoffs[c], geometry));
+        }
+    }
+
+    // Find the sites with the same match list geometry as their reference site.
+    local_geometry_basis_.assign(types_.size(), -1);
+
+    parallelFor(types_.size(),
+                [&](const size_t begin, const size_t end)
+                {
+                    for (size_t i = begin; i < end; ++i)
+                    {
+                        const int basis = lattice_map.basisSiteFromIndex(i);
+                        if (matchListSize(i) != reference_lists[basis].size())
+                        {
+                            continue;
+                        }
+
+                        if (sameGeometry(configMatchList(i), reference_lists[basis]))
+                        {
+                            local_geometry_basis_[i] = basis;
+                        }
+                    }
+                });
+}
+
+
+// -----------------------------------------------------------------------------
+//
+const std::vector<double> * Configuration::localGeometry(const int index,
+                                                         const double cutoff) const
+{
+    if (local_geometry_basis_.empty() || local_geometry_basis_[index] == -1)
+    {
+        return NULL;
+    }
+
+    const std::vector<std::pair<double, std::vector<double> > > & geometries = \
+        local_geometries_[local_geometry_basis_[index]];
+
+    for (size_t i = 0; i < geometries.size(); ++i)
+    {
+        if (geometries[i].first == cutoff)
+        {
+            return &geometries[i].second;
+        }
+    }
+
+    return NULL;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Configuration::initMatchListHashes(const std::vector<double> & cutoffs)
+{
+    // The distinct cutoffs.
+    hash_cutoffs_.clear();
+    for (size_t c = 0; c < cutoffs.size(); ++c)
+    {
+        if (std::find(hash_cutoffs_.begin(), hash_cutoffs_.end(), cutoffs[c]) == hash_cutoffs_.end())
+        {
+            hash_cutoffs_.push_back(cutoffs[c]);
+        }
+    }
+
+    const size_t n_cutoffs = hash_cutoffs_.size();
+    hash_lengths_.assign(types_.size() * n_cutoffs, 0);
+    match_list_hashes_.assign(types_.size() * n_cutoffs, 0);
+
+    parallelFor(types_.size(),
+                [&](const size_t begin, const size_t end)
+                {
+                    for (size_t i = begin; i < end; ++i)
+                    {
+                        const ConfigBucketMatchList & match_list = configMatchList(i);
+                        int* lengths = &hash_lengths_[i * n_cutoffs];
+
+                        for (size_t c = 0; c < n_cutoffs; ++c)
+                        {
+                            int len = 0;
+                            while (len < static_cast<int>(match_list.size()) &&
+                                   match_list[len].distance <= hash_cutoffs_[c])
+                            {
+                                ++len;
+                            }
+                            lengths[c] = len;
+                        }
+
+                        calculateMatchListHashes(i);
+                    }
+                });
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Configuration::calculateMatchListHashes(const int index)
+{
+    const size_t n_cutoffs = hash_cutoffs_.size();
+    const ConfigBucketMatchList & match_list = configMatchList(index);
+    const int* lengths = &hash_lengths_[index * n_cutoffs];
+    uint64_t* hashes = &match_list_hashes_[index * n_cutoffs];
+
+    for (size_t c = 0; c < n_cutoffs; ++c)
+    {
+        hashes[c] = 0;
+    }
+
+    for (size_t j = 0; j < match_list.size(); ++j)
+    {
+        const TypeBucket & match_types = match_list[j].match_types;
+        uint64_t hash = 0;
+        for (int t = 0; t < match_types.size(); ++t)
+        {
+            hash += static_cast<uint64_t>(static_cast<int64_t>(match_types[t])) * zobristKey(j, t);
+        }
+
+        for (size_t c = 0; c < n_cutoffs; ++c)
+        {
+            if (static_cast<int>(j) < lengths[c])
+            {
+                hashes[c] += hash;
+            }
+        }
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+bool Configuration::matchListHash(const int index,
+                                  const double cutoff,
+                                  uint64_t & hash) const
+{
+    const size_t n_cutoffs = hash_cutoffs_.size();
+
+    for (size_t c = 0; c < n_cutoffs; ++c)
+    {
+        if (hash_cutoffs_[c] == cutoff)
+        {
+            hash = match_list_hashes_[index * n_cutoffs + c];
+            return true;
+        }
+    }
+
+    return false;
+}
+
+
 // -----------------------------------------------------------------------------
 //
 void Configuration::updateMatchList(const int index)
 {
+    const size_t n_cutoffs = hash_cutoffs_.size();
+
+    // The compact match lists are generated from the current types, and
+    // only the hashes need to be updated. The previous types are not known,
+    // so the hashes are calculated over again.
+    if (compact_match_lists_)
+    {
+        if (n_cutoffs != 0)
+        {
+            calculateMatchListHashes(index);
+        }
+        return;
+    }
+
     // Update the config match lists.
-    ConfigBucketMatchList::iterator it1 = match_lists_[index].begin();
-    const ConfigBucketMatchList::const_iterator end = match_lists_[index].end();
-    for ( ; it1 != end; ++it1 )
+    ConfigBucketMatchList & match_list = match_lists_[index];
+    for (size_t j = 0; j < match_list.size(); ++j)
     {
-        (*it1).match_types = types_[(*it1).index];
+        TypeBucket & match_types = match_list[j].match_types;
+        const TypeBucket & types = types_[match_list[j].index];
+
+        // Add the change of the particles at this position to the hashes.
+        if (n_cutoffs != 0 && match_types != types)
+        {
+            uint64_t change = 0;
+            for (int t = 0; t < types.size(); ++t)
+            {
+                const int64_t diff = types[t] - match_types[t];
+                change += static_cast<uint64_t>(diff) * zobristKey(j, t);
+            }
+
+            for (size_t c = 0; c < n_cutoffs; ++c)
+            {
+                if (static_cast<int>(j) < hash_lengths_[index * n_cutoffs + c])
+                {
+                    match_list_hashes_[index * n_cutoffs + c] += change;
+                }
+            }
+        }
+
+        match_types = types;
     }
 }
 
@@ -324,30 +877,34 @@ void Configuration::performBucketProcess(Process & process,
                 types_[index][i] += update_types[i];
             }
 
-            // Set the elements at this index.
+            // Update the particle counts.
+            for (size_t i = 0; i < particles_per_type_.size(); ++i)
+            {
+                particles_per_type_[i] += update_types[i];
+            }
 
-            // ML: FIXME: This is not a good solution.
-            //            We should store the update types as
-            //            a vector of strings in the match list entry,
-            //            instead of regenerating that list every time here.
-            std::vector<std::string> elements_at_index;
-            for (int i = 0; i < types_[index].size(); ++i)
+            // And the type counts, once they have been queried.
+            if (!type_counts_.empty())
             {
-                for (int j = 0; j < types_[index][i]; ++j)
+                int* counts = &type_counts_[index * type_names_.size()];
+                for (int i = 0; i < types_[index].size(); ++i)
                 {
-                    elements_at_index.push_back(type_names_[i]);
+                    counts[i] += update_types[i];
                 }
             }
-            elements_[index] = elements_at_index;
 
-            // Update the atom id element.
+            // The elements are generated from the types when queried.
+            siteChanged(index);
+
+            // Update the atom id type.
             if (!(*it1).has_move_coordinate)
             {
                 // ML: FIXME: This behavior should be deprecated.
                 //            Now we only take the first occuring type at the site.
                 //            This is expected behavior but incorrect in general and
                 //            works only for one atom per site simulations.
-                atom_id_elements_[atom_id] = elements_[index][0];
+                atom_id_types_[atom_id] = types_[index].firstPresentType();
+                atomIDChanged(atom_id);
             }
 
             // Mark this index as affected.
@@ -368,8 +925,9 @@ void Configuration::performBucketProcess(Process & process,
     // Perform the moves on all involved atom-IDs.
     const std::vector< std::pair<int,int> > & process_id_moves = process.idMoves();
 
-    // Local vector to store the atom id updates in.
-    std::vector<std::pair<int,int> > id_updates(process_id_moves.size());
+    // Work space to store the atom id updates in.
+    std::vector<std::pair<int,int> > & id_updates = id_updates_;
+    id_updates.resize(process_id_moves.size());
 
     // Setup the id updates list.
     for (size_t i = 0; i < process_id_moves.size(); ++i)
@@ -397,28 +955,11 @@ void Configuration::performBucketProcess(Process & process,
         // ML: FIXME: This behavior should be deprecated.
         // See above comment.
         // Update the element type of this atom ID.
-        atom_id_elements_[id] = elements_[index][0];
-
-    }
-}
+        atom_id_types_[id] = types_[index].firstPresentType();
+        atomIDChanged(id);
 
-
-// -----------------------------------------------------------------------------
-//
-std::vector<int> Configuration::particlesPerType() const
-{
-    // Allocate space for the return values.
-    std::vector<int> particles_per_type(possible_types_.size(), 0);
-
-    // Loop over each site and sum the number of particle.
-    for (size_t i = 0; i < types_.size(); ++i)
-    {
-        for (size_t j = 0; j < particles_per_type.size(); ++j)
-        {
-            particles_per_type[j] += types_[i][j];
-        }
     }
 
-    // DONE.
-    return particles_per_type;
+    // Match lists generated before this process are outdated.
+    types_version_ = ++types_versions__;
 }
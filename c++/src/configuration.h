@@ -18,6 +18,7 @@
 #include <vector>
 #include <string>
 #include <map>
+#include <cstdint>
 #include "matchlist.h"
 #include "coordinate.h"
 #include "typebucket.h"
@@ -48,6 +49,58 @@ public:
      */
     void initMatchLists(const LatticeMap & lattice_map, const int range);
 
+    /*! \brief Set if the match lists should be stored in compact form, as
+     *         one geometry template per basis site and the neighbour indices
+     *         of each site, instead of a full match list per site. Sites
+     *         with a different geometry, e.g. at non-periodic boundaries,
+     *         get templates of their own. Must be set before initMatchLists.
+     *  \param compact : True for the compact match lists.
+     */
+    void setCompactMatchLists(const bool compact) { compact_match_lists_ = compact; }
+
+    /*! \brief Query for the compact match lists flag.
+     *  \return : True if the match lists are stored in compact form.
+     */
+    bool compactMatchLists() const { return compact_match_lists_; }
+
+    /*! \brief Precompute the local geometries within the given cutoffs
+     *         around each basis site. Sites with the same match list
+     *         geometry as the reference site of their basis site share its
+     *         local geometries. Must be called after initMatchLists.
+     *  \param lattice_map : The lattice map to get the basis sites from.
+     *  \param cutoffs     : The cutoffs to precompute the geometries for.
+     */
+    void initLocalGeometries(const LatticeMap & lattice_map,
+                             const std::vector<double> & cutoffs);
+
+    /*! \brief Setup the match list hashes of all indices for the given
+     *         cutoffs. The hashes are updated with the match lists.
+     *         Must be called after initMatchLists.
+     *  \param cutoffs : The cutoffs to setup the hashes for.
+     */
+    void initMatchListHashes(const std::vector<double> & cutoffs);
+
+    /*! \brief Query for the hash of the match types within a cutoff in
+     *         the match list of an index.
+     *  \param index  : The index to get the hash for.
+     *  \param cutoff : The cutoff of the hash.
+     *  \param hash (out) : The hash.
+     *  \return : False if there is no hash for the cutoff.
+     */
+    bool matchListHash(const int index,
+                       const double cutoff,
+                       uint64_t & hash) const;
+
+    /*! \brief Query for the precomputed local geometry around an index.
+     *  \param index  : The index to get the local geometry for.
+     *  \param cutoff : The cutoff of the local geometry.
+     *  \return : A pointer to the x,y,z coordinates in contiguous memory of the match
+     *            list entries within the cutoff, or NULL if there is no precomputed
+     *            geometry for the index and cutoff.
+     */
+    const std::vector<double> * localGeometry(const int index,
+                                              const double cutoff) const;
+
     /*! \brief Const query for the coordinates.
      *  \return : The coordinates of the configuration.
      */
@@ -58,27 +111,55 @@ public:
      */
     const std::vector<Coordinate> & atomIDCoordinates() const { return atom_id_coordinates_; }
 
-    /*! \brief Const query for the elements.
-     *  \return : The elements of the configuration.
+    /*! \brief Const query for the elements. The element names are generated
+     *         from the types at the first query, and only the sites changed
+     *         since the previous query are regenerated. Not to be called
+     *         from several threads at the same time.
+     *  \return : The elements of the configuration, in type number order on each site.
      */
-    const std::vector<std::vector<std::string> > & elements() const { return elements_; }
+    const std::vector<std::vector<std::string> > & elements() const;
+
+    /*! \brief Const query for the atom id elements, generated from the
+     *         atom id types in the same way as the elements.
+     *  \return : The atom id elements of the configuration.
+     */
+    const std::vector<std::string> & atomIDElements() const;
 
     /*! \brief Const query for the atom id types.
-     *  \return : The atom id types of the configuration.
+     *  \return : The type number of each atom id, or -1 for an empty site.
      */
-    const std::vector<std::string> & atomIDElements() const { return atom_id_elements_; }
+    const std::vector<int> & atomIDTypes() const { return atom_id_types_; }
 
     /*! \brief Const query for the types.
      *  \return : The types of the configuration.
      */
     const std::vector<TypeBucket> & types() const { return types_; }
 
+    /*! \brief Const query for the type counts. The counts are set up from
+     *         the types at the first query and kept up to date when processes
+     *         are performed. Not to be called from several threads at the
+     *         same time.
+     *  \return : The number of particles of each type number on each site, as a
+     *            row major matrix with one row per site and one column per type.
+     */
+    const std::vector<int> & typeCounts() const;
+
     /*! \brief Const query for the moved atom ids.
      *  \return : A copy of the moved atom ids, resized to correct length.
      */
     inline
     std::vector<int> movedAtomIDs() const;
 
+    /*! \brief Const query for the number of atom ids moved the last move.
+     *  \return : The number of moved atom ids.
+     */
+    int nMovedAtomIDs() const { return n_moved_; }
+
+    /*! \brief Const query for the moved atom ids storage, without copying.
+     *  \return : The storage, with the moved atom ids as the first nMovedAtomIDs() elements.
+     */
+    const std::vector<int> & movedAtomIDsStorage() const { return moved_atom_ids_; }
+
     /*! \brief Const query for the process number of the latest process performed.
      *  \return : The number of the latest process performed.
      */
@@ -113,11 +194,15 @@ public:
      */
     void updateMatchList(const int index);
 
-    /*! \brief Return the cached match list without update.
+    /*! \brief Return the cached match list without update. With compact
+     *         match lists the list is generated from the current types, and
+     *         the returned reference is valid until the next call on the
+     *         same thread for another index, or until the types change.
      *  \param index : The index to get the match list for.
      *  \return : The match list.
      */
-    const ConfigBucketMatchList & configMatchList(const int index) const { return match_lists_[index]; }
+    const ConfigBucketMatchList & configMatchList(const int index) const
+    { return compact_match_lists_ ? compactMatchList(index) : match_lists_[index]; }
 
     /*! \brief Perform the given process.
      *  \param process : The process to perform, which will be updated with the affected
@@ -168,15 +253,58 @@ public:
      */
     const std::map<std::string,int> & possibleTypes() const { return possible_types_; }
 
-    /*! \brief Query for the number of particles per type.
+    /*! \brief Query for the number of particles per type, kept up to date
+     *         when processes are performed.
      *  \return : A vector holding the number of particles per type.
      */
-    std::vector<int> particlesPerType() const;
+    const std::vector<int> & particlesPerType() const { return particles_per_type_; }
 
 protected:
 
 private:
 
+    /*! \brief Mark a site as changed for the generated elements.
+     *  \param index : The index of the site.
+     */
+    inline
+    void siteChanged(const int index);
+
+    /*! \brief Mark an atom id as changed for the generated atom id elements.
+     *  \param atom_id : The atom id.
+     */
+    inline
+    void atomIDChanged(const int atom_id);
+
+    /*! \brief Generate the element names of a site from its types.
+     *  \param index : The index of the site.
+     */
+    void generateElements(const int index) const;
+
+    /*! \brief Setup the compact match lists.
+     *  \param lattice_map : The lattice map needed to get coordinates wrapped.
+     *  \param range       : The number of shells to include.
+     */
+    void initCompactMatchLists(const LatticeMap & lattice_map, const int range);
+
+    /*! \brief Generate the match list of an index from its geometry template,
+     *         neighbour indices and the current types.
+     *  \param index : The index to get the match list for.
+     *  \return : The match list, stored per thread.
+     */
+    const ConfigBucketMatchList & compactMatchList(const int index) const;
+
+    /*! \brief Query for the length of the match list of an index.
+     *  \param index : The index to get the match list length for.
+     *  \return : The number of entries in the match list.
+     */
+    inline
+    size_t matchListSize(const int index) const;
+
+    /*! \brief Calculate the match list hashes of an index from scratch.
+     *  \param index : The index to calculate the hashes for.
+     */
+    void calculateMatchListHashes(const int index);
+
     /// Counter for the number of moved atom ids the last move.
     int n_moved_;
 
@@ -186,15 +314,30 @@ private:
     /// The coordinates for each atom id.
     std::vector<Coordinate> atom_id_coordinates_;
 
-    /// The lattice elements.
-    std::vector<std::vector<std::string> > elements_;
-
-    /// The elements per atom id.
-    std::vector<std::string> atom_id_elements_;
-
     /// The the lattice elements in integer representation.
     std::vector<TypeBucket> types_;
 
+    /// The type number per atom id.
+    std::vector<int> atom_id_types_;
+
+    /// The number of particles of each type.
+    std::vector<int> particles_per_type_;
+
+    /// The number of particles of each type on each site, empty until queried.
+    mutable std::vector<int> type_counts_;
+
+    /// The lattice elements generated from the types, empty until queried.
+    mutable std::vector<std::vector<std::string> > elements_;
+
+    /// The sites changed since the elements were generated.
+    mutable std::vector<int> changed_sites_;
+
+    /// The elements per atom id generated from the atom id types, empty until queried.
+    mutable std::vector<std::string> atom_id_elements_;
+
+    /// The atom ids changed since the atom id elements were generated.
+    mutable std::vector<int> changed_atom_ids_;
+
     /// The atom id for each lattice point.
     std::vector<int> atom_id_;
 
@@ -207,9 +350,28 @@ private:
     /// The mapping from type integers to names.
     std::vector<std::string> type_names_;
 
-    /// The match lists for all indices.
+    /// The match lists for all indices, empty with compact match lists.
     std::vector< ConfigBucketMatchList > match_lists_;
 
+    /// If the match lists are stored in compact form.
+    bool compact_match_lists_;
+
+    /// The geometry templates of the compact match lists, without types.
+    std::vector< ConfigBucketMatchList > match_list_templates_;
+
+    /// The geometry template of each index.
+    std::vector<int> match_list_template_;
+
+    /// The offset of the neighbour indices of each index, with the total last.
+    std::vector<size_t> match_list_offsets_;
+
+    /// The neighbour indices of all indices, in the order of their templates.
+    std::vector<int> match_list_indices_;
+
+    /// Changes with the types and the match list layout, to know when
+    /// generated match lists are outdated.
+    uint64_t types_version_;
+
     /// The update info.
     std::vector< std::map<std::string, int> > update_info_;
 
@@ -222,6 +384,24 @@ private:
     /// The site index of the latest event that took place.
     int latest_event_site_;
 
+    /// Work space for the atom id updates of a process.
+    std::vector<std::pair<int,int> > id_updates_;
+
+    /// The basis site whose local geometries each index shares, or -1.
+    std::vector<int> local_geometry_basis_;
+
+    /// The cutoffs and local geometries for each basis site.
+    std::vector<std::vector<std::pair<double, std::vector<double> > > > local_geometries_;
+
+    /// The cutoffs of the match list hashes.
+    std::vector<double> hash_cutoffs_;
+
+    /// The match list length within each hash cutoff for each index.
+    std::vector<int> hash_lengths_;
+
+    /// The match list hash for each hash cutoff for each index.
+    std::vector<uint64_t> match_list_hashes_;
+
 };
 
 
@@ -230,6 +410,58 @@ private:
 // -----------------------------------------------------------------------------
 
 
+// -----------------------------------------------------------------------------
+//
+void Configuration::siteChanged(const int index)
+{
+    // Only needed once the elements have been generated. If more sites than
+    // there are in total have changed it is cheaper to start over.
+    if (!elements_.empty())
+    {
+        if (changed_sites_.size() < elements_.size())
+        {
+            changed_sites_.push_back(index);
+        }
+        else
+        {
+            std::vector<std::vector<std::string> >().swap(elements_);
+            std::vector<int>().swap(changed_sites_);
+        }
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Configuration::atomIDChanged(const int atom_id)
+{
+    if (!atom_id_elements_.empty())
+    {
+        if (changed_atom_ids_.size() < atom_id_elements_.size())
+        {
+            changed_atom_ids_.push_back(atom_id);
+        }
+        else
+        {
+            std::vector<std::string>().swap(atom_id_elements_);
+            std::vector<int>().swap(changed_atom_ids_);
+        }
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+size_t Configuration::matchListSize(const int index) const
+{
+    if (compact_match_lists_)
+    {
+        return match_list_offsets_[index + 1] - match_list_offsets_[index];
+    }
+    return match_lists_[index].size();
+}
+
+
 // -----------------------------------------------------------------------------
 //
 std::vector<int> Configuration::movedAtomIDs() const
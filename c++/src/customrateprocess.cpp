@@ -55,7 +55,13 @@ void CustomRateProcess::addSite(const int index,
     sites_.push_back(index);
     site_multiplicity_.push_back(multiplicity);
     site_rates_.push_back(rate);
-    total_rate_ += multiplicity * rate;
+
+    // Add the site rate to the tree.
+    const size_t position = sites_.size() - 1;
+    site_positions_.set(index, position);
+    site_tree_.resize(sites_.size());
+    site_tree_.set(position, multiplicity * rate);
+    total_rate_ = site_tree_.total();
 }
 
 
@@ -63,41 +69,53 @@ void CustomRateProcess::addSite(const int index,
 //
 void CustomRateProcess::removeSite(const int index)
 {
-    // Find the index to remove.
-    std::vector<int>::iterator it1 = std::find(sites_.begin(),
-                                               sites_.end(),
-                                               index);
-
-    // Swap the index to remove with the last index.
-    std::vector<int>::iterator last = sites_.end()-1;
-    std::swap((*it1), (*last));
+    // Find the position of the index to remove.
+    const int position = site_positions_.find(index);
 
-    // Remove the last index from the list.
-    sites_.pop_back();
+    if (position == -1)
+    {
+        return;
+    }
 
-    // Calculate the positions in the site_rates_ vector.
-    std::vector<double>::iterator it2 = site_rates_.begin() + (it1-sites_.begin());
-    std::vector<double>::iterator last_rate = site_rates_.end()-1;
+    // Move the last rate into the removed position and remove the last.
+    site_rates_[position] = site_rates_.back();
+    site_rates_.pop_back();
 
-    // Swap and remove.
-    std::swap((*it2), (*last_rate));
+    // Remove the site and its multiplicity.
+    removeSiteAtPosition(position);
+}
 
-    // Store the value temporarily.
-    const double site_rate = site_rates_.back();
-    site_rates_.pop_back();
 
-    // Calculate the position in the site_multiplicity_ vector.
-    std::vector<double>::iterator it3 = site_multiplicity_.begin() + (it1-sites_.begin());
-    std::vector<double>::iterator last_multiplicity = site_multiplicity_.end()-1;
+// -----------------------------------------------------------------------------
+//
+void CustomRateProcess::updateSite(const int index,
+                                   const double rate,
+                                   const double multiplicity)
+{
+    // Find the position of the index to update.
+    const int position = site_positions_.find(index);
 
-    // Swap and remove.
-    std::swap((*it3), (*last_multiplicity));
+    if (position == -1)
+    {
+        addSite(index, rate, multiplicity);
+    }
+    else
+    {
+        site_rates_[position] = rate;
+        updateSiteAtPosition(position, multiplicity, multiplicity * rate);
+    }
+}
 
-    // Update the total rate.
-    total_rate_ -= site_rate * site_multiplicity_.back();
 
-    site_multiplicity_.pop_back();
+// -----------------------------------------------------------------------------
+//
+int CustomRateProcess::pickSite() const
+{
+    // Get a random number between 0.0 and the total rate.
+    const double rnd = randomDouble01() * site_tree_.total();
 
+    // Pick the site weighted by its rate.
+    return sites_[site_tree_.pick(rnd)];
 }
 
 
@@ -105,14 +123,13 @@ void CustomRateProcess::removeSite(const int index)
 //
 void CustomRateProcess::updateRateTable()
 {
-    // Resize and update the incremental rate table.
-    incremental_rate_table_.resize(site_multiplicity_.size());
-    double previous = 0.0;
+    // Recalculate the site rates.
+    site_tree_ = SumTree(sites_.size());
     for (size_t i = 0; i < site_multiplicity_.size(); ++i)
     {
-        incremental_rate_table_[i] = previous + (site_rates_[i] * site_multiplicity_[i]);
-        previous = incremental_rate_table_[i];
+        site_tree_.set(i, site_rates_[i] * site_multiplicity_[i]);
     }
+    total_rate_ = site_tree_.total();
 
     // DONE
 }
@@ -75,8 +75,23 @@ public:
      */
     virtual void removeSite(const int index);
 
+    /*! \brief Update the rate and multiplicity of a listed site in place.
+     *         The site is added if it is not already listed.
+     *  \param index        : The index to update.
+     *  \param rate         : The new custom rate of the site.
+     *  \param multiplicity : The new multiplicity of the site.
+     */
+    virtual void updateSite(const int index,
+                            const double rate,
+                            const double multiplicity=1.0);
+
+    /*! \brief Pick a site weighted by its individual total rate.
+     *  \return : An available process.
+     */
+    virtual int pickSite() const;
 
-    /*! \brief Update the rate table prior to drawing a rate.
+    /*! \brief Recalculate the site rate tree from scratch. The tree is
+     *         otherwise updated incrementally when sites are added or removed.
      */
     virtual void updateRateTable();
 
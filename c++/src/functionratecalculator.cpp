@@ -0,0 +1,66 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  functionratecalculator.cpp
+ *  \brief File for the implementation code of the FunctionRateCalculator class.
+ */
+
+#include "functionratecalculator.h"
+
+#include <stdexcept>
+
+
+// -----------------------------------------------------------------------------
+//
+FunctionRateCalculator::FunctionRateCalculator(const size_t function,
+                                               const size_t user_data,
+                                               const double cutoff,
+                                               const bool cache_rates,
+                                               const std::vector<int> & exclude_from_caching,
+                                               const int cache_size,
+                                               const bool thread_safe) :
+    function_(reinterpret_cast<RateFunction>(function)),
+    user_data_(reinterpret_cast<void*>(user_data)),
+    cutoff_(cutoff),
+    cache_rates_(cache_rates),
+    exclude_from_caching_(exclude_from_caching),
+    cache_size_(cache_size),
+    thread_safe_(thread_safe)
+{
+    if (function_ == NULL)
+    {
+        throw std::runtime_error("The rate function address may not be zero.");
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double FunctionRateCalculator::backendRateCallbackTypeNumbers(const std::vector<double> & geometry,
+                                                              const int len,
+                                                              const std::vector<int> & types_before,
+                                                              const std::vector<int> & types_after,
+                                                              const std::vector<std::string> & type_names,
+                                                              const double rate_constant,
+                                                              const int process_number,
+                                                              const double global_x,
+                                                              const double global_y,
+                                                              const double global_z) const
+{
+    return function_(geometry.empty() ? NULL : &geometry[0],
+                     len,
+                     types_before.empty() ? NULL : &types_before[0],
+                     types_after.empty() ? NULL : &types_after[0],
+                     rate_constant,
+                     process_number,
+                     global_x,
+                     global_y,
+                     global_z,
+                     user_data_);
+}
+
@@ -0,0 +1,143 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  functionratecalculator.h
+ *  \brief File for the FunctionRateCalculator class definition.
+ */
+
+#ifndef __FUNCTIONRATECALCULATOR__
+#define __FUNCTIONRATECALCULATOR__
+
+#include <vector>
+#include <string>
+#include <cstddef>
+
+#include "ratecalculator.h"
+
+
+/// The signature of the C functions used by the FunctionRateCalculator.
+/// The arguments are the same as for backendRateCallbackTypeNumbers, with
+/// the vectors given as pointers to their data, followed by the user data.
+typedef double (*RateFunction)(const double * geometry,
+                               int len,
+                               const int * types_before,
+                               const int * types_after,
+                               double rate_constant,
+                               int process_number,
+                               double global_x,
+                               double global_y,
+                               double global_z,
+                               void * user_data);
+
+
+/*! \brief Class for a rate calculator calling a C function given by its
+ *         address, e.g. a ctypes callback or a compiled numba cfunc. The
+ *         function is called directly with the type numbers, without
+ *         going through Python. Bucket processes are not supported.
+ */
+class FunctionRateCalculator : public RateCalculator {
+
+public:
+
+    /*! \brief Constructor.
+     *  \param function             : The address of a function with the RateFunction signature.
+     *  \param user_data            : An address passed on to each call of the function.
+     *  \param cutoff               : The cutoff of the local geometries.
+     *  \param cache_rates          : If the rates should be cached.
+     *  \param exclude_from_caching : The process numbers to exclude from caching.
+     *  \param cache_size           : The maximum number of cached rates.
+     *  \param thread_safe          : If the function may be called from several threads at once.
+     */
+    FunctionRateCalculator(const size_t function,
+                           const size_t user_data,
+                           const double cutoff,
+                           const bool cache_rates,
+                           const std::vector<int> & exclude_from_caching,
+                           const int cache_size,
+                           const bool thread_safe);
+
+    /*! \brief Call the function with the data of the vectors.
+     * \param geometry       : The geometry, with x,y,z coordinates for each atom in contiguous memory.
+     * \param len            : The number of atoms.
+     * \param types_before   : The type numbers before the process.
+     * \param types_after    : The type numbers after the process.
+     * \param type_names     : The names of the type numbers, not used.
+     * \param rate_constant  : The rate constant associated with the process.
+     * \param process_number : The id number of the process.
+     * \param global_x       : The global coordinate in the x direction for the central site.
+     * \param global_y       : The global coordinate in the y direction for the central site.
+     * \param global_z       : The global coordinate in the z direction for the central site.
+     * \return : The rate returned by the function.
+     */
+    virtual
+    double backendRateCallbackTypeNumbers(const std::vector<double> & geometry,
+                                          const int len,
+                                          const std::vector<int> & types_before,
+                                          const std::vector<int> & types_after,
+                                          const std::vector<std::string> & type_names,
+                                          const double rate_constant,
+                                          const int process_number,
+                                          const double global_x,
+                                          const double global_y,
+                                          const double global_z) const override;
+
+    /*! \brief Query for the type numbers flag.
+     *  \return : True, the function takes type numbers.
+     */
+    virtual bool typeNumbers() const override { return true; }
+
+    /*! \brief Query for the thread safe flag given at construction.
+     */
+    virtual bool threadSafe() const override { return thread_safe_; }
+
+    /*! \brief Query for the cache size given at construction.
+     */
+    virtual int cacheSize() const override { return cache_size_; }
+
+    /*! \brief Query for the cutoff given at construction.
+     */
+    virtual double cutoff() const override { return cutoff_; }
+
+    /*! \brief Query for the caching flag given at construction.
+     */
+    virtual bool cacheRates() const override { return cache_rates_; }
+
+    /*! \brief Query for the process numbers excluded from caching given at construction.
+     */
+    virtual std::vector<int> excludeFromCaching() const override { return exclude_from_caching_; }
+
+protected:
+
+private:
+
+    /// The function to call.
+    RateFunction function_;
+
+    /// The user data to pass on to the function.
+    void * user_data_;
+
+    /// The cutoff.
+    double cutoff_;
+
+    /// The caching flag.
+    bool cache_rates_;
+
+    /// The process numbers to exclude from caching.
+    std::vector<int> exclude_from_caching_;
+
+    /// The cache size.
+    int cache_size_;
+
+    /// The thread safe flag.
+    bool thread_safe_;
+
+};
+
+
+#endif // __FUNCTIONRATECALCULATOR__
+
@@ -23,6 +23,13 @@
 #include <cinttypes>
 
 
+// Work space for the data to hash, per thread.
+static thread_local std::vector<int> tmp_data_to_hash__;
+
+// Flag for using MD5 rate keys.
+static bool md5_rate_keys__ = false;
+
+
 // -------------------------------------------------------------------------- //
 //
 uint64_t hash64MD5xor(std::vector<int> & message)
@@ -126,7 +133,8 @@ uint64_t hashCustomRateInput(const int index,
     const ConfigBucketMatchList & config_match_list  = configuration.configMatchList(index);
 
     // This is the data to hash.
-    std::vector<int> data_to_hash;
+    std::vector<int> & data_to_hash = tmp_data_to_hash__;
+    data_to_hash.clear();
     data_to_hash.push_back(process_number);
 
     // Add the match types of the config match list to the data to hash.
@@ -143,3 +151,37 @@ uint64_t hashCustomRateInput(const int index,
     // Hash and return.
     return hash64MD5xor(data_to_hash);
 }
+
+
+// -------------------------------------------------------------------------- //
+//
+uint64_t customRateKey(const int index,
+                       const Process & process,
+                       const Configuration & configuration)
+{
+    uint64_t hash = 0;
+
+    if (md5_rate_keys__ || !configuration.matchListHash(index, process.cutoff(), hash))
+    {
+        return hashCustomRateInput(index, process, configuration);
+    }
+
+    // Add the process number at a position not in any match list.
+    return hash + zobristKey(-1, process.processNumber());
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void setMD5RateKeys(const bool use_md5)
+{
+    md5_rate_keys__ = use_md5;
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+bool md5RateKeys()
+{
+    return md5_rate_keys__;
+}
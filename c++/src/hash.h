@@ -83,5 +83,55 @@ uint64_t hashCustomRateInput(const int index,
                              const Configuration & configurartion);
 
 
+/*! \brief Function for generating the 64-bit rate table key of the custom
+ *         rate calculator input. The key is taken from the incrementally
+ *         updated match list hashes of the configuration if these are set
+ *         up, and from hashCustomRateInput otherwise or if MD5 rate keys
+ *         are turned on.
+ *  \param index         : The global site index.
+ *  \param process       : The process that takes place.
+ *  \param configuration : The global configuration of the system.
+ *  \returns: 64-bit key value.
+ */
+uint64_t customRateKey(const int index,
+                       const Process & process,
+                       const Configuration & configuration);
+
+
+/*! \brief Turn on or off the use of MD5 hashes of the full custom rate
+ *         calculator input as rate table keys, for verification of the
+ *         incrementally updated match list hashes.
+ *  \param use_md5 : True for MD5 rate keys.
+ */
+void setMD5RateKeys(const bool use_md5);
+
+
+/*! \brief Query for the use of MD5 rate keys.
+ *  \returns : True if MD5 rate keys are used.
+ */
+bool md5RateKeys();
+
+
+/*! \brief The Zobrist key of a type at a match list position. The hash of
+ *         a match list is the sum of the keys times the number of particles
+ *         of each type at each position, which can be updated in O(1) when
+ *         the particles at a position change.
+ *  \param position : The position in the match list.
+ *  \param type     : The type number.
+ *  \returns : The pseudo random 64-bit key.
+ */
+inline
+uint64_t zobristKey(const int position, const int type)
+{
+    // The splitmix64 finalizer of the position and type.
+    uint64_t z = (static_cast<uint64_t>(static_cast<uint32_t>(position)) << 32) |
+        static_cast<uint32_t>(type);
+    z += 0x9e3779b97f4a7c15ull;
+    z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ull;
+    z = (z ^ (z >> 27)) * 0x94d049bb133111ebull;
+    return z ^ (z >> 31);
+}
+
+
 #endif // __HASH__
 
@@ -0,0 +1,154 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  indexmap.cpp
+ *  \brief File for the implementation code of the IndexMap class.
+ */
+
+#include "indexmap.h"
+
+
+// The number of slots in a new map, and its base two logarithm.
+static const size_t initial_slots__ = 8;
+static const int initial_bits__ = 3;
+
+
+// -----------------------------------------------------------------------------
+//
+IndexMap::IndexMap() :
+    size_(0),
+    mask_(initial_slots__ - 1),
+    shift_(64 - initial_bits__),
+    keys_(initial_slots__, -1),
+    values_(initial_slots__, 0)
+{
+    // NOTHING HERE
+}
+
+
+// -----------------------------------------------------------------------------
+//
+int IndexMap::find(const int key) const
+{
+    size_t i = slot(key);
+
+    while (keys_[i] != -1)
+    {
+        if (keys_[i] == key)
+        {
+            return values_[i];
+        }
+        i = (i + 1) & mask_;
+    }
+
+    return -1;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void IndexMap::set(const int key, const int value)
+{
+    // Keep the table at most half full for short probe sequences.
+    if (2 * (size_ + 1) > keys_.size())
+    {
+        grow();
+    }
+
+    size_t i = slot(key);
+
+    while (keys_[i] != -1)
+    {
+        if (keys_[i] == key)
+        {
+            values_[i] = value;
+            return;
+        }
+        i = (i + 1) & mask_;
+    }
+
+    keys_[i]   = key;
+    values_[i] = value;
+    ++size_;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void IndexMap::erase(const int key)
+{
+    size_t i = slot(key);
+
+    while (keys_[i] != key)
+    {
+        if (keys_[i] == -1)
+        {
+            return;
+        }
+        i = (i + 1) & mask_;
+    }
+
+    // Move later entries of the probe sequence back into the hole, so that
+    // no key is separated from its slot by an empty slot.
+    size_t j = i;
+    while (true)
+    {
+        j = (j + 1) & mask_;
+
+        if (keys_[j] == -1)
+        {
+            break;
+        }
+
+        // The entry at j may move to i if its slot is not cyclically in (i, j].
+        const size_t k = slot(keys_[j]);
+        const bool stays = (i <= j) ? (i < k && k <= j) : (i < k || k <= j);
+
+        if (!stays)
+        {
+            keys_[i]   = keys_[j];
+            values_[i] = values_[j];
+            i = j;
+        }
+    }
+
+    keys_[i] = -1;
+    --size_;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void IndexMap::clear()
+{
+    keys_.assign(keys_.size(), -1);
+    size_ = 0;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void IndexMap::grow()
+{
+    std::vector<int> keys(2 * keys_.size(), -1);
+    std::vector<int> values(2 * keys_.size(), 0);
+    keys.swap(keys_);
+    values.swap(values_);
+    mask_ = keys_.size() - 1;
+    --shift_;
+    size_ = 0;
+
+    for (size_t i = 0; i < keys.size(); ++i)
+    {
+        if (keys[i] != -1)
+        {
+            set(keys[i], values[i]);
+        }
+    }
+}
+
@@ -0,0 +1,98 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+
+/*! \file  indexmap.h
+ *  \brief File for the IndexMap class definition.
+ */
+
+#ifndef __INDEXMAP__
+#define __INDEXMAP__
+
+#include <vector>
+#include <cstddef>
+
+
+/*! \brief Class for mapping non-negative integer keys, such as lattice
+ *         indices, to non-negative integer values. The entries are stored
+ *         in a flat open addressing table with linear probing, so that
+ *         once the table has grown to its working size no insertion or
+ *         removal allocates any memory.
+ */
+class IndexMap {
+
+public:
+
+    /*! \brief Default constructor, giving an empty map.
+     */
+    IndexMap();
+
+    /*! \brief Query for the value stored for a key.
+     *  \param key : The key to look up.
+     *  \return : The stored value, or -1 if the key is not in the map.
+     */
+    int find(const int key) const;
+
+    /*! \brief Set the value for a key, adding the key if not present.
+     *  \param key   : The key to set the value for.
+     *  \param value : The value.
+     */
+    void set(const int key, const int value);
+
+    /*! \brief Remove a key from the map. Nothing happens if the key is
+     *         not present.
+     *  \param key : The key to remove.
+     */
+    void erase(const int key);
+
+    /*! \brief Remove all keys from the map, keeping the allocated storage.
+     */
+    void clear();
+
+    /*! \brief Query for the number of keys in the map.
+     *  \return : The number of keys.
+     */
+    size_t size() const { return size_; }
+
+protected:
+
+private:
+
+    /*! \brief Get the slot a key hashes to, from the high bits of a
+     *         multiplicative hash so that strided keys are spread out.
+     *  \param key : The key.
+     *  \return : The first slot to probe for the key.
+     */
+    size_t slot(const int key) const
+    { return static_cast<size_t>((static_cast<unsigned long long>(key) * 0x9E3779B97F4A7C15ull) >> shift_); }
+
+    /*! \brief Double the number of slots and re-insert all keys.
+     */
+    void grow();
+
+    /// The number of keys in the map.
+    size_t size_;
+
+    /// The number of slots minus one, the number of slots being a power of two.
+    size_t mask_;
+
+    /// The shift giving the first slot to probe from the key hash, 64 minus
+    /// the base two logarithm of the number of slots.
+    int shift_;
+
+    /// The key in each slot, or -1 for an empty slot.
+    std::vector<int> keys_;
+
+    /// The value in each slot.
+    std::vector<int> values_;
+
+};
+
+
+#endif // __INDEXMAP__
+
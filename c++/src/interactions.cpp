@@ -45,6 +45,13 @@ Interactions::Interactions(const std::vector<Process> & processes,
     custom_rate_processes_(0),
     process_pointers_(processes.size(), NULL),
     probability_table_(processes.size(), std::pair<double,int>(0.0,0)),
+    process_tree_(processes.size()),
+    updated_processes_(0),
+    process_updated_(processes.size(), false),
+    event_bins_(processes.size()),
+    updated_sites_(0),
+    rebuild_event_bins_(true),
+    selection_type_(TREE),
     implicit_wildcards_(implicit_wildcards),
     use_custom_rates_(false),
     rate_calculator_placeholder_(RateCalculator()),
@@ -69,6 +76,13 @@ Interactions::Interactions(const std::vector<CustomRateProcess> & processes,
     custom_rate_processes_(processes),
     process_pointers_(processes.size(), NULL),
     probability_table_(processes.size(), std::pair<double,int>(0.0,0)),
+    process_tree_(processes.size()),
+    updated_processes_(0),
+    process_updated_(processes.size(), false),
+    event_bins_(processes.size()),
+    updated_sites_(0),
+    rebuild_event_bins_(true),
+    selection_type_(TREE),
     implicit_wildcards_(implicit_wildcards),
     use_custom_rates_(true),
     rate_calculator_(rate_calculator)
@@ -101,6 +115,26 @@ int Interactions::maxRange() const
 }
 
 
+// -----------------------------------------------------------------------------
+//
+std::vector<int> Interactions::processRanges() const
+{
+    std::vector<int> ranges;
+
+    std::vector<Process*>::const_iterator it1 = process_pointers_.begin();
+    for ( ; it1 != process_pointers_.end(); ++it1 )
+    {
+        ranges.push_back((**it1).range());
+    }
+
+    // Sort and remove duplicates.
+    std::sort(ranges.begin(), ranges.end());
+    ranges.resize(std::unique(ranges.begin(), ranges.end()) - ranges.begin());
+
+    return ranges;
+}
+
+
 // -----------------------------------------------------------------------------
 //
 void Interactions::updateProcessMatchLists(const Configuration & configuration,
@@ -204,13 +238,37 @@ int Interactions::totalAvailableSites() const
 //
 void Interactions::updateProbabilityTable()
 {
+    // With composition-rejection the events are kept in rate bins.
+    if (selection_type_ == COMPOSITION_REJECTION)
+    {
+        updateEventBins();
+        return;
+    }
+
+    // With the sum tree only the registered processes need an update.
+    if (selection_type_ == TREE && !updated_processes_.empty())
+    {
+        for (size_t i = 0; i < updated_processes_.size(); ++i)
+        {
+            const int index = updated_processes_[i];
+            const Process & process = (*process_pointers_[index]);
+
+            // Processes with no available sites must never be picked.
+            const double total_rate = (process.nSites() == 0) ? 0.0 : process.totalRate();
+            process_tree_.set(index, total_rate);
+            process_updated_[index] = false;
+        }
+        updated_processes_.clear();
+        return;
+    }
+
     // Loop over all processes.
     std::vector<Process*>::const_iterator it1 = process_pointers_.begin();
     std::vector<std::pair<double,int> >::iterator it2 = probability_table_.begin();
     const std::vector<Process*>::const_iterator end = process_pointers_.end();
 
     double previous_rate = 0.0;
-    for ( ; it1 != end; ++it1, ++it2 )
+    for (size_t i = 0 ; it1 != end; ++it1, ++it2, ++i )
     {
         // Find out its total probability.
         const int n_sites = (**it1).nSites();
@@ -220,7 +278,100 @@ void Interactions::updateProbabilityTable()
         previous_rate += total_rate;
         // Store the number of available processes to filter out zeroes later.
         (*it2).second = n_sites;
+
+        // Keep the sum tree in sync.
+        process_tree_.set(i, (n_sites == 0) ? 0.0 : total_rate);
+    }
+
+    // Nothing is pending after a full update.
+    for (size_t i = 0; i < updated_processes_.size(); ++i)
+    {
+        process_updated_[updated_processes_[i]] = false;
+    }
+    updated_processes_.clear();
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Interactions::registerProcessUpdate(const int index)
+{
+    // Only the sum tree makes use of the information.
+    if (selection_type_ != TREE || process_updated_[index])
+    {
+        return;
+    }
+
+    process_updated_[index] = true;
+    updated_processes_.push_back(index);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Interactions::registerSiteUpdate(const int index, const int site)
+{
+    // Only the composition-rejection bins make use of the information.
+    if (selection_type_ != COMPOSITION_REJECTION)
+    {
+        return;
     }
+
+    updated_sites_.push_back(std::pair<int,int>(index, site));
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Interactions::updateEventBins()
+{
+    // Update only the registered events unless a rebuild is needed.
+    if (!rebuild_event_bins_)
+    {
+        for (size_t i = 0; i < updated_sites_.size(); ++i)
+        {
+            const int index = updated_sites_[i].first;
+            const int site  = updated_sites_[i].second;
+            event_bins_.set(index, site, process_pointers_[index]->siteTotalRate(site));
+        }
+        updated_sites_.clear();
+        return;
+    }
+
+    // Otherwise rebuild the bins from all sites of all processes.
+    event_bins_.clear(process_pointers_.size());
+
+    for (size_t i = 0; i < process_pointers_.size(); ++i)
+    {
+        const Process & process = (*process_pointers_[i]);
+        const std::vector<int> & sites = process.sites();
+
+        for (size_t j = 0; j < sites.size(); ++j)
+        {
+            event_bins_.set(i, sites[j], process.siteTotalRate(sites[j]));
+        }
+    }
+
+    updated_sites_.clear();
+    rebuild_event_bins_ = false;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Interactions::setSelectionType(const SELECTION_TYPE selection_type)
+{
+    selection_type_ = selection_type;
+
+    // Make sure the data for the new selection type is up to date.
+    for (size_t i = 0; i < updated_processes_.size(); ++i)
+    {
+        process_updated_[updated_processes_[i]] = false;
+    }
+    updated_processes_.clear();
+    updated_sites_.clear();
+    rebuild_event_bins_ = true;
+    updateProbabilityTable();
 }
 
 
@@ -228,15 +379,22 @@ void Interactions::updateProbabilityTable()
 //
 int Interactions::pickProcessIndex() const
 {
-    // PERFORMME:
-    // This implements the O(N) SSA algorithm.
-    // One could consider implementing the O(logN) SSA-GB algorithm,
-    // or the O(1) algorithm described in J.Chem.Phys. 128, 205101, (2008)
-    // but it is typically the re-matching after an event that sets the
-    // limit in terms of scaling with the number of processes.
+    // Pick the process of an event picked by composition-rejection.
+    if (selection_type_ == COMPOSITION_REJECTION)
+    {
+        return event_bins_.pick().first;
+    }
 
     // Get a random number between 0.0 and the total imcremented rate.
     const double rnd = randomDouble01() * totalRate();
+
+    // The O(logN) selection using the sum tree.
+    if (selection_type_ == TREE)
+    {
+        return process_tree_.pick(rnd);
+    }
+
+    // This implements the O(N) SSA algorithm.
     const std::pair<double,int> rnd_pair(rnd,1);
 
     // Find the lower bound - corresponding to the first element for which
@@ -259,11 +417,26 @@ int Interactions::pickProcessIndex() const
 Process* Interactions::pickProcess()
 {
     const int index = pickProcessIndex();
+    return process_pointers_[index];
+}
 
-    // Update the process internal probablility table if needed.
-    process_pointers_[index]->updateRateTable();
 
-    return process_pointers_[index];
+// -----------------------------------------------------------------------------
+//
+Process* Interactions::pickProcessAndSite(int & site_index)
+{
+    // Pick the process and site together from the event bins.
+    if (selection_type_ == COMPOSITION_REJECTION)
+    {
+        const std::pair<int,int> event = event_bins_.pick();
+        site_index = event.second;
+        return process_pointers_[event.first];
+    }
+
+    // Otherwise pick the process first and then a site in the process.
+    Process* process = pickProcess();
+    site_index = process->pickSite();
+    return process;
 }
 
 
@@ -275,6 +448,10 @@ void Interactions::clearMatching()
     {
         process_pointers_[i]->clearSites();
     }
+
+    // The event bins must be rebuilt from the new matching.
+    updated_sites_.clear();
+    rebuild_event_bins_ = true;
 }
 
 
@@ -19,6 +19,12 @@
 #include "process.h"
 #include "customrateprocess.h"
 #include "ratecalculator.h"
+#include "sumtree.h"
+#include "compositionrejection.h"
+
+
+/// The supported algorithms for selecting a process.
+enum SELECTION_TYPE {TREE, LINEAR, COMPOSITION_REJECTION};
 
 
 // Forward declarations.
@@ -54,6 +60,11 @@ public:
      */
     int maxRange() const;
 
+    /*! \brief Get the distinct ranges of the processes.
+     *  \return : The ranges in shells, sorted in ascending order.
+     */
+    std::vector<int> processRanges() const;
+
     /*! \brief Query for the custom rates flag.
      *  \return : The custom rates flag, (true) if we use custom rates.
      */
@@ -93,13 +104,44 @@ public:
 
     /*! \brief Recalculate the table of process probabilities based on the
      *         number of available sites for each process and their rates.
+     *         With the TREE selection type only the processes registered
+     *         as updated since the last call are recalculated, if any.
+     *         Otherwise all processes are recalculated.
      */
     void updateProbabilityTable();
 
+    /*! \brief Register that the sites or rates of a process have changed,
+     *         so that it will be recalculated at the next update of the
+     *         probability table.
+     *  \param index : The index of the updated process.
+     */
+    void registerProcessUpdate(const int index);
+
+    /*! \brief Register that a site has been added to, removed from or
+     *         updated in a process, so that the event will be recalculated
+     *         at the next update of the probability table. Only used with
+     *         the COMPOSITION_REJECTION selection type.
+     *  \param index : The index of the updated process.
+     *  \param site  : The index of the updated site.
+     */
+    void registerSiteUpdate(const int index, const int site);
+
+    /*! \brief Set the algorithm to use for selecting a process. This
+     *         triggers a full update of the probability table.
+     *  \param selection_type : The selection algorithm to use.
+     */
+    void setSelectionType(const SELECTION_TYPE selection_type);
+
+    /*! \brief Query for the selection algorithm in use.
+     *  \return : The selection type.
+     */
+    SELECTION_TYPE selectionType() const { return selection_type_; }
+
     /*! \brief Query for the total rate of the system.
      *  \return : The total rate.
      */
-    double totalRate() const { return probability_table_.back().first; }
+    inline
+    double totalRate() const;
 
     /*! \brief Pick an availabe process according to its probability.
      *  \return : The index of a possible available process picked according
@@ -114,6 +156,13 @@ public:
      */
     Process* pickProcess();
 
+    /*! \brief Pick an available process and one of its sites according to
+     *         their probability.
+     *  \param site_index : On return, the index of the picked site.
+     *  \return : A reference to the picked process.
+     */
+    Process* pickProcessAndSite(int & site_index);
+
     /*! \brief Erase any matching information from the processe.
      *         Used at initialization.
      */
@@ -123,6 +172,13 @@ protected:
 
 private:
 
+    /*! \brief Update the composition-rejection event bins with the events
+     *         registered since the last update, or rebuild them from all
+     *         processes after construction, a change of selection type or
+     *         a cleared matching.
+     */
+    void updateEventBins();
+
     /// The processes.
     std::vector<Process> processes_;
 
@@ -135,6 +191,27 @@ private:
     /// The probability table.
     std::vector<std::pair<double,int> > probability_table_;
 
+    /// The sum tree of the total rates of the processes.
+    SumTree process_tree_;
+
+    /// The indices of the processes updated since the last table update.
+    std::vector<int> updated_processes_;
+
+    /// Flags indicating which processes are listed as updated.
+    std::vector<bool> process_updated_;
+
+    /// The events of all processes binned for composition-rejection.
+    CompositionRejection event_bins_;
+
+    /// The process and site indices of the events updated since the last table update.
+    std::vector<std::pair<int,int> > updated_sites_;
+
+    /// Flag indicating that the event bins must be rebuilt from all processes.
+    bool rebuild_event_bins_;
+
+    /// The algorithm to use for selecting a process.
+    SELECTION_TYPE selection_type_;
+
     /// The flag indicating if implicit wildcards should  be used.
     bool implicit_wildcards_;
 
@@ -150,5 +227,29 @@ private:
 };
 
 
+// -----------------------------------------------------------------------------
+// Inlined function definitions follow.
+// -----------------------------------------------------------------------------
+
+
+// -----------------------------------------------------------------------------
+//
+double Interactions::totalRate() const
+{
+    if (selection_type_ == TREE)
+    {
+        return process_tree_.total();
+    }
+    else if (selection_type_ == COMPOSITION_REJECTION)
+    {
+        return event_bins_.totalRate();
+    }
+    else
+    {
+        return probability_table_.back().first;
+    }
+}
+
+
 #endif // __INTERACTIONS__
 
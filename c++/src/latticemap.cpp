@@ -31,8 +31,8 @@ struct CellIndex {
 };
 
 
-// Temporary storage for the indices form cell.
-static std::vector<int> tmp_cell_indices__;
+// Temporary storage for the indices form cell, one per thread.
+static thread_local std::vector<int> tmp_cell_indices__;
 
 
 // -----------------------------------------------------------------------------
@@ -44,8 +44,7 @@ LatticeMap::LatticeMap(const int n_basis,
     repetitions_(repetitions),
     periodic_(periodic)
 {
-    // Resize the global data.
-    tmp_cell_indices__.resize(n_basis_);
+    // NOTHING HERE
 }
 
 
@@ -54,24 +53,68 @@ LatticeMap::LatticeMap(const int n_basis,
 std::vector<int> LatticeMap::neighbourIndices(const int index,
                                               const int shells) const
 {
-    // PERFORMME
+    std::vector<int> neighbours;
+    neighbourIndices(index, shells, neighbours);
+    return neighbours;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void LatticeMap::neighbourIndices(const int index,
+                                  const int shells,
+                                  std::vector<int> & neighbours) const
+{
+    neighbours.clear();
+    appendNeighbourIndices(index, shells, neighbours);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+std::vector<int> LatticeMap::supersetNeighbourIndices(const std::vector<int> & indices,
+                                                      const int shells) const
+{
+    std::vector<int> superset;
+    supersetNeighbourIndices(indices, shells, superset);
+    return superset;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void LatticeMap::supersetNeighbourIndices(const std::vector<int> & indices,
+                                          const int shells,
+                                          std::vector<int> & superset) const
+{
+    // Add the neighbours of all indices and remove the duplicates.
+    superset.clear();
+
+    for (size_t i = 0; i < indices.size(); ++i)
+    {
+        appendNeighbourIndices(indices[i], shells, superset);
+    }
 
+    // Sort the superset.
+    std::sort(superset.begin(), superset.end());
+
+    // Get the unique elements out.
+    superset.resize(std::unique(superset.begin(), superset.end())-superset.begin());
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void LatticeMap::appendNeighbourIndices(const int index,
+                                        const int shells,
+                                        std::vector<int> & neighbours) const
+{
     // Get the cell index.
     CellIndex c;
     indexToCell(index, c.i, c.j, c.k);
 
     const CellIndex & cell = c;
 
-    // Setup the return data structure.
-    const int n_neighbours = static_cast<int>(std::pow((2.0*shells + 1), 3) * n_basis_);
-    std::vector<int> neighbours(n_neighbours);
-
-    // Get a pointer to the neighbours data for direct write access.
-    int* neighbours_ptr = &neighbours[0];
-
-    // A counter to know how much we have added.
-    int counter = 0;
-
     for (int i = cell.i - shells; i <= cell.i + shells; ++i)
     {
         int ii = i;
@@ -130,61 +173,13 @@ std::vector<int> LatticeMap::neighbourIndices(const int index,
                             // Take a reference to the mapped data.
                             const std::vector<int> & indices = indicesFromCell(ii,jj,kk);
                             // Copy data over from the neighbour cell.
-                            size_t size = n_basis_ * sizeof(int);
-                            std::memcpy(neighbours_ptr, &indices[0], size);
-
-                            // Increment the pointer.
-                            neighbours_ptr += n_basis_;
-
-                            // Increment the counter.
-                            counter += n_basis_;
+                            neighbours.insert(neighbours.end(), indices.begin(), indices.end());
                         }
                     }
                 }
             }
         }
     }
-
-    // Resize and return.
-    neighbours.resize(counter);
-    return neighbours;
-}
-
-
-// -----------------------------------------------------------------------------
-//
-std::vector<int> LatticeMap::supersetNeighbourIndices(const std::vector<int> & indices,
-                                                      const int shells) const
-{
-    // PERFORMME:
-    // We can use several different stategies here and this might
-    // be performance critical, thus we need to time it. So, for now,
-    // use the simplest possible naive implementation.
-
-    std::vector<int> superset;
-
-    for (size_t i = 0; i < indices.size(); ++i)
-    {
-        // Get the index.
-        const int index = indices[i];
-
-        // And its neighbours.
-        const std::vector<int> neighbours = neighbourIndices(index, shells);
-
-        // Add its neighbourlist to the superset.
-        for (size_t j = 0; j < neighbours.size(); ++j)
-        {
-            superset.push_back(neighbours[j]);
-        }
-    }
-
-    // Sort the superset.
-    std::sort(superset.begin(), superset.end());
-
-    // Get the unique elements out.
-    superset.resize(std::unique(superset.begin(), superset.end())-superset.begin());
-
-    return superset;
 }
 
 
@@ -199,6 +194,9 @@ const std::vector<int> & LatticeMap::indicesFromCell(const int i,
     const int tmp2 = tmp1 * repetitions_[2] + k;
     const int tmp3 = tmp2 * n_basis_;
 
+    // The storage is shared by all lattice maps on the thread.
+    tmp_cell_indices__.resize(n_basis_);
+
     for (int l = 0; l < n_basis_; ++l)
     {
         tmp_cell_indices__[l] = tmp3 + l;
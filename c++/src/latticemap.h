@@ -54,6 +54,26 @@ public:
     std::vector<int> supersetNeighbourIndices(const std::vector<int> & indices,
                                               const int shells) const;
 
+    /*! \brief Get the neighbouring indices of a given index, including all
+     *         indices in nearby cells, reusing the storage of the out vector.
+     * \param index          : The index to query for.
+     * \param shells         : The number of shells to include (in terms of primitive cells.)
+     * \param neighbours(out): The list of indices, replacing any previous content.
+     */
+    void neighbourIndices(const int index,
+                          const int shells,
+                          std::vector<int> & neighbours) const;
+
+    /*! \brief Get the unique neighbouring indices of a set of given
+     *         indices, reusing the storage of the out vector.
+     * \param indices      : The vector of indices to get the neighbours for.
+     * \param shells       : The number of shells to include (in terms of primitive cells.)
+     * \param superset(out): The sorted list of unique indices, replacing any previous content.
+     */
+    void supersetNeighbourIndices(const std::vector<int> & indices,
+                                  const int shells,
+                                  std::vector<int> & superset) const;
+
     /*! \brief Get the indices from a given cell.
      * \param i : The cell index in the a direction.
      * \param j : The cell index in the b direction.
@@ -149,6 +169,16 @@ protected:
 
 private:
 
+    /*! \brief Append the neighbouring indices of a given index,
+     *         including all indices in nearby cells, to a vector.
+     * \param index          : The index to query for.
+     * \param shells         : The number of shells to include (in terms of primitive cells.)
+     * \param neighbours(out): The vector to append the indices to.
+     */
+    void appendNeighbourIndices(const int index,
+                                const int shells,
+                                std::vector<int> & neighbours) const;
+
     /// The number of basis points in the elemntary unitcell.
     int n_basis_;
     /// The number of repetitions along the a, b and c directions.
@@ -17,21 +17,27 @@
 #include "random.h"
 
 #include <cstdio>
+#include <algorithm>
 
 // -----------------------------------------------------------------------------
 //
 LatticeModel::LatticeModel(Configuration & configuration,
                            SimulationTimer & simulation_timer,
                            const LatticeMap & lattice_map,
-                           const Interactions & interactions) :
+                           const Interactions & interactions,
+                           const RateTable & preloaded_rates) :
     configuration_(configuration),
     simulation_timer_(simulation_timer),
     lattice_map_(lattice_map),
     interactions_(interactions),
-    matcher_(configuration.coordinates().size(), interactions.processes().size())
+    matcher_(configuration.coordinates().size(), interactions.processes().size()),
+    range_classes_(0),
+    index_ranges_(0),
+    indices_(0),
+    inner_indices_(0)
 {
     // Setup the mapping between coordinates and processes.
-    calculateInitialMatching();
+    calculateInitialMatching(preloaded_rates);
 
     // Initialize the interactions table here.
     interactions_.updateProbabilityTable();
@@ -40,19 +46,53 @@ LatticeModel::LatticeModel(Configuration & configuration,
 
 // -----------------------------------------------------------------------------
 //
-void LatticeModel::calculateInitialMatching()
+void LatticeModel::calculateInitialMatching(const RateTable & preloaded_rates)
 {
     // Calculate the match lists.
     configuration_.initMatchLists(lattice_map_, interactions_.maxRange());
 
+    // The local geometries sent to the rate calculator never change,
+    // precompute them for the cutoffs of the processes, and setup the
+    // match list hashes used as rate table keys.
+    if (interactions_.useCustomRates())
+    {
+        std::vector<double> cutoffs;
+        for (size_t i = 0; i < interactions_.processes().size(); ++i)
+        {
+            cutoffs.push_back(interactions_.processes()[i]->cutoff());
+        }
+        configuration_.initLocalGeometries(lattice_map_, cutoffs);
+        configuration_.initMatchListHashes(cutoffs);
+
+        // Size the rate table as requested by the rate calculator.
+        const int cache_size = interactions_.rateCalculator().cacheSize();
+        matcher_.setRateTableCapacity(std::max(cache_size, 0));
+        matcher_.preloadRates(preloaded_rates);
+    }
+
     // Update the interactions matchlists.
     interactions_.clearMatching();
     interactions_.updateProcessMatchLists(configuration_, lattice_map_);
 
+    // Setup the candidate processes for each basis site.
+    matcher_.initCandidateProcesses(interactions_, lattice_map_);
+
+    // Find the process ranges that need a smaller re-matching neighbourhood.
+    const int max_range = interactions_.maxRange();
+    const std::vector<int> ranges = interactions_.processRanges();
+    range_classes_.clear();
+    for (size_t i = 0; i < ranges.size(); ++i)
+    {
+        if (ranges[i] < max_range)
+        {
+            range_classes_.push_back(ranges[i]);
+        }
+    }
+
    // Match all centeres.
     std::vector<int> indices;
 
-    for(size_t i = 0; i < configuration_.elements().size(); ++i)
+    for(size_t i = 0; i < configuration_.types().size(); ++i)
     {
         indices.push_back(i);
     }
@@ -64,6 +104,35 @@ void LatticeModel::calculateInitialMatching()
                                indices);
 }
 
+// -----------------------------------------------------------------------------
+//
+void LatticeModel::preloadRates(const RateTable & rates)
+{
+    // Only custom rates are stored.
+    if (!interactions_.useCustomRates())
+    {
+        return;
+    }
+
+    matcher_.preloadRates(rates);
+
+    // Re-match all centers, picking up the stored rates.
+    std::vector<int> indices;
+
+    for(size_t i = 0; i < configuration_.types().size(); ++i)
+    {
+        indices.push_back(i);
+    }
+
+    matcher_.calculateMatching(interactions_,
+                               configuration_,
+                               lattice_map_,
+                               indices);
+
+    // Update the interactions' probability table.
+    interactions_.updateProbabilityTable();
+}
+
 // -----------------------------------------------------------------------------
 //
 void LatticeModel::propagateTime()
@@ -76,25 +145,66 @@ void LatticeModel::propagateTime()
 //
 void LatticeModel::singleStep()
 {
-    // Select a process.
-    Process & process = (*interactions_.pickProcess());
-
-    // Select a site.
-    const int site_index = process.pickSite();
+    // Select a process and a site.
+    int site_index = 0;
+    Process & process = (*interactions_.pickProcessAndSite(site_index));
 
     // Perform the operation.
     configuration_.performBucketProcess(process, site_index, lattice_map_);
 
     // Run the re-matching of the affected sites and their neighbours.
-    const std::vector<int> & indices = \
-        lattice_map_.supersetNeighbourIndices(process.affectedIndices(), interactions_.maxRange());
+    const std::vector<int> & affected_indices = process.affectedIndices();
+    lattice_map_.supersetNeighbourIndices(affected_indices, interactions_.maxRange(), indices_);
+    const std::vector<int> & indices = indices_;
 
-    matcher_.calculateMatching(interactions_,
-                               configuration_,
-                               lattice_map_,
-                               indices);
+    if (range_classes_.empty())
+    {
+        matcher_.calculateMatching(interactions_,
+                                   configuration_,
+                                   lattice_map_,
+                                   indices);
+    }
+    else
+    {
+        // Each process is only re-matched within its own range.
+        calculateIndexRanges(affected_indices, indices);
+        matcher_.calculateMatching(interactions_,
+                                   configuration_,
+                                   lattice_map_,
+                                   indices,
+                                   index_ranges_);
+    }
 
     // Update the interactions' probability table.
     interactions_.updateProbabilityTable();
 }
 
+
+// -----------------------------------------------------------------------------
+//
+void LatticeModel::calculateIndexRanges(const std::vector<int> & affected_indices,
+                                        const std::vector<int> & indices)
+{
+    // Indices only in the outermost superset need the max range.
+    index_ranges_.assign(indices.size(), interactions_.maxRange());
+
+    // Go from the largest to the smallest range and overwrite the range of
+    // the indices in each superset, which are all contained in the larger.
+    for (int k = range_classes_.size() - 1; k >= 0; --k)
+    {
+        lattice_map_.supersetNeighbourIndices(affected_indices, range_classes_[k], inner_indices_);
+        const std::vector<int> & inner = inner_indices_;
+
+        // Both lists are sorted.
+        size_t j = 0;
+        for (size_t i = 0; i < inner.size(); ++i)
+        {
+            while (indices[j] != inner[i])
+            {
+                ++j;
+            }
+            index_ranges_[j] = range_classes_[k];
+        }
+    }
+}
+
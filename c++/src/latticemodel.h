@@ -37,11 +37,15 @@ public:
      *  \param lattice_map      : A lattice map object describing the lattice.
      *  \param interactions     : An interactions object describing all interactions
      *                         and possible processes in the system.
+     *  \param preloaded_rates  : Custom rates to store in the rate table before
+     *                             the initial matching, e.g. loaded from the
+     *                             rate table file of a previous run.
      */
     LatticeModel(Configuration & configuration,
                  SimulationTimer & simulation_timer,
                  const LatticeMap & lattice_map,
-                 const Interactions & interactions);
+                 const Interactions & interactions,
+                 const RateTable & preloaded_rates = RateTable(0));
 
     /*! \brief Function for taking one time step in the KMC lattice model.
      */
@@ -51,6 +55,17 @@ public:
      */
     void propagateTime();
 
+    /*! \brief Set the algorithm to use for selecting a process.
+     *  \param selection_type : The selection algorithm to use.
+     */
+    void setSelectionType(const SELECTION_TYPE selection_type) { interactions_.setSelectionType(selection_type); }
+
+    /*! \brief Set if the processes at each index should be matched in one
+     *         pass through a compiled match tree, or one by one.
+     *  \param use_match_trees : True if the match trees should be used.
+     */
+    void setUseMatchTrees(const bool use_match_trees) { matcher_.setUseMatchTrees(use_match_trees); }
+
     /*! \brief Query for the interactions.
      *  \return : A handle to the interactions stored on the class.
      */
@@ -66,14 +81,50 @@ public:
      */
     const LatticeMap & latticeMap() const { return lattice_map_; }
 
+    /*! \brief Query for the table of cached custom rates.
+     *  \return : A handle to the rate table, with its lookup, hit, miss,
+     *             insert and eviction counters.
+     */
+    const RateTable & rateTable() const { return matcher_.rateTable(); }
+
+    /*! \brief Query for the rate table lookup and rate callback statistics
+     *         per process.
+     *  \return : A handle to the rate statistics.
+     */
+    const RateStatistics & rateStatistics() const { return matcher_.rateStatistics(); }
+
+    /*! \brief Set all rate table and rate callback counters and times to zero.
+     */
+    void resetRateStatistics() { matcher_.resetRateStatistics(); }
+
+    /*! \brief Store custom rates in the rate table and re-match all indices,
+     *         so that the processes take the stored rates. Used for rates
+     *         loaded after the model was set up.
+     *  \param rates : The rates to store, e.g. loaded from the rate table
+     *                 file of a previous run.
+     */
+    void preloadRates(const RateTable & rates);
+
 protected:
 
 private:
 
     /*! \brief Private helper function to initiate matching of all
      *         processes with all indices in the configuration.
+     *  \param preloaded_rates : Custom rates to store in the rate table
+     *                            before the matching.
+     */
+    void calculateInitialMatching(const RateTable & preloaded_rates);
+
+    /*! \brief Private helper function to find the smallest process range
+     *         needed to reach each of the indices to re-match from the
+     *         affected indices.
+     *  \param affected_indices : The indices affected by the last process.
+     *  \param indices          : The indices to re-match, as given by the
+     *                            superset of neighbours at the max range.
      */
-    void calculateInitialMatching();
+    void calculateIndexRanges(const std::vector<int> & affected_indices,
+                              const std::vector<int> & indices);
 
     /// A reference to the configuration given at construction.
     Configuration & configuration_;
@@ -89,6 +140,18 @@ private:
 
     /// The Matcher to use for calculating matches and update the process lists.
     Matcher matcher_;
+
+    /// The distinct process ranges smaller than the max range.
+    std::vector<int> range_classes_;
+
+    /// The smallest process range to re-match at each index in a step.
+    std::vector<int> index_ranges_;
+
+    /// Work space for the indices to re-match in a step.
+    std::vector<int> indices_;
+
+    /// Work space for the indices within a smaller range in a step.
+    std::vector<int> inner_indices_;
 };
 
 
@@ -12,7 +12,10 @@
 
 #include <cstdio>
 #include <algorithm>
+#include <iterator>
 #include <cstdlib>
+#include <stdexcept>
+#include <chrono>
 
 #include "matcher.h"
 #include "matchlist.h"
@@ -25,54 +28,286 @@
 
 #include "mpicommons.h"
 #include "mpiroutines.h"
+#include "threads.h"
+
+
+// Work space for the matching with the match trees, per thread.
+static thread_local std::vector<bool> tmp_tree_match__;
+static thread_local std::vector<int> tmp_tree_matches__;
+
+// Work space for the rate calculator input, per thread.
+static thread_local std::vector<double> tmp_numpy_geo__;
+static thread_local std::vector<std::string> tmp_types_before__;
+static thread_local std::vector<std::string> tmp_types_after__;
+static thread_local std::vector<int> tmp_type_numbers_before__;
+static thread_local std::vector<int> tmp_type_numbers_after__;
+static thread_local std::vector<int> tmp_counts_before__;
+static thread_local std::vector<int> tmp_counts_after__;
+static thread_local std::vector<TypeBucket> tmp_occupations__;
+static thread_local std::vector<TypeBucket> tmp_update__;
+
+// -----------------------------------------------------------------------------
+// The first type added by an update, or -1 if the update adds no type.
+static int firstAddedType(const TypeBucket & update)
+{
+    for (int t = 0; t < update.size(); ++t)
+    {
+        if (update[t] == 1)
+        {
+            return t;
+        }
+    }
+    return -1;
+}
+
 
 // -----------------------------------------------------------------------------
 //
 Matcher::Matcher(const size_t & sites, const size_t & processes) :
+    basis_candidates_(0),
+    type_candidates_(0),
+    central_types_(sites, -1),
+    merged_candidates_(0),
+    match_trees_(0),
+    use_match_trees_(true),
+    index_process_to_match_(0),
+    remove_tasks_(0),
+    update_tasks_(0),
+    add_tasks_(0),
+    local_index_process_to_match_(0),
+    local_task_types_(0),
+    task_types_(0),
+    global_tasks_(0),
+    global_keys_(0),
+    global_process_numbers_(0),
+    add_task_indices_(0),
+    update_task_indices_(0),
+    local_tasks_(0),
+    local_tasks_rates_(0),
+    global_tasks_rates_(0),
+    batch_tasks_(0),
+    batch_lengths_(0),
+    batch_geometries_(0),
+    batch_types_before_(0),
+    batch_types_after_(0),
+    batch_rate_constants_(0),
+    batch_process_numbers_(0),
+    batch_global_coordinates_(0),
+    rate_times_(0),
     rate_table_(),
+    rate_statistics_(processes),
     inverse_table_(sites, std::vector<bool>(processes, false))
 {
     // NOTHING HERE YET
 }
 
 
+// -----------------------------------------------------------------------------
+// Get a wall clock time in seconds for timing the rate callbacks.
+static double wallTime()
+{
+    const std::chrono::steady_clock::duration now = std::chrono::steady_clock::now().time_since_epoch();
+    return std::chrono::duration<double>(now).count();
+}
+
+
+// -----------------------------------------------------------------------------
+// Get the single type with non-zero count in a type bucket, or -1 if there
+// are several or none. The wildcard type at position 0 is not considered.
+static int singleType(const TypeBucket & types)
+{
+    int single_type = -1;
+    for (int t = 1; t < types.size(); ++t)
+    {
+        if (types[t] > 0)
+        {
+            if (single_type != -1)
+            {
+                return -1;
+            }
+            single_type = t;
+        }
+    }
+    return single_type;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Matcher::initCandidateProcesses(const Interactions & interactions,
+                                     const LatticeMap & lattice_map)
+{
+    const std::vector<Process*> & processes = interactions.processes();
+    const int n_basis = lattice_map.nBasis();
+
+    // Get the number of types from the process match lists.
+    int n_types = 0;
+    if (!processes.empty() && !processes[0]->processMatchList().empty())
+    {
+        n_types = processes[0]->processMatchList()[0].match_types.size();
+    }
+
+    basis_candidates_ = std::vector< std::vector<int> >(n_basis);
+    type_candidates_  = std::vector< std::vector< std::vector<int> > >(n_basis, std::vector< std::vector<int> >(n_types));
+
+    for (size_t j = 0; j < processes.size(); ++j)
+    {
+        const Process & process = (*processes[j]);
+
+        // Find out which single central type, if any, the process requires.
+        // -1 means any type can match and -2 that several types are needed.
+        int required_type = -1;
+        const ProcessBucketMatchList & match_list = process.processMatchList();
+
+        if (!match_list.empty() && match_list[0].distance == 0.0 && match_list[0].match_types[0] != 1)
+        {
+            for (int t = 1; t < match_list[0].match_types.size(); ++t)
+            {
+                if (match_list[0].match_types[t] > 0)
+                {
+                    required_type = (required_type == -1) ? t : -2;
+                }
+            }
+        }
+
+        // Add the process to the lists for its basis sites.
+        const std::vector<int> & basis_sites = process.basisSites();
+        for (size_t k = 0; k < basis_sites.size(); ++k)
+        {
+            const int basis_site = basis_sites[k];
+            if (basis_site < 0 || basis_site >= n_basis)
+            {
+                continue;
+            }
+
+            basis_candidates_[basis_site].push_back(j);
+
+            for (int t = 1; t < n_types; ++t)
+            {
+                if (required_type == -1 || required_type == t)
+                {
+                    type_candidates_[basis_site][t].push_back(j);
+                }
+            }
+        }
+    }
+
+    // Compile the match lists of the processes at each basis site into trees.
+    match_trees_ = std::vector<MatchTree>(n_basis);
+    for (int b = 0; b < n_basis; ++b)
+    {
+        const std::vector<int> & candidates = basis_candidates_[b];
+        for (size_t j = 0; j < candidates.size(); ++j)
+        {
+            match_trees_[b].addProcess(candidates[j], processes[candidates[j]]->processMatchList());
+        }
+    }
+
+    // Nothing is known about the previous central types.
+    central_types_.assign(central_types_.size(), -1);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+const std::vector<int> & Matcher::candidateProcesses(const int index,
+                                                     const int basis_site,
+                                                     const Configuration & configuration)
+{
+    // A process listed at the index must have matched the previous central
+    // type, so the candidates for both the previous and present type are needed.
+    const int previous_type = central_types_[index];
+    const int present_type  = singleType(configuration.types()[index]);
+    central_types_[index] = present_type;
+
+    if (previous_type == -1 || present_type == -1)
+    {
+        return basis_candidates_[basis_site];
+    }
+
+    const std::vector<int> & present = type_candidates_[basis_site][present_type];
+    if (previous_type == present_type)
+    {
+        return present;
+    }
+
+    const std::vector<int> & previous = type_candidates_[basis_site][previous_type];
+    merged_candidates_.clear();
+    std::set_union(previous.begin(), previous.end(),
+                   present.begin(), present.end(),
+                   std::back_inserter(merged_candidates_));
+    return merged_candidates_;
+}
+
+
 // -----------------------------------------------------------------------------
 //
 void Matcher::calculateMatching(Interactions & interactions,
                                 Configuration & configuration,
                                 const LatticeMap & lattice_map,
                                 const std::vector<int> & indices)
+{
+    // Match all processes at all indices.
+    calculateMatching(interactions,
+                      configuration,
+                      lattice_map,
+                      indices,
+                      std::vector<int>(0));
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Matcher::calculateMatching(Interactions & interactions,
+                                Configuration & configuration,
+                                const LatticeMap & lattice_map,
+                                const std::vector<int> & indices,
+                                const std::vector<int> & index_ranges)
 {
     // PERFORMME: What happens in this function is
     //            highly performance critical.
 
-    // Build the list of indices and processes to match.
+    // Setup the candidate processes if not done.
+    if (basis_candidates_.empty())
+    {
+        initCandidateProcesses(interactions, lattice_map);
+    }
+
+    // Build the list of indices and processes to match. All work space
+    // is kept between calls, so that no memory is allocated once the
+    // vectors have grown to their working sizes.
+
+    const std::vector<Process*> & processes = interactions.processes();
+    const bool use_ranges = !index_ranges.empty();
+
+    std::vector<std::pair<int,int> > & index_process_to_match = index_process_to_match_;
+    index_process_to_match.clear();
 
-    std::vector<std::pair<int,int> > index_process_to_match;
     for(size_t i = 0; i < indices.size(); ++i)
     {
         // Get the index.
         const int index = indices[i];
-        bool use_index = false;
 
         // Get the basis site.
         const int basis_site = lattice_map.basisSiteFromIndex(index);
 
-        // For each process, check if we should try to match.
-        for (size_t j = 0; j < interactions.processes().size(); ++j)
+        // Get the processes we should try to match.
+        const std::vector<int> & candidates = candidateProcesses(index, basis_site, configuration);
+        const size_t n_pairs = index_process_to_match.size();
+        for (size_t j = 0; j < candidates.size(); ++j)
         {
-            // Check if the basis site is listed.
-            const std::vector<int> & process_basis_sites = (*interactions.processes()[j]).basisSites();
-            if ( std::find(process_basis_sites.begin(), process_basis_sites.end(), basis_site) != process_basis_sites.end() )
+            // Skip processes that can not reach the index.
+            if (use_ranges && processes[candidates[j]]->range() < index_ranges[i])
             {
-                // This is a potential match.
-                index_process_to_match.push_back(std::pair<int,int>(index,j));
-                use_index = true;
+                continue;
             }
+
+            // This is a potential match.
+            index_process_to_match.push_back(std::pair<int,int>(index, candidates[j]));
         }
 
         // Update the configuration match list for this index if it will be used.
-        if (use_index)
+        if (index_process_to_match.size() != n_pairs)
         {
             configuration.updateMatchList(index);
         }
@@ -80,9 +315,12 @@ void Matcher::calculateMatching(Interactions & interactions,
 
     // Generate the lists of tasks.
 
-    std::vector<RemoveTask> remove_tasks;
-    std::vector<RateTask>   update_tasks;
-    std::vector<RateTask>   add_tasks;
+    std::vector<RemoveTask> & remove_tasks = remove_tasks_;
+    std::vector<RateTask>   & update_tasks = update_tasks_;
+    std::vector<RateTask>   & add_tasks    = add_tasks_;
+    remove_tasks.clear();
+    update_tasks.clear();
+    add_tasks.clear();
 
     matchIndicesWithProcesses(index_process_to_match,
                               interactions,
@@ -96,25 +334,33 @@ void Matcher::calculateMatching(Interactions & interactions,
     if (interactions.useCustomRates())
     {
         // Create a common task list for getting a good load balance.
-        std::vector<RateTask> global_tasks;
-        std::vector<ratekey>  global_keys;
-        std::vector<int>      global_process_numbers;
+        std::vector<RateTask> & global_tasks         = global_tasks_;
+        std::vector<ratekey>  & global_keys          = global_keys_;
+        std::vector<int>      & global_process_numbers = global_process_numbers_;
+        global_tasks.clear();
+        global_keys.clear();
+        global_process_numbers.clear();
 
         // Find out which tasks are allready calculated and stored.
-        std::vector<int> add_task_indices;
+        std::vector<int> & add_task_indices = add_task_indices_;
+        add_task_indices.clear();
         for (size_t i = 0; i < add_tasks.size(); ++i)
         {
-            // Calculate the key.
             const Process & process = (*interactions.processes()[add_tasks[i].process]);
-            const int index   = add_tasks[i].index;
-            const ratekey key = hashCustomRateInput(index, process, configuration);
 
-            // Check if the key has a stored value.
-            if (rate_table_.stored(key) != -1)
+            // Calculate the rate unless the process is cached and the key
+            // has a stored value.
+            ratekey key = 0;
+            bool hit = false;
+            if (process.cacheRate())
             {
-                add_tasks[i].rate = rate_table_.retrieve(key);
+                const int index = add_tasks[i].index;
+                key = customRateKey(index, process, configuration);
+                hit = rate_table_.lookup(key, add_tasks[i].rate);
+                rate_statistics_.addLookup(add_tasks[i].process, hit);
             }
-            else
+
+            if (!hit)
             {
                 global_tasks.push_back(add_tasks[i]);
                 global_keys.push_back(key);
@@ -124,20 +370,25 @@ void Matcher::calculateMatching(Interactions & interactions,
         }
 
         // The same procedure for the update tasks.
-        std::vector<int> update_task_indices;
+        std::vector<int> & update_task_indices = update_task_indices_;
+        update_task_indices.clear();
         for (size_t i = 0; i < update_tasks.size(); ++i)
         {
-            // Calculate the key.
             const Process & process = (*interactions.processes()[update_tasks[i].process]);
-            const int index   = update_tasks[i].index;
-            const ratekey key = hashCustomRateInput(index, process, configuration);
 
-            // Check if the key has a stored value.
-            if (rate_table_.stored(key) != -1)
+            // Calculate the rate unless the process is cached and the key
+            // has a stored value.
+            ratekey key = 0;
+            bool hit = false;
+            if (process.cacheRate())
             {
-                update_tasks[i].rate = rate_table_.retrieve(key);
+                const int index = update_tasks[i].index;
+                key = customRateKey(index, process, configuration);
+                hit = rate_table_.lookup(key, update_tasks[i].rate);
+                rate_statistics_.addLookup(update_tasks[i].process, hit);
             }
-            else
+
+            if (!hit)
             {
                 global_tasks.push_back(update_tasks[i]);
                 global_keys.push_back(key);
@@ -150,14 +401,15 @@ void Matcher::calculateMatching(Interactions & interactions,
         // Here comes the MPI parallelism
         // ------------------------------------------------------------------------
         // Split up the tasks.
-        std::vector<RateTask> local_tasks = splitOverProcesses(global_tasks);
-        std::vector<double> local_tasks_rates(local_tasks.size(), 0.0);
+        splitOverProcesses(global_tasks, local_tasks_);
+        local_tasks_rates_.assign(local_tasks_.size(), 0.0);
 
         // Update in parallel.
-        updateRates(local_tasks_rates, local_tasks, interactions, configuration);
+        updateRates(local_tasks_rates_, local_tasks_, interactions, configuration);
 
         // Join the results.
-        const std::vector<double> global_tasks_rates = joinOverProcesses(local_tasks_rates);
+        joinOverProcesses(local_tasks_rates_, global_tasks_rates_);
+        const std::vector<double> & global_tasks_rates = global_tasks_rates_;
         // ------------------------------------------------------------------------
 
         // Copy the results over to the tasks vectors.
@@ -184,6 +436,7 @@ void Matcher::calculateMatching(Interactions & interactions,
                 const ratekey key = global_keys[i];
                 const double rate = global_tasks_rates[i];
                 rate_table_.store(key, rate);
+                rate_statistics_.addInsert(process_number);
             }
         }
     }
@@ -204,51 +457,31 @@ void Matcher::matchIndicesWithProcesses(const std::vector<std::pair<int,int> > &
                                         const Configuration & configuration,
                                         std::vector<RemoveTask> & remove_tasks,
                                         std::vector<RateTask>   & update_tasks,
-                                        std::vector<RateTask>   & add_tasks) const
+                                        std::vector<RateTask>   & add_tasks)
 {
     // Setup local variables for running in parallel.
-    std::vector< std::pair<int,int> > local_index_process_to_match = \
-        splitOverProcesses(index_process_to_match);
+    std::vector< std::pair<int,int> > & local_index_process_to_match = local_index_process_to_match_;
+    splitOverProcesses(index_process_to_match, local_index_process_to_match);
 
     // These are the local task types to fill with matching restults.
-    const int n_local_tasks = local_index_process_to_match.size();
-    std::vector<int> local_task_types(n_local_tasks, 0);
-
-    // Loop over pairs to match.
-    for (size_t i = 0; i < local_index_process_to_match.size(); ++i)
-    {
-        // Get the process and index to match.
-        const int index = local_index_process_to_match[i].first;
-        const int p_idx = local_index_process_to_match[i].second;
-        Process & process = (*interactions.processes()[p_idx]);
-
-        // Perform the matching.
-        const bool in_list = inverse_table_[index][p_idx];
+    std::vector<int> & local_task_types = local_task_types_;
+    local_task_types.assign(local_index_process_to_match.size(), 0);
 
-        // ML:
-        const bool is_match = whateverMatch(process.processMatchList(),
-                                            configuration.configMatchList(index));
-
-        // Determine what to do with this pair of processes and indices.
-        if (!is_match && in_list)
-        {
-            // If no match and previous match - remove.
-            local_task_types[i] = 1;
-        }
-        else if (is_match && in_list)
-        {
-            // If match and previous match - update the rate.
-            local_task_types[i] = 2;
-        }
-        else if (is_match && !in_list)
-        {
-            // If match and not previous match - add.
-            local_task_types[i] = 3;
-        }
-    }
+    // Match in parallel on the threads, each filling its own part.
+    parallelFor(local_index_process_to_match.size(),
+                [&](const size_t begin, const size_t end)
+                {
+                    matchPairs(local_index_process_to_match,
+                               begin,
+                               end,
+                               interactions,
+                               configuration,
+                               local_task_types);
+                });
 
     // Join the result - parallel.
-    const std::vector<int> task_types = joinOverProcesses(local_task_types);
+    joinOverProcesses(local_task_types, task_types_);
+    const std::vector<int> & task_types = task_types_;
 
     // Loop again (not in parallel) and add the tasks to the taks vectors.
     const size_t n_tasks = index_process_to_match.size();
@@ -296,6 +529,99 @@ void Matcher::matchIndicesWithProcesses(const std::vector<std::pair<int,int> > &
     // DONE
 }
 
+// -----------------------------------------------------------------------------
+//
+void Matcher::matchPairs(const std::vector<std::pair<int,int> > & index_process_to_match,
+                         const size_t begin,
+                         const size_t end,
+                         const Interactions  & interactions,
+                         const Configuration & configuration,
+                         std::vector<int> & task_types) const
+{
+    // With the match trees all processes are matched at once for each index.
+    const bool use_trees = use_match_trees_ && !match_trees_.empty();
+    std::vector<bool> & tree_match = tmp_tree_match__;
+    std::vector<int> & tree_matches = tmp_tree_matches__;
+    int tree_index = -1;
+
+    // All flags are cleared again before returning.
+    if (use_trees && tree_match.size() != interactions.processes().size())
+    {
+        tree_match.assign(interactions.processes().size(), false);
+    }
+    tree_matches.clear();
+
+    // Loop over pairs to match.
+    for (size_t i = begin; i < end; ++i)
+    {
+        // Get the process and index to match.
+        const int index = index_process_to_match[i].first;
+        const int p_idx = index_process_to_match[i].second;
+        Process & process = (*interactions.processes()[p_idx]);
+
+        // Perform the matching.
+        const bool in_list = inverse_table_[index][p_idx];
+
+        bool is_match = false;
+        if (use_trees)
+        {
+            // The pairs come grouped by index, so the tree is only
+            // traversed when a new index is reached.
+            if (index != tree_index)
+            {
+                for (size_t j = 0; j < tree_matches.size(); ++j)
+                {
+                    tree_match[tree_matches[j]] = false;
+                }
+                tree_matches.clear();
+
+                // The basis site, as given by the lattice map.
+                const int basis_site = index % match_trees_.size();
+                match_trees_[basis_site].match(configuration.configMatchList(index), tree_matches);
+
+                for (size_t j = 0; j < tree_matches.size(); ++j)
+                {
+                    tree_match[tree_matches[j]] = true;
+                }
+                tree_index = index;
+            }
+
+            is_match = tree_match[p_idx];
+        }
+        else
+        {
+            // ML:
+            is_match = whateverMatch(process.processMatchList(),
+                                     configuration.configMatchList(index));
+        }
+
+        // Determine what to do with this pair of processes and indices.
+        if (!is_match && in_list)
+        {
+            // If no match and previous match - remove.
+            task_types[i] = 1;
+        }
+        else if (is_match && in_list)
+        {
+            // If match and previous match - update the rate.
+            task_types[i] = 2;
+        }
+        else if (is_match && !in_list)
+        {
+            // If match and not previous match - add.
+            task_types[i] = 3;
+        }
+    }
+
+    // Clear the flags of the last matched index.
+    for (size_t j = 0; j < tree_matches.size(); ++j)
+    {
+        tree_match[tree_matches[j]] = false;
+    }
+    tree_matches.clear();
+}
+
+
 // -----------------------------------------------------------------------------
 //
 bool Matcher::isMatch(const ProcessBucketMatchList & process_match_list,
@@ -471,6 +797,8 @@ void Matcher::updateProcesses(const std::vector<RemoveTask> & remove_tasks,
         const int index = remove_tasks[i].index;
         const int p_idx = remove_tasks[i].process;
         interactions.processes()[p_idx]->removeSite(index);
+        interactions.registerProcessUpdate(p_idx);
+        interactions.registerSiteUpdate(p_idx, index);
         inverse_table_[index][p_idx] = false;
     }
 
@@ -480,8 +808,9 @@ void Matcher::updateProcesses(const std::vector<RemoveTask> & remove_tasks,
         const int index   = update_tasks[i].index;
         const int p_idx   = update_tasks[i].process;
         const double rate = update_tasks[i].rate;
-        interactions.processes()[p_idx]->removeSite(index);
-        interactions.processes()[p_idx]->addSite(index, rate);
+        interactions.processes()[p_idx]->updateSite(index, rate);
+        interactions.registerProcessUpdate(p_idx);
+        interactions.registerSiteUpdate(p_idx, index);
     }
 
     // Add.
@@ -491,6 +820,8 @@ void Matcher::updateProcesses(const std::vector<RemoveTask> & remove_tasks,
         const int p_idx   = add_tasks[i].process;
         const double rate = add_tasks[i].rate;
         interactions.processes()[p_idx]->addSite(index, rate);
+        interactions.registerProcessUpdate(p_idx);
+        interactions.registerSiteUpdate(p_idx, index);
         inverse_table_[index][p_idx] = true;
     }
 }
@@ -507,16 +838,171 @@ void Matcher::updateRates(std::vector<double>         & new_rates,
     // interactions object, to get an updated rate for each process.
     const RateCalculator & rate_calculator = interactions.rateCalculator();
 
+    // Or get the rates of all tasks at once.
+    if (rate_calculator.batchRates())
+    {
+        updateRatesBatch(new_rates, tasks, interactions, configuration);
+        return;
+    }
+
+    const auto update = [&](const size_t begin, const size_t end)
+    {
+        for (size_t i = begin; i < end; ++i)
+        {
+            // Get the rate process to use.
+            const Process & process = (*interactions.processes()[tasks[i].process]);
+
+            // Get the coordinate index.
+            const int index = tasks[i].index;
+
+            // Calculate the new rate.
+            const double start = wallTime();
+            new_rates[i] = updateSingleRate(index, process, configuration, rate_calculator);
+            rate_times_[i] = wallTime() - start;
+        }
+    };
+
+    rate_times_.resize(tasks.size());
+
+    // Only rate calculators that are safe to call concurrently, i.e. not
+    // the Python ones, run on several threads.
+    if (rate_calculator.threadSafe())
+    {
+        parallelFor(tasks.size(), update);
+    }
+    else
+    {
+        update(0, tasks.size());
+    }
+
+    // Add the callback times to the statistics.
+    for (size_t i = 0; i < tasks.size(); ++i)
+    {
+        rate_statistics_.addCallback(tasks[i].process, rate_times_[i]);
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Matcher::updateRatesBatch(std::vector<double>         & new_rates,
+                               const std::vector<RateTask> & tasks,
+                               const Interactions          & interactions,
+                               const Configuration         & configuration)
+{
+    const RateCalculator & rate_calculator = interactions.rateCalculator();
+    const std::vector<TypeBucket> & types = configuration.types();
+
+    // Find the tasks to calculate in the batch and the longest geometry.
+    batch_tasks_.clear();
+    batch_lengths_.clear();
+    int max_len = 0;
+
     for (size_t i = 0; i < tasks.size(); ++i)
     {
-        // Get the rate process to use.
         const Process & process = (*interactions.processes()[tasks[i].process]);
-
-        // Get the coordinate index.
         const int index = tasks[i].index;
 
-        // Calculate the new rate.
-        new_rates[i] = updateSingleRate(index, process, configuration, rate_calculator);
+        // Bucket processes are calculated one by one.
+        if (process.bucketProcess())
+        {
+            const double start = wallTime();
+            new_rates[i] = updateSingleRate(index, process, configuration, rate_calculator);
+            rate_statistics_.addCallback(tasks[i].process, wallTime() - start);
+            continue;
+        }
+
+        // The geometry is all entries within the cutoff.
+        const ConfigBucketMatchList & config_match_list = configuration.configMatchList(index);
+        const double cutoff = process.cutoff();
+        int len = 0;
+        while (len < static_cast<int>(config_match_list.size()) && config_match_list[len].distance <= cutoff)
+        {
+            ++len;
+        }
+
+        batch_tasks_.push_back(i);
+        batch_lengths_.push_back(len);
+        max_len = std::max(max_len, len);
+    }
+
+    const size_t n_batch = batch_tasks_.size();
+    if (n_batch == 0)
+    {
+        return;
+    }
+
+    // Fill in the padded batch data.
+    batch_geometries_.assign(n_batch * max_len * 3, 0.0);
+    batch_types_before_.assign(n_batch * max_len, -1);
+    batch_types_after_.assign(n_batch * max_len, -1);
+    batch_rate_constants_.resize(n_batch);
+    batch_process_numbers_.resize(n_batch);
+    batch_global_coordinates_.resize(n_batch * 3);
+
+    for (size_t b = 0; b < n_batch; ++b)
+    {
+        const RateTask & task = tasks[batch_tasks_[b]];
+        const Process & process = (*interactions.processes()[task.process]);
+        const ProcessBucketMatchList & process_match_list = process.processMatchList();
+        const ConfigBucketMatchList & config_match_list = configuration.configMatchList(task.index);
+        const int len = batch_lengths_[b];
+
+        double* geometry   = &batch_geometries_[b * max_len * 3];
+        int* types_before  = &batch_types_before_[b * max_len];
+        int* types_after   = &batch_types_after_[b * max_len];
+
+        for (int i = 0; i < len; ++i)
+        {
+            geometry[3*i]   = config_match_list[i].x;
+            geometry[3*i+1] = config_match_list[i].y;
+            geometry[3*i+2] = config_match_list[i].z;
+
+            types_before[i] = types[config_match_list[i].index].firstPresentType();
+            types_after[i]  = types_before[i];
+        }
+
+        for (size_t i = 0; i < process_match_list.size() && static_cast<int>(i) < len; ++i)
+        {
+            const int type_after = firstAddedType(process_match_list[i].update_types);
+            if (type_after != -1)
+            {
+                types_after[i] = type_after;
+            }
+        }
+
+        batch_rate_constants_[b]  = process.rateConstant();
+        batch_process_numbers_[b] = process.processNumber();
+        batch_global_coordinates_[3*b]   = configuration.coordinates()[task.index].x();
+        batch_global_coordinates_[3*b+1] = configuration.coordinates()[task.index].y();
+        batch_global_coordinates_[3*b+2] = configuration.coordinates()[task.index].z();
+    }
+
+    // Calculate all rates with one call.
+    const double start = wallTime();
+    const std::vector<double> rates = \
+        rate_calculator.backendRateCallbackBatch(batch_geometries_,
+                                                 max_len,
+                                                 batch_lengths_,
+                                                 batch_types_before_,
+                                                 batch_types_after_,
+                                                 configuration.typeNames(),
+                                                 batch_rate_constants_,
+                                                 batch_process_numbers_,
+                                                 batch_global_coordinates_);
+
+    if (rates.size() != n_batch)
+    {
+        throw std::runtime_error("The batch rate calculator must return one rate per task.");
+    }
+
+    // The time of the call is shared evenly between the tasks.
+    const double time = (wallTime() - start) / n_batch;
+
+    for (size_t b = 0; b < n_batch; ++b)
+    {
+        new_rates[batch_tasks_[b]] = rates[b];
+        rate_statistics_.addCallback(tasks[batch_tasks_[b]].process, time);
     }
 }
 
@@ -532,8 +1018,7 @@ double Matcher::updateSingleRate(const int index,
     const ProcessBucketMatchList & process_match_list = process.processMatchList();
     const ConfigBucketMatchList & config_match_list   = configuration.configMatchList(index);
 
-    // We will also need the elements.
-    const std::vector<std::vector<std::string> > & elements = configuration.elements();
+    // We will also need the types.
     const std::vector<TypeBucket> & types = configuration.types();
 
     // Get cutoff distance from the process.
@@ -548,29 +1033,143 @@ double Matcher::updateSingleRate(const int index,
 
     const size_t distance = it1 - config_match_list.begin();
 
-    // Allocate memory for the numpy geometry and copy the data over.
-    std::vector<double> numpy_geo(len*3);
-    std::vector<std::string> types_before(distance);
-    std::vector<TypeBucket> occupations(distance);
+    // Use the precomputed geometry if there is one for this site, otherwise
+    // copy the geometry over to the work space.
+    const std::vector<double> * local_geometry = configuration.localGeometry(index, cutoff);
 
-    for (size_t i = 0; i < distance; ++i)
+    if (local_geometry == NULL || static_cast<int>(local_geometry->size()) != 3*len)
+    {
+        std::vector<double> & numpy_geo = tmp_numpy_geo__;
+        numpy_geo.resize(len*3);
+
+        for (size_t i = 0; i < distance; ++i)
+        {
+            numpy_geo[3*i]   = config_match_list[i].x;
+            numpy_geo[3*i+1] = config_match_list[i].y;
+            numpy_geo[3*i+2] = config_match_list[i].z;
+        }
+
+        local_geometry = &numpy_geo;
+    }
+
+    const std::vector<double> & numpy_geo = *local_geometry;
+
+    const double rate_constant = process.rateConstant();
+    const int process_number   = process.processNumber();
+    const double global_x = configuration.coordinates()[index].x();
+    const double global_y = configuration.coordinates()[index].y();
+    const double global_z = configuration.coordinates()[index].z();
+
+    // Send the types as type numbers if the rate calculator asks for it.
+    if (!process.bucketProcess() && rate_calculator.typeNumbers())
+    {
+        std::vector<int> & type_numbers_before = tmp_type_numbers_before__;
+        std::vector<int> & type_numbers_after  = tmp_type_numbers_after__;
+        type_numbers_before.resize(distance);
+
+        for (size_t i = 0; i < distance; ++i)
+        {
+            type_numbers_before[i] = types[config_match_list[i].index].firstPresentType();
+        }
+
+        type_numbers_after = type_numbers_before;
+
+        for (size_t i = 0; i < process_match_list.size() && i < distance; ++i)
+        {
+            const int type_after = firstAddedType(process_match_list[i].update_types);
+            if (type_after != -1)
+            {
+                type_numbers_after[i] = type_after;
+            }
+        }
+
+        return rate_calculator.backendRateCallbackTypeNumbers(numpy_geo,
+                                                              len,
+                                                              type_numbers_before,
+                                                              type_numbers_after,
+                                                              configuration.typeNames(),
+                                                              rate_constant,
+                                                              process_number,
+                                                              global_x,
+                                                              global_y,
+                                                              global_z);
+    }
+
+    // Send the bucket occupations before and after the process as count
+    // matrices if the rate calculator asks for type numbers.
+    if (process.bucketProcess() && rate_calculator.typeNumbers())
     {
-        const Coordinate coord(config_match_list[i].x,
-                               config_match_list[i].y,
-                               config_match_list[i].z);
+        const int n_types = configuration.typeNames().size();
+        std::vector<int> & counts_before = tmp_counts_before__;
+        std::vector<int> & counts_after  = tmp_counts_after__;
+        counts_before.resize(distance * n_types);
+
+        for (size_t i = 0; i < distance; ++i)
+        {
+            const TypeBucket & site_types = types[config_match_list[i].index];
+            int* counts = &counts_before[i * n_types];
+            for (int t = 0; t < n_types; ++t)
+            {
+                counts[t] = site_types[t];
+            }
+        }
+
+        counts_after = counts_before;
+
+        for (size_t i = 0; i < process_match_list.size() && i < distance; ++i)
+        {
+            const TypeBucket & update_types = process_match_list[i].update_types;
+            int* counts = &counts_after[i * n_types];
+            for (int t = 0; t < n_types; ++t)
+            {
+                counts[t] += update_types[t];
+            }
+        }
 
-        numpy_geo[3*i]   = coord.x();
-        numpy_geo[3*i+1] = coord.y();
-        numpy_geo[3*i+2] = coord.z();
+        return rate_calculator.backendRateCallbackBucketCounts(numpy_geo,
+                                                               len,
+                                                               counts_before,
+                                                               counts_after,
+                                                               configuration.typeNames(),
+                                                               rate_constant,
+                                                               process_number,
+                                                               global_x,
+                                                               global_y,
+                                                               global_z);
+    }
 
+    std::vector<std::string> & types_before = tmp_types_before__;
+    std::vector<TypeBucket> & occupations = tmp_occupations__;
+    types_before.resize(distance);
+    occupations.resize(distance);
+
+    for (size_t i = 0; i < distance; ++i)
+    {
         const int idx   = config_match_list[i].index;
-        types_before[i] = elements[idx][0];
+        const int type  = types[idx].firstPresentType();
+        types_before[i] = (type < 0) ? std::string() : configuration.typeName(type);
         occupations[i]  = types[idx];
     }
 
     // Types after the process.
-    std::vector<std::string> types_after = types_before;
-    std::vector<TypeBucket> update(len, TypeBucket(occupations[0].size()));
+    std::vector<std::string> & types_after = tmp_types_after__;
+    types_after = types_before;
+
+    // The update is zero beyond the process match list.
+    std::vector<TypeBucket> & update = tmp_update__;
+    update.resize(len);
+    const int n_types = occupations[0].size();
+    for (size_t i = process_match_list.size(); i < update.size(); ++i)
+    {
+        if (update[i].size() != n_types)
+        {
+            update[i] = TypeBucket(n_types);
+        }
+        for (int j = 0; j < n_types; ++j)
+        {
+            update[i][j] = 0;
+        }
+    }
 
     // Loop over the process match list and update the types_after vector.
     for (size_t i = 0; i < process_match_list.size(); ++i)
@@ -606,13 +1205,6 @@ double Matcher::updateSingleRate(const int index,
         }
     }
 
-    // Calculate the rate using the provided rate calculator.
-    const double rate_constant = process.rateConstant();
-    const int process_number   = process.processNumber();
-    const double global_x = configuration.coordinates()[index].x();
-    const double global_y = configuration.coordinates()[index].y();
-    const double global_z = configuration.coordinates()[index].z();
-
     // Determine if we should use the buckets interface or not.
     if (!process.bucketProcess())
     {
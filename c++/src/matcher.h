@@ -17,7 +17,9 @@
 #include <vector>
 
 #include "matchlist.h"
+#include "matchtree.h"
 #include "ratetable.h"
+#include "ratestatistics.h"
 
 // Forward declarations.
 class Interactions;
@@ -69,6 +71,72 @@ public:
                            const LatticeMap & lattice_map,
                            const std::vector<int> & indices);
 
+    /*! \brief Calculate/update the matching of provided indices with the
+     *         processes that can reach them. Each index is only matched
+     *         against processes with a range of at least the given range.
+     *  \param interactions  : The interactions object holding info on possible processes.
+     *  \param configuration : The configuration which the list of indices refers to.
+     *  \param lattice_map   : The lattice map describing the configuration.
+     *  \param indices       : The configuration indices for which the neighbourhood should
+     *                         be matched against the possible processes.
+     *  \param index_ranges  : The smallest process range to match at each index, or
+     *                         empty to match all processes at all indices.
+     */
+    void calculateMatching(Interactions & interactions,
+                           Configuration & configuration,
+                           const LatticeMap & lattice_map,
+                           const std::vector<int> & indices,
+                           const std::vector<int> & index_ranges);
+
+    /*! \brief Setup the lists of candidate processes to try at each basis site,
+     *         further refined by the type at the central site, and the match
+     *         trees of the processes at each basis site. Called once before
+     *         the initial matching, or on the first matching if not called
+     *         explicitly.
+     *  \param interactions : The interactions object holding the processes.
+     *  \param lattice_map  : The lattice map describing the configuration.
+     */
+    void initCandidateProcesses(const Interactions & interactions,
+                                const LatticeMap & lattice_map);
+
+    /*! \brief Set if the match trees should be used to match all processes
+     *         at an index in one pass, or if each process should be matched
+     *         separately. The match trees are used by default.
+     *  \param use_match_trees : True if the match trees should be used.
+     */
+    void setUseMatchTrees(const bool use_match_trees) { use_match_trees_ = use_match_trees; }
+
+    /*! \brief Query for the use of match trees.
+     *  \return : True if the match trees are used.
+     */
+    bool useMatchTrees() const { return use_match_trees_; }
+
+    /*! \brief Set the maximum number of custom rates kept in the rate table.
+     *         This removes all stored rates.
+     *  \param capacity : The maximum number of stored rates.
+     */
+    void setRateTableCapacity(const size_t capacity) { rate_table_.setCapacity(capacity); }
+
+    /*! \brief Store previously calculated custom rates in the rate table.
+     *  \param rates : The table to take the rates from.
+     */
+    void preloadRates(const RateTable & rates) { rate_table_.storeAll(rates); }
+
+    /*! \brief Query for the rate table.
+     *  \return : The rate table for storing calculated custom rates.
+     */
+    const RateTable & rateTable() const { return rate_table_; }
+
+    /*! \brief Query for the rate table lookup and rate callback statistics
+     *         per process.
+     *  \return : The rate statistics.
+     */
+    const RateStatistics & rateStatistics() const { return rate_statistics_; }
+
+    /*! \brief Set all rate table and rate callback counters and times to zero.
+     */
+    void resetRateStatistics() { rate_table_.resetStatistics(); rate_statistics_.reset(); }
+
     /*! \brief Calculate the matching for a list of match tasks (pairs of indices and processes).
      *  \param index_process_to_match : The list of indices and process numbers to match.
      *  \param interactions           : The interactions to get the processes from.
@@ -82,7 +150,7 @@ public:
                                    const Configuration & configuration,
                                    std::vector<RemoveTask> & remove_tasks,
                                    std::vector<RateTask>   & update_tasks,
-                                   std::vector<RateTask>   & add_tasks) const;
+                                   std::vector<RateTask>   & add_tasks);
 
     /*! \brief Update the rates of the rate tasks by calling the
      *         backend call-back function of the RateCalculator stored
@@ -91,6 +159,8 @@ public:
      *  \param tasks         : A vector with tasks to update.
      *  \param interactions  : The interactions to get the rate calculator from.
      *  \param configuration : The configuration to use.
+     *  The rates are calculated in parallel on the threads set with
+     *  setNumberOfThreads if the rate calculator is thread safe.
      */
     void updateRates(std::vector<double>         & new_rates,
                      const std::vector<RateTask> & tasks,
@@ -108,6 +178,20 @@ public:
                          const std::vector<RateTask>   & to_add,
                          Interactions & interactions);
 
+    /*! \brief Update the rates of the rate tasks with one call to the batch
+     *         backend call-back function of the RateCalculator stored on the
+     *         interactions object. The rates of bucket processes are
+     *         calculated one by one.
+     *  \param new_rates(out): The vector to place the updated rates in.
+     *  \param tasks         : A vector with tasks to update.
+     *  \param interactions  : The interactions to get the rate calculator from.
+     *  \param configuration : The configuration to use.
+     */
+    void updateRatesBatch(std::vector<double>         & new_rates,
+                          const std::vector<RateTask> & tasks,
+                          const Interactions          & interactions,
+                          const Configuration         & configuration);
+
     /*! \brief Calculate the rate for a single process using the rate calculator.
      *  \param index           : The index to perform the process at.
      *  \param process         : The process to perform.
@@ -157,9 +241,130 @@ protected:
 
 private:
 
+    /*! \brief Get the processes that may match at an index, based on its
+     *         basis site and the central type now and at the last matching.
+     *  \param index         : The index to get the candidate processes for.
+     *  \param basis_site    : The basis site of the index.
+     *  \param configuration : The configuration which the index refers to.
+     *  \return : The sorted list of candidate process numbers.
+     */
+    const std::vector<int> & candidateProcesses(const int index,
+                                                const int basis_site,
+                                                const Configuration & configuration);
+
+    /*! \brief Match a range of index and process pairs and determine what
+     *         to do with each. Calls for different ranges may run in parallel.
+     *  \param index_process_to_match : The list of indices and process numbers to match.
+     *  \param begin                  : The first pair to match.
+     *  \param end                    : One past the last pair to match.
+     *  \param interactions           : The interactions to get the processes from.
+     *  \param configuration          : The configuration which the index refers to.
+     *  \param task_types (out)       : The task type of each pair, 0 for nothing,
+     *                                  1 for remove, 2 for update and 3 for add.
+     */
+    void matchPairs(const std::vector<std::pair<int,int> > & index_process_to_match,
+                    const size_t begin,
+                    const size_t end,
+                    const Interactions  & interactions,
+                    const Configuration & configuration,
+                    std::vector<int> & task_types) const;
+
+    /// The candidate processes for each basis site.
+    std::vector< std::vector<int> > basis_candidates_;
+
+    /// The candidate processes for each basis site and single central type.
+    std::vector< std::vector< std::vector<int> > > type_candidates_;
+
+    /// The single central type at each index when last matched, or -1 if mixed.
+    std::vector<int> central_types_;
+
+    /// Work space for merging candidate lists.
+    std::vector<int> merged_candidates_;
+
+    /// The match tree of the processes at each basis site.
+    std::vector<MatchTree> match_trees_;
+
+    /// The flag indicating if the match trees should be used.
+    bool use_match_trees_;
+
+    /// Work space for the index and process pairs to match.
+    std::vector<std::pair<int,int> > index_process_to_match_;
+
+    /// Work space for the remove tasks.
+    std::vector<RemoveTask> remove_tasks_;
+
+    /// Work space for the update tasks.
+    std::vector<RateTask> update_tasks_;
+
+    /// Work space for the add tasks.
+    std::vector<RateTask> add_tasks_;
+
+    /// Work space for the index and process pairs to match on this MPI process.
+    std::vector<std::pair<int,int> > local_index_process_to_match_;
+
+    /// Work space for the task types on this MPI process.
+    std::vector<int> local_task_types_;
+
+    /// Work space for the task types of all MPI processes.
+    std::vector<int> task_types_;
+
+    /// Work space for the rate tasks of all MPI processes.
+    std::vector<RateTask> global_tasks_;
+
+    /// Work space for the rate table keys of the rate tasks.
+    std::vector<ratekey> global_keys_;
+
+    /// Work space for the process numbers of the rate tasks.
+    std::vector<int> global_process_numbers_;
+
+    /// Work space for the positions of the rate tasks among the add tasks.
+    std::vector<int> add_task_indices_;
+
+    /// Work space for the positions of the rate tasks among the update tasks.
+    std::vector<int> update_task_indices_;
+
+    /// Work space for the rate tasks on this MPI process.
+    std::vector<RateTask> local_tasks_;
+
+    /// Work space for the rates calculated on this MPI process.
+    std::vector<double> local_tasks_rates_;
+
+    /// Work space for the rates calculated by all MPI processes.
+    std::vector<double> global_tasks_rates_;
+
+    /// Work space for the positions of the batch rate tasks among all rate tasks.
+    std::vector<int> batch_tasks_;
+
+    /// Work space for the number of atoms in the geometry of each batch rate task.
+    std::vector<int> batch_lengths_;
+
+    /// Work space for the padded geometries of the batch rate tasks.
+    std::vector<double> batch_geometries_;
+
+    /// Work space for the padded type numbers before the batch rate tasks.
+    std::vector<int> batch_types_before_;
+
+    /// Work space for the padded type numbers after the batch rate tasks.
+    std::vector<int> batch_types_after_;
+
+    /// Work space for the rate constants of the batch rate tasks.
+    std::vector<double> batch_rate_constants_;
+
+    /// Work space for the process numbers of the batch rate tasks.
+    std::vector<int> batch_process_numbers_;
+
+    /// Work space for the global coordinates of the batch rate tasks.
+    std::vector<double> batch_global_coordinates_;
+
+    /// Work space for the time spent calculating the rate of each task.
+    std::vector<double> rate_times_;
+
     /// The rate table for storing calculated custom rates.
     RateTable rate_table_;
 
+    /// The rate table lookup and rate callback statistics per process.
+    RateStatistics rate_statistics_;
+
     /// The inverse matching information table.
     std::vector<std::vector<bool> > inverse_table_;
 
@@ -58,7 +58,7 @@ void configurationsToMatchList(const Configuration & first,
     // If no update info was given we create it here.
     else
     {
-        for (size_t i = 0; i < first.elements().size(); ++i)
+        for (size_t i = 0; i < first.types().size(); ++i)
         {
             const TypeBucket & t1 = first.types()[i];
             const TypeBucket & t2 = second.types()[i];
@@ -77,7 +77,7 @@ void configurationsToMatchList(const Configuration & first,
     const Coordinate origin = coords[0];
 
     // Transform the configurations into match lists.
-    for (size_t i = 0; i < first.elements().size(); ++i)
+    for (size_t i = 0; i < first.types().size(); ++i)
     {
         // Calculate the distance.
         const Coordinate coordinate = coords[i];
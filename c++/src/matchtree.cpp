@@ -0,0 +1,137 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  matchtree.cpp
+ *  \brief File for the implementation code of the MatchTree class.
+ */
+
+#include "matchtree.h"
+
+
+// -----------------------------------------------------------------------------
+// Determine if two process match list entries match exactly the same
+// configuration match list entries. The points are compared exactly so that
+// sharing a node never changes the outcome of the matching.
+static bool sameEntry(const ProcessBucketMatchListEntry & m1,
+                      const ProcessBucketMatchListEntry & m2)
+{
+    const bool wildcard1 = (m1.match_types[0] == 1);
+    const bool wildcard2 = (m2.match_types[0] == 1);
+
+    // Wildcards match anything regardless of the point.
+    if (wildcard1 || wildcard2)
+    {
+        return wildcard1 && wildcard2;
+    }
+
+    return (m1.match_types == m2.match_types          &&
+            m1.distance == m2.distance                &&
+            m1.coordinate.x() == m2.coordinate.x()    &&
+            m1.coordinate.y() == m2.coordinate.y()    &&
+            m1.coordinate.z() == m2.coordinate.z());
+}
+
+
+// -----------------------------------------------------------------------------
+//
+MatchTree::MatchTree() :
+    nodes_(1)
+{
+    // NOTHING HERE
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void MatchTree::addProcess(const int process, const ProcessBucketMatchList & match_list)
+{
+    // Trailing wildcards always match and need no nodes.
+    size_t n_entries = match_list.size();
+    while (n_entries > 0 && match_list[n_entries - 1].match_types[0] == 1)
+    {
+        --n_entries;
+    }
+
+    // Walk down the tree along the match list, adding nodes where needed.
+    int node = 0;
+
+    for (size_t i = 0; i < n_entries; ++i)
+    {
+        int next = -1;
+        const std::vector<int> & children = nodes_[node].children;
+
+        for (size_t j = 0; j < children.size(); ++j)
+        {
+            if (sameEntry(nodes_[children[j]].entry, match_list[i]))
+            {
+                next = children[j];
+                break;
+            }
+        }
+
+        if (next == -1)
+        {
+            next = nodes_.size();
+            nodes_.push_back(MatchTreeNode());
+            nodes_[next].entry = match_list[i];
+            nodes_[node].children.push_back(next);
+        }
+
+        node = next;
+    }
+
+    nodes_[node].processes.push_back(process);
+    nodes_[node].lengths.push_back(match_list.size());
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void MatchTree::match(const ConfigBucketMatchList & config_match_list,
+                      std::vector<int> & matches) const
+{
+    // Depth first traversal of all nodes matching the configuration. The
+    // recursion depth is bounded by the length of the process match lists.
+    matchNode(0, 0, config_match_list, matches);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void MatchTree::matchNode(const int node,
+                          const size_t depth,
+                          const ConfigBucketMatchList & config_match_list,
+                          std::vector<int> & matches) const
+{
+    // All processes ending here match, if the configuration match list
+    // is long enough to cover any trailing wildcards.
+    const MatchTreeNode & current = nodes_[node];
+    for (size_t j = 0; j < current.processes.size(); ++j)
+    {
+        if (current.lengths[j] <= config_match_list.size())
+        {
+            matches.push_back(current.processes[j]);
+        }
+    }
+
+    // The configuration match list must be long enough to continue.
+    if (depth >= config_match_list.size())
+    {
+        return;
+    }
+
+    const std::vector<int> & children = current.children;
+    for (size_t j = 0; j < children.size(); ++j)
+    {
+        if (nodes_[children[j]].entry.match(config_match_list[depth]))
+        {
+            matchNode(children[j], depth + 1, config_match_list, matches);
+        }
+    }
+}
+
@@ -0,0 +1,97 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+
+/*! \file  matchtree.h
+ *  \brief File for the MatchTree class definition.
+ */
+
+#ifndef __MATCHTREE__
+#define __MATCHTREE__
+
+#include <vector>
+
+#include "matchlist.h"
+
+
+/// A node in the match tree.
+struct MatchTreeNode
+{
+    /// The process match list entry this node tests against.
+    ProcessBucketMatchListEntry entry;
+
+    /// The indices of the child nodes.
+    std::vector<int> children;
+
+    /// The process numbers whose match lists end at this node.
+    std::vector<int> processes;
+
+    /// The full match list length of each process ending at this node.
+    std::vector<size_t> lengths;
+};
+
+
+/*! \brief Class for matching the process match lists of several processes
+ *         against a configuration match list in one pass. The process match
+ *         lists are compiled into a tree where processes with identical
+ *         leading match list entries share nodes, so that each distinct
+ *         entry is only compared once per configuration match list.
+ */
+class MatchTree {
+
+public:
+
+    /*! \brief Default constructor, giving an empty tree.
+     */
+    MatchTree();
+
+    /*! \brief Add a process match list to the tree. Trailing wildcards
+     *         are not added as nodes, only the length of the match list is
+     *         stored to be checked against the configuration.
+     *  \param process    : The process number to return on a match.
+     *  \param match_list : The process match list.
+     */
+    void addProcess(const int process, const ProcessBucketMatchList & match_list);
+
+    /*! \brief Find all processes in the tree that match a configuration match list.
+     *  \param config_match_list : The configuration match list to match against.
+     *  \param matches (out)     : The matching process numbers are appended to this vector.
+     */
+    void match(const ConfigBucketMatchList & config_match_list,
+               std::vector<int> & matches) const;
+
+    /*! \brief Query for the number of nodes in the tree, including the root.
+     *  \return : The number of nodes.
+     */
+    size_t nNodes() const { return nodes_.size(); }
+
+protected:
+
+private:
+
+    /*! \brief Recursively collect the processes in the subtree of a node
+     *         that matches the configuration match list.
+     *  \param node              : The node to start from.
+     *  \param depth             : The depth of the node, i.e. the position in
+     *                             the configuration match list of its children.
+     *  \param config_match_list : The configuration match list to match against.
+     *  \param matches (out)     : The matching process numbers are appended to this vector.
+     */
+    void matchNode(const int node,
+                   const size_t depth,
+                   const ConfigBucketMatchList & config_match_list,
+                   std::vector<int> & matches) const;
+
+    /// The nodes of the tree, with the root first.
+    std::vector<MatchTreeNode> nodes_;
+
+};
+
+
+#endif // __MATCHTREE__
+
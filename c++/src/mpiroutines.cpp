@@ -13,6 +13,8 @@
 
 #include "mpiroutines.h"
 
+#include <algorithm>
+
 
 // -------------------------------------------------------------------------- //
 //
@@ -134,3 +136,23 @@ std::vector< std::pair<int,int> > determineChunks(const int mpi_size,
     return chunks;
 }
 
+
+// -------------------------------------------------------------------------- //
+//
+void determineChunk(const int rank,
+                    const int mpi_size,
+                    const int vector_size,
+                    int & start,
+                    int & n_take)
+{
+    // Determine how many elements to take at minimum.
+    const int take = vector_size/mpi_size;
+
+    // Take the modulus to get the rest.
+    const int rest = vector_size%mpi_size;
+
+    // The lower ranks take one each of the rest.
+    start  = rank * take + std::min(rank, rest);
+    n_take = (rank < rest) ? (take + 1) : take;
+}
+
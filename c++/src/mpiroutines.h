@@ -28,6 +28,20 @@
 std::vector< std::pair<int,int> > determineChunks(const int mpi_size,
                                                   const int vector_size);
 
+/*! \brief Calculate the chunk of one process, without allocating the
+ *         chunks of all processes. Gives the same chunk as determineChunks.
+ *  \param rank        : The rank of the process.
+ *  \param mpi_size    : This number of processes.
+ *  \param vector_size : The length of the vector to split.
+ *  \param start (out) : The starting position in the vector to split.
+ *  \param n_take (out): The number of elements to take.
+ */
+void determineChunk(const int rank,
+                    const int mpi_size,
+                    const int vector_size,
+                    int & start,
+                    int & n_take);
+
 /*! \brief Distribute and integer from master to all other ranks.
  *  \param data : The data to distrubite from master to all others.
  *  \param comm : The communicator to use.
@@ -78,6 +92,28 @@ template <class T_vector>
 T_vector joinOverProcesses(const T_vector & local,
                            const MPI_Comm & comm=MPI_COMM_WORLD);
 
+/*! \brief Split the global vector over the processes, reusing the
+ *         storage of the local vector.
+ *  \param global     : The data vector to split.
+ *  \param local (out): The part of the vector for this process.
+ *  \param comm       : The communicator to use.
+ */
+template <class T_vector>
+void splitOverProcesses(const T_vector & global,
+                        T_vector & local,
+                        const MPI_Comm & comm=MPI_COMM_WORLD);
+
+/*! \brief Join the local vectors to form a global, reusing the
+ *         storage of the global vector.
+ *  \param local       : The data vector to join.
+ *  \param global (out): The global vector.
+ *  \param comm        : The communicator to use.
+ */
+template <class T_vector>
+void joinOverProcesses(const T_vector & local,
+                       T_vector & global,
+                       const MPI_Comm & comm=MPI_COMM_WORLD);
+
 
 
 // -------------------------------------------------------------------------- //
@@ -90,6 +126,31 @@ T_vector joinOverProcesses(const T_vector & local,
 template <class T_vector>
 T_vector splitOverProcesses(const T_vector & global,
                             const MPI_Comm & comm)
+{
+    T_vector local;
+    splitOverProcesses(global, local, comm);
+    return local;
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+template <class T_vector>
+T_vector joinOverProcesses(const T_vector & local,
+                           const MPI_Comm & comm)
+{
+    T_vector global;
+    joinOverProcesses(local, global, comm);
+    return global;
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+template <class T_vector>
+void splitOverProcesses(const T_vector & global,
+                        T_vector & local,
+                        const MPI_Comm & comm)
 {
     // Get the dimensions.
 #if RUNMPI == true
@@ -103,35 +164,22 @@ T_vector splitOverProcesses(const T_vector & global,
 
     const int global_len = global.size();
 
-
-    // Calculate everyones chunk sizes.
-    std::vector< std::pair<int,int> > chunks = determineChunks(size,
-                                                               global_len);
-
     // Determine which elements to work on base on my rank.
-    const int start  = chunks[rank].first;
-    const int n_take = chunks[rank].second;
+    int start, n_take;
+    determineChunk(rank, size, global_len, start, n_take);
 
     // Copy the values over.
-    T_vector my_copy(n_take);
-    for (int i = 0; i < n_take; ++i)
-    {
-        my_copy[i] = global[start+i];
-    }
-
-    // Return.
-    return my_copy;
+    local.assign(global.begin() + start, global.begin() + start + n_take);
 }
 
 
 // -------------------------------------------------------------------------- //
 //
 template <class T_vector>
-T_vector joinOverProcesses(const T_vector & local,
-                           const MPI_Comm & comm)
+void joinOverProcesses(const T_vector & local,
+                       T_vector & global,
+                       const MPI_Comm & comm)
 {
-    // PERFORMME: Prototyping. Chunks does not need to be this involved.
-
     // Get the dimensions.
 #if RUNMPI == true
     int rank, size;
@@ -149,29 +197,24 @@ T_vector joinOverProcesses(const T_vector & local,
     sumOverProcesses(global_len, comm);
 
     // Setup the return data.
-    T_vector global_data(global_len);
-
-    // Calculate everyones chunk sizes.
-    std::vector< std::pair<int,int> > chunks = determineChunks(size,
-                                                               global_len);
+    global.assign(global_len, typename T_vector::value_type());
 
     // Determine which elements to take base on my rank.
-    const int start  = chunks[rank].first;
-    const int n_take = chunks[rank].second;
+    int start, n_take;
+    determineChunk(rank, size, global_len, start, n_take);
 
     // Copy the values over.
     for (int i = 0; i < n_take; ++i)
     {
-        global_data[start+i] = local[i];
+        global[start+i] = local[i];
     }
 
     // Now the global data holds the local data in the correct
     // positions for each processor, but must be communicated.
-    sumOverProcesses(global_data, comm);
-
-    // Return.
-    return global_data;
+    sumOverProcesses(global, comm);
 }
 
 
+
+
 #endif // __MPIROUTINES__
@@ -24,7 +24,7 @@ OnTheFlyMSD::OnTheFlyMSD(const Configuration & configuration,
                          const std::string track_type,
                          const std::vector<Coordinate> & abc_to_xyz,
                          const int blocksize) :
-    history_buffer_(configuration.elements().size(), std::vector<std::pair<Coordinate, double> >(0)),
+    history_buffer_(configuration.atomIDTypes().size(), std::vector<std::pair<Coordinate, double> >(0)),
     histogram_buffer_(n_bins, Coordinate(0.0, 0.0, 0.0)),
     histogram_buffer_sqr_(n_bins, Coordinate(0.0, 0.0, 0.0)),
     histogram_bin_counts_(n_bins, 0),
@@ -39,11 +39,11 @@ OnTheFlyMSD::OnTheFlyMSD(const Configuration & configuration,
 {
     // Populate the history buffer with initial coordinates for tracked atoms.
     const std::vector<Coordinate> & atom_id_coords = configuration.atomIDCoordinates();
-    const std::vector<std::string> & types  = configuration.atomIDElements();
+    const std::vector<int> & types  = configuration.atomIDTypes();
 
     for (size_t i = 0; i < atom_id_coords.size(); ++i)
     {
-        if (types[i] == track_type_)
+        if (types[i] >= 0 && configuration.typeName(types[i]) == track_type_)
         {
             history_buffer_[i].push_back(std::pair<Coordinate, double>(atom_id_coords[i], t0));
         }
@@ -58,14 +58,14 @@ void OnTheFlyMSD::registerStep(const double time,
 {
     // Get the moved atom IDs.
     const std::vector<int> & moved_atom_ids = configuration.movedAtomIDs();
-    const std::vector<std::string> & types  = configuration.atomIDElements();
+    const std::vector<int> & types  = configuration.atomIDTypes();
 
     for (size_t i = 0; i < moved_atom_ids.size(); ++i)
     {
         // Check if this id is one of our moved types.
         const int id = moved_atom_ids[i];
 
-        if (types[id] == track_type_)
+        if (types[id] >= 0 && configuration.typeName(types[id]) == track_type_)
         {
             // Make place in the history buffer.
             if (history_buffer_[id].size() < history_steps_)
@@ -0,0 +1,178 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  pairratecalculator.cpp
+ *  \brief File for the implementation code of the PairRateCalculator class.
+ */
+
+#include "pairratecalculator.h"
+
+#include <cmath>
+#include <algorithm>
+#include <stdexcept>
+
+
+// -----------------------------------------------------------------------------
+//
+PairRateCalculator::PairRateCalculator(const std::vector<double> & shells,
+                                       const int n_types,
+                                       const std::vector<double> & pair_energies,
+                                       const std::vector<double> & site_energies,
+                                       const std::vector<double> & barriers,
+                                       const std::vector<double> & alphas,
+                                       const double kT,
+                                       const double cutoff,
+                                       const bool cache_rates,
+                                       const std::vector<int> & exclude_from_caching,
+                                       const int cache_size) :
+    shells_(shells),
+    shells2_(shells.size()),
+    n_types_(n_types),
+    pair_energies_(pair_energies),
+    site_energies_(site_energies),
+    barriers_(barriers),
+    alphas_(alphas),
+    kT_(kT),
+    cutoff_(cutoff),
+    cache_rates_(cache_rates),
+    exclude_from_caching_(exclude_from_caching),
+    cache_size_(cache_size)
+{
+    // Check the tables.
+    if (shells_.empty())
+    {
+        throw std::runtime_error("The pair rate calculator needs at least one shell.");
+    }
+
+    for (size_t s = 0; s < shells_.size(); ++s)
+    {
+        if (shells_[s] <= 0.0 || (s > 0 && shells_[s] <= shells_[s-1]))
+        {
+            throw std::runtime_error("The shell radii of the pair rate calculator must be positive and increasing.");
+        }
+
+        const double radius = shells_[s] + 1.0e-6;
+        shells2_[s] = radius * radius;
+    }
+
+    if (n_types_ < 1 ||
+        pair_energies_.size() != shells_.size() * n_types_ * n_types_ ||
+        site_energies_.size() != static_cast<size_t>(n_types_))
+    {
+        throw std::runtime_error("The energy tables of the pair rate calculator do not match the number of shells and types.");
+    }
+
+    if (barriers_.size() != alphas_.size())
+    {
+        throw std::runtime_error("The pair rate calculator needs as many barriers as alphas.");
+    }
+
+    if (kT_ <= 0.0)
+    {
+        throw std::runtime_error("The thermal energy of the pair rate calculator must be positive.");
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double PairRateCalculator::backendRateCallbackTypeNumbers(const std::vector<double> & geometry,
+                                                          const int len,
+                                                          const std::vector<int> & types_before,
+                                                          const std::vector<int> & types_after,
+                                                          const std::vector<std::string> & type_names,
+                                                          const double rate_constant,
+                                                          const int process_number,
+                                                          const double global_x,
+                                                          const double global_y,
+                                                          const double global_z) const
+{
+    const double dE = energyChange(geometry, len, types_before, types_after);
+
+    // The activation energy, Metropolis by default.
+    double barrier = 0.0;
+    double alpha   = 1.0;
+    if (process_number >= 0 && process_number < static_cast<int>(barriers_.size()))
+    {
+        barrier = barriers_[process_number];
+        alpha   = alphas_[process_number];
+    }
+    const double activation = std::max(std::max(0.0, dE), barrier + alpha * dE);
+
+    return rate_constant * std::exp(-activation / kT_);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double PairRateCalculator::energyChange(const std::vector<double> & geometry,
+                                        const int len,
+                                        const std::vector<int> & types_before,
+                                        const std::vector<int> & types_after) const
+{
+    double dE = 0.0;
+
+    for (int i = 0; i < len; ++i)
+    {
+        const int before_i = types_before[i];
+        const int after_i  = types_after[i];
+
+        if (before_i == after_i)
+        {
+            continue;
+        }
+
+        dE += site_energies_[after_i] - site_energies_[before_i];
+
+        // All pairs with the changed site, counting pairs with two changed
+        // sites only once.
+        for (int j = 0; j < len; ++j)
+        {
+            if (j == i || (j < i && types_before[j] != types_after[j]))
+            {
+                continue;
+            }
+
+            const int s = shell(geometry, i, j);
+            if (s < 0)
+            {
+                continue;
+            }
+
+            const int offset = s * n_types_;
+            dE += pair_energies_[(offset + after_i) * n_types_ + types_after[j]];
+            dE -= pair_energies_[(offset + before_i) * n_types_ + types_before[j]];
+        }
+    }
+
+    return dE;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+int PairRateCalculator::shell(const std::vector<double> & geometry,
+                              const int i,
+                              const int j) const
+{
+    const double dx = geometry[3*j]   - geometry[3*i];
+    const double dy = geometry[3*j+1] - geometry[3*i+1];
+    const double dz = geometry[3*j+2] - geometry[3*i+2];
+    const double distance2 = dx*dx + dy*dy + dz*dz;
+
+    for (size_t s = 0; s < shells2_.size(); ++s)
+    {
+        if (distance2 <= shells2_[s])
+        {
+            return static_cast<int>(s);
+        }
+    }
+
+    return -1;
+}
+
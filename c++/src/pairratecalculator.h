@@ -0,0 +1,214 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  pairratecalculator.h
+ *  \brief File for the PairRateCalculator class definition.
+ */
+
+#ifndef __PAIRRATECALCULATOR__
+#define __PAIRRATECALCULATOR__
+
+#include <vector>
+#include <string>
+
+#include "ratecalculator.h"
+
+
+/*! \brief Class for a rate calculator evaluating the energy change of each
+ *         process from pair interactions in neighbour shells and site
+ *         energies, tabulated per type number, and giving the rate from a
+ *         Bronsted-Evans-Polanyi activation energy model per process number.
+ *
+ *  The energy change of a process is the sum over all pairs within the local
+ *  geometry with at least one changed site, and over the changed sites,
+ *
+ *      dE = sum_pairs E_pair(shell, after) - E_pair(shell, before)
+ *         + sum_sites E_site(after) - E_site(before),
+ *
+ *  where the shell of a pair is the first shell radius not smaller than the
+ *  distance between the two sites. Pairs further apart than the last shell
+ *  radius do not interact. The rate of process p is then
+ *
+ *      rate = rate_constant * exp(-Ea / kT),
+ *      Ea   = max(0, dE, barrier[p] + alpha[p] * dE),
+ *
+ *  which with a zero barrier and alpha one gives the Metropolis rate
+ *  rate_constant * min(1, exp(-dE / kT)). Process numbers without a barrier
+ *  and alpha get the Metropolis rate. Bucket processes are not supported.
+ */
+class PairRateCalculator : public RateCalculator {
+
+public:
+
+    /*! \brief Constructor.
+     *  \param shells               : The outer radius of each neighbour shell, in increasing order.
+     *  \param n_types              : The number of type numbers, including the wildcard.
+     *  \param pair_energies        : The pair energies, with index (shell*n_types + type1)*n_types + type2.
+     *  \param site_energies        : The site energy of each type number.
+     *  \param barriers             : The activation energy barrier of each process number.
+     *  \param alphas               : The Bronsted-Evans-Polanyi coefficient of each process number.
+     *  \param kT                   : The thermal energy, in the same unit as the energies.
+     *  \param cutoff               : The cutoff of the local geometries.
+     *  \param cache_rates          : If the rates should be cached.
+     *  \param exclude_from_caching : The process numbers to exclude from caching.
+     *  \param cache_size           : The maximum number of cached rates.
+     */
+    PairRateCalculator(const std::vector<double> & shells,
+                       const int n_types,
+                       const std::vector<double> & pair_energies,
+                       const std::vector<double> & site_energies,
+                       const std::vector<double> & barriers,
+                       const std::vector<double> & alphas,
+                       const double kT,
+                       const double cutoff,
+                       const bool cache_rates,
+                       const std::vector<int> & exclude_from_caching,
+                       const int cache_size);
+
+    /*! \brief Calculate the rate from the energy change of the process.
+     * \param geometry       : The geometry, with x,y,z coordinates for each atom in contiguous memory.
+     * \param len            : The number of atoms.
+     * \param types_before   : The type numbers before the process.
+     * \param types_after    : The type numbers after the process.
+     * \param type_names     : The names of the type numbers, not used.
+     * \param rate_constant  : The rate constant associated with the process.
+     * \param process_number : The id number of the process.
+     * \param global_x       : The global coordinate in the x direction for the central site, not used.
+     * \param global_y       : The global coordinate in the y direction for the central site, not used.
+     * \param global_z       : The global coordinate in the z direction for the central site, not used.
+     * \return : The rate.
+     */
+    virtual
+    double backendRateCallbackTypeNumbers(const std::vector<double> & geometry,
+                                          const int len,
+                                          const std::vector<int> & types_before,
+                                          const std::vector<int> & types_after,
+                                          const std::vector<std::string> & type_names,
+                                          const double rate_constant,
+                                          const int process_number,
+                                          const double global_x,
+                                          const double global_y,
+                                          const double global_z) const override;
+
+    /*! \brief Calculate the energy change of a process.
+     * \param geometry     : The geometry, with x,y,z coordinates for each atom in contiguous memory.
+     * \param len          : The number of atoms.
+     * \param types_before : The type numbers before the process.
+     * \param types_after  : The type numbers after the process.
+     * \return : The energy after minus the energy before the process.
+     */
+    double energyChange(const std::vector<double> & geometry,
+                        const int len,
+                        const std::vector<int> & types_before,
+                        const std::vector<int> & types_after) const;
+
+    /*! \brief Query for the type numbers flag.
+     *  \return : True, the energies are tabulated by type number.
+     */
+    virtual bool typeNumbers() const override { return true; }
+
+    /*! \brief Query for the thread safe flag.
+     *  \return : True, the calculation only reads the tables.
+     */
+    virtual bool threadSafe() const override { return true; }
+
+    /*! \brief Query for the cache size given at construction.
+     */
+    virtual int cacheSize() const override { return cache_size_; }
+
+    /*! \brief Query for the cutoff given at construction.
+     */
+    virtual double cutoff() const override { return cutoff_; }
+
+    /*! \brief Query for the caching flag given at construction.
+     */
+    virtual bool cacheRates() const override { return cache_rates_; }
+
+    /*! \brief Query for the process numbers excluded from caching given at construction.
+     */
+    virtual std::vector<int> excludeFromCaching() const override { return exclude_from_caching_; }
+
+    /*! \brief Query for the shell radii.
+     */
+    const std::vector<double> & shells() const { return shells_; }
+
+    /*! \brief Query for the pair energies.
+     */
+    const std::vector<double> & pairEnergies() const { return pair_energies_; }
+
+    /*! \brief Query for the site energies.
+     */
+    const std::vector<double> & siteEnergies() const { return site_energies_; }
+
+    /*! \brief Query for the activation energy barriers.
+     */
+    const std::vector<double> & barriers() const { return barriers_; }
+
+    /*! \brief Query for the Bronsted-Evans-Polanyi coefficients.
+     */
+    const std::vector<double> & alphas() const { return alphas_; }
+
+    /*! \brief Query for the thermal energy.
+     */
+    double kT() const { return kT_; }
+
+protected:
+
+private:
+
+    /*! \brief Get the shell of a pair of sites.
+     *  \param geometry : The geometry.
+     *  \param i        : The index of the first site.
+     *  \param j        : The index of the second site.
+     *  \return : The shell index, or -1 if the sites are too far apart.
+     */
+    int shell(const std::vector<double> & geometry,
+              const int i,
+              const int j) const;
+
+    /// The outer radius of each shell.
+    std::vector<double> shells_;
+
+    /// The squared outer radius of each shell, with a tolerance.
+    std::vector<double> shells2_;
+
+    /// The number of type numbers.
+    int n_types_;
+
+    /// The pair energies.
+    std::vector<double> pair_energies_;
+
+    /// The site energies.
+    std::vector<double> site_energies_;
+
+    /// The barriers.
+    std::vector<double> barriers_;
+
+    /// The Bronsted-Evans-Polanyi coefficients.
+    std::vector<double> alphas_;
+
+    /// The thermal energy.
+    double kT_;
+
+    /// The cutoff.
+    double cutoff_;
+
+    /// The caching flag.
+    bool cache_rates_;
+
+    /// The process numbers to exclude from caching.
+    std::vector<int> exclude_from_caching_;
+
+    /// The cache size.
+    int cache_size_;
+
+};
+
+
+#endif // __PAIRRATECALCULATOR__
+
@@ -33,6 +33,8 @@ Process::Process(const Configuration & first,
     rate_(rate),
     cutoff_(0.0),
     sites_(0),
+    site_tree_(0),
+    n_weighted_sites_(0),
     affected_indices_(0),
     basis_sites_(basis_sites),
     id_moves_(0),
@@ -106,7 +108,18 @@ void Process::addSite(const int index,
 {
     sites_.push_back(index);
     site_multiplicity_.push_back(multiplicity);
-    total_rate_ += multiplicity * rate_;
+
+    if (multiplicity != 1.0)
+    {
+        ++n_weighted_sites_;
+    }
+
+    // Add the site rate to the tree.
+    const size_t position = sites_.size() - 1;
+    site_positions_.set(index, position);
+    site_tree_.resize(sites_.size());
+    site_tree_.set(position, multiplicity * rate_);
+    total_rate_ = site_tree_.total();
 }
 
 
@@ -114,25 +127,85 @@ void Process::addSite(const int index,
 //
 void Process::removeSite(const int index)
 {
-    // Find the index to remove.
-    std::vector<int>::iterator it1 = std::find(sites_.begin(),
-                                               sites_.end(),
-                                               index);
-    // Swap the index to remove with the last index.
-    std::vector<int>::iterator last = sites_.end()-1;
-    std::swap((*it1), (*last));
-    // Remove the last index from the list.
-    sites_.pop_back();
+    // Find the position of the index to remove.
+    const int position = site_positions_.find(index);
+
+    if (position != -1)
+    {
+        removeSiteAtPosition(position);
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Process::updateSite(const int index,
+                         const double rate,
+                         const double multiplicity)
+{
+    // Find the position of the index to update.
+    const int position = site_positions_.find(index);
+
+    if (position == -1)
+    {
+        addSite(index, rate, multiplicity);
+    }
+    else
+    {
+        updateSiteAtPosition(position, multiplicity, multiplicity * rate_);
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Process::removeSiteAtPosition(const size_t position)
+{
+    const size_t last = sites_.size() - 1;
+
+    if (site_multiplicity_[position] != 1.0)
+    {
+        --n_weighted_sites_;
+    }
+
+    // Move the last site into the removed position and remove the last.
+    site_positions_.erase(sites_[position]);
+    if (position != last)
+    {
+        site_positions_.set(sites_[last], position);
+    }
 
-    // Calculate the position in the site_multiplicity_ vector.
-    std::vector<double>::iterator it3 = site_multiplicity_.begin() + (it1-sites_.begin());
-    std::vector<double>::iterator last_multiplicity = site_multiplicity_.end()-1;
+    sites_[position] = sites_[last];
+    sites_.pop_back();
 
-    // Swap and remove.
-    std::swap((*it3), (*last_multiplicity));
-    total_rate_ -= site_multiplicity_.back() * rate_;
+    site_multiplicity_[position] = site_multiplicity_[last];
     site_multiplicity_.pop_back();
 
+    site_tree_.set(position, site_tree_.value(last));
+    site_tree_.resize(last);
+    total_rate_ = site_tree_.total();
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void Process::updateSiteAtPosition(const size_t position,
+                                   const double multiplicity,
+                                   const double site_rate)
+{
+    if (site_multiplicity_[position] != 1.0)
+    {
+        --n_weighted_sites_;
+    }
+
+    if (multiplicity != 1.0)
+    {
+        ++n_weighted_sites_;
+    }
+
+    site_multiplicity_[position] = multiplicity;
+    site_tree_.set(position, site_rate);
+    total_rate_ = site_tree_.total();
 }
 
 
@@ -140,9 +213,12 @@ void Process::removeSite(const int index)
 //
 void Process::clearSites()
 {
+    site_positions_.clear();
     sites_.clear();
     site_multiplicity_.clear();
     site_rates_.clear();
+    site_tree_ = SumTree();
+    n_weighted_sites_ = 0;
     total_rate_ = 0.0;
 }
 
@@ -151,37 +227,45 @@ void Process::clearSites()
 //
 int Process::pickSite() const
 {
-    // PERFORMME: This implementation works but is unnecessarily slow
-    //            in the case when no buckets are used, and therefore
-    //            multiplicity is one for all sites. For the Ising spin
-    //            model this means a 30% (!) extra increase in running time,
-    //            with no benefit at al. Should be fixed before release.
+    // Get a random number between 0.0 and 1.0.
+    const double rnd = randomDouble01();
 
-    // Get the total rate.
-    const double total_rate = incremental_rate_table_.back();
-
-    // Get a random number between 0.0 and the total rate.
-    const double rnd = randomDouble01() * total_rate;
+    // With multiplicity one on all sites all sites are equally probable.
+    if (n_weighted_sites_ == 0)
+    {
+        const size_t n_sites = sites_.size();
+        const size_t site_index = std::min(static_cast<size_t>(rnd * n_sites), n_sites - 1);
+        return sites_[site_index];
+    }
 
-    // Pick the site.
-    const std::vector<double>::const_iterator begin = incremental_rate_table_.begin();
-    const std::vector<double>::const_iterator end   = incremental_rate_table_.end();
-    const std::vector<double>::const_iterator it1   = std::lower_bound( begin, end, rnd);
+    // Pick the site weighted by its rate.
+    return sites_[site_tree_.pick(rnd * site_tree_.total())];
+}
 
-    // Get the site index.
-    const int site_index = it1-begin;
 
-    // Return the site.
-    return sites_[site_index];
+// -----------------------------------------------------------------------------
+//
+bool Process::isListed(const int index) const
+{
+    // Look up the index among the listed sites.
+    return site_positions_.find(index) != -1;
 }
 
 
 // -----------------------------------------------------------------------------
 //
-bool Process::isListed(const int index) const
+double Process::siteTotalRate(const int index) const
 {
-    // Search in the list to find out if it is added.
-    return std::find(sites_.begin(), sites_.end(), index) != sites_.end();
+    const int position = site_positions_.find(index);
+
+    if (position == -1)
+    {
+        return 0.0;
+    }
+    else
+    {
+        return site_tree_.value(position);
+    }
 }
 
 
@@ -189,14 +273,13 @@ bool Process::isListed(const int index) const
 //
 void Process::updateRateTable()
 {
-    // Resize and update the incremental rate table.
-    incremental_rate_table_.resize(site_multiplicity_.size());
-    double previous = 0.0;
+    // Recalculate the site rates.
+    site_tree_ = SumTree(sites_.size());
     for (size_t i = 0; i < site_multiplicity_.size(); ++i)
     {
-        incremental_rate_table_[i] = previous + (rate_ * site_multiplicity_[i]);
-        previous = incremental_rate_table_[i];
+        site_tree_.set(i, rate_ * site_multiplicity_[i]);
     }
+    total_rate_ = site_tree_.total();
 
     // DONE
 }
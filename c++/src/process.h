@@ -17,6 +17,8 @@
 #include <map>
 #include <string>
 #include "matchlist.h"
+#include "sumtree.h"
+#include "indexmap.h"
 
 class Configuration;
 
@@ -82,16 +84,28 @@ public:
      */
     virtual void removeSite(const int index);
 
+    /*! \brief Update the rate and multiplicity of a listed site in place.
+     *         The site is added if it is not already listed.
+     *  \param index        : The index to update.
+     *  \param rate         : Dummy argument needed for common interface.
+     *  \param multiplicity : The new multiplicity of the site.
+     */
+    virtual void updateSite(const int index,
+                            const double rate=0.0,
+                            const double multiplicity=1.0);
+
     /*! \brief Remove all indices from the list of available sites.
      */
     virtual void clearSites();
 
     /*! \brief Pick a site weighted by its individual total rate (multiplicity).
+     *         If all sites have multiplicity one the site is picked uniformly.
      *  \return : An available process.
      */
     virtual int pickSite() const;
 
-    /*! \brief Update the rate table prior to drawing a rate.
+    /*! \brief Recalculate the site rate tree from scratch. The tree is
+     *         otherwise updated incrementally when sites are added or removed.
      */
     virtual void updateRateTable();
 
@@ -116,6 +130,12 @@ public:
      */
     bool isListed(const int index) const;
 
+    /*! \brief Query for the total rate (rate times multiplicity) of a site.
+     *  \param index : The index to get the total rate for.
+     *  \return : The total rate of the site, or zero if it is not listed.
+     */
+    double siteTotalRate(const int index) const;
+
     /*! \brief Query for the available sites for this process.
      *         Convenient when testing other functionality of the class.
      *  \return : The available sites.
@@ -181,6 +201,22 @@ public:
 
 protected:
 
+    /*! \brief Remove the site at the given position in the list of available
+     *         sites, by moving the last site into its place.
+     *  \param position : The position in the sites list to remove.
+     */
+    void removeSiteAtPosition(const size_t position);
+
+    /*! \brief Set the multiplicity and total rate of the site at the given
+     *         position in the list of available sites.
+     *  \param position     : The position in the sites list to update.
+     *  \param multiplicity : The new multiplicity of the site.
+     *  \param site_rate    : The new total rate of the site.
+     */
+    void updateSiteAtPosition(const size_t position,
+                              const double multiplicity,
+                              const double site_rate);
+
     // If the process rate can be cached.
     bool cache_rate_;
 
@@ -205,8 +241,14 @@ protected:
     /// The list of individual site rates.
     std::vector<double> site_rates_;
 
-    /// The incremental rates.
-    std::vector<double> incremental_rate_table_;
+    /// The sum tree of the total rates (rate times multiplicity) of the sites.
+    SumTree site_tree_;
+
+    /// The number of available sites with multiplicity different from one.
+    int n_weighted_sites_;
+
+    /// The position in the sites list of each available site index.
+    IndexMap site_positions_;
 
     /// The match list for comparing against local configurations.
     ProcessBucketMatchList match_list_;
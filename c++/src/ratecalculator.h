@@ -50,7 +50,7 @@ public:
      * \return : The base class implementation returns the rate constant unmodified.
      */
     virtual
-    double backendRateCallback(const std::vector<double> geometry,
+    double backendRateCallback(const std::vector<double> & geometry,
                                const int len,
                                const std::vector<std::string> & types_before,
                                const std::vector<std::string> & types_after,
@@ -61,6 +61,80 @@ public:
                                const double global_z) const {
         return rate_constant; }
 
+    /*! \brief The backend callback function for sending process information
+     *         with the types given as type numbers to objects inheriting from
+     *         this class. Called instead of backendRateCallback if typeNumbers
+     *         returns true. The KMCRateCalculatorPlugin class in python
+     *         overloads this function.
+     * \param geometry       : The geometry, with x,y,z coordinates for each atom in contiguous memory.
+     * \param len            : The number of atoms, must be geometry.size()/3 used for reshping
+     *                         geometry data in Python.
+     * \param types_before   : The type numbers before the process.
+     * \param types_after    : The type numbers after the process.
+     * \param type_names     : The names of the type numbers.
+     * \param rate_constant  : The rate constant associated with the process.
+     * \param process_number : The id number of the process.
+     * \param global_x       : The global coordinate in the x direction for the central site.
+     * \param global_y       : The global coordinate in the y direction for the central site.
+     * \param global_z       : The global coordinate in the z direction for the central site.
+     * \return : The base class implementation returns the rate constant unmodified.
+     */
+    virtual
+    double backendRateCallbackTypeNumbers(const std::vector<double> & geometry,
+                                          const int len,
+                                          const std::vector<int> & types_before,
+                                          const std::vector<int> & types_after,
+                                          const std::vector<std::string> & type_names,
+                                          const double rate_constant,
+                                          const int process_number,
+                                          const double global_x,
+                                          const double global_y,
+                                          const double global_z) const {
+        return rate_constant; }
+
+    /*! \brief The backend callback function for sending bucket process information
+     *         with the occupations given as count matrices to objects inheriting
+     *         from this class. Called instead of backendRateCallbackBuckets if
+     *         typeNumbers returns true. The KMCRateCalculatorPlugin class in
+     *         python overloads this function.
+     * \param geometry       : The geometry, with x,y,z coordinates for each atom in contiguous memory.
+     * \param len            : The number of sites, must be geometry.size()/3 used for reshping
+     *                         geometry data in Python.
+     * \param counts_before  : The number of particles of each type at each site before the
+     *                         process, type_names.size() per site in contiguous memory.
+     * \param counts_after   : The number of particles of each type at each site after the
+     *                         process, in the same layout.
+     * \param type_names     : The names of the type numbers.
+     * \param rate_constant  : The rate constant associated with the process.
+     * \param process_number : The id number of the process.
+     * \param global_x       : The global coordinate in the x direction for the central site.
+     * \param global_y       : The global coordinate in the y direction for the central site.
+     * \param global_z       : The global coordinate in the z direction for the central site.
+     * \return : The base class implementation returns the rate constant unmodified.
+     */
+    virtual
+    double backendRateCallbackBucketCounts(const std::vector<double> & geometry,
+                                           const int len,
+                                           const std::vector<int> & counts_before,
+                                           const std::vector<int> & counts_after,
+                                           const std::vector<std::string> & type_names,
+                                           const double rate_constant,
+                                           const int process_number,
+                                           const double global_x,
+                                           const double global_y,
+                                           const double global_z) const {
+        return rate_constant; }
+
+    /*! \brief Query if the types of non bucket processes should be sent as
+     *         type numbers to backendRateCallbackTypeNumbers, instead of as
+     *         strings to backendRateCallback, and the occupations of bucket
+     *         processes as count matrices to backendRateCallbackBucketCounts,
+     *         instead of as type buckets to backendRateCallbackBuckets.
+     * \return : The base class implementation returns false.
+     */
+    virtual
+    bool typeNumbers() const { return false; }
+
     /*! \brief The backend callback function for sending bucket process information
      *         to objects inheriting from this class. The KMCRateCalculatorPlugin
      *         class in python overloads this function.
@@ -78,7 +152,7 @@ public:
      * \return : The base class implementation returns the rate constant unmodified.
      */
     virtual
-    double backendRateCallbackBuckets(const std::vector<double> geometry,
+    double backendRateCallbackBuckets(const std::vector<double> & geometry,
                                       const int len,
                                       const std::vector<TypeBucket> & occupation,
                                       const std::vector<TypeBucket> & update,
@@ -90,6 +164,82 @@ public:
                                       const double global_z) const {
                 return rate_constant; }
 
+    /*! \brief Query if the backend callback functions may be called from
+     *         several threads at the same time. Rate calculators implemented
+     *         in Python must not return true.
+     * \return : The base class implementation returns false.
+     */
+    virtual
+    bool threadSafe() const { return false; }
+
+    /*! \brief Query for the maximum number of calculated rates to keep
+     *         in the rate table when rates are cached.
+     * \return : The base class implementation returns 100000.
+     */
+    virtual
+    int cacheSize() const { return 100000; }
+
+    /*! \brief Query for the cutoff of the local geometries sent to the
+     *         backend callback functions. Only used for rate calculators
+     *         implemented in C++.
+     * \return : The base class implementation returns 1.0.
+     */
+    virtual
+    double cutoff() const { return 1.0; }
+
+    /*! \brief Query if the calculated rates should be cached. Only used for
+     *         rate calculators implemented in C++.
+     * \return : The base class implementation returns false.
+     */
+    virtual
+    bool cacheRates() const { return false; }
+
+    /*! \brief Query for the process numbers to exclude from caching. Only
+     *         used for rate calculators implemented in C++.
+     * \return : The base class implementation returns an empty vector.
+     */
+    virtual
+    std::vector<int> excludeFromCaching() const { return std::vector<int>(0); }
+
+    /*! \brief Query if the rates of all pending tasks should be calculated
+     *         together with one call to backendRateCallbackBatch, instead of
+     *         one call to backendRateCallback per task. Bucket processes are
+     *         always calculated one by one.
+     * \return : The base class implementation returns false.
+     */
+    virtual
+    bool batchRates() const { return false; }
+
+    /*! \brief The backend callback function for sending the information of
+     *         several processes at once to objects inheriting from this class.
+     *         The geometries and types of all tasks are padded to the length
+     *         of the longest geometry in the batch.
+     * \param geometries         : The geometries, with x,y,z coordinates for each atom of each
+     *                             task in contiguous memory, padded with zeros.
+     * \param max_len            : The padded number of atoms per task.
+     * \param lengths            : The number of atoms of each task.
+     * \param types_before       : The type numbers before the process, max_len per task,
+     *                             padded with -1.
+     * \param types_after        : The type numbers after the process, max_len per task,
+     *                             padded with -1.
+     * \param type_names         : The names of the type numbers.
+     * \param rate_constants     : The rate constant associated with the process of each task.
+     * \param process_numbers    : The id number of the process of each task.
+     * \param global_coordinates : The global x,y,z coordinates for the central site of each task.
+     * \return : The rate of each task. The base class implementation returns the rate constants.
+     */
+    virtual
+    std::vector<double> backendRateCallbackBatch(const std::vector<double> & geometries,
+                                                 const int max_len,
+                                                 const std::vector<int> & lengths,
+                                                 const std::vector<int> & types_before,
+                                                 const std::vector<int> & types_after,
+                                                 const std::vector<std::string> & type_names,
+                                                 const std::vector<double> & rate_constants,
+                                                 const std::vector<int> & process_numbers,
+                                                 const std::vector<double> & global_coordinates) const {
+        return rate_constants; }
+
 
 protected:
 
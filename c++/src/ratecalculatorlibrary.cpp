@@ -0,0 +1,242 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  ratecalculatorlibrary.cpp
+ *  \brief File for the implementation code of the RateCalculatorLibrary class.
+ */
+
+#include "ratecalculatorlibrary.h"
+#include "configuration.h"
+
+#include <dlfcn.h>
+#include <stdexcept>
+#include <sstream>
+
+
+// -----------------------------------------------------------------------------
+//
+RateCalculatorLibrary::RateCalculatorLibrary(const std::string & path,
+                                             const Configuration & configuration) :
+    path_(path),
+    handle_(NULL),
+    rate_calculator_(NULL),
+    destroy_(NULL)
+{
+    // Load with local symbols, so that the classes the library is built
+    // with do not clash with those of other loaded libraries.
+    handle_ = dlopen(path.c_str(), RTLD_NOW | RTLD_LOCAL);
+    if (handle_ == NULL)
+    {
+        throw std::runtime_error("Could not load the rate calculator library " + path + ": " + dlerror());
+    }
+
+    try
+    {
+        // Check that the library was built for this version of the interface.
+        int (*version)() = reinterpret_cast<int (*)()>(symbol("kmclibRateCalculatorPluginVersion"));
+        if (version() != KMCLIB_RATE_CALCULATOR_PLUGIN_VERSION)
+        {
+            std::stringstream msg;
+            msg << "The rate calculator library " << path << " was built for plugin interface version "
+                << version() << ", expected version " << KMCLIB_RATE_CALCULATOR_PLUGIN_VERSION << ".";
+            throw std::runtime_error(msg.str());
+        }
+
+        RateCalculator * (*create)(const Configuration &) =
+            reinterpret_cast<RateCalculator * (*)(const Configuration &)>(symbol("kmclibCreateRateCalculator"));
+        destroy_ = reinterpret_cast<void (*)(RateCalculator *)>(symbol("kmclibDestroyRateCalculator"));
+
+        rate_calculator_ = create(configuration);
+        if (rate_calculator_ == NULL)
+        {
+            throw std::runtime_error("The rate calculator library " + path + " did not create a rate calculator.");
+        }
+    }
+    catch (...)
+    {
+        dlclose(handle_);
+        throw;
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+RateCalculatorLibrary::~RateCalculatorLibrary()
+{
+    // The calculator must be destroyed by the library that created it,
+    // before the library is closed.
+    destroy_(rate_calculator_);
+    dlclose(handle_);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void * RateCalculatorLibrary::symbol(const std::string & name) const
+{
+    // Clear any old error before the lookup.
+    dlerror();
+    void * address = dlsym(handle_, name.c_str());
+    if (address == NULL)
+    {
+        throw std::runtime_error("The rate calculator library " + path_ + " does not define " + name +
+                                 ". Use the KMCLIB_RATE_CALCULATOR_PLUGIN macro to define it.");
+    }
+    return address;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double RateCalculatorLibrary::backendRateCallback(const std::vector<double> & geometry,
+                                                  const int len,
+                                                  const std::vector<std::string> & types_before,
+                                                  const std::vector<std::string> & types_after,
+                                                  const double rate_constant,
+                                                  const int process_number,
+                                                  const double global_x,
+                                                  const double global_y,
+                                                  const double global_z) const
+{
+    return rate_calculator_->backendRateCallback(geometry, len, types_before, types_after,
+                                                 rate_constant, process_number,
+                                                 global_x, global_y, global_z);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double RateCalculatorLibrary::backendRateCallbackTypeNumbers(const std::vector<double> & geometry,
+                                                             const int len,
+                                                             const std::vector<int> & types_before,
+                                                             const std::vector<int> & types_after,
+                                                             const std::vector<std::string> & type_names,
+                                                             const double rate_constant,
+                                                             const int process_number,
+                                                             const double global_x,
+                                                             const double global_y,
+                                                             const double global_z) const
+{
+    return rate_calculator_->backendRateCallbackTypeNumbers(geometry, len, types_before, types_after,
+                                                            type_names, rate_constant, process_number,
+                                                            global_x, global_y, global_z);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double RateCalculatorLibrary::backendRateCallbackBucketCounts(const std::vector<double> & geometry,
+                                                              const int len,
+                                                              const std::vector<int> & counts_before,
+                                                              const std::vector<int> & counts_after,
+                                                              const std::vector<std::string> & type_names,
+                                                              const double rate_constant,
+                                                              const int process_number,
+                                                              const double global_x,
+                                                              const double global_y,
+                                                              const double global_z) const
+{
+    return rate_calculator_->backendRateCallbackBucketCounts(geometry, len, counts_before, counts_after,
+                                                             type_names, rate_constant, process_number,
+                                                             global_x, global_y, global_z);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double RateCalculatorLibrary::backendRateCallbackBuckets(const std::vector<double> & geometry,
+                                                         const int len,
+                                                         const std::vector<TypeBucket> & occupation,
+                                                         const std::vector<TypeBucket> & update,
+                                                         const std::vector<std::string> & type_map,
+                                                         const double rate_constant,
+                                                         const int process_number,
+                                                         const double global_x,
+                                                         const double global_y,
+                                                         const double global_z) const
+{
+    return rate_calculator_->backendRateCallbackBuckets(geometry, len, occupation, update,
+                                                        type_map, rate_constant, process_number,
+                                                        global_x, global_y, global_z);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+std::vector<double> RateCalculatorLibrary::backendRateCallbackBatch(const std::vector<double> & geometries,
+                                                                    const int max_len,
+                                                                    const std::vector<int> & lengths,
+                                                                    const std::vector<int> & types_before,
+                                                                    const std::vector<int> & types_after,
+                                                                    const std::vector<std::string> & type_names,
+                                                                    const std::vector<double> & rate_constants,
+                                                                    const std::vector<int> & process_numbers,
+                                                                    const std::vector<double> & global_coordinates) const
+{
+    return rate_calculator_->backendRateCallbackBatch(geometries, max_len, lengths, types_before,
+                                                      types_after, type_names, rate_constants,
+                                                      process_numbers, global_coordinates);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+bool RateCalculatorLibrary::typeNumbers() const
+{
+    return rate_calculator_->typeNumbers();
+}
+
+
+// -----------------------------------------------------------------------------
+//
+bool RateCalculatorLibrary::threadSafe() const
+{
+    return rate_calculator_->threadSafe();
+}
+
+
+// -----------------------------------------------------------------------------
+//
+int RateCalculatorLibrary::cacheSize() const
+{
+    return rate_calculator_->cacheSize();
+}
+
+
+// -----------------------------------------------------------------------------
+//
+double RateCalculatorLibrary::cutoff() const
+{
+    return rate_calculator_->cutoff();
+}
+
+
+// -----------------------------------------------------------------------------
+//
+bool RateCalculatorLibrary::cacheRates() const
+{
+    return rate_calculator_->cacheRates();
+}
+
+
+// -----------------------------------------------------------------------------
+//
+std::vector<int> RateCalculatorLibrary::excludeFromCaching() const
+{
+    return rate_calculator_->excludeFromCaching();
+}
+
+
+// -----------------------------------------------------------------------------
+//
+bool RateCalculatorLibrary::batchRates() const
+{
+    return rate_calculator_->batchRates();
+}
+
@@ -0,0 +1,201 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  ratecalculatorlibrary.h
+ *  \brief File for the RateCalculatorLibrary class definition.
+ */
+
+#ifndef __RATECALCULATORLIBRARY__
+#define __RATECALCULATORLIBRARY__
+
+#include <vector>
+#include <string>
+
+#include "ratecalculator.h"
+
+// Forward declarations.
+class Configuration;
+
+
+/// The version of the rate calculator plugin interface. Increase when the
+/// RateCalculator or Configuration classes change in ways that break
+/// compiled plugins.
+#define KMCLIB_RATE_CALCULATOR_PLUGIN_VERSION 1
+
+
+/// Define the factory functions of a rate calculator plugin for a class
+/// inheriting from RateCalculator with a constructor taking a constant
+/// reference to the configuration. Use once in the plugin source.
+#define KMCLIB_RATE_CALCULATOR_PLUGIN(CLASS)                                     \
+    extern "C" int kmclibRateCalculatorPluginVersion()                           \
+    { return KMCLIB_RATE_CALCULATOR_PLUGIN_VERSION; }                            \
+    extern "C" RateCalculator * kmclibCreateRateCalculator(const Configuration & configuration) \
+    { return new CLASS(configuration); }                                         \
+    extern "C" void kmclibDestroyRateCalculator(RateCalculator * rate_calculator) \
+    { delete rate_calculator; }
+
+
+/*! \brief Class for using a rate calculator implemented in C++ and compiled
+ *         into a separate shared library, loaded at runtime. The library
+ *         must define its factory functions with the
+ *         KMCLIB_RATE_CALCULATOR_PLUGIN macro, and be built against the
+ *         same version of the sources as the backend. All calls are
+ *         forwarded to the rate calculator created by the library.
+ */
+class RateCalculatorLibrary : public RateCalculator {
+
+public:
+
+    /*! \brief Constructor. Loads the library and creates its rate calculator.
+     *         Throws a std::runtime_error if the library can not be loaded or
+     *         does not define the plugin factory functions.
+     *  \param path          : The path to the shared library.
+     *  \param configuration : The configuration to create the rate calculator for.
+     */
+    RateCalculatorLibrary(const std::string & path,
+                          const Configuration & configuration);
+
+    /*! \brief Destructor. Destroys the rate calculator and closes the library.
+     */
+    virtual ~RateCalculatorLibrary();
+
+    /*! \brief Query for the path of the loaded library.
+     *  \return : The path.
+     */
+    const std::string & path() const { return path_; }
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual
+    double backendRateCallback(const std::vector<double> & geometry,
+                               const int len,
+                               const std::vector<std::string> & types_before,
+                               const std::vector<std::string> & types_after,
+                               const double rate_constant,
+                               const int process_number,
+                               const double global_x,
+                               const double global_y,
+                               const double global_z) const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual
+    double backendRateCallbackTypeNumbers(const std::vector<double> & geometry,
+                                          const int len,
+                                          const std::vector<int> & types_before,
+                                          const std::vector<int> & types_after,
+                                          const std::vector<std::string> & type_names,
+                                          const double rate_constant,
+                                          const int process_number,
+                                          const double global_x,
+                                          const double global_y,
+                                          const double global_z) const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual
+    double backendRateCallbackBucketCounts(const std::vector<double> & geometry,
+                                           const int len,
+                                           const std::vector<int> & counts_before,
+                                           const std::vector<int> & counts_after,
+                                           const std::vector<std::string> & type_names,
+                                           const double rate_constant,
+                                           const int process_number,
+                                           const double global_x,
+                                           const double global_y,
+                                           const double global_z) const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual
+    double backendRateCallbackBuckets(const std::vector<double> & geometry,
+                                      const int len,
+                                      const std::vector<TypeBucket> & occupation,
+                                      const std::vector<TypeBucket> & update,
+                                      const std::vector<std::string> & type_map,
+                                      const double rate_constant,
+                                      const int process_number,
+                                      const double global_x,
+                                      const double global_y,
+                                      const double global_z) const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual
+    std::vector<double> backendRateCallbackBatch(const std::vector<double> & geometries,
+                                                 const int max_len,
+                                                 const std::vector<int> & lengths,
+                                                 const std::vector<int> & types_before,
+                                                 const std::vector<int> & types_after,
+                                                 const std::vector<std::string> & type_names,
+                                                 const std::vector<double> & rate_constants,
+                                                 const std::vector<int> & process_numbers,
+                                                 const std::vector<double> & global_coordinates) const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual bool typeNumbers() const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual bool threadSafe() const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual int cacheSize() const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual double cutoff() const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual bool cacheRates() const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual std::vector<int> excludeFromCaching() const override;
+
+    /*! \brief Forwarded to the rate calculator of the library.
+     */
+    virtual bool batchRates() const override;
+
+protected:
+
+private:
+
+    /*! \brief Look up a symbol in the library. Throws a std::runtime_error
+     *         if the symbol is not found.
+     */
+    void * symbol(const std::string & name) const;
+
+    /*! \brief Not copyable, the library handle and calculator are owned.
+     */
+    RateCalculatorLibrary(const RateCalculatorLibrary &);
+
+    /*! \brief Not assignable, the library handle and calculator are owned.
+     */
+    RateCalculatorLibrary & operator=(const RateCalculatorLibrary &);
+
+    /// The path to the library.
+    std::string path_;
+
+    /// The handle of the loaded library.
+    void * handle_;
+
+    /// The rate calculator created by the library.
+    RateCalculator * rate_calculator_;
+
+    /// The function destroying the rate calculator.
+    void (*destroy_)(RateCalculator *);
+
+};
+
+
+#endif // __RATECALCULATORLIBRARY__
+
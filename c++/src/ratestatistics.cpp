@@ -0,0 +1,39 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  ratestatistics.cpp
+ *  \brief File for the implementation code of the RateStatistics class.
+ */
+
+#include "ratestatistics.h"
+
+
+// -----------------------------------------------------------------------------
+//
+RateStatistics::RateStatistics(const size_t processes) :
+    lookups_(processes, 0),
+    hits_(processes, 0),
+    inserts_(processes, 0),
+    callbacks_(processes, 0),
+    callback_times_(processes, 0.0)
+{
+    // NOTHING HERE
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void RateStatistics::reset()
+{
+    lookups_.assign(lookups_.size(), 0);
+    hits_.assign(hits_.size(), 0);
+    inserts_.assign(inserts_.size(), 0);
+    callbacks_.assign(callbacks_.size(), 0);
+    callback_times_.assign(callback_times_.size(), 0.0);
+}
+
@@ -0,0 +1,107 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  ratestatistics.h
+ *  \brief File for the RateStatistics class definition.
+ */
+
+#ifndef __RATESTATISTICS__
+#define __RATESTATISTICS__
+
+#include <vector>
+#include <cstddef>
+
+
+/*! \brief Class for counting the rate table lookups and the rate calculator
+ *         callbacks of each process, and the time spent in the callbacks.
+ */
+class RateStatistics {
+
+public:
+
+    /*! \brief Constructor.
+     *  \param processes : The number of processes.
+     */
+    RateStatistics(const size_t processes);
+
+    /*! \brief Count a rate table lookup.
+     *  \param process : The process number.
+     *  \param hit     : True if a stored rate was found.
+     */
+    void addLookup(const int process, const bool hit)
+    { ++lookups_[process]; if (hit) { ++hits_[process]; } }
+
+    /*! \brief Count a calculated rate stored in the rate table.
+     *  \param process : The process number.
+     */
+    void addInsert(const int process) { ++inserts_[process]; }
+
+    /*! \brief Count a rate calculated with the rate calculator.
+     *  \param process : The process number.
+     *  \param time    : The time spent calculating the rate in seconds.
+     */
+    void addCallback(const int process, const double time)
+    { ++callbacks_[process]; callback_times_[process] += time; }
+
+    /*! \brief Set all counters and times to zero.
+     */
+    void reset();
+
+    /*! \brief Query for the number of rate table lookups per process.
+     *  \return : The number of lookups.
+     */
+    const std::vector<long> & lookups() const { return lookups_; }
+
+    /*! \brief Query for the number of rate table lookups that found a stored
+     *         rate per process.
+     *  \return : The number of hits.
+     */
+    const std::vector<long> & hits() const { return hits_; }
+
+    /*! \brief Query for the number of calculated rates stored in the rate
+     *         table per process. Rates stored for keys already in the
+     *         table are also counted.
+     *  \return : The number of inserts.
+     */
+    const std::vector<long> & inserts() const { return inserts_; }
+
+    /*! \brief Query for the number of rate calculator callbacks per process.
+     *  \return : The number of callbacks.
+     */
+    const std::vector<long> & callbacks() const { return callbacks_; }
+
+    /*! \brief Query for the total time spent in the rate calculator callbacks
+     *         per process.
+     *  \return : The callback times in seconds.
+     */
+    const std::vector<double> & callbackTimes() const { return callback_times_; }
+
+protected:
+
+private:
+
+    /// The number of lookups per process.
+    std::vector<long> lookups_;
+
+    /// The number of hits per process.
+    std::vector<long> hits_;
+
+    /// The number of inserts per process.
+    std::vector<long> inserts_;
+
+    /// The number of callbacks per process.
+    std::vector<long> callbacks_;
+
+    /// The callback time per process.
+    std::vector<double> callback_times_;
+
+};
+
+
+#endif // __RATESTATISTICS__
+
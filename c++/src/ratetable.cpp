@@ -11,16 +11,31 @@
  */
 
 #include "ratetable.h"
+
+#include <fstream>
 #include <stdexcept>
+#include <cstdint>
+#include <cstring>
+
+
+// The first bytes of a rate table file, including the format version.
+static const char file_magic__[8] = {'K', 'M', 'C', 'R', 'A', 'T', 'E', '1'};
 
 
 // -----------------------------------------------------------------------------
 //
-RateTable::RateTable() :
-    n_tables_(8),
-    max_size_(1024),
-    current_table_(0),
-    tables_(std::vector< std::unordered_map<ratekey, double> >(n_tables_))
+RateTable::RateTable(const size_t capacity) :
+    capacity_(capacity),
+    shift_(64),
+    hand_(0),
+    slots_(0),
+    keys_(0),
+    values_(0),
+    referenced_(0),
+    n_lookups_(0),
+    n_hits_(0),
+    n_inserts_(0),
+    n_evictions_(0)
 {
     // NOTHING HERE
 }
@@ -28,52 +43,314 @@ RateTable::RateTable() :
 
 // -----------------------------------------------------------------------------
 //
-int RateTable::stored(const ratekey key)
+bool RateTable::lookup(const ratekey key, double & value)
 {
-    // Check all tables and see if we find the key.
-    for (size_t i = 0; i < tables_.size(); ++i)
+    ++n_lookups_;
+
+    if (keys_.empty())
+    {
+        return false;
+    }
+
+    const int entry = slots_[findSlot(key)];
+    if (entry == -1)
+    {
+        return false;
+    }
+
+    ++n_hits_;
+    referenced_[entry] = 1;
+    value = values_[entry];
+    return true;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void RateTable::store(const ratekey key, const double value)
+{
+    if (capacity_ == 0)
+    {
+        return;
+    }
+
+    // Allocate the table on first use, keeping it at most half full for
+    // short probe sequences.
+    if (slots_.empty())
+    {
+        size_t n_slots = 2;
+        shift_ = 63;
+        while (n_slots < 2 * capacity_)
+        {
+            n_slots *= 2;
+            --shift_;
+        }
+        slots_.assign(n_slots, -1);
+        keys_.reserve(capacity_);
+        values_.reserve(capacity_);
+        referenced_.reserve(capacity_);
+    }
+
+    size_t i = findSlot(key);
+
+    // Overwrite the value of a stored key.
+    if (slots_[i] != -1)
+    {
+        values_[slots_[i]] = value;
+        return;
+    }
+
+    ++n_inserts_;
+    int entry;
+
+    if (keys_.size() < capacity_)
+    {
+        // Take a new entry.
+        entry = static_cast<int>(keys_.size());
+        keys_.push_back(key);
+        values_.push_back(value);
+        referenced_.push_back(0);
+    }
+    else
     {
-        if (tables_[i].find(key) != tables_[i].end())
+        // Move the clock hand to the first entry not referenced since it
+        // was last passed, and replace that entry.
+        while (referenced_[hand_] != 0)
         {
-            return i;
+            referenced_[hand_] = 0;
+            hand_ = (hand_ + 1) % capacity_;
         }
+        entry = static_cast<int>(hand_);
+        hand_ = (hand_ + 1) % capacity_;
+        ++n_evictions_;
+
+        eraseSlot(findSlot(keys_[entry]));
+        keys_[entry]       = key;
+        values_[entry]     = value;
+        referenced_[entry] = 0;
+
+        // The erase may have moved entries into the probe sequence of the key.
+        i = findSlot(key);
     }
-    return -1;
+
+    slots_[i] = entry;
 }
 
 
 // -----------------------------------------------------------------------------
 //
-void RateTable::store(const ratekey key, const double value)
+void RateTable::setCapacity(const size_t capacity)
+{
+    capacity_ = capacity;
+
+    // Release the memory, it is allocated again with the new size on the
+    // first store.
+    std::vector<int>().swap(slots_);
+    std::vector<ratekey>().swap(keys_);
+    std::vector<double>().swap(values_);
+    std::vector<unsigned char>().swap(referenced_);
+    shift_ = 64;
+    hand_  = 0;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void RateTable::clear()
+{
+    slots_.assign(slots_.size(), -1);
+    keys_.clear();
+    values_.clear();
+    referenced_.clear();
+    hand_ = 0;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void RateTable::storeAll(const RateTable & other)
+{
+    for (size_t i = 0; i < other.keys_.size(); ++i)
+    {
+        store(other.keys_[i], other.values_[i]);
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void RateTable::save(const std::string & filename,
+                     const std::string & fingerprint) const
+{
+    std::ofstream file(filename.c_str(), std::ios::binary | std::ios::trunc);
+    if (!file)
+    {
+        throw std::runtime_error("Could not open the rate table file " + filename + " for writing.");
+    }
+
+    // The header.
+    const uint64_t fingerprint_size = fingerprint.size();
+    const uint64_t n_entries        = keys_.size();
+    file.write(file_magic__, sizeof(file_magic__));
+    file.write(reinterpret_cast<const char*>(&fingerprint_size), sizeof(fingerprint_size));
+    file.write(fingerprint.data(), fingerprint_size);
+    file.write(reinterpret_cast<const char*>(&n_entries), sizeof(n_entries));
+
+    // The key value pairs.
+    for (size_t i = 0; i < keys_.size(); ++i)
+    {
+        const uint64_t key = keys_[i];
+        file.write(reinterpret_cast<const char*>(&key), sizeof(key));
+        file.write(reinterpret_cast<const char*>(&values_[i]), sizeof(values_[i]));
+    }
+
+    if (!file)
+    {
+        throw std::runtime_error("Could not write the rate table file " + filename + ".");
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+bool RateTable::load(const std::string & filename,
+                     const std::string & fingerprint)
 {
-    // PERFORMME:
-    // This is slow but necessary to prevent errors.
-    // if (stored(key) != -1)
-    // {
-    //     throw std::runtime_error("Key clash error in RateTable.");
-    // }
+    std::ifstream file(filename.c_str(), std::ios::binary);
+    if (!file)
+    {
+        return false;
+    }
+
+    // Check the header.
+    char magic[sizeof(file_magic__)];
+    file.read(magic, sizeof(magic));
+    if (!file || std::memcmp(magic, file_magic__, sizeof(magic)) != 0)
+    {
+        return false;
+    }
+
+    uint64_t fingerprint_size = 0;
+    file.read(reinterpret_cast<char*>(&fingerprint_size), sizeof(fingerprint_size));
+    if (!file || fingerprint_size != fingerprint.size())
+    {
+        return false;
+    }
+
+    std::string file_fingerprint(fingerprint_size, ' ');
+    file.read(&file_fingerprint[0], fingerprint_size);
+    if (!file || file_fingerprint != fingerprint)
+    {
+        return false;
+    }
+
+    uint64_t n_entries = 0;
+    file.read(reinterpret_cast<char*>(&n_entries), sizeof(n_entries));
+    if (!file)
+    {
+        return false;
+    }
+
+    // The rest of the file must hold exactly the given number of pairs,
+    // checked before sizing anything from the header.
+    const std::streampos position = file.tellg();
+    file.seekg(0, std::ios::end);
+    const std::streampos end = file.tellg();
+    file.seekg(position);
+    if (!file || end < position)
+    {
+        return false;
+    }
+
+    const uint64_t remaining  = static_cast<uint64_t>(end - position);
+    const uint64_t entry_size = sizeof(uint64_t) + sizeof(double);
+    if (remaining % entry_size != 0 || remaining / entry_size != n_entries)
+    {
+        return false;
+    }
+
+    // Read all pairs before changing the table.
+    std::vector<ratekey> keys(n_entries);
+    std::vector<double> values(n_entries);
+    for (size_t i = 0; i < n_entries; ++i)
+    {
+        uint64_t key = 0;
+        file.read(reinterpret_cast<char*>(&key), sizeof(key));
+        file.read(reinterpret_cast<char*>(&values[i]), sizeof(values[i]));
+        keys[i] = key;
+    }
 
-    // Add the value to the current table.
-    tables_[current_table_][key] = value;
+    if (!file)
+    {
+        return false;
+    }
 
-    // Check if it is time to switch table.
-    if (tables_[current_table_].size() == max_size_)
+    setCapacity(n_entries);
+    for (size_t i = 0; i < n_entries; ++i)
     {
-        // Take the next current table.
-        current_table_ = (current_table_ + 1) % n_tables_;
+        store(keys[i], values[i]);
+    }
+
+    return true;
+}
+
 
-        // Clear its content.
-        tables_[current_table_].clear();
+// -----------------------------------------------------------------------------
+//
+void RateTable::resetStatistics()
+{
+    n_lookups_   = 0;
+    n_hits_      = 0;
+    n_inserts_   = 0;
+    n_evictions_ = 0;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+size_t RateTable::findSlot(const ratekey key) const
+{
+    const size_t mask = slots_.size() - 1;
+    size_t i = slot(key);
+
+    while (slots_[i] != -1 && keys_[slots_[i]] != key)
+    {
+        i = (i + 1) & mask;
     }
+
+    return i;
 }
 
 
 // -----------------------------------------------------------------------------
 //
-double RateTable::retrieve(const ratekey key)
+void RateTable::eraseSlot(size_t i)
 {
-    // Find which table this key is stored in.
-    const int nt = stored(key);
-    return tables_.at(nt).at(key);
+    const size_t mask = slots_.size() - 1;
+
+    // Move later entries of the probe sequence back into the hole, so that
+    // no key is separated from its slot by an empty slot.
+    size_t j = i;
+    while (true)
+    {
+        j = (j + 1) & mask;
+
+        if (slots_[j] == -1)
+        {
+            break;
+        }
+
+        // The entry at j may move to i if its slot is not cyclically in (i, j].
+        const size_t k = slot(keys_[slots_[j]]);
+        const bool stays = (i <= j) ? (i < k && k <= j) : (i < k || k <= j);
+
+        if (!stays)
+        {
+            slots_[i] = slots_[j];
+            i = j;
+        }
+    }
+
+    slots_[i] = -1;
 }
 
@@ -8,65 +8,174 @@
 
 
 /*! \file  ratetable.h
- *  \brief File for the RateTaböe class definition.
+ *  \brief File for the RateTable class definition.
  */
 
 #ifndef __RATETABLE__
 #define __RATETABLE__
 
-#include <unordered_map>
 #include <vector>
-
-// NOTE: This implementation is based on the c++11 std::unordered_map.
+#include <string>
+#include <cstddef>
 
 
 // Define the ratekey type.
 typedef unsigned long ratekey;
 
 
-/*! \brief Class for storing and retrieving calculated rates.
+/*! \brief Class for storing and retrieving calculated rates. The rates are
+ *         kept in one open addressing hash table holding at most a given
+ *         number of entries. When the table is full the entry to replace is
+ *         chosen with the CLOCK algorithm, i.e. the next entry not looked up
+ *         since the clock hand last passed it.
  */
 class RateTable {
 
 public:
 
     /*! \brief Constructor.
+     *  \param capacity : The maximum number of stored rates.
      */
-    RateTable();
+    RateTable(const size_t capacity = 100000);
 
-    /*! \brief Check if a key has a stored value.
-     *  \param key : The key to check for.
-     *  \returns : -1 if not stored, otherwise the table number where it is stored.
+    /*! \brief Look up the value stored for a key.
+     *  \param key   : The key to look up.
+     *  \param value : On return the stored value if the key was found.
+     *  \returns : True if the key was found, false on a miss.
      */
-    int stored(const ratekey key);
+    bool lookup(const ratekey key, double & value);
 
-    /*! \brief Store a key value pair.
+    /*! \brief Store a key value pair, replacing an old entry if the
+     *         table is full.
      *  \param key   : The key to store for.
      *  \param value : The value to store.
      */
     void store(const ratekey key, const double value);
 
-    /*! \brief Retrieve a stored value.
-     *  \param key   : The key.
-     *  \returns : The stored value.
+    /*! \brief Set the maximum number of stored rates. This removes all
+     *         stored rates. With a capacity of zero nothing is stored.
+     *  \param capacity : The new capacity.
+     */
+    void setCapacity(const size_t capacity);
+
+    /*! \brief Remove all stored rates.
+     */
+    void clear();
+
+    /*! \brief Store all key value pairs of another table in this table.
+     *  \param other : The table to take the key value pairs from.
+     */
+    void storeAll(const RateTable & other);
+
+    /*! \brief Write the stored key value pairs to a binary file in native
+     *         byte order, together with a fingerprint identifying the
+     *         setup the rates were calculated for.
+     *  \param filename    : The name of the file to write.
+     *  \param fingerprint : The fingerprint to write.
+     */
+    void save(const std::string & filename,
+              const std::string & fingerprint) const;
+
+    /*! \brief Replace the content of the table with the key value pairs in
+     *         a file written by save. The capacity is set to the number of
+     *         pairs in the file. Nothing is changed if the file can not be
+     *         read or was written with another fingerprint.
+     *  \param filename    : The name of the file to read.
+     *  \param fingerprint : The fingerprint the file must have been written with.
+     *  \returns : True if the file was loaded.
+     */
+    bool load(const std::string & filename,
+              const std::string & fingerprint);
+
+    /*! \brief Query for the maximum number of stored rates.
+     *  \returns : The capacity.
      */
-    double retrieve(const ratekey key);
+    size_t capacity() const { return capacity_; }
+
+    /*! \brief Query for the number of stored rates.
+     *  \returns : The number of stored rates.
+     */
+    size_t size() const { return keys_.size(); }
+
+    /*! \brief Query for the number of lookups.
+     *  \returns : The number of lookups since construction or the last reset.
+     */
+    long lookups() const { return n_lookups_; }
+
+    /*! \brief Query for the number of lookups that found a stored value.
+     *  \returns : The number of hits since construction or the last reset.
+     */
+    long hits() const { return n_hits_; }
+
+    /*! \brief Query for the number of lookups that did not find a stored value.
+     *  \returns : The number of misses since construction or the last reset.
+     */
+    long misses() const { return n_lookups_ - n_hits_; }
+
+    /*! \brief Query for the number of stored new keys.
+     *  \returns : The number of inserts since construction or the last reset.
+     */
+    long inserts() const { return n_inserts_; }
+
+    /*! \brief Query for the number of entries replaced to store a new key.
+     *  \returns : The number of evictions since construction or the last reset.
+     */
+    long evictions() const { return n_evictions_; }
+
+    /*! \brief Set the lookup, hit, insert and eviction counters to zero.
+     */
+    void resetStatistics();
 
 protected:
 
 private:
 
-    /// The number of tables.
-    int n_tables_;
+    /*! \brief Get the first slot to probe for a key.
+     */
+    size_t slot(const ratekey key) const
+    { return static_cast<size_t>((static_cast<unsigned long long>(key) * 0x9E3779B97F4A7C15ull) >> shift_); }
+
+    /*! \brief Get the slot holding the entry of a key, or the empty slot
+     *         where it should go.
+     */
+    size_t findSlot(const ratekey key) const;
+
+    /*! \brief Empty a slot and move later entries of its probe sequence back.
+     */
+    void eraseSlot(size_t i);
+
+    /// The maximum number of entries.
+    size_t capacity_;
+
+    /// The shift giving the first slot to probe from the key hash.
+    int shift_;
+
+    /// The position of the clock hand among the entries.
+    size_t hand_;
+
+    /// The entry stored in each slot of the hash table, -1 for empty slots.
+    std::vector<int> slots_;
+
+    /// The key of each entry.
+    std::vector<ratekey> keys_;
+
+    /// The value of each entry.
+    std::vector<double> values_;
+
+    /// The reference flag of each entry, set on lookup and cleared by the clock hand.
+    std::vector<unsigned char> referenced_;
+
+    /// The number of lookups.
+    long n_lookups_;
 
-    /// The maximum size of each table.
-    unsigned int max_size_;
+    /// The number of lookups that found a stored value.
+    long n_hits_;
 
-    /// The current working table to fill.
-    int current_table_;
+    /// The number of stored new keys.
+    long n_inserts_;
 
-    /// The maps to store key-value pairs in.
-    std::vector< std::unordered_map<ratekey, double> > tables_;
+    /// The number of replaced entries.
+    long n_evictions_;
 
 };
 
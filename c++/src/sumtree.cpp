@@ -0,0 +1,128 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  sumtree.cpp
+ *  \brief File for the implementation code of the SumTree class.
+ */
+
+#include "sumtree.h"
+
+
+// -----------------------------------------------------------------------------
+//
+SumTree::SumTree(const size_t size) :
+    size_(0),
+    capacity_(1),
+    tree_(2, 0.0)
+{
+    resize(size);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void SumTree::resize(const size_t size)
+{
+    if (size > capacity_)
+    {
+        // Find the new capacity as the next power of two.
+        size_t capacity = capacity_;
+        while (capacity < size)
+        {
+            capacity *= 2;
+        }
+
+        // Move the weights over to the new storage.
+        std::vector<double> tree(2*capacity, 0.0);
+        for (size_t i = 0; i < size_; ++i)
+        {
+            tree[capacity + i] = tree_[capacity_ + i];
+        }
+
+        tree_.swap(tree);
+        capacity_ = capacity;
+        size_ = size;
+        rebuild();
+    }
+    else
+    {
+        // Zero out any removed weights.
+        for (size_t i = size; i < size_; ++i)
+        {
+            set(i, 0.0);
+        }
+        size_ = size;
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void SumTree::clear()
+{
+    tree_.assign(tree_.size(), 0.0);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void SumTree::set(const size_t index, const double value)
+{
+    // Set the leaf and walk up to the root, recalculating each partial
+    // sum from its two children to avoid accumulating round-off errors.
+    size_t node = capacity_ + index;
+    tree_[node] = value;
+    node /= 2;
+
+    while (node > 0)
+    {
+        tree_[node] = tree_[2*node] + tree_[2*node+1];
+        node /= 2;
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+size_t SumTree::pick(const double rnd) const
+{
+    double remaining = rnd;
+    size_t node = 1;
+
+    // Walk down from the root.
+    while (node < capacity_)
+    {
+        const size_t left = 2*node;
+
+        // Go left if the value is within the left sum, or if the right
+        // branch is empty, which may happen due to round-off in the value.
+        if (remaining < tree_[left] || !(tree_[left+1] > 0.0))
+        {
+            node = left;
+        }
+        else
+        {
+            remaining -= tree_[left];
+            node = left + 1;
+        }
+    }
+
+    return node - capacity_;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void SumTree::rebuild()
+{
+    for (size_t node = capacity_ - 1; node > 0; --node)
+    {
+        tree_[node] = tree_[2*node] + tree_[2*node+1];
+    }
+}
+
@@ -0,0 +1,94 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+
+/*! \file  sumtree.h
+ *  \brief File for the SumTree class definition.
+ */
+
+#ifndef __SUMTREE__
+#define __SUMTREE__
+
+#include <vector>
+#include <cstddef>
+
+
+/*! \brief Class for a binary sum tree over a list of non-negative weights,
+ *         supporting O(log N) updates of individual weights and
+ *         O(log N) weighted picking of an index.
+ */
+class SumTree {
+
+public:
+
+    /*! \brief Constructor for the sum tree. All weights are initialized to zero.
+     *  \param size : The number of weights in the tree.
+     */
+    SumTree(const size_t size=0);
+
+    /*! \brief Query for the number of weights in the tree.
+     *  \return : The number of weights.
+     */
+    size_t size() const { return size_; }
+
+    /*! \brief Change the number of weights in the tree. Any added weights
+     *         are set to zero.
+     *  \param size : The new number of weights.
+     */
+    void resize(const size_t size);
+
+    /*! \brief Set all weights to zero, keeping the size.
+     */
+    void clear();
+
+    /*! \brief Set the weight at a given index and update the partial sums.
+     *  \param index : The index to set the weight for.
+     *  \param value : The new weight.
+     */
+    void set(const size_t index, const double value);
+
+    /*! \brief Query for the weight at a given index.
+     *  \param index : The index to get the weight for.
+     *  \return : The weight at the index.
+     */
+    double value(const size_t index) const { return tree_[capacity_ + index]; }
+
+    /*! \brief Query for the sum of all weights.
+     *  \return : The total weight.
+     */
+    double total() const { return tree_[1]; }
+
+    /*! \brief Find the index for which the accumulated weight first
+     *         exceeds the given value.
+     *  \param rnd : A value on the interval [0.0, total()).
+     *  \return : The picked index.
+     */
+    size_t pick(const double rnd) const;
+
+protected:
+
+private:
+
+    /*! \brief Recalculate all partial sums from the weights.
+     */
+    void rebuild();
+
+    /// The number of weights in the tree.
+    size_t size_;
+
+    /// The number of leaves in the tree, always a power of two.
+    size_t capacity_;
+
+    /// The tree storage, with the root at 1 and the weights from capacity_.
+    std::vector<double> tree_;
+
+};
+
+
+#endif // __SUMTREE__
+
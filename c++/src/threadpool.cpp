@@ -0,0 +1,197 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  threadpool.cpp
+ *  \brief File for the implementation code of the ThreadPool class.
+ */
+
+#include "threadpool.h"
+
+
+// Flag marking threads that are running a chunk, to run nested runs serially.
+static thread_local bool in_run__ = false;
+
+
+// -----------------------------------------------------------------------------
+//
+ThreadPool::ThreadPool(const size_t n_workers) :
+    bounds_(NULL),
+    function_(NULL),
+    generation_(0),
+    n_pending_(0),
+    stop_(false)
+{
+    resize(n_workers);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+ThreadPool::~ThreadPool()
+{
+    resize(0);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void ThreadPool::resize(const size_t n_workers)
+{
+    std::lock_guard<std::mutex> run_lock(run_mutex_);
+    restart(n_workers);
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void ThreadPool::restart(const size_t n_workers)
+{
+    // Stop and join the present workers.
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        stop_ = true;
+    }
+    start_.notify_all();
+
+    for (size_t i = 0; i < workers_.size(); ++i)
+    {
+        workers_[i].join();
+    }
+    workers_.clear();
+    stop_ = false;
+
+    // Start the new workers.
+    workers_.reserve(n_workers);
+    for (size_t i = 0; i < n_workers; ++i)
+    {
+        workers_.push_back(std::thread(&ThreadPool::work, this, i));
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void ThreadPool::run(const std::vector<size_t> & bounds,
+                     const std::function<void(size_t, size_t)> & function)
+{
+    const size_t n_chunks = bounds.size() - 1;
+
+    // Nested runs and single chunks run on the calling thread.
+    if (in_run__ || n_chunks < 2)
+    {
+        for (size_t i = 0; i < n_chunks; ++i)
+        {
+            function(bounds[i], bounds[i+1]);
+        }
+        return;
+    }
+
+    std::lock_guard<std::mutex> run_lock(run_mutex_);
+
+    if (workers_.size() < n_chunks - 1)
+    {
+        restart(n_chunks - 1);
+    }
+
+    // Hand out the chunks to the workers.
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        bounds_   = &bounds;
+        function_ = &function;
+        errors_.assign(n_chunks, std::exception_ptr());
+        n_pending_ = n_chunks - 1;
+        ++generation_;
+    }
+    start_.notify_all();
+
+    // Run the first chunk here.
+    std::exception_ptr error;
+    in_run__ = true;
+    try
+    {
+        function(bounds[0], bounds[1]);
+    }
+    catch (...)
+    {
+        error = std::current_exception();
+    }
+    in_run__ = false;
+
+    // Wait for the workers.
+    std::unique_lock<std::mutex> lock(mutex_);
+    done_.wait(lock, [this]{ return n_pending_ == 0; });
+    errors_[0] = error;
+
+    bounds_   = NULL;
+    function_ = NULL;
+
+    // Rethrow the exception of the first failing chunk.
+    for (size_t i = 0; i < errors_.size(); ++i)
+    {
+        if (errors_[i])
+        {
+            error = errors_[i];
+            errors_.clear();
+            std::rethrow_exception(error);
+        }
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void ThreadPool::work(const size_t worker)
+{
+    in_run__ = true;
+
+    // Worker i runs chunk i+1 of each run it takes part in.
+    const size_t chunk = worker + 1;
+    size_t generation = 0;
+
+    std::unique_lock<std::mutex> lock(mutex_);
+    while (true)
+    {
+        start_.wait(lock, [this, generation]{ return stop_ || generation_ != generation; });
+
+        if (stop_)
+        {
+            return;
+        }
+
+        generation = generation_;
+
+        if (bounds_ == NULL || chunk + 1 >= bounds_->size())
+        {
+            continue;
+        }
+
+        const std::vector<size_t> & bounds = *bounds_;
+        const std::function<void(size_t, size_t)> & function = *function_;
+
+        lock.unlock();
+
+        std::exception_ptr error;
+        try
+        {
+            function(bounds[chunk], bounds[chunk+1]);
+        }
+        catch (...)
+        {
+            error = std::current_exception();
+        }
+
+        lock.lock();
+        errors_[chunk] = error;
+        --n_pending_;
+        if (n_pending_ == 0)
+        {
+            done_.notify_one();
+        }
+    }
+}
+
@@ -0,0 +1,118 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+
+/*! \file  threadpool.h
+ *  \brief File for the ThreadPool class definition.
+ */
+
+#ifndef __THREADPOOL__
+#define __THREADPOOL__
+
+#include <vector>
+#include <cstddef>
+#include <thread>
+#include <mutex>
+#include <condition_variable>
+#include <exception>
+#include <functional>
+
+
+/*! \brief Class for a persistent set of worker threads running contiguous
+ *         chunks of a loop. The workers are kept alive between runs so that
+ *         thread local data survives from one run to the next.
+ */
+class ThreadPool {
+
+public:
+
+    /*! \brief Constructor for the thread pool.
+     *  \param n_workers : The number of worker threads to start.
+     */
+    ThreadPool(const size_t n_workers=0);
+
+    /*! \brief Destructor, stopping and joining all workers.
+     */
+    ~ThreadPool();
+
+    /*! \brief Query for the number of worker threads.
+     *  \return : The number of workers.
+     */
+    size_t size() const { return workers_.size(); }
+
+    /*! \brief Stop the present workers and start a new set of workers.
+     *         Must not be called during a run.
+     *  \param n_workers : The number of worker threads to start.
+     */
+    void resize(const size_t n_workers);
+
+    /*! \brief Run the chunks of a loop with the first chunk on the calling
+     *         thread and the others on the workers, starting more workers if
+     *         needed. Returns when all chunks are done. If any chunk throws,
+     *         the exception of the first such chunk is rethrown here. Runs
+     *         all chunks on the calling thread if called from within a run.
+     *  \param bounds   : The chunk boundaries, chunk i covering the work
+     *                    items from bounds[i] to bounds[i+1].
+     *  \param function : Function called as function(begin, end) for each chunk.
+     */
+    void run(const std::vector<size_t> & bounds,
+             const std::function<void(size_t, size_t)> & function);
+
+protected:
+
+private:
+
+    /*! \brief Stop the present workers and start a new set of workers,
+     *         without locking the run mutex.
+     *  \param n_workers : The number of worker threads to start.
+     */
+    void restart(const size_t n_workers);
+
+    /*! \brief The loop of a worker thread, waiting for and running its chunk
+     *         of each run until the pool is stopped.
+     *  \param worker : The index of the worker.
+     */
+    void work(const size_t worker);
+
+    /// The worker threads.
+    std::vector<std::thread> workers_;
+
+    /// Mutex serializing the runs and resizing of the pool.
+    std::mutex run_mutex_;
+
+    /// Mutex protecting the data shared with the workers.
+    std::mutex mutex_;
+
+    /// Condition signalling the workers to start a run or stop.
+    std::condition_variable start_;
+
+    /// Condition signalling the calling thread that the workers are done.
+    std::condition_variable done_;
+
+    /// The chunk boundaries of the present run.
+    const std::vector<size_t> * bounds_;
+
+    /// The function of the present run.
+    const std::function<void(size_t, size_t)> * function_;
+
+    /// The exception thrown by each chunk of the present run, if any.
+    std::vector<std::exception_ptr> errors_;
+
+    /// Counter identifying the present run.
+    size_t generation_;
+
+    /// The number of chunks of the present run still running on the workers.
+    size_t n_pending_;
+
+    /// Flag telling the workers to stop.
+    bool stop_;
+
+};
+
+#endif // __THREADPOOL__
+
@@ -0,0 +1,76 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  threads.cpp
+ *  \brief File for the implementation code of the thread parallelism
+ *         interface.
+ */
+
+#include "threads.h"
+#include "threadpool.h"
+
+#include <algorithm>
+
+
+// -----------------------------------------------------------------------------
+// The thread settings.
+
+static int n_threads__ = 1;
+static int thread_threshold__ = 1000;
+
+
+// -----------------------------------------------------------------------------
+// The worker threads, kept alive between the parallel loops.
+
+static ThreadPool & threadPool()
+{
+    static ThreadPool thread_pool;
+    return thread_pool;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+void setNumberOfThreads(const int n_threads, const int threshold)
+{
+    n_threads__        = std::max(1, n_threads);
+    thread_threshold__ = std::max(0, threshold);
+
+    // Keep one worker per thread besides the calling thread.
+    const size_t n_workers = static_cast<size_t>(n_threads__ - 1);
+    if (threadPool().size() != n_workers)
+    {
+        threadPool().resize(n_workers);
+    }
+}
+
+
+// -----------------------------------------------------------------------------
+//
+int numberOfThreads()
+{
+    return n_threads__;
+}
+
+
+// -----------------------------------------------------------------------------
+//
+int threadThreshold()
+{
+    return thread_threshold__;
+}
+
+
+
+// -----------------------------------------------------------------------------
+//
+void runChunks(const std::vector<size_t> & bounds,
+               const std::function<void(size_t, size_t)> & function)
+{
+    threadPool().run(bounds, function);
+}
@@ -0,0 +1,107 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+/*! \file  threads.h
+ *  \brief File for the shared memory thread parallelism interface.
+ */
+
+#ifndef __THREADS__
+#define __THREADS__
+
+#include <vector>
+#include <cstddef>
+
+
+/*! \brief Set the number of threads to use for the matching and rate
+ *         calculations, and the number of work items below which they run
+ *         serially. The default is one thread, i.e. serial execution.
+ *  \param n_threads : The number of threads to use, values below one are
+ *                     taken as one.
+ *  \param threshold : The smallest number of work items to split over threads.
+ */
+void setNumberOfThreads(const int n_threads, const int threshold);
+
+
+/*! \brief Query for the number of threads.
+ *  \return : The number of threads to use.
+ */
+int numberOfThreads();
+
+
+/*! \brief Query for the thread threshold.
+ *  \return : The smallest number of work items to split over threads.
+ */
+int threadThreshold();
+
+
+#ifndef SWIG
+
+#include <algorithm>
+#include <functional>
+
+/*! \brief Run the chunks of a loop with the first chunk on the calling
+ *         thread and the others on a persistent pool of worker threads.
+ *         Exceptions thrown by any chunk are rethrown on the calling thread
+ *         once all chunks are done.
+ *  \param bounds   : The chunk boundaries, chunk i covering the work items
+ *                    from bounds[i] to bounds[i+1].
+ *  \param function : Function called as function(begin, end) for each chunk.
+ */
+void runChunks(const std::vector<size_t> & bounds,
+               const std::function<void(size_t, size_t)> & function);
+
+
+/*! \brief Split a loop over contiguous chunks of work items on the
+ *         threads set with setNumberOfThreads, with the first chunk on
+ *         the calling thread. Runs serially if there is only one thread or
+ *         fewer work items than the thread threshold. The worker threads
+ *         are kept between calls, and an exception thrown by any chunk is
+ *         rethrown on the calling thread when all chunks are done.
+ *  \param n_items  : The number of work items.
+ *  \param function : Function called as function(begin, end) for each chunk.
+ *                    Calls for different chunks must be safe to run at the
+ *                    same time.
+ */
+template <class F>
+void parallelFor(const size_t n_items, F function);
+
+
+// -------------------------------------------------------------------------- //
+// -------------------------------------------------------------------------- //
+//
+// TEMPLATE IMPLEMENTATION CODE FOLLOW
+//
+// -------------------------------------------------------------------------- //
+//
+template <class F>
+void parallelFor(const size_t n_items, F function)
+{
+    const size_t n_threads = std::min(static_cast<size_t>(numberOfThreads()), n_items);
+
+    if (n_threads < 2 || n_items < static_cast<size_t>(threadThreshold()))
+    {
+        function(0, n_items);
+        return;
+    }
+
+    // The chunk boundaries, with the remainder spread over the first chunks.
+    const size_t chunk     = n_items / n_threads;
+    const size_t remainder = n_items % n_threads;
+    std::vector<size_t> bounds(n_threads + 1, 0);
+    for (size_t t = 0; t < n_threads; ++t)
+    {
+        bounds[t+1] = bounds[t] + chunk + ((t < remainder) ? 1 : 0);
+    }
+
+    runChunks(bounds, std::function<void(size_t, size_t)>(function));
+}
+
+#endif // SWIG
+
+#endif // __THREADS__
+
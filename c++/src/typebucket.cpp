@@ -19,31 +19,41 @@
 //
 TypeBucket::TypeBucket() :
     size_(0),
-    raw_data_(NULL)
+    raw_data_(inline_data_)
 {
-    // NOTHING HERE
+    memset(inline_data_, 0U, sizeof(inline_data_));
 }
 
 
 // -----------------------------------------------------------------------------
 //
 TypeBucket::TypeBucket(const int size) :
-    size_(size)
+    size_(size),
+    raw_data_(inline_data_)
 {
-    raw_data_ = (int*)malloc(sizeof(int)*size_);
-
-    memset(raw_data_, 0U, sizeof(int)*size_);
+    memset(inline_data_, 0U, sizeof(inline_data_));
 
+    if (size_ > KMCLIB_TYPE_BUCKET_INLINE_SIZE)
+    {
+        raw_data_ = (int*)malloc(sizeof(int)*size_);
+        memset(raw_data_, 0U, sizeof(int)*size_);
+    }
 }
 
 
 // -----------------------------------------------------------------------------
 //
 TypeBucket::TypeBucket(const TypeBucket & other) :
-    size_(other.size_)
+    size_(other.size_),
+    raw_data_(inline_data_)
 {
-    raw_data_ = (int*)malloc(sizeof(int)*size_);
-    memcpy(raw_data_, other.raw_data_, sizeof(int)*size_);
+    memcpy(inline_data_, other.inline_data_, sizeof(inline_data_));
+
+    if (size_ > KMCLIB_TYPE_BUCKET_INLINE_SIZE)
+    {
+        raw_data_ = (int*)malloc(sizeof(int)*size_);
+        memcpy(raw_data_, other.raw_data_, sizeof(int)*size_);
+    }
 }
 
 
@@ -51,16 +61,46 @@ TypeBucket::TypeBucket(const TypeBucket & other) :
 //
 void TypeBucket::operator=(const TypeBucket & other)
 {
-    size_ = other.size_;
-    raw_data_ = (int*)realloc(raw_data_, sizeof(int)*size_);
-    memcpy(raw_data_, other.raw_data_, sizeof(int)*size_);
+    if (this == &other)
+    {
+        return;
+    }
+
+    if (other.size_ <= KMCLIB_TYPE_BUCKET_INLINE_SIZE)
+    {
+        // Copy all inline slots to keep the unused ones at zero.
+        if (!isInline())
+        {
+            free(raw_data_);
+            raw_data_ = inline_data_;
+        }
+        size_ = other.size_;
+        memcpy(inline_data_, other.inline_data_, sizeof(inline_data_));
+    }
+    else
+    {
+        // Only reallocate if the size changes.
+        if (isInline())
+        {
+            raw_data_ = (int*)malloc(sizeof(int)*other.size_);
+        }
+        else if (size_ != other.size_)
+        {
+            raw_data_ = (int*)realloc(raw_data_, sizeof(int)*other.size_);
+        }
+        size_ = other.size_;
+        memcpy(raw_data_, other.raw_data_, sizeof(int)*size_);
+    }
 }
 
 // -----------------------------------------------------------------------------
 //
 TypeBucket::~TypeBucket()
 {
-    free(raw_data_);
+    if (!isInline())
+    {
+        free(raw_data_);
+    }
 }
 
 
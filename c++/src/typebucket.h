@@ -18,10 +18,20 @@
 #include <stdexcept>
 #include <cstring>
 
+/// The number of slots a type bucket stores inline. Buckets with more slots
+/// store them on the heap. All code using the buckets must be compiled with
+/// the same value.
+#ifndef KMCLIB_TYPE_BUCKET_INLINE_SIZE
+#define KMCLIB_TYPE_BUCKET_INLINE_SIZE 8
+#endif
+
 // Forward declarations if any.
 
 
-/*! \brief Class for defining the type bucket data structure.
+/*! \brief Class for defining the type bucket data structure. Buckets with
+ *         up to KMCLIB_TYPE_BUCKET_INLINE_SIZE slots keep their counts inline,
+ *         with the unused inline slots kept at zero, such that comparisons of
+ *         inline buckets run over a fixed number of slots.
  */
 class TypeBucket {
 
@@ -48,6 +58,11 @@ public:
     // ML
     void operator=(const TypeBucket & other);
 
+    /*! \brief Query for the inline storage flag.
+     *  \return : True if the counts are stored inline and not on the heap.
+     */
+    bool isInline() const { return raw_data_ == inline_data_; }
+
     /*! \brief Get the number of slots in the bucket.
      *  \return : The size of the data vector.
      */
@@ -117,6 +132,13 @@ public:
     inline
     TypeBucket add(const TypeBucket & other) const;
 
+    /*! \brief Get the first type present in the bucket, which is the first
+     *         of the element names of a site holding the bucket.
+     *  \return : The lowest type with a non-zero count, or -1 if the bucket is empty.
+     */
+    inline
+    int firstPresentType() const;
+
 protected:
 
 private:
@@ -127,9 +149,12 @@ private:
     /// The bucket data field.
     //std::vector<int> data_;
 
-    /// The bucket raw data field.
+    /// The bucket raw data field, pointing to the inline data or the heap.
     int * raw_data_;
 
+    /// The inline data field.
+    int inline_data_[KMCLIB_TYPE_BUCKET_INLINE_SIZE];
+
 };
 
 
@@ -147,16 +172,19 @@ bool TypeBucket::identical(const TypeBucket & other) const
         return false;
     }
 
-    for (int i = 0; i < size_; ++i)
+    // Inline buckets are compared over all inline slots without branching,
+    // which the compiler turns into a few vector instructions.
+    if (size_ <= KMCLIB_TYPE_BUCKET_INLINE_SIZE)
     {
-        if (raw_data_[i] != other.raw_data_[i])
+        int diff = 0;
+        for (int i = 0; i < KMCLIB_TYPE_BUCKET_INLINE_SIZE; ++i)
         {
-            return false;
+            diff |= inline_data_[i] ^ other.inline_data_[i];
         }
+        return diff == 0;
     }
 
-    return true;
-
+    return memcmp(raw_data_, other.raw_data_, sizeof(int)*size_) == 0;
 }
 
 
@@ -222,16 +250,26 @@ bool TypeBucket::match(const TypeBucket & other) const
         throw std::runtime_error("Fatal backend error. Size must match in bucket comparisons.");
     }
 
-    for (int i = 0; i < size_; ++i)
+    // Count the slots exceeding the other without branching, over all
+    // inline slots for inline buckets.
+    int n_greater = 0;
+
+    if (size_ <= KMCLIB_TYPE_BUCKET_INLINE_SIZE)
     {
-        if (raw_data_[i] > other.raw_data_[i])
+        for (int i = 0; i < KMCLIB_TYPE_BUCKET_INLINE_SIZE; ++i)
         {
-            return false;
+            n_greater += (inline_data_[i] > other.inline_data_[i]);
+        }
+    }
+    else
+    {
+        for (int i = 0; i < size_; ++i)
+        {
+            n_greater += (raw_data_[i] > other.raw_data_[i]);
         }
     }
 
-    return true;
-
+    return n_greater == 0;
 }
 
 
@@ -268,6 +306,21 @@ bool TypeBucket::lessThan(const TypeBucket & other) const
 }
 
 
+// -----------------------------------------------------------------------------
+//
+int TypeBucket::firstPresentType() const
+{
+    for (int i = 0; i < size_; ++i)
+    {
+        if (raw_data_[i] > 0)
+        {
+            return i;
+        }
+    }
+    return -1;
+}
+
+
 // -----------------------------------------------------------------------------
 // NON-MEMBER FUNCTION DECLARATIONS FOLLOW.
 // -----------------------------------------------------------------------------
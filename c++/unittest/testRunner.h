@@ -27,7 +27,18 @@
 #include "test_blocker.h"
 #include "test_hash.h"
 #include "test_ratetable.h"
+#include "test_ratestatistics.h"
+#include "test_ratecalculatorlibrary.h"
+#include "test_functionratecalculator.h"
+#include "test_pairratecalculator.h"
 #include "test_typebucket.h"
+#include "test_sumtree.h"
+#include "test_compositionrejection.h"
+#include "test_matchtree.h"
+#include "test_threads.h"
+#include "test_threadpool.h"
+#include "test_indexmap.h"
+#include "test_allocations.h"
 
 // -------------------------------------------------------------------------- //
 // Add tests.
@@ -49,5 +60,16 @@ CPPUNIT_TEST_SUITE_REGISTRATION( Test_Process );
 CPPUNIT_TEST_SUITE_REGISTRATION( Test_Random );
 CPPUNIT_TEST_SUITE_REGISTRATION( Test_RateCalculator );
 CPPUNIT_TEST_SUITE_REGISTRATION( Test_RateTable );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_RateStatistics );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_RateCalculatorLibrary );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_FunctionRateCalculator );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_PairRateCalculator );
 CPPUNIT_TEST_SUITE_REGISTRATION( Test_SimulationTimer );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_SumTree );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_CompositionRejection );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_MatchTree );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_Threads );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_ThreadPool );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_IndexMap );
+CPPUNIT_TEST_SUITE_REGISTRATION( Test_Allocations );
 CPPUNIT_TEST_SUITE_REGISTRATION( Test_TypeBucket );
@@ -0,0 +1,305 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_allocations.h"
+
+// Include the files to test.
+#include "latticemodel.h"
+
+// Other inclusions.
+#include "configuration.h"
+#include "latticemap.h"
+#include "interactions.h"
+#include "process.h"
+#include "customrateprocess.h"
+#include "ratecalculator.h"
+#include "random.h"
+#include "simulationtimer.h"
+
+#include <atomic>
+#include <cstdlib>
+#include <new>
+
+
+// The allocation counter state.
+static std::atomic<bool> counting_allocations__(false);
+static std::atomic<long> n_allocations__(0);
+
+
+// -------------------------------------------------------------------------- //
+// Replace the global operator new of the test program with a counting one.
+// The array and sized versions all end up here.
+void* operator new(std::size_t size)
+{
+    if (counting_allocations__)
+    {
+        ++n_allocations__;
+    }
+
+    void* ptr = std::malloc((size == 0) ? 1 : size);
+    if (ptr == NULL)
+    {
+        throw std::bad_alloc();
+    }
+    return ptr;
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void operator delete(void* ptr) noexcept
+{
+    std::free(ptr);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void startAllocationCounter()
+{
+    n_allocations__ = 0;
+    counting_allocations__ = true;
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+long stopAllocationCounter()
+{
+    counting_allocations__ = false;
+    return n_allocations__;
+}
+
+
+// -------------------------------------------------------------------------- //
+// Setup a lattice of A and B for the step tests.
+static void setupLattice(std::vector<std::vector<double> > & coordinates,
+                         std::vector<std::vector<std::string> > & elements,
+                         std::map<std::string, int> & possible_types,
+                         std::vector<int> & repetitions)
+{
+    const int nI = 12;
+    const int nJ = 5;
+    const int nK = 5;
+
+    for (int i = 0; i < nI; ++i)
+    {
+        for (int j = 0; j < nJ; ++j)
+        {
+            for (int k = 0; k < nK; ++k)
+            {
+                std::vector<double> c(3);
+                c[0] = i;
+                c[1] = j;
+                c[2] = k;
+                coordinates.push_back(c);
+                const std::string element = ((i*7 + j*3 + k) % 3 == 0) ? "A" : "B";
+                elements.push_back(std::vector<std::string>(1, element));
+            }
+        }
+    }
+
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    repetitions.resize(3);
+    repetitions[0] = nI;
+    repetitions[1] = nJ;
+    repetitions[2] = nK;
+}
+
+
+// -------------------------------------------------------------------------- //
+// Setup the local configurations of an A swapping place with a B at the
+// given distance in the x direction.
+static void setupSwap(const double distance,
+                      const std::map<std::string, int> & possible_types,
+                      std::vector<Configuration> & configurations)
+{
+    std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+    process_coordinates[1][0] = distance;
+
+    std::vector<std::vector<std::string> > process_elements1(2, std::vector<std::string>(1, "A"));
+    process_elements1[1][0] = "B";
+    std::vector<std::vector<std::string> > process_elements2(2, std::vector<std::string>(1, "B"));
+    process_elements2[1][0] = "A";
+
+    configurations.clear();
+    configurations.push_back(Configuration(process_coordinates, process_elements1, possible_types));
+    configurations.push_back(Configuration(process_coordinates, process_elements2, possible_types));
+}
+
+
+// -------------------------------------------------------------------------- //
+// A thread safe rate calculator depending on the number of A around the site.
+class NeighbourRateCalculator : public RateCalculator {
+
+public:
+
+    virtual double backendRateCallback(const std::vector<double> & geometry,
+                                       const int len,
+                                       const std::vector<std::string> & types_before,
+                                       const std::vector<std::string> & types_after,
+                                       const double rate_constant,
+                                       const int process_number,
+                                       const double global_x,
+                                       const double global_y,
+                                       const double global_z) const override
+    {
+        int n_a = 0;
+        for (size_t i = 0; i < types_before.size(); ++i)
+        {
+            if (types_before[i] == "A")
+            {
+                ++n_a;
+            }
+        }
+        return rate_constant * (1.0 + n_a);
+    }
+
+    virtual bool threadSafe() const override { return true; }
+
+};
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Allocations::testAllocationCounter()
+{
+    // Allocations are counted between start and stop. The operator is
+    // called explicitly since new expressions may be optimized away.
+    startAllocationCounter();
+    void* ptr1 = ::operator new(16);
+    void* ptr2 = ::operator new(32);
+    long n_allocations = stopAllocationCounter();
+    ::operator delete(ptr1);
+    ::operator delete(ptr2);
+
+    CPPUNIT_ASSERT_EQUAL( n_allocations, 2l );
+
+    // But not after stopping.
+    startAllocationCounter();
+    stopAllocationCounter();
+    ptr1 = ::operator new(16);
+    ::operator delete(ptr1);
+    n_allocations = stopAllocationCounter();
+
+    CPPUNIT_ASSERT_EQUAL( n_allocations, 0l );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Allocations::testSingleStep()
+{
+    // Setup a system of A and B swapping places at distance one and two,
+    // so that the processes are re-matched within their own ranges.
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    std::map<std::string, int> possible_types;
+    std::vector<int> repetitions;
+    setupLattice(coordinates, elements, possible_types, repetitions);
+
+    const std::vector<bool> periodicity(3, true);
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    std::vector<Process> processes;
+    const std::vector<int> basis_sites(1, 0);
+    const double distances[3] = {1.0, -1.0, 2.0};
+
+    for (int p = 0; p < 3; ++p)
+    {
+        std::vector<Configuration> configurations;
+        setupSwap(distances[p], possible_types, configurations);
+        processes.push_back(Process(configurations[0], configurations[1], 1.0 + p, basis_sites));
+    }
+
+    const Interactions interactions(processes, true);
+    Configuration configuration(coordinates, elements, possible_types);
+    SimulationTimer timer;
+    LatticeModel lattice_model(configuration, timer, lattice_map, interactions);
+
+    seedRandom(false, 8743);
+
+    // Let all work space grow to its working size.
+    for (int step = 0; step < 2000; ++step)
+    {
+        lattice_model.singleStep();
+    }
+
+    // After that no step allocates any memory.
+    startAllocationCounter();
+    for (int step = 0; step < 500; ++step)
+    {
+        lattice_model.singleStep();
+    }
+    const long n_allocations = stopAllocationCounter();
+
+    CPPUNIT_ASSERT_EQUAL( n_allocations, 0l );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Allocations::testSingleStepCustomRates()
+{
+    // The same system with cached custom rates from a native rate calculator.
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    std::map<std::string, int> possible_types;
+    std::vector<int> repetitions;
+    setupLattice(coordinates, elements, possible_types, repetitions);
+
+    const std::vector<bool> periodicity(3, true);
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    std::vector<CustomRateProcess> processes;
+    const std::vector<int> basis_sites(1, 0);
+    const double distances[2] = {1.0, -1.0};
+
+    for (int p = 0; p < 2; ++p)
+    {
+        std::vector<Configuration> configurations;
+        setupSwap(distances[p], possible_types, configurations);
+        processes.push_back(CustomRateProcess(configurations[0],
+                                              configurations[1],
+                                              1.0 + p,
+                                              basis_sites,
+                                              1.0,
+                                              std::vector<int>(0),
+                                              std::vector<Coordinate>(0),
+                                              p,
+                                              true));
+    }
+
+    const NeighbourRateCalculator rate_calculator;
+    const Interactions interactions(processes, true, rate_calculator);
+    Configuration configuration(coordinates, elements, possible_types);
+    SimulationTimer timer;
+    LatticeModel lattice_model(configuration, timer, lattice_map, interactions);
+
+    seedRandom(false, 8743);
+
+    // Let all work space grow and all distinct rates be stored.
+    for (int step = 0; step < 2000; ++step)
+    {
+        lattice_model.singleStep();
+    }
+
+    startAllocationCounter();
+    for (int step = 0; step < 500; ++step)
+    {
+        lattice_model.singleStep();
+    }
+    const long n_allocations = stopAllocationCounter();
+
+    CPPUNIT_ASSERT_EQUAL( n_allocations, 0l );
+}
+
@@ -0,0 +1,50 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+#ifndef __TEST_ALLOCATIONS__
+#define __TEST_ALLOCATIONS__
+
+#include <iostream>
+#include <string>
+
+#include <cppunit/TestCase.h>
+#include <cppunit/TestSuite.h>
+#include <cppunit/TestCaller.h>
+#include <cppunit/TestRunner.h>
+
+#include <cppunit/extensions/HelperMacros.h>
+
+
+/*! \brief Start counting the calls to operator new in the test program.
+ */
+void startAllocationCounter();
+
+/*! \brief Stop counting the calls to operator new in the test program.
+ *  \return : The number of calls since the counter was started.
+ */
+long stopAllocationCounter();
+
+
+class Test_Allocations : public CppUnit::TestCase {
+
+public:
+
+    CPPUNIT_TEST_SUITE( Test_Allocations );
+    CPPUNIT_TEST( testAllocationCounter );
+    CPPUNIT_TEST( testSingleStep );
+    CPPUNIT_TEST( testSingleStepCustomRates );
+    CPPUNIT_TEST_SUITE_END();
+
+    void testAllocationCounter();
+    void testSingleStep();
+    void testSingleStepCustomRates();
+
+};
+
+#endif
+
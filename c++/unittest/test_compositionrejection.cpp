@@ -0,0 +1,140 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_compositionrejection.h"
+
+// Include the files to test.
+#include "compositionrejection.h"
+
+#include "random.h"
+
+#include <stdexcept>
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_CompositionRejection::testConstruction()
+{
+    // Construct.
+    CompositionRejection bins(3);
+
+    // Check that there are no events.
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(bins.size()), 0 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( bins.totalRate(), 0.0, 1.0e-14 );
+
+    // DONE
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_CompositionRejection::testSetAndRemove()
+{
+    CompositionRejection bins(3);
+
+    // Add events in different bins.
+    bins.set(0, 12, 1.0e-5);
+    bins.set(0, 13, 3.0);
+    bins.set(2, 12, 2.5);
+    bins.set(1, 4,  1.0e5);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(bins.size()), 4 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( bins.totalRate(), 1.0e5 + 5.5 + 1.0e-5, 1.0e-9 );
+
+    // Update an event, moving it to another bin.
+    bins.set(0, 13, 7.0);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(bins.size()), 4 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( bins.totalRate(), 1.0e5 + 9.5 + 1.0e-5, 1.0e-9 );
+
+    // Remove events.
+    bins.remove(1, 4);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(bins.size()), 3 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( bins.totalRate(), 9.5 + 1.0e-5, 1.0e-12 );
+
+    // Removing an event that is not present does nothing.
+    bins.remove(1, 4);
+    bins.remove(2, 13);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(bins.size()), 3 );
+
+    // Setting a zero rate removes the event.
+    bins.set(0, 12, 0.0);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(bins.size()), 2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( bins.totalRate(), 9.5, 1.0e-12 );
+
+    // Removing all events gives exactly zero total rate.
+    bins.remove(0, 13);
+    bins.remove(2, 12);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(bins.size()), 0 );
+    CPPUNIT_ASSERT_EQUAL( bins.totalRate(), 0.0 );
+
+    // Clear.
+    bins.set(1, 1, 1.0);
+    bins.clear(4);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(bins.size()), 0 );
+    CPPUNIT_ASSERT_EQUAL( bins.totalRate(), 0.0 );
+    bins.set(3, 1, 1.0);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( bins.totalRate(), 1.0, 1.0e-14 );
+
+    // DONE
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_CompositionRejection::testPick()
+{
+    CompositionRejection bins(2);
+
+    // Picking without events throws, also when all rates are zero.
+    CPPUNIT_ASSERT_THROW( bins.pick(), std::runtime_error );
+    bins.set(0, 3, 0.0);
+    CPPUNIT_ASSERT_THROW( bins.pick(), std::runtime_error );
+
+    // Events in the same bin and in different bins.
+    bins.set(0, 1, 1.0);
+    bins.set(0, 2, 1.5);
+    bins.set(1, 1, 5.0);
+    bins.set(1, 7, 0.5);
+
+    const double total = bins.totalRate();
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( total, 8.0, 1.0e-14 );
+
+    seedRandom(false, 19);
+    std::vector<int> picked(4, 0);
+    const int n_loop = 1000000;
+    for (int i = 0; i < n_loop; ++i)
+    {
+        const std::pair<int,int> event = bins.pick();
+
+        if (event.first == 0 && event.second == 1)
+        {
+            ++picked[0];
+        }
+        else if (event.first == 0 && event.second == 2)
+        {
+            ++picked[1];
+        }
+        else if (event.first == 1 && event.second == 1)
+        {
+            ++picked[2];
+        }
+        else if (event.first == 1 && event.second == 7)
+        {
+            ++picked[3];
+        }
+    }
+
+    CPPUNIT_ASSERT_EQUAL( picked[0] + picked[1] + picked[2] + picked[3], n_loop );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked[0]/n_loop, 1.0/total, 1.0e-2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked[1]/n_loop, 1.5/total, 1.0e-2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked[2]/n_loop, 5.0/total, 1.0e-2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked[3]/n_loop, 0.5/total, 1.0e-2 );
+
+    // DONE
+}
+
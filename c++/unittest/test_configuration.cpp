@@ -14,6 +14,10 @@
 
 #include "latticemap.h"
 #include "process.h"
+#include "interactions.h"
+#include "latticemodel.h"
+#include "simulationtimer.h"
+#include "random.h"
 
 // -------------------------------------------------------------------------- //
 //
@@ -813,6 +817,112 @@ void Test_Configuration::testMatchLists()
 }
 
 
+// -------------------------------------------------------------------------- //
+//
+void Test_Configuration::testLocalGeometries()
+{
+    // Setup a 6x5x4 lattice with two basis sites, periodic in a and b only.
+    std::vector< std::vector<double> > basis(2, std::vector<double>(3,0.0));
+    basis[1][0] = 0.5;
+    basis[1][1] = 0.5;
+    basis[1][2] = 0.5;
+
+    const int nI = 6;
+    const int nJ = 5;
+    const int nK = 4;
+    const int nB = 2;
+
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+
+    for (int i = 0; i < nI; ++i)
+    {
+        for (int j = 0; j < nJ; ++j)
+        {
+            for (int k = 0; k < nK; ++k)
+            {
+                for (int b = 0; b < nB; ++b)
+                {
+                    std::vector<double> c(3);
+                    c[0] = i + basis[b][0];
+                    c[1] = j + basis[b][1];
+                    c[2] = k + basis[b][2];
+                    coordinates.push_back(c);
+                    elements.push_back(std::vector<std::string>(1, "A"));
+                }
+            }
+        }
+    }
+
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+
+    Configuration configuration(coordinates, elements, possible_types);
+
+    std::vector<int> repetitions(3);
+    repetitions[0] = nI;
+    repetitions[1] = nJ;
+    repetitions[2] = nK;
+    std::vector<bool> periodicity(3, true);
+    periodicity[2] = false;
+    LatticeMap lattice_map(nB, repetitions, periodicity);
+
+    // No geometries before initialization.
+    configuration.initMatchLists(lattice_map, 1);
+    CPPUNIT_ASSERT( configuration.localGeometry(0, 1.0) == NULL );
+
+    std::vector<double> cutoffs;
+    cutoffs.push_back(1.0);
+    cutoffs.push_back(0.9);
+    cutoffs.push_back(1.0);
+    configuration.initLocalGeometries(lattice_map, cutoffs);
+
+    // Only the given cutoffs are precomputed.
+    CPPUNIT_ASSERT( configuration.localGeometry(0, 1.5) == NULL );
+
+    int n_precomputed = 0;
+
+    for (size_t index = 0; index < coordinates.size(); ++index)
+    {
+        const ConfigBucketMatchList & match_list = configuration.configMatchList(index);
+
+        for (size_t c = 0; c < cutoffs.size(); ++c)
+        {
+            const std::vector<double> * geometry = configuration.localGeometry(index, cutoffs[c]);
+
+            // Sites close to the non periodic boundary have no precomputed geometries.
+            const int k = (index / nB) % nK;
+            const bool boundary = (k == 0 || k == nK-1);
+            CPPUNIT_ASSERT_EQUAL( (geometry == NULL), boundary );
+
+            if (geometry == NULL)
+            {
+                continue;
+            }
+            ++n_precomputed;
+
+            // The geometry is the part of the match list within the cutoff.
+            size_t len = 0;
+            while (len < match_list.size() && match_list[len].distance <= cutoffs[c])
+            {
+                CPPUNIT_ASSERT_DOUBLES_EQUAL( (*geometry)[3*len],   match_list[len].x, 1.0e-12 );
+                CPPUNIT_ASSERT_DOUBLES_EQUAL( (*geometry)[3*len+1], match_list[len].y, 1.0e-12 );
+                CPPUNIT_ASSERT_DOUBLES_EQUAL( (*geometry)[3*len+2], match_list[len].z, 1.0e-12 );
+                ++len;
+            }
+            CPPUNIT_ASSERT_EQUAL( geometry->size(), 3*len );
+
+            // Shared between all sites of the same basis site.
+            CPPUNIT_ASSERT( geometry == configuration.localGeometry(nB*nK + index % nB + nB, cutoffs[c]) );
+        }
+    }
+
+    // Two inner layers of the 6x5x4 lattice, two basis sites and three cutoffs.
+    CPPUNIT_ASSERT_EQUAL( n_precomputed, 6*5*2*2*3 );
+}
+
+
 // -------------------------------------------------------------------------- //
 //
 void Test_Configuration::testTypeNameQuery()
@@ -1335,5 +1445,383 @@ void Test_Configuration::testParticlesPerType()
     CPPUNIT_ASSERT_EQUAL( particles_per_type_1[5], 2);
     CPPUNIT_ASSERT_EQUAL( particles_per_type_1[6], 11);
 
+    // The counts follow the processes performed, here on a chain where
+    // single A and B atoms are turned into each other.
+    std::vector<std::vector<double> > chain_coordinates;
+    std::vector<std::vector<std::string> > chain_elements;
+    const int n_chain = 20;
+    for (int i = 0; i < n_chain; ++i)
+    {
+        std::vector<double> c(3, 0.0);
+        c[0] = i;
+        chain_coordinates.push_back(c);
+        chain_elements.push_back(std::vector<std::string>(1, (i % 4 == 0) ? "B" : "A"));
+    }
+
+    std::vector<Process> processes;
+    const std::vector<int> basis_sites(1, 0);
+    for (int p = 0; p < 2; ++p)
+    {
+        const std::vector<std::vector<double> > process_coordinates(1, std::vector<double>(3, 0.0));
+        const std::vector<std::vector<std::string> > elements1(1, std::vector<std::string>(1, (p == 0) ? "A" : "B"));
+        const std::vector<std::vector<std::string> > elements2(1, std::vector<std::string>(1, (p == 0) ? "B" : "A"));
+        const Configuration config1(process_coordinates, elements1, possible_types);
+        const Configuration config2(process_coordinates, elements2, possible_types);
+        processes.push_back(Process(config1, config2, 1.0 + p, basis_sites));
+    }
+
+    std::vector<int> repetitions(3, 1);
+    repetitions[0] = n_chain;
+    const LatticeMap lattice_map(1, repetitions, std::vector<bool>(3, true));
+
+    const Interactions interactions(processes, true);
+    Configuration chain(chain_coordinates, chain_elements, possible_types);
+    SimulationTimer timer;
+    LatticeModel lattice_model(chain, timer, lattice_map, interactions);
+
+    CPPUNIT_ASSERT_EQUAL( chain.particlesPerType()[1], 15 );
+    CPPUNIT_ASSERT_EQUAL( chain.particlesPerType()[2], 5 );
+
+    // The type counts per site are kept in the same storage once queried.
+    const size_t n_types = chain.typeNames().size();
+    const std::vector<int> & type_counts = chain.typeCounts();
+    CPPUNIT_ASSERT_EQUAL( type_counts.size(), n_chain * n_types );
+    const int* type_counts_data = &type_counts[0];
+
+    seedRandom(false, 1311);
+    for (int step = 0; step < 50; ++step)
+    {
+        lattice_model.singleStep();
+
+        std::vector<int> counts(possible_types.size(), 0);
+        for (int i = 0; i < n_chain; ++i)
+        {
+            for (size_t j = 0; j < counts.size(); ++j)
+            {
+                counts[j] += chain.types()[i][j];
+                CPPUNIT_ASSERT_EQUAL( chain.typeCounts()[i * n_types + j], chain.types()[i][j] );
+            }
+        }
+        CPPUNIT_ASSERT( chain.particlesPerType() == counts );
+        CPPUNIT_ASSERT( &chain.typeCounts()[0] == type_counts_data );
+
+        // The moved atom ids are the first ones in the storage.
+        const std::vector<int> moved = chain.movedAtomIDs();
+        CPPUNIT_ASSERT_EQUAL( chain.nMovedAtomIDs(), static_cast<int>(moved.size()) );
+        for (size_t i = 0; i < moved.size(); ++i)
+        {
+            CPPUNIT_ASSERT_EQUAL( chain.movedAtomIDsStorage()[i], moved[i] );
+        }
+    }
+
     // DONE
 }
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Configuration::testGeneratedElements()
+{
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    // The elements of each site are generated in type number order.
+    {
+        std::vector<std::vector<double> > coords(2, std::vector<double>(3, 0.0));
+        coords[1][0] = 1.0;
+        std::vector< std::vector<std::string> > elements(2, std::vector<std::string>(1, "B"));
+        elements[0].push_back("A");
+        elements[0].push_back("B");
+
+        const Configuration config(coords, elements, possible_types);
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(config.elements().size()), 2 );
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(config.elements()[0].size()), 3 );
+        CPPUNIT_ASSERT_EQUAL( config.elements()[0][0], std::string("A") );
+        CPPUNIT_ASSERT_EQUAL( config.elements()[0][1], std::string("B") );
+        CPPUNIT_ASSERT_EQUAL( config.elements()[0][2], std::string("B") );
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(config.elements()[1].size()), 1 );
+        CPPUNIT_ASSERT_EQUAL( config.elements()[1][0], std::string("B") );
+
+        // The atom id types are the first type on each site.
+        CPPUNIT_ASSERT_EQUAL( config.atomIDTypes()[0], 1 );
+        CPPUNIT_ASSERT_EQUAL( config.atomIDTypes()[1], 2 );
+        CPPUNIT_ASSERT_EQUAL( config.atomIDElements()[0], std::string("A") );
+        CPPUNIT_ASSERT_EQUAL( config.atomIDElements()[1], std::string("B") );
+    }
+
+    // A chain of A and B.
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    const int nI = 30;
+    for (int i = 0; i < nI; ++i)
+    {
+        std::vector<double> c(3, 0.0);
+        c[0] = i;
+        coordinates.push_back(c);
+        elements.push_back(std::vector<std::string>(1, (i % 3 == 0) ? "B" : "A"));
+    }
+
+    // An A swapping place with a B, moving the atoms in one direction.
+    std::vector<Process> processes;
+    const std::vector<int> basis_sites(1, 0);
+    for (int p = 0; p < 2; ++p)
+    {
+        std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+        process_coordinates[1][0] = (p == 0) ? 1.0 : -1.0;
+        std::vector<std::vector<std::string> > elements1(2, std::vector<std::string>(1, "A"));
+        elements1[1][0] = "B";
+        std::vector<std::vector<std::string> > elements2(2, std::vector<std::string>(1, "B"));
+        elements2[1][0] = "A";
+        const Configuration config1(process_coordinates, elements1, possible_types);
+        const Configuration config2(process_coordinates, elements2, possible_types);
+
+        std::vector<int> move_origins(0);
+        std::vector<Coordinate> move_vectors(0);
+        if (p == 0)
+        {
+            move_origins.push_back(0);
+            move_origins.push_back(1);
+            move_vectors.push_back(Coordinate(1.0, 0.0, 0.0));
+            move_vectors.push_back(Coordinate(-1.0, 0.0, 0.0));
+        }
+        processes.push_back(Process(config1, config2, 1.0 + p, basis_sites, move_origins, move_vectors, p));
+    }
+
+    std::vector<int> repetitions(3, 1);
+    repetitions[0] = nI;
+    std::vector<bool> periodicity(3, false);
+    periodicity[0] = true;
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    // Two models taking the same steps, with the elements of the first
+    // queried along the way and the elements of the second only at the end.
+    const Interactions interactions1(processes, true);
+    Configuration configuration1(coordinates, elements, possible_types);
+    SimulationTimer timer1;
+    LatticeModel lattice_model1(configuration1, timer1, lattice_map, interactions1);
+
+    const Interactions interactions2(processes, true);
+    Configuration configuration2(coordinates, elements, possible_types);
+    SimulationTimer timer2;
+    LatticeModel lattice_model2(configuration2, timer2, lattice_map, interactions2);
+
+    seedRandom(false, 9871);
+    for (int step = 0; step < 100; ++step)
+    {
+        if (step % 7 == 0)
+        {
+            configuration1.elements();
+            configuration1.atomIDElements();
+        }
+        lattice_model1.singleStep();
+    }
+
+    seedRandom(false, 9871);
+    for (int step = 0; step < 100; ++step)
+    {
+        lattice_model2.singleStep();
+    }
+
+    // The elements agree with each other and with the types.
+    CPPUNIT_ASSERT( configuration1.elements() == configuration2.elements() );
+    CPPUNIT_ASSERT( configuration1.atomIDElements() == configuration2.atomIDElements() );
+
+    for (int i = 0; i < nI; ++i)
+    {
+        const int type = configuration1.types()[i].firstPresentType();
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(configuration1.elements()[i].size()), 1 );
+        CPPUNIT_ASSERT_EQUAL( configuration1.elements()[i][0], configuration1.typeName(type) );
+
+        const int atom_id = configuration1.atomID()[i];
+        CPPUNIT_ASSERT_EQUAL( configuration1.atomIDTypes()[atom_id], type );
+        CPPUNIT_ASSERT_EQUAL( configuration1.atomIDElements()[atom_id], configuration1.typeName(type) );
+    }
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Configuration::testCompactMatchLists()
+{
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    // A 5x4x3 lattice with two basis points, not periodic in z.
+    const int nI = 5;
+    const int nJ = 4;
+    const int nK = 3;
+    const int nB = 2;
+
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    for (int i = 0; i < nI; ++i)
+    {
+        for (int j = 0; j < nJ; ++j)
+        {
+            for (int k = 0; k < nK; ++k)
+            {
+                for (int b = 0; b < nB; ++b)
+                {
+                    std::vector<double> c(3);
+                    c[0] = i + 0.5 * b;
+                    c[1] = j + 0.5 * b;
+                    c[2] = k + 0.5 * b;
+                    coordinates.push_back(c);
+                    elements.push_back(std::vector<std::string>(1, (coordinates.size() % 3 == 0) ? "B" : "A"));
+                }
+            }
+        }
+    }
+
+    std::vector<int> repetitions(3);
+    repetitions[0] = nI;
+    repetitions[1] = nJ;
+    repetitions[2] = nK;
+    std::vector<bool> periodicity(3, true);
+    periodicity[2] = false;
+    const LatticeMap lattice_map(nB, repetitions, periodicity);
+
+    Configuration full(coordinates, elements, possible_types);
+    CPPUNIT_ASSERT( !full.compactMatchLists() );
+    full.initMatchLists(lattice_map, 1);
+
+    Configuration compact(coordinates, elements, possible_types);
+    compact.setCompactMatchLists(true);
+    CPPUNIT_ASSERT( compact.compactMatchLists() );
+    compact.initMatchLists(lattice_map, 1);
+
+    // The match lists are the same.
+    std::vector<double> cutoffs(2, 1.0);
+    cutoffs[1] = 1.5;
+    full.initMatchListHashes(cutoffs);
+    compact.initMatchListHashes(cutoffs);
+
+    for (size_t i = 0; i < coordinates.size(); ++i)
+    {
+        const ConfigBucketMatchList full_list = full.configMatchList(i);
+        const ConfigBucketMatchList & compact_list = compact.configMatchList(i);
+
+        CPPUNIT_ASSERT_EQUAL( full_list.size(), compact_list.size() );
+        for (size_t j = 0; j < full_list.size(); ++j)
+        {
+            CPPUNIT_ASSERT_EQUAL( full_list[j].index, compact_list[j].index );
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( full_list[j].distance, compact_list[j].distance, 1.0e-12 );
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( full_list[j].x, compact_list[j].x, 1.0e-12 );
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( full_list[j].y, compact_list[j].y, 1.0e-12 );
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( full_list[j].z, compact_list[j].z, 1.0e-12 );
+            CPPUNIT_ASSERT( full_list[j].match_types == compact_list[j].match_types );
+        }
+
+        for (size_t c = 0; c < cutoffs.size(); ++c)
+        {
+            uint64_t full_hash = 0;
+            uint64_t compact_hash = 1;
+            CPPUNIT_ASSERT( full.matchListHash(i, cutoffs[c], full_hash) );
+            CPPUNIT_ASSERT( compact.matchListHash(i, cutoffs[c], compact_hash) );
+            CPPUNIT_ASSERT_EQUAL( full_hash, compact_hash );
+        }
+    }
+
+    // Re-initializing with another range gives new match lists, also at
+    // the index of the latest generated list.
+    const size_t size_range1 = compact.configMatchList(0).size();
+    full.initMatchLists(lattice_map, 2);
+    compact.initMatchLists(lattice_map, 2);
+    CPPUNIT_ASSERT( compact.configMatchList(0).size() > size_range1 );
+
+    for (size_t i = 0; i < coordinates.size(); ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( full.configMatchList(i).size(), compact.configMatchList(i).size() );
+    }
+
+    // A chain of A and B with open ends, where the end sites have
+    // templates of their own.
+    std::vector<std::vector<double> > chain_coordinates;
+    std::vector<std::vector<std::string> > chain_elements;
+    const int n_chain = 30;
+    for (int i = 0; i < n_chain; ++i)
+    {
+        std::vector<double> c(3, 0.0);
+        c[0] = i;
+        chain_coordinates.push_back(c);
+        chain_elements.push_back(std::vector<std::string>(1, (i % 3 == 0) ? "B" : "A"));
+    }
+
+    // An A swapping place with a B, moving the atoms in one direction.
+    std::vector<Process> processes;
+    const std::vector<int> basis_sites(1, 0);
+    for (int p = 0; p < 2; ++p)
+    {
+        std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+        process_coordinates[1][0] = (p == 0) ? 1.0 : -1.0;
+        std::vector<std::vector<std::string> > elements1(2, std::vector<std::string>(1, "A"));
+        elements1[1][0] = "B";
+        std::vector<std::vector<std::string> > elements2(2, std::vector<std::string>(1, "B"));
+        elements2[1][0] = "A";
+        const Configuration config1(process_coordinates, elements1, possible_types);
+        const Configuration config2(process_coordinates, elements2, possible_types);
+
+        std::vector<int> move_origins(0);
+        std::vector<Coordinate> move_vectors(0);
+        if (p == 0)
+        {
+            move_origins.push_back(0);
+            move_origins.push_back(1);
+            move_vectors.push_back(Coordinate(1.0, 0.0, 0.0));
+            move_vectors.push_back(Coordinate(-1.0, 0.0, 0.0));
+        }
+        processes.push_back(Process(config1, config2, 1.0 + p, basis_sites, move_origins, move_vectors, p));
+    }
+
+    std::vector<int> chain_repetitions(3, 1);
+    chain_repetitions[0] = n_chain;
+    const LatticeMap chain_map(1, chain_repetitions, std::vector<bool>(3, false));
+
+    // Two models taking the same steps, with and without compact match lists.
+    const Interactions interactions1(processes, true);
+    Configuration configuration1(chain_coordinates, chain_elements, possible_types);
+    SimulationTimer timer1;
+    LatticeModel lattice_model1(configuration1, timer1, chain_map, interactions1);
+
+    const Interactions interactions2(processes, true);
+    Configuration configuration2(chain_coordinates, chain_elements, possible_types);
+    configuration2.setCompactMatchLists(true);
+    SimulationTimer timer2;
+    LatticeModel lattice_model2(configuration2, timer2, chain_map, interactions2);
+
+    // The end sites have shorter match lists.
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(configuration2.configMatchList(0).size()), 2 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(configuration2.configMatchList(1).size()), 3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(configuration2.configMatchList(n_chain - 1).size()), 2 );
+
+    seedRandom(false, 9871);
+    for (int step = 0; step < 100; ++step)
+    {
+        lattice_model1.singleStep();
+    }
+
+    seedRandom(false, 9871);
+    for (int step = 0; step < 100; ++step)
+    {
+        lattice_model2.singleStep();
+    }
+
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( timer1.simulationTime(), timer2.simulationTime(), 1.0e-10 );
+    CPPUNIT_ASSERT( configuration1.types() == configuration2.types() );
+    CPPUNIT_ASSERT( configuration1.atomID() == configuration2.atomID() );
+    CPPUNIT_ASSERT( configuration1.elements() == configuration2.elements() );
+
+    // The compact match lists follow the types.
+    for (int i = 0; i < n_chain; ++i)
+    {
+        const ConfigBucketMatchList & match_list = configuration2.configMatchList(i);
+        for (size_t j = 0; j < match_list.size(); ++j)
+        {
+            CPPUNIT_ASSERT( match_list[j].match_types == configuration2.types()[match_list[j].index] );
+        }
+    }
+}
@@ -30,10 +30,13 @@ public:
     CPPUNIT_TEST( testPerformProcessVectors );
     CPPUNIT_TEST( testAtomID );
     CPPUNIT_TEST( testMatchLists );
+    CPPUNIT_TEST( testLocalGeometries );
     CPPUNIT_TEST( testTypeNameQuery );
     CPPUNIT_TEST( testAtomIDElementsCoordinatesMovedIDs );
     CPPUNIT_TEST( testUpdateInfo );
     CPPUNIT_TEST( testParticlesPerType );
+    CPPUNIT_TEST( testGeneratedElements );
+    CPPUNIT_TEST( testCompactMatchLists );
     CPPUNIT_TEST_SUITE_END();
 
     void testConstruction();
@@ -42,10 +45,13 @@ public:
     void testPerformProcessVectors();
     void testAtomID();
     void testMatchLists();
+    void testLocalGeometries();
     void testAtomIDElementsCoordinatesMovedIDs();
     void testTypeNameQuery();
     void testUpdateInfo();
     void testParticlesPerType();
+    void testGeneratedElements();
+    void testCompactMatchLists();
 
 };
 
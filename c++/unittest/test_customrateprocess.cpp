@@ -422,6 +422,51 @@ void Test_CustomRateProcess::testAddAndRemoveSite()
 }
 
 
+// -------------------------------------------------------------------------- //
+//
+void Test_CustomRateProcess::testUpdateSite()
+{
+    // Default construct a process.
+    CustomRateProcess process;
+
+    // Add a few sites.
+    process.addSite(1234, 2.0, 1.0);
+    process.addSite(3,    5.0, 1.0);
+    process.addSite(11,   3.0, 2.0);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(process.totalRate(), 13.0, 1.0e-12);
+
+    // Update the rate and multiplicity of a site in place.
+    process.updateSite(3, 7.0, 2.0);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(process.totalRate(), 22.0, 1.0e-12);
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(process.nSites()), 3);
+    CPPUNIT_ASSERT_EQUAL(process.sites()[1], 3);
+
+    // Updating a site that is not listed adds it.
+    process.updateSite(-5, 1.0);
+    CPPUNIT_ASSERT( process.isListed(-5) );
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(process.nSites()), 4);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(process.totalRate(), 23.0, 1.0e-12);
+
+    // Remove a site and update the site that was moved into its place.
+    process.removeSite(1234);
+    CPPUNIT_ASSERT_EQUAL(process.sites()[0], -5);
+    process.updateSite(-5, 4.0);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(process.totalRate(), 24.0, 1.0e-12);
+
+    // Removing a site that is not listed does nothing.
+    process.removeSite(1234);
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(process.nSites()), 3);
+
+    // Clearing the sites removes them from the listing.
+    process.clearSites();
+    CPPUNIT_ASSERT( !process.isListed(3)  );
+    CPPUNIT_ASSERT( !process.isListed(-5) );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(process.totalRate(), 0.0, 1.0e-12);
+
+    // DONE
+}
+
+
 // -------------------------------------------------------------------------- //
 //
 void Test_CustomRateProcess::testPickSite()
@@ -524,6 +569,69 @@ void Test_CustomRateProcess::testPickSiteMultiplicity()
 }
 
 
+// -------------------------------------------------------------------------- //
+//
+void Test_CustomRateProcess::testPickSiteIncremental()
+{
+    // Default construct a process.
+    CustomRateProcess process;
+
+    // Add and remove sites without updating the rate table.
+    process.addSite(199, 2.00, 1.0);
+    process.addSite(7,   8.00, 1.0);
+    process.addSite(12,  5.00, 1.0);
+    process.addSite(3,   4.00, 2.0);
+    process.removeSite(7);
+    process.addSite(19,  3.00, 1.0);
+    process.removeSite(3);
+
+    // The total rate is kept up to date.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( process.totalRate(), 10.0, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(process.nSites()), 3 );
+
+    // Get the cite.
+    int counter12  = 0;
+    int counter19  = 0;
+    int counter199 = 0;
+
+    seedRandom(false, 97);
+    const int n_loop = 1000000;
+
+    for (int i = 0; i < n_loop; ++i)
+    {
+        const int site = process.pickSite();
+        CPPUNIT_ASSERT( ! (site != 12 && site != 199 && site != 19) );
+
+        // Count how often each gets selected.
+        if (site == 12)
+        {
+            ++counter12;
+        }
+
+        if (site == 199)
+        {
+            ++counter199;
+        }
+
+        if (site == 19)
+        {
+            ++counter19;
+        }
+    }
+
+    // Test.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 2.0/10.0, 1.0 * counter199 / n_loop,  1.0e-2);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0/2.0 , 1.0 * counter12  / n_loop,  1.0e-2);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 3.0/10.0, 1.0 * counter19  / n_loop,  1.0e-2);
+
+    // Removing all sites gives exactly zero total rate.
+    process.removeSite(12);
+    process.removeSite(199);
+    process.removeSite(19);
+    CPPUNIT_ASSERT_EQUAL( process.totalRate(), 0.0 );
+}
+
+
 // -------------------------------------------------------------------------- //
 //
 void Test_CustomRateProcess::testAffectedIndices()
@@ -29,8 +29,10 @@ public:
     CPPUNIT_TEST( testTotalRate );
     CPPUNIT_TEST( testTotalRateMultiplicity );
     CPPUNIT_TEST( testAddAndRemoveSite );
+    CPPUNIT_TEST( testUpdateSite );
     CPPUNIT_TEST( testPickSite );
     CPPUNIT_TEST( testPickSiteMultiplicity );
+    CPPUNIT_TEST( testPickSiteIncremental );
     CPPUNIT_TEST( testAffectedIndices );
     CPPUNIT_TEST( testCutoffAndRange );
     CPPUNIT_TEST( testProcessNumber );
@@ -42,8 +44,10 @@ public:
     void testTotalRate();
     void testTotalRateMultiplicity();
     void testAddAndRemoveSite();
+    void testUpdateSite();
     void testPickSite();
     void testPickSiteMultiplicity();
+    void testPickSiteIncremental();
     void testAffectedIndices();
     void testCutoffAndRange();
     void testProcessNumber();
@@ -0,0 +1,273 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_functionratecalculator.h"
+
+// Include the files to test.
+#include "functionratecalculator.h"
+
+// Other inclusions.
+#include "latticemodel.h"
+#include "configuration.h"
+#include "latticemap.h"
+#include "interactions.h"
+#include "customrateprocess.h"
+#include "simulationtimer.h"
+#include "random.h"
+
+#include <stdexcept>
+
+
+// -------------------------------------------------------------------------- //
+// A rate function scaling the rate constant with one plus the number of
+// atoms of type 1 before the process, and with the factor in the user data.
+extern "C" double scaledRate(const double * geometry,
+                             int len,
+                             const int * types_before,
+                             const int * types_after,
+                             double rate_constant,
+                             int process_number,
+                             double global_x,
+                             double global_y,
+                             double global_z,
+                             void * user_data)
+{
+    int n_ones = 0;
+    for (int i = 0; i < len; ++i)
+    {
+        if (types_before[i] == 1)
+        {
+            ++n_ones;
+        }
+    }
+    return rate_constant * (1.0 + n_ones) * (*static_cast<const double*>(user_data));
+}
+
+
+// -------------------------------------------------------------------------- //
+// A rate function returning the sum of its arguments except the types.
+extern "C" double argumentSum(const double * geometry,
+                              int len,
+                              const int * types_before,
+                              const int * types_after,
+                              double rate_constant,
+                              int process_number,
+                              double global_x,
+                              double global_y,
+                              double global_z,
+                              void * user_data)
+{
+    double sum = len + rate_constant + process_number + global_x + global_y + global_z;
+    for (int i = 0; i < 3*len; ++i)
+    {
+        sum += geometry[i];
+    }
+    for (int i = 0; i < len; ++i)
+    {
+        sum += 100.0 * types_before[i] + 1000.0 * types_after[i];
+    }
+    return sum + ((user_data == NULL) ? 0.0 : 0.5);
+}
+
+
+// -------------------------------------------------------------------------- //
+// The scaled rate calculation with strings, for reference.
+class ScaledRateCalculator : public RateCalculator {
+
+public:
+
+    virtual double backendRateCallback(const std::vector<double> & geometry,
+                                       const int len,
+                                       const std::vector<std::string> & types_before,
+                                       const std::vector<std::string> & types_after,
+                                       const double rate_constant,
+                                       const int process_number,
+                                       const double global_x,
+                                       const double global_y,
+                                       const double global_z) const override
+    {
+        int n_a = 0;
+        for (int i = 0; i < len; ++i)
+        {
+            if (types_before[i] == "A")
+            {
+                ++n_a;
+            }
+        }
+        return rate_constant * (1.0 + n_a) * 0.25;
+    }
+
+};
+
+
+// -------------------------------------------------------------------------- //
+//
+static size_t address(RateFunction function)
+{
+    return reinterpret_cast<size_t>(function);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_FunctionRateCalculator::testConstruction()
+{
+    std::vector<int> exclude(1, 3);
+    const FunctionRateCalculator calculator(address(&argumentSum), 0, 2.5, true, exclude, 123, true);
+
+    CPPUNIT_ASSERT( calculator.typeNumbers() );
+    CPPUNIT_ASSERT( calculator.threadSafe() );
+    CPPUNIT_ASSERT( calculator.cacheRates() );
+    CPPUNIT_ASSERT( !calculator.batchRates() );
+    CPPUNIT_ASSERT_EQUAL( calculator.cacheSize(), 123 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.cutoff(), 2.5, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(calculator.excludeFromCaching().size()), 1 );
+    CPPUNIT_ASSERT_EQUAL( calculator.excludeFromCaching()[0], 3 );
+
+    // Other settings.
+    const FunctionRateCalculator calculator2(address(&argumentSum), 0, 1.0, false, std::vector<int>(0), 10, false);
+    CPPUNIT_ASSERT( !calculator2.threadSafe() );
+    CPPUNIT_ASSERT( !calculator2.cacheRates() );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(calculator2.excludeFromCaching().size()), 0 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_FunctionRateCalculator::testConstructionFail()
+{
+    // The function address may not be zero.
+    CPPUNIT_ASSERT_THROW( FunctionRateCalculator(0, 0, 1.0, false, std::vector<int>(0), 10, false),
+                          std::runtime_error );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_FunctionRateCalculator::testBackendRateCallback()
+{
+    // All arguments reach the function.
+    std::vector<double> geometry(6, 0.0);
+    geometry[1] = 0.125;
+    geometry[5] = 0.25;
+    std::vector<int> types_before(2, 1);
+    std::vector<int> types_after(2, 2);
+    types_after[1] = 1;
+    const std::vector<std::string> type_names(3, "X");
+
+    const FunctionRateCalculator calculator(address(&argumentSum), 0, 1.0, false, std::vector<int>(0), 10, false);
+    const double rate = calculator.backendRateCallbackTypeNumbers(geometry, 2, types_before, types_after, type_names,
+                                                                  3.0, 4, 10.0, 20.0, 30.0);
+    const double ref = 2 + 3.0 + 4 + 10.0 + 20.0 + 30.0 + 0.375 + 200.0 + 3000.0;
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( rate, ref, 1.0e-10 );
+
+    // With user data.
+    double scale = 2.0;
+    const FunctionRateCalculator calculator2(address(&argumentSum), reinterpret_cast<size_t>(&scale),
+                                             1.0, false, std::vector<int>(0), 10, false);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator2.backendRateCallbackTypeNumbers(geometry, 2, types_before, types_after,
+                                                                             type_names, 3.0, 4, 10.0, 20.0, 30.0),
+                                  ref + 0.5, 1.0e-10 );
+
+    // The user data is given by address.
+    const FunctionRateCalculator calculator3(address(&scaledRate), reinterpret_cast<size_t>(&scale),
+                                             1.0, false, std::vector<int>(0), 10, false);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator3.backendRateCallbackTypeNumbers(geometry, 2, types_before, types_after,
+                                                                             type_names, 3.0, 4, 10.0, 20.0, 30.0),
+                                  18.0, 1.0e-10 );
+    scale = 0.5;
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator3.backendRateCallbackTypeNumbers(geometry, 2, types_before, types_after,
+                                                                             type_names, 3.0, 4, 10.0, 20.0, 30.0),
+                                  4.5, 1.0e-10 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_FunctionRateCalculator::testLatticeModel()
+{
+    // A chain of A and B.
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    const int nI = 40;
+    for (int i = 0; i < nI; ++i)
+    {
+        std::vector<double> c(3, 0.0);
+        c[0] = i;
+        coordinates.push_back(c);
+        elements.push_back(std::vector<std::string>(1, (i % 3 == 0) ? "B" : "A"));
+    }
+
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    // An A swapping place with a B in either direction.
+    std::vector<CustomRateProcess> processes;
+    const std::vector<int> basis_sites(1, 0);
+    for (int p = 0; p < 2; ++p)
+    {
+        std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+        process_coordinates[1][0] = (p == 0) ? 1.0 : -1.0;
+        std::vector<std::vector<std::string> > elements1(2, std::vector<std::string>(1, "A"));
+        elements1[1][0] = "B";
+        std::vector<std::vector<std::string> > elements2(2, std::vector<std::string>(1, "B"));
+        elements2[1][0] = "A";
+        const Configuration config1(process_coordinates, elements1, possible_types);
+        const Configuration config2(process_coordinates, elements2, possible_types);
+        processes.push_back(CustomRateProcess(config1, config2, 1.0 + p, basis_sites, 2.0,
+                                              std::vector<int>(0), std::vector<Coordinate>(0),
+                                              p, (p == 0)));
+    }
+
+    std::vector<int> repetitions(3, 1);
+    repetitions[0] = nI;
+    std::vector<bool> periodicity(3, false);
+    periodicity[0] = true;
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    // A model with the rates from the function, calculated on several threads.
+    double scale = 0.25;
+    const FunctionRateCalculator calculator(address(&scaledRate), reinterpret_cast<size_t>(&scale),
+                                            2.0, true, std::vector<int>(1, 1), 1000, true);
+    const Interactions interactions(processes, true, calculator);
+    Configuration configuration1(coordinates, elements, possible_types);
+    SimulationTimer timer1;
+    LatticeModel lattice_model1(configuration1, timer1, lattice_map, interactions);
+
+    // And one with the same rates calculated from the type strings.
+    const ScaledRateCalculator reference;
+    const Interactions reference_interactions(processes, true, reference);
+    Configuration configuration2(coordinates, elements, possible_types);
+    SimulationTimer timer2;
+    LatticeModel lattice_model2(configuration2, timer2, lattice_map, reference_interactions);
+
+    CPPUNIT_ASSERT( lattice_model1.interactions().totalRate() > 0.0 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( lattice_model1.interactions().totalRate(),
+                                  lattice_model2.interactions().totalRate(),
+                                  1.0e-10 );
+
+    // Also after the same steps.
+    seedRandom(false, 4127);
+    for (int step = 0; step < 50; ++step)
+    {
+        lattice_model1.singleStep();
+    }
+    seedRandom(false, 4127);
+    for (int step = 0; step < 50; ++step)
+    {
+        lattice_model2.singleStep();
+    }
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( lattice_model1.interactions().totalRate(),
+                                  lattice_model2.interactions().totalRate(),
+                                  1.0e-10 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( timer1.simulationTime(), timer2.simulationTime(), 1.0e-10 );
+}
+
@@ -15,6 +15,10 @@
 #include "configuration.h"
 #include "customrateprocess.h"
 #include "latticemap.h"
+#include "latticemodel.h"
+#include "interactions.h"
+#include "ratecalculator.h"
+#include "simulationtimer.h"
 #include "random.h"
 
 #include <cstdint>
@@ -196,3 +200,151 @@ void Test_Hash::testHashCustomRateInput()
         printf("hash0 %" PRIx64 "\n %e", hash_loop, (t2-t1)/10000000);
     }
 }
+
+
+// -------------------------------------------------------------------------- //
+// A rate calculator depending on the number of A around the site.
+class CountingRateCalculator : public RateCalculator {
+
+public:
+
+    virtual double backendRateCallback(const std::vector<double> & geometry,
+                                       const int len,
+                                       const std::vector<std::string> & types_before,
+                                       const std::vector<std::string> & types_after,
+                                       const double rate_constant,
+                                       const int process_number,
+                                       const double global_x,
+                                       const double global_y,
+                                       const double global_z) const override
+    {
+        int n_a = 0;
+        for (size_t i = 0; i < types_before.size(); ++i)
+        {
+            if (types_before[i] == "A")
+            {
+                ++n_a;
+            }
+        }
+        return rate_constant * (1.0 + n_a);
+    }
+
+};
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Hash::testCustomRateKey()
+{
+    // Setup a periodic lattice of A and B.
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    const int nI = 6;
+    const int nJ = 5;
+    const int nK = 4;
+
+    for (int i = 0; i < nI; ++i)
+    {
+        for (int j = 0; j < nJ; ++j)
+        {
+            for (int k = 0; k < nK; ++k)
+            {
+                std::vector<double> c(3);
+                c[0] = i;
+                c[1] = j;
+                c[2] = k;
+                coordinates.push_back(c);
+                const std::string element = ((i*7 + j*3 + k) % 3 == 0) ? "A" : "B";
+                elements.push_back(std::vector<std::string>(1, element));
+            }
+        }
+    }
+
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    std::vector<int> repetitions(3);
+    repetitions[0] = nI;
+    repetitions[1] = nJ;
+    repetitions[2] = nK;
+    const std::vector<bool> periodicity(3, true);
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    // Processes swapping an A and a B in the x direction, with different cutoffs.
+    std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+    process_coordinates[1][0] = 1.0;
+    std::vector<std::vector<std::string> > process_elements1(2, std::vector<std::string>(1, "A"));
+    process_elements1[1][0] = "B";
+    std::vector<std::vector<std::string> > process_elements2(2, std::vector<std::string>(1, "B"));
+    process_elements2[1][0] = "A";
+    const Configuration config1(process_coordinates, process_elements1, possible_types);
+    const Configuration config2(process_coordinates, process_elements2, possible_types);
+
+    const std::vector<int> basis_sites(1, 0);
+    std::vector<CustomRateProcess> processes;
+    processes.push_back(CustomRateProcess(config1, config2, 1.0, basis_sites, 1.0,
+                                          std::vector<int>(0), std::vector<Coordinate>(0), 0, true));
+    processes.push_back(CustomRateProcess(config2, config1, 2.0, basis_sites, 1.5,
+                                          std::vector<int>(0), std::vector<Coordinate>(0), 1, true));
+
+    // Without hashes setup the key is the MD5 hash.
+    Configuration configuration(coordinates, elements, possible_types);
+    configuration.initMatchLists(lattice_map, 2);
+    CPPUNIT_ASSERT_EQUAL( customRateKey(3, processes[0], configuration),
+                          hashCustomRateInput(3, processes[0], configuration) );
+
+    // Run a simulation with the hashes updated incrementally.
+    const CountingRateCalculator rate_calculator;
+    const Interactions interactions(processes, true, rate_calculator);
+    SimulationTimer timer;
+    LatticeModel lattice_model(configuration, timer, lattice_map, interactions);
+
+    seedRandom(false, 1371);
+    for (int step = 0; step < 500; ++step)
+    {
+        lattice_model.singleStep();
+    }
+
+    // Setup the hashes from scratch on a copy of the final configuration.
+    Configuration reference(coordinates, configuration.elements(), possible_types);
+    reference.initMatchLists(lattice_map, 2);
+    std::vector<double> cutoffs(2);
+    cutoffs[0] = 1.0;
+    cutoffs[1] = 1.5;
+    reference.initMatchListHashes(cutoffs);
+
+    // The keys agree, and equal environments give equal keys.
+    const int n_sites = static_cast<int>(coordinates.size());
+    for (int i = 0; i < n_sites; ++i)
+    {
+        for (size_t p = 0; p < processes.size(); ++p)
+        {
+            const uint64_t key = customRateKey(i, processes[p], configuration);
+            CPPUNIT_ASSERT_EQUAL( key, customRateKey(i, processes[p], reference) );
+
+            for (int j = 0; j < i; ++j)
+            {
+                if (hashCustomRateInput(i, processes[p], configuration) ==
+                    hashCustomRateInput(j, processes[p], configuration))
+                {
+                    CPPUNIT_ASSERT_EQUAL( key, customRateKey(j, processes[p], configuration) );
+                }
+            }
+        }
+
+        // The keys differ between the processes.
+        CPPUNIT_ASSERT( customRateKey(i, processes[0], configuration) !=
+                        customRateKey(i, processes[1], configuration) );
+    }
+
+    // Setting the MD5 verification mode gives the MD5 hashes.
+    setMD5RateKeys(true);
+    CPPUNIT_ASSERT( md5RateKeys() );
+    CPPUNIT_ASSERT_EQUAL( customRateKey(3, processes[1], configuration),
+                          hashCustomRateInput(3, processes[1], configuration) );
+    setMD5RateKeys(false);
+    CPPUNIT_ASSERT( !md5RateKeys() );
+}
+
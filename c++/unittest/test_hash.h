@@ -27,11 +27,13 @@ public:
     CPPUNIT_TEST( testMD5String );
     CPPUNIT_TEST( test64MD5String );
     CPPUNIT_TEST( testHashCustomRateInput );
+    CPPUNIT_TEST( testCustomRateKey );
     CPPUNIT_TEST_SUITE_END();
 
     void testMD5String();
     void test64MD5String();
     void testHashCustomRateInput();
+    void testCustomRateKey();
 
 };
 
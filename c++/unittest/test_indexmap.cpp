@@ -0,0 +1,189 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_indexmap.h"
+
+// Include the files to test.
+#include "indexmap.h"
+#include "random.h"
+
+#include <map>
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_IndexMap::testConstruction()
+{
+    // Default construction gives an empty map.
+    const IndexMap map;
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), 0 );
+    CPPUNIT_ASSERT_EQUAL( map.find(0), -1 );
+    CPPUNIT_ASSERT_EQUAL( map.find(123), -1 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_IndexMap::testSetAndFind()
+{
+    IndexMap map;
+
+    map.set(3, 0);
+    map.set(11, 1);
+    map.set(0, 2);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), 3 );
+    CPPUNIT_ASSERT_EQUAL( map.find(3), 0 );
+    CPPUNIT_ASSERT_EQUAL( map.find(11), 1 );
+    CPPUNIT_ASSERT_EQUAL( map.find(0), 2 );
+    CPPUNIT_ASSERT_EQUAL( map.find(4), -1 );
+
+    // Overwrite a value.
+    map.set(11, 7);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), 3 );
+    CPPUNIT_ASSERT_EQUAL( map.find(11), 7 );
+
+    // Add enough keys for the map to grow.
+    for (int i = 0; i < 1000; ++i)
+    {
+        map.set(100 + 3*i, i);
+    }
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), 1003 );
+
+    for (int i = 0; i < 1000; ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( map.find(100 + 3*i), i );
+        CPPUNIT_ASSERT_EQUAL( map.find(101 + 3*i), -1 );
+    }
+    CPPUNIT_ASSERT_EQUAL( map.find(3), 0 );
+    CPPUNIT_ASSERT_EQUAL( map.find(11), 7 );
+
+    // Clear.
+    map.clear();
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), 0 );
+    CPPUNIT_ASSERT_EQUAL( map.find(3), -1 );
+    CPPUNIT_ASSERT_EQUAL( map.find(100), -1 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_IndexMap::testErase()
+{
+    IndexMap map;
+
+    for (int i = 0; i < 20; ++i)
+    {
+        map.set(i, 2*i);
+    }
+
+    // Erase every other key.
+    for (int i = 0; i < 20; i += 2)
+    {
+        map.erase(i);
+    }
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), 10 );
+
+    for (int i = 0; i < 20; ++i)
+    {
+        const int ref = (i % 2 == 0) ? -1 : 2*i;
+        CPPUNIT_ASSERT_EQUAL( map.find(i), ref );
+    }
+
+    // Erasing a key not in the map does nothing.
+    map.erase(0);
+    map.erase(1000);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), 10 );
+
+    // Erased keys can be added again.
+    map.set(4, 3);
+    CPPUNIT_ASSERT_EQUAL( map.find(4), 3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), 11 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_IndexMap::testRandomOperations()
+{
+    // Compare against std::map for a long random sequence of operations
+    // on a small key range, to get many collisions and removals.
+    seedRandom(false, 3719);
+
+    IndexMap map;
+    std::map<int, int> ref;
+
+    for (int i = 0; i < 20000; ++i)
+    {
+        const int key = static_cast<int>(randomDouble01() * 200);
+
+        if (randomDouble01() < 0.5)
+        {
+            map.set(key, i);
+            ref[key] = i;
+        }
+        else
+        {
+            map.erase(key);
+            ref.erase(key);
+        }
+
+        CPPUNIT_ASSERT_EQUAL( map.size(), ref.size() );
+    }
+
+    for (int key = 0; key < 200; ++key)
+    {
+        const std::map<int, int>::const_iterator it = ref.find(key);
+        const int value = (it == ref.end()) ? -1 : it->second;
+        CPPUNIT_ASSERT_EQUAL( map.find(key), value );
+    }
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_IndexMap::testStridedKeys()
+{
+    // Keys with power of two strides, as for processes on one basis site
+    // or one layer of the lattice.
+    const int n_keys = 20000;
+    const int strides[] = {1, 64, 1024, 4096};
+
+    for (size_t s = 0; s < sizeof(strides)/sizeof(int); ++s)
+    {
+        const int stride = strides[s];
+        IndexMap map;
+
+        for (int i = 0; i < n_keys; ++i)
+        {
+            map.set(i*stride, i);
+        }
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), n_keys );
+
+        for (int i = 0; i < n_keys; ++i)
+        {
+            CPPUNIT_ASSERT_EQUAL( map.find(i*stride), i );
+            if (stride > 1)
+            {
+                CPPUNIT_ASSERT_EQUAL( map.find(i*stride + 1), -1 );
+            }
+        }
+
+        // Remove every other key.
+        for (int i = 0; i < n_keys; i += 2)
+        {
+            map.erase(i*stride);
+        }
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(map.size()), n_keys/2 );
+
+        for (int i = 0; i < n_keys; ++i)
+        {
+            CPPUNIT_ASSERT_EQUAL( map.find(i*stride), (i % 2 == 0) ? -1 : i );
+        }
+    }
+}
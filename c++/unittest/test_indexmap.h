@@ -0,0 +1,43 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+#ifndef __TEST_INDEXMAP__
+#define __TEST_INDEXMAP__
+
+#include <iostream>
+#include <string>
+
+#include <cppunit/TestCase.h>
+#include <cppunit/TestSuite.h>
+#include <cppunit/TestCaller.h>
+#include <cppunit/TestRunner.h>
+
+#include <cppunit/extensions/HelperMacros.h>
+
+class Test_IndexMap : public CppUnit::TestCase {
+
+public:
+
+    CPPUNIT_TEST_SUITE( Test_IndexMap );
+    CPPUNIT_TEST( testConstruction );
+    CPPUNIT_TEST( testSetAndFind );
+    CPPUNIT_TEST( testErase );
+    CPPUNIT_TEST( testRandomOperations );
+    CPPUNIT_TEST( testStridedKeys );
+    CPPUNIT_TEST_SUITE_END();
+
+    void testConstruction();
+    void testSetAndFind();
+    void testErase();
+    void testRandomOperations();
+    void testStridedKeys();
+
+};
+
+#endif
+
@@ -18,6 +18,9 @@
 #include "latticemap.h"
 #include "ratecalculator.h"
 
+#include <stdexcept>
+
+
 // -------------------------------------------------------------------------- //
 //
 void Test_Interactions::testConstruction()
@@ -467,6 +470,200 @@ void Test_Interactions::testUpdateAndPickCustom()
 }
 
 
+// -------------------------------------------------------------------------- //
+//
+void Test_Interactions::testSelectionType()
+{
+    // Setup a list of custom rate processes.
+    std::vector<CustomRateProcess> processes;
+
+    std::vector<std::vector<std::string> > process_elements1(1);
+    process_elements1[0] = std::vector<std::string>(1, "A");
+
+    std::vector<std::vector<std::string> > process_elements2(1);
+    process_elements2[0] = std::vector<std::string>(1, "B");
+
+    std::vector<std::vector<double> > process_coordinates(1, std::vector<double>(3, 0.0));
+
+    std::map<std::string, int> possible_types;
+    possible_types["A"] = 0;
+    possible_types["B"] = 1;
+
+    const double rate = 1.0/13.7;
+    Configuration c1(process_coordinates, process_elements1, possible_types);
+    Configuration c2(process_coordinates, process_elements2, possible_types);
+    std::vector<int> sites_vector(1,0);
+    for (int i = 0; i < 5; ++i)
+    {
+        processes.push_back(CustomRateProcess(c1,c2,rate,sites_vector, 1.0));
+    }
+
+    // Total rates 3, 0, 1, 0, 4.
+    processes[0].addSite(12,  1.0, 1.0);
+    processes[0].addSite(123, 2.0, 1.0);
+    processes[2].addSite(19,  1.0, 1.0);
+    processes[4].addSite(992, 4.0, 1.0);
+
+    RateCalculator rc;
+    Interactions interactions(processes, true, rc);
+
+    // The default is to use the sum tree.
+    CPPUNIT_ASSERT_EQUAL( interactions.selectionType(), TREE );
+
+    interactions.updateProbabilityTable();
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( interactions.totalRate(), 8.0, 1.0e-14 );
+
+    // Change two processes and register only these for an update.
+    interactions.processes()[0]->removeSite(12);
+    interactions.processes()[3]->addSite(7, 9.0, 1.0);
+    interactions.registerProcessUpdate(0);
+    interactions.registerProcessUpdate(3);
+    interactions.registerProcessUpdate(3);
+    interactions.updateProbabilityTable();
+
+    // Total rates 2, 0, 1, 9, 4.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( interactions.totalRate(), 16.0, 1.0e-14 );
+
+    seedRandom(false, 131);
+    std::vector<int> picked(5,0);
+    const int n_loop = 1000000;
+    for (int i = 0; i < n_loop; ++i)
+    {
+        ++picked[interactions.pickProcessIndex()];
+    }
+
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked[0]/n_loop, 2.0/16.0, 1.0e-2 );
+    CPPUNIT_ASSERT_EQUAL( picked[1], 0 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked[2]/n_loop, 1.0/16.0, 1.0e-2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked[3]/n_loop, 9.0/16.0, 1.0e-2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked[4]/n_loop, 4.0/16.0, 1.0e-2 );
+
+    // Pick a sequence of processes with the sum tree.
+    seedRandom(false, 87);
+    std::vector<int> tree_picks(1000);
+    for (size_t i = 0; i < tree_picks.size(); ++i)
+    {
+        tree_picks[i] = interactions.pickProcessIndex();
+    }
+
+    // Switch to the linear table and check that it is up to date.
+    interactions.setSelectionType(LINEAR);
+    CPPUNIT_ASSERT_EQUAL( interactions.selectionType(), LINEAR );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( interactions.totalRate(), 16.0, 1.0e-14 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( interactions.probabilityTable()[3].first, 12.0, 1.0e-14 );
+
+    // The same random numbers give the same processes with both methods.
+    seedRandom(false, 87);
+    for (size_t i = 0; i < tree_picks.size(); ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( interactions.pickProcessIndex(), tree_picks[i] );
+    }
+
+    // DONE
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Interactions::testSelectionTypeCompositionRejection()
+{
+    // Setup a list of custom rate processes.
+    std::vector<CustomRateProcess> processes;
+
+    std::vector<std::vector<std::string> > process_elements1(1);
+    process_elements1[0] = std::vector<std::string>(1, "A");
+
+    std::vector<std::vector<std::string> > process_elements2(1);
+    process_elements2[0] = std::vector<std::string>(1, "B");
+
+    std::vector<std::vector<double> > process_coordinates(1, std::vector<double>(3, 0.0));
+
+    std::map<std::string, int> possible_types;
+    possible_types["A"] = 0;
+    possible_types["B"] = 1;
+
+    const double rate = 1.0/13.7;
+    Configuration c1(process_coordinates, process_elements1, possible_types);
+    Configuration c2(process_coordinates, process_elements2, possible_types);
+    std::vector<int> sites_vector(1,0);
+    for (int i = 0; i < 3; ++i)
+    {
+        processes.push_back(CustomRateProcess(c1,c2,rate,sites_vector, 1.0));
+    }
+
+    // Site rates spanning several orders of magnitude.
+    processes[0].addSite(12,  1.0e-3, 1.0);
+    processes[0].addSite(123, 3.0,    1.0);
+    processes[2].addSite(19,  1.0e3,  1.0);
+
+    RateCalculator rc;
+    Interactions interactions(processes, true, rc);
+
+    // Switching the selection type builds the event bins from all processes.
+    interactions.setSelectionType(COMPOSITION_REJECTION);
+    CPPUNIT_ASSERT_EQUAL( interactions.selectionType(), COMPOSITION_REJECTION );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( interactions.totalRate(), 1003.001, 1.0e-10 );
+
+    // Change the sites and register the changed events.
+    interactions.processes()[2]->removeSite(19);
+    interactions.processes()[1]->addSite(7, 4.0, 1.0);
+    interactions.processes()[0]->updateSite(12, 1.0, 2.0);
+    interactions.registerSiteUpdate(2, 19);
+    interactions.registerSiteUpdate(1, 7);
+    interactions.registerSiteUpdate(0, 12);
+    interactions.updateProbabilityTable();
+
+    // Event rates 2, 3, 4.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( interactions.totalRate(), 9.0, 1.0e-12 );
+
+    // Pick processes and sites together.
+    seedRandom(false, 131);
+    int picked12  = 0;
+    int picked123 = 0;
+    int picked7   = 0;
+    const int n_loop = 1000000;
+    for (int i = 0; i < n_loop; ++i)
+    {
+        int site = -1;
+        const Process* process = interactions.pickProcessAndSite(site);
+
+        if (site == 12 && process == interactions.processes()[0])
+        {
+            ++picked12;
+        }
+        else if (site == 123 && process == interactions.processes()[0])
+        {
+            ++picked123;
+        }
+        else if (site == 7 && process == interactions.processes()[1])
+        {
+            ++picked7;
+        }
+    }
+
+    CPPUNIT_ASSERT_EQUAL( picked12 + picked123 + picked7, n_loop );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked12/n_loop,  2.0/9.0, 1.0e-2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked123/n_loop, 3.0/9.0, 1.0e-2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0*picked7/n_loop,   4.0/9.0, 1.0e-2 );
+
+    // Without registered updates the bins are not rebuilt.
+    interactions.processes()[2]->addSite(21, 5.0, 1.0);
+    interactions.updateProbabilityTable();
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( interactions.totalRate(), 9.0, 1.0e-12 );
+
+    // Clearing the matching rebuilds the bins at the next update.
+    interactions.clearMatching();
+    interactions.updateProbabilityTable();
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( interactions.totalRate(), 0.0, 1.0e-12 );
+
+    // No events left to pick.
+    int site = -1;
+    CPPUNIT_ASSERT_THROW( interactions.pickProcessAndSite(site), std::runtime_error );
+
+    // DONE
+}
+
+
 // -------------------------------------------------------------------------- //
 //
 void Test_Interactions::testMaxRange()
@@ -590,6 +787,12 @@ void Test_Interactions::testMaxRange()
     const Interactions interactions7(processes, true);
     CPPUNIT_ASSERT_EQUAL( interactions7.maxRange(), 4 );
 
+    // The distinct ranges are 1 and 4.
+    const std::vector<int> ranges = interactions7.processRanges();
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(ranges.size()), 2 );
+    CPPUNIT_ASSERT_EQUAL( ranges[0], 1 );
+    CPPUNIT_ASSERT_EQUAL( ranges[1], 4 );
+
 }
 
 
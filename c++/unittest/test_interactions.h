@@ -28,6 +28,8 @@ public:
     CPPUNIT_TEST( testQuery );
     CPPUNIT_TEST( testUpdateAndPick );
     CPPUNIT_TEST( testUpdateAndPickCustom );
+    CPPUNIT_TEST( testSelectionType );
+    CPPUNIT_TEST( testSelectionTypeCompositionRejection );
     CPPUNIT_TEST( testMaxRange );
     CPPUNIT_TEST( testUpdateProcessMatchLists );
     CPPUNIT_TEST( testUpdateProcessIDMoves );
@@ -38,6 +40,8 @@ public:
     void testQuery();
     void testUpdateAndPick();
     void testUpdateAndPickCustom();
+    void testSelectionType();
+    void testSelectionTypeCompositionRejection();
     void testMaxRange();
     void testUpdateProcessMatchLists();
     void testUpdateProcessIDMoves();
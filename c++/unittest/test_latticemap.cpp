@@ -665,6 +665,14 @@ void Test_LatticeMap::testSupersetNeighbourIndices()
     CPPUNIT_ASSERT_EQUAL( neighbours_idx014[12], neighbours_idx01[8]);
     CPPUNIT_ASSERT_EQUAL( neighbours_idx014[13], neighbours_idx01[9]);
 
+    // The same with the out vector versions, reusing the storage.
+    std::vector<int> out(100, -1);
+    map.supersetNeighbourIndices(indices, shells, out);
+    CPPUNIT_ASSERT( out == neighbours_idx014 );
+
+    map.neighbourIndices(4, shells, out);
+    CPPUNIT_ASSERT( out == map.neighbourIndices(4, shells) );
+
     // DONE
 }
 
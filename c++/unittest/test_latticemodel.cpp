@@ -16,10 +16,13 @@
 #include "configuration.h"
 #include "latticemap.h"
 #include "interactions.h"
+#include "customrateprocess.h"
+#include "ratecalculator.h"
 #include "random.h"
 #include "simulationtimer.h"
 
 #include <ctime>
+#include <algorithm>
 
 // -------------------------------------------------------------------------- //
 //
@@ -462,6 +465,294 @@ void Test_LatticeModel::testSingleStepFunction()
     }
 }
 
+
+// -------------------------------------------------------------------------- //
+//
+void Test_LatticeModel::testSingleStepProcessRanges()
+{
+    // Setup a system with processes of range one and two and check that
+    // re-matching each process within its own range after every step gives
+    // the same matching as a full matching of the new configuration.
+    const int nI = 12;
+    const int nJ = 5;
+    const int nK = 5;
+
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+
+    for (int i = 0; i < nI; ++i)
+    {
+        for (int j = 0; j < nJ; ++j)
+        {
+            for (int k = 0; k < nK; ++k)
+            {
+                std::vector<double> c(3);
+                c[0] = i;
+                c[1] = j;
+                c[2] = k;
+                coordinates.push_back(c);
+                const std::string element = ((i*7 + j*3 + k) % 3 == 0) ? "A" : "B";
+                elements.push_back(std::vector<std::string>(1, element));
+            }
+        }
+    }
+
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    std::vector<int> repetitions(3);
+    repetitions[0] = nI;
+    repetitions[1] = nJ;
+    repetitions[2] = nK;
+    const std::vector<bool> periodicity(3, true);
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    // Swap an A with a B at distance one or two in the x direction.
+    std::vector<Process> processes;
+    const std::vector<int> basis_sites(1, 0);
+    const double distances[3] = {1.0, -1.0, 2.0};
+
+    for (int p = 0; p < 3; ++p)
+    {
+        std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+        process_coordinates[1][0] = distances[p];
+
+        std::vector<std::vector<std::string> > process_elements1(2, std::vector<std::string>(1, "A"));
+        process_elements1[1][0] = "B";
+        std::vector<std::vector<std::string> > process_elements2(2, std::vector<std::string>(1, "B"));
+        process_elements2[1][0] = "A";
+
+        const Configuration c1(process_coordinates, process_elements1, possible_types);
+        const Configuration c2(process_coordinates, process_elements2, possible_types);
+        processes.push_back(Process(c1, c2, 1.0 + p, basis_sites));
+    }
+
+    CPPUNIT_ASSERT_EQUAL( processes[0].range(), 1 );
+    CPPUNIT_ASSERT_EQUAL( processes[2].range(), 2 );
+
+    const Interactions interactions(processes, true);
+    Configuration configuration(coordinates, elements, possible_types);
+    SimulationTimer timer;
+    LatticeModel lattice_model(configuration, timer, lattice_map, interactions);
+
+    seedRandom(false, 8743);
+
+    for (int step = 0; step < 50; ++step)
+    {
+        lattice_model.singleStep();
+
+        // Match the new configuration from scratch.
+        const Interactions ref_interactions(processes, true);
+        Configuration ref_configuration(coordinates, configuration.elements(), possible_types);
+        SimulationTimer ref_timer;
+        const LatticeModel ref_model(ref_configuration, ref_timer, lattice_map, ref_interactions);
+
+        for (size_t p = 0; p < processes.size(); ++p)
+        {
+            std::vector<int> sites = lattice_model.interactions().processes()[p]->sites();
+            std::vector<int> ref_sites = ref_model.interactions().processes()[p]->sites();
+            std::sort(sites.begin(), sites.end());
+            std::sort(ref_sites.begin(), ref_sites.end());
+            CPPUNIT_ASSERT( sites == ref_sites );
+        }
+    }
+}
+
+// -------------------------------------------------------------------------- //
+// A rate calculator depending on the number of A in the local geometry.
+class CountingRateCalculator : public RateCalculator {
+
+public:
+
+    virtual double backendRateCallback(const std::vector<double> & geometry,
+                                       const int len,
+                                       const std::vector<std::string> & types_before,
+                                       const std::vector<std::string> & types_after,
+                                       const double rate_constant,
+                                       const int process_number,
+                                       const double global_x,
+                                       const double global_y,
+                                       const double global_z) const override
+    {
+        return rate_constant * (1.0 + std::count(types_before.begin(), types_before.end(), "A"));
+    }
+
+};
+
+
+// -------------------------------------------------------------------------- //
+// Setup a periodic chain of A and B, with processes moving an A to the right
+// and to the left. Only the rates of the first process are cached.
+static LatticeMap setupChain(std::vector<std::vector<double> > & coordinates,
+                             std::vector<std::vector<std::string> > & elements,
+                             std::map<std::string, int> & possible_types,
+                             std::vector<CustomRateProcess> & processes)
+{
+    const int nI = 40;
+    for (int i = 0; i < nI; ++i)
+    {
+        std::vector<double> c(3, 0.0);
+        c[0] = i;
+        coordinates.push_back(c);
+        elements.push_back(std::vector<std::string>(1, (i % 3 == 0) ? "A" : "B"));
+    }
+
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    const std::vector<int> basis_sites(1, 0);
+    for (int p = 0; p < 2; ++p)
+    {
+        std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+        process_coordinates[1][0] = (p == 0) ? 1.0 : -1.0;
+        std::vector<std::vector<std::string> > elements1(2, std::vector<std::string>(1, "A"));
+        elements1[1][0] = "B";
+        std::vector<std::vector<std::string> > elements2(2, std::vector<std::string>(1, "B"));
+        elements2[1][0] = "A";
+        const Configuration config1(process_coordinates, elements1, possible_types);
+        const Configuration config2(process_coordinates, elements2, possible_types);
+        processes.push_back(CustomRateProcess(config1, config2, 1.0, basis_sites, 2.0,
+                                              std::vector<int>(0), std::vector<Coordinate>(0),
+                                              p, (p == 0)));
+    }
+
+    std::vector<int> repetitions(3, 1);
+    repetitions[0] = nI;
+    std::vector<bool> periodicity(3, false);
+    periodicity[0] = true;
+    return LatticeMap(1, repetitions, periodicity);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_LatticeModel::testRateStatistics()
+{
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    std::map<std::string, int> possible_types;
+    std::vector<CustomRateProcess> processes;
+    const LatticeMap lattice_map = setupChain(coordinates, elements, possible_types, processes);
+
+    const CountingRateCalculator rate_calculator;
+    const Interactions interactions(processes, true, rate_calculator);
+    Configuration configuration(coordinates, elements, possible_types);
+    SimulationTimer timer;
+    LatticeModel lattice_model(configuration, timer, lattice_map, interactions);
+
+    // All rates of the initial matching were calculated, since the rates
+    // are stored after all lookups. The process that is not cached is
+    // never looked up.
+    const RateStatistics & statistics = lattice_model.rateStatistics();
+    const RateTable & rate_table = lattice_model.rateTable();
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups().size(), static_cast<size_t>(2) );
+    CPPUNIT_ASSERT( statistics.lookups()[0] > 0 );
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups()[1], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[0], statistics.lookups()[0] );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[1], statistics.callbacks()[0] );
+    for (int p = 0; p < 2; ++p)
+    {
+        CPPUNIT_ASSERT_EQUAL( statistics.hits()[p], 0l );
+        CPPUNIT_ASSERT( statistics.callbackTimes()[p] >= 0.0 );
+    }
+
+    // Only the rates of the cached process were stored.
+    CPPUNIT_ASSERT_EQUAL( statistics.inserts()[0], statistics.callbacks()[0] );
+    CPPUNIT_ASSERT_EQUAL( statistics.inserts()[1], 0l );
+
+    // The rate table counted the same, with one insert per distinct environment.
+    CPPUNIT_ASSERT_EQUAL( rate_table.lookups(), statistics.lookups()[0] );
+    CPPUNIT_ASSERT_EQUAL( rate_table.hits(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rate_table.misses(), rate_table.lookups() );
+    CPPUNIT_ASSERT( rate_table.inserts() > 0 );
+    CPPUNIT_ASSERT( rate_table.inserts() < statistics.inserts()[0] );
+    CPPUNIT_ASSERT_EQUAL( rate_table.evictions(), 0l );
+    CPPUNIT_ASSERT_EQUAL( static_cast<long>(rate_table.size()), rate_table.inserts() );
+
+    // Reset.
+    lattice_model.resetRateStatistics();
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups()[0], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[1], 0l );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( statistics.callbackTimes()[0], 0.0, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( rate_table.lookups(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rate_table.inserts(), 0l );
+
+    // Steps continue to count.
+    seedRandom(false, 2931);
+    for (int step = 0; step < 50; ++step)
+    {
+        lattice_model.singleStep();
+    }
+    CPPUNIT_ASSERT( statistics.lookups()[0] > 0 );
+    CPPUNIT_ASSERT( statistics.hits()[0] > 0 );
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups()[1], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.hits()[1], 0l );
+    CPPUNIT_ASSERT( statistics.callbacks()[1] > 0 );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[0] + statistics.hits()[0], statistics.lookups()[0] );
+    CPPUNIT_ASSERT_EQUAL( rate_table.lookups(), statistics.lookups()[0] );
+    CPPUNIT_ASSERT_EQUAL( rate_table.hits(), statistics.hits()[0] );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_LatticeModel::testPreloadedRates()
+{
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    std::map<std::string, int> possible_types;
+    std::vector<CustomRateProcess> processes;
+    const LatticeMap lattice_map = setupChain(coordinates, elements, possible_types, processes);
+
+    const CountingRateCalculator rate_calculator;
+    const Interactions interactions(processes, true, rate_calculator);
+
+    // Run a first model.
+    Configuration configuration1(coordinates, elements, possible_types);
+    SimulationTimer timer1;
+    LatticeModel lattice_model1(configuration1, timer1, lattice_map, interactions);
+    CPPUNIT_ASSERT( lattice_model1.rateStatistics().callbacks()[0] > 0 );
+
+    // A second model starting from the rates of the first does not
+    // calculate any rates of the cached process in the initial matching.
+    Configuration configuration2(coordinates, elements, possible_types);
+    SimulationTimer timer2;
+    LatticeModel lattice_model2(configuration2, timer2, lattice_map, interactions,
+                                lattice_model1.rateTable());
+
+    const RateStatistics & statistics = lattice_model2.rateStatistics();
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[0], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.hits()[0], statistics.lookups()[0] );
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups()[1], 0l );
+    CPPUNIT_ASSERT( statistics.callbacks()[1] > 0 );
+    CPPUNIT_ASSERT_EQUAL( lattice_model2.rateTable().size(), lattice_model1.rateTable().size() );
+
+    // With the same rates.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( lattice_model2.interactions().totalRate(),
+                                  lattice_model1.interactions().totalRate(),
+                                  1.0e-10 );
+
+    // Rates preloaded after the setup are picked up by re-matching.
+    Configuration configuration3(coordinates, elements, possible_types);
+    SimulationTimer timer3;
+    LatticeModel lattice_model3(configuration3, timer3, lattice_map, interactions);
+    lattice_model3.resetRateStatistics();
+    lattice_model3.preloadRates(lattice_model1.rateTable());
+
+    const RateStatistics & statistics3 = lattice_model3.rateStatistics();
+    CPPUNIT_ASSERT( statistics3.lookups()[0] > 0 );
+    CPPUNIT_ASSERT_EQUAL( statistics3.callbacks()[0], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics3.hits()[0], statistics3.lookups()[0] );
+    CPPUNIT_ASSERT_EQUAL( lattice_model3.rateTable().size(), lattice_model1.rateTable().size() );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( lattice_model3.interactions().totalRate(),
+                                  lattice_model1.interactions().totalRate(),
+                                  1.0e-10 );
+}
+
+
 // -------------------------------------------------------------------------- //
 //
 void Test_LatticeModel::testTiming()
@@ -27,12 +27,18 @@ public:
     CPPUNIT_TEST( testConstruction );
     CPPUNIT_TEST( testSetupAndQuery );
     CPPUNIT_TEST( testSingleStepFunction );
+    CPPUNIT_TEST( testSingleStepProcessRanges );
+    CPPUNIT_TEST( testRateStatistics );
+    CPPUNIT_TEST( testPreloadedRates );
     //CPPUNIT_TEST( testTiming );
     CPPUNIT_TEST_SUITE_END();
 
     void testConstruction();
     void testSetupAndQuery();
     void testSingleStepFunction();
+    void testSingleStepProcessRanges();
+    void testRateStatistics();
+    void testPreloadedRates();
     void testTiming();
 
 };
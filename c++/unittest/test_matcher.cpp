@@ -1555,12 +1555,138 @@ void Test_Matcher::testCalculateMatchingInteractions()
 
 }
 
+// -------------------------------------------------------------------------- //
+//
+void Test_Matcher::testCalculateMatchingCandidates()
+{
+    // Test that only processes matching the central type are tried, and
+    // that processes are removed when the central type changes.
+
+    // Test with and without the match trees, which must give the same result.
+    for (int t = 0; t < 2; ++t)
+    {
+        const bool use_match_trees = (t == 0);
+
+        // A periodic chain of six sites.
+        std::vector<std::vector<double> > coords;
+        std::vector<std::vector<std::string> > elements;
+        const std::string chain[6] = {"A", "B", "B", "A", "B", "B"};
+        for (int i = 0; i < 6; ++i)
+        {
+            coords.push_back(std::vector<double>(3, 0.0));
+            coords[i][0] = i;
+            elements.push_back(std::vector<std::string>(1, chain[i]));
+        }
+
+        std::map<std::string, int> possible_types;
+        possible_types["*"] = 0;
+        possible_types["A"] = 1;
+        possible_types["B"] = 2;
+
+        Configuration config(coords, elements, possible_types);
+
+        std::vector<int> repetitions(3, 1);
+        repetitions[0] = 6;
+        std::vector<bool> periodicity(3, false);
+        periodicity[0] = true;
+        const LatticeMap lattice_map(1, repetitions, periodicity);
+        config.initMatchLists(lattice_map, 1);
+
+        // The processes.
+        std::vector<Process> processes;
+        const std::vector<int> basis_sites(1, 0);
+        const double rate = 1.0;
+
+        {
+            // A -> B.
+            const std::vector<std::vector<double> > process_coords(1, std::vector<double>(3, 0.0));
+            const Configuration config1(process_coords, std::vector<std::vector<std::string> >(1, std::vector<std::string>(1, "A")), possible_types);
+            const Configuration config2(process_coords, std::vector<std::vector<std::string> >(1, std::vector<std::string>(1, "B")), possible_types);
+            processes.push_back(Process(config1, config2, rate, basis_sites));
+        }
+        {
+            // B -> A.
+            const std::vector<std::vector<double> > process_coords(1, std::vector<double>(3, 0.0));
+            const Configuration config1(process_coords, std::vector<std::vector<std::string> >(1, std::vector<std::string>(1, "B")), possible_types);
+            const Configuration config2(process_coords, std::vector<std::vector<std::string> >(1, std::vector<std::string>(1, "A")), possible_types);
+            processes.push_back(Process(config1, config2, rate, basis_sites));
+        }
+        {
+            // B with an A to the right -> A.
+            std::vector<std::vector<double> > process_coords(2, std::vector<double>(3, 0.0));
+            process_coords[1][0] = 1.0;
+            std::vector<std::vector<std::string> > elements1(2, std::vector<std::string>(1, "A"));
+            elements1[0][0] = "B";
+            const std::vector<std::vector<std::string> > elements2(2, std::vector<std::string>(1, "A"));
+            const Configuration config1(process_coords, elements1, possible_types);
+            const Configuration config2(process_coords, elements2, possible_types);
+            processes.push_back(Process(config1, config2, rate, basis_sites));
+        }
+
+        Interactions interactions(processes, true);
+        interactions.updateProcessMatchLists(config, lattice_map);
+
+        // Match all indices.
+        Matcher m(6, 3);
+        m.setUseMatchTrees(use_match_trees);
+        CPPUNIT_ASSERT_EQUAL( m.useMatchTrees(), use_match_trees );
+        std::vector<int> indices;
+        for (int i = 0; i < 6; ++i)
+        {
+            indices.push_back(i);
+        }
+        m.calculateMatching(interactions, config, lattice_map, indices);
+
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(interactions.processes()[0]->nSites()), 2 );
+        CPPUNIT_ASSERT( interactions.processes()[0]->isListed(0) );
+        CPPUNIT_ASSERT( interactions.processes()[0]->isListed(3) );
+
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(interactions.processes()[1]->nSites()), 4 );
+        CPPUNIT_ASSERT( !interactions.processes()[1]->isListed(0) );
+        CPPUNIT_ASSERT( !interactions.processes()[1]->isListed(3) );
+
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(interactions.processes()[2]->nSites()), 2 );
+        CPPUNIT_ASSERT( interactions.processes()[2]->isListed(2) );
+        CPPUNIT_ASSERT( interactions.processes()[2]->isListed(5) );
+
+        // Swap the types at index 2 and 3 and rematch the affected region.
+        elements[2] = std::vector<std::string>(1, "A");
+        elements[3] = std::vector<std::string>(1, "B");
+        config = Configuration(coords, elements, possible_types);
+        config.initMatchLists(lattice_map, 1);
+
+        indices.clear();
+        indices.push_back(1);
+        indices.push_back(2);
+        indices.push_back(3);
+        indices.push_back(4);
+        m.calculateMatching(interactions, config, lattice_map, indices);
+
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(interactions.processes()[0]->nSites()), 2 );
+        CPPUNIT_ASSERT( interactions.processes()[0]->isListed(0) );
+        CPPUNIT_ASSERT( interactions.processes()[0]->isListed(2) );
+
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(interactions.processes()[1]->nSites()), 4 );
+        CPPUNIT_ASSERT( interactions.processes()[1]->isListed(1) );
+        CPPUNIT_ASSERT( interactions.processes()[1]->isListed(3) );
+        CPPUNIT_ASSERT( interactions.processes()[1]->isListed(4) );
+        CPPUNIT_ASSERT( interactions.processes()[1]->isListed(5) );
+
+        CPPUNIT_ASSERT_EQUAL( static_cast<int>(interactions.processes()[2]->nSites()), 2 );
+        CPPUNIT_ASSERT( interactions.processes()[2]->isListed(1) );
+        CPPUNIT_ASSERT( interactions.processes()[2]->isListed(5) );
+    }
+
+    // DONE
+}
+
+
 // -------------------------------------------------------------------------- //
 // This proxy class is needed for the UpdateRates test below.
 class CustRateCalc : public RateCalculator {
 public:
     virtual ~CustRateCalc() {}
-    virtual double backendRateCallback(const std::vector<double> geometry,
+    virtual double backendRateCallback(const std::vector<double> & geometry,
                                        const int len,
                                        const std::vector<std::string> & types_before,
                                        const std::vector<std::string> & types_after,
@@ -1568,7 +1694,7 @@ public:
                                        const int process_number,
                                        const double global_x,
                                        const double global_y,
-                                       const double global_z) const
+                                       const double global_z) const override
         {
             // Return.
             return std::sqrt(rate_constant);
@@ -1671,6 +1797,14 @@ void Test_Matcher::testUpdateRates()
     // Check that the rates were correctly updated.
     CPPUNIT_ASSERT_DOUBLES_EQUAL( rates[0], std::sqrt(ref_rate1), 1.0e-12 );
     CPPUNIT_ASSERT_DOUBLES_EQUAL( rates[1], std::sqrt(ref_rate2), 1.0e-12 );
+
+    // Check that the callbacks were counted per process.
+    const RateStatistics & statistics = m.rateStatistics();
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[0], 1l );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[1], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[3], 1l );
+    CPPUNIT_ASSERT( statistics.callbackTimes()[0] >= 0.0 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( statistics.callbackTimes()[1], 0.0, 1.0e-12 );
 }
 
 
@@ -1680,7 +1814,7 @@ class CustomRateCalculator : public RateCalculator {
 public:
     CustomRateCalculator() {}
     virtual ~CustomRateCalculator() {}
-    virtual double backendRateCallback(const std::vector<double> geometry,
+    virtual double backendRateCallback(const std::vector<double> & geometry,
                                        const int len,
                                        const std::vector<std::string> & types_before,
                                        const std::vector<std::string> & types_after,
@@ -1688,7 +1822,7 @@ public:
                                        const int process_number,
                                        const double global_x,
                                        const double global_y,
-                                       const double global_z) const
+                                       const double global_z) const override
         {
             // Test the geometry.
             CPPUNIT_ASSERT_DOUBLES_EQUAL( geometry[0], 0.0, 1.0e-12 );
@@ -1719,6 +1853,235 @@ public:
         }
 };
 
+// -------------------------------------------------------------------------- //
+// This proxy class is part of the UpdateSingleRate test below.
+class TypeNumbersRateCalculator : public RateCalculator {
+public:
+    TypeNumbersRateCalculator() {}
+    virtual ~TypeNumbersRateCalculator() {}
+    virtual bool typeNumbers() const override { return true; }
+    virtual double backendRateCallbackTypeNumbers(const std::vector<double> & geometry,
+                                                  const int len,
+                                                  const std::vector<int> & types_before,
+                                                  const std::vector<int> & types_after,
+                                                  const std::vector<std::string> & type_names,
+                                                  const double rate_constant,
+                                                  const int process_number,
+                                                  const double global_x,
+                                                  const double global_y,
+                                                  const double global_z) const override
+        {
+            // Test the geometry.
+            CPPUNIT_ASSERT_EQUAL( static_cast<int>(geometry.size()), 6 );
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( geometry[3], 0.5, 1.0e-12 );
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( geometry[4], 0.5, 1.0e-12 );
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( geometry[5], 0.5, 1.0e-12 );
+            CPPUNIT_ASSERT_EQUAL(len, 2);
+
+            // Test the type numbers, B -> C and A -> A.
+            CPPUNIT_ASSERT_EQUAL(static_cast<int>(types_before.size()), 2);
+            CPPUNIT_ASSERT_EQUAL(types_before[0], 2);
+            CPPUNIT_ASSERT_EQUAL(types_before[1], 1);
+            CPPUNIT_ASSERT_EQUAL(static_cast<int>(types_after.size()), 2);
+            CPPUNIT_ASSERT_EQUAL(types_after[0], 3);
+            CPPUNIT_ASSERT_EQUAL(types_after[1], 1);
+
+            // Test the names.
+            CPPUNIT_ASSERT_EQUAL(type_names[types_before[0]], std::string("B"));
+            CPPUNIT_ASSERT_EQUAL(type_names[types_after[0]], std::string("C"));
+
+            CPPUNIT_ASSERT_EQUAL( process_number, 917 );
+
+            return std::pow(rate_constant,2.71828);
+        }
+};
+
+// -------------------------------------------------------------------------- //
+// A rate calculator giving the same rates with single and batch calls.
+class BatchRateCalc : public RateCalculator {
+public:
+    BatchRateCalc(const bool batch, const std::map<std::string, int> & possible_types) :
+        batch_(batch),
+        possible_types_(possible_types),
+        n_batch_calls_(0)
+    {}
+
+    virtual ~BatchRateCalc() {}
+
+    virtual bool batchRates() const override { return batch_; }
+
+    virtual double backendRateCallback(const std::vector<double> & geometry,
+                                       const int len,
+                                       const std::vector<std::string> & types_before,
+                                       const std::vector<std::string> & types_after,
+                                       const double rate_constant,
+                                       const int process_number,
+                                       const double global_x,
+                                       const double global_y,
+                                       const double global_z) const override
+        {
+            double rate = rate_constant + 100.0*len + global_x + 2.0*global_y + 3.0*global_z;
+            for (int i = 0; i < len; ++i)
+            {
+                rate += (i+1)*(geometry[3*i] + 2.0*geometry[3*i+1] + 3.0*geometry[3*i+2]);
+                rate += 0.01*possible_types_.find(types_before[i])->second;
+                rate += 0.001*possible_types_.find(types_after[i])->second;
+            }
+            return rate;
+        }
+
+    virtual std::vector<double> backendRateCallbackBatch(const std::vector<double> & geometries,
+                                                         const int max_len,
+                                                         const std::vector<int> & lengths,
+                                                         const std::vector<int> & types_before,
+                                                         const std::vector<int> & types_after,
+                                                         const std::vector<std::string> & type_names,
+                                                         const std::vector<double> & rate_constants,
+                                                         const std::vector<int> & process_numbers,
+                                                         const std::vector<double> & global_coordinates) const override
+        {
+            ++n_batch_calls_;
+            std::vector<double> rates(lengths.size());
+            for (size_t b = 0; b < lengths.size(); ++b)
+            {
+                const int len = lengths[b];
+                double rate = rate_constants[b] + 100.0*len + global_coordinates[3*b] \
+                    + 2.0*global_coordinates[3*b+1] + 3.0*global_coordinates[3*b+2];
+                for (int i = 0; i < max_len; ++i)
+                {
+                    const double* c = &geometries[3*(b*max_len + i)];
+                    rate += (i+1)*(c[0] + 2.0*c[1] + 3.0*c[2]);
+
+                    const int type_before = types_before[b*max_len + i];
+                    const int type_after  = types_after[b*max_len + i];
+
+                    // The padding has no types.
+                    CPPUNIT_ASSERT_EQUAL( (i < len), (type_before != -1) );
+                    CPPUNIT_ASSERT_EQUAL( (i < len), (type_after != -1) );
+
+                    if (i < len)
+                    {
+                        rate += 0.01*possible_types_.find(type_names[type_before])->second;
+                        rate += 0.001*possible_types_.find(type_names[type_after])->second;
+                    }
+                }
+                rates[b] = rate;
+            }
+            return rates;
+        }
+
+private:
+    bool batch_;
+    std::map<std::string, int> possible_types_;
+
+public:
+    mutable int n_batch_calls_;
+};
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Matcher::testUpdateRatesBatch()
+{
+    // Setup a configuration of two cells with two atoms each.
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["C"] = 1;
+    possible_types["B"] = 2;
+    possible_types["D"] = 3;
+    possible_types["A"] = 4;
+
+    std::vector<std::vector<double> > coords(4, std::vector<double>(3, 0.0));
+    coords[1][0] = 0.5;
+    coords[1][1] = 0.3;
+    coords[1][2] = 0.1;
+    coords[2][0] = 1.0;
+    coords[3][0] = 1.5;
+    coords[3][1] = 0.3;
+    coords[3][2] = 0.1;
+
+    std::vector<std::vector<std::string> > elements(4);
+    elements[0] = std::vector<std::string>(1, "A");
+    elements[1] = std::vector<std::string>(1, "B");
+    elements[2] = std::vector<std::string>(1, "C");
+    elements[3] = std::vector<std::string>(1, "D");
+
+    Configuration config(coords, elements, possible_types);
+
+    std::vector<int> repetitions(3, 1);
+    repetitions[0] = 2;
+    const std::vector<bool> periodicity(3, false);
+    LatticeMap lattice_map(2, repetitions, periodicity);
+    config.initMatchLists(lattice_map, 1);
+
+    // Processes changing the type at the center, with different cutoffs
+    // to get geometries of different lengths.
+    std::vector<std::vector<std::string> > elements1(2, std::vector<std::string>(1, "C"));
+    elements1[1][0] = "B";
+    std::vector<std::vector<std::string> > elements2(2, std::vector<std::string>(1, "D"));
+    elements2[1][0] = "B";
+    std::vector<std::vector<double> > process_coords(2, std::vector<double>(3, 0.0));
+    process_coords[1][0] = 0.5;
+    process_coords[1][1] = 0.3;
+    process_coords[1][2] = 0.1;
+
+    const Configuration config1(process_coords, elements1, possible_types);
+    const Configuration config2(process_coords, elements2, possible_types);
+
+    const std::vector<int> basis_sites(1, 0);
+    std::vector<CustomRateProcess> processes;
+    processes.push_back(CustomRateProcess(config1, config2, 1.5, basis_sites, 0.6));
+    processes.push_back(CustomRateProcess(config1, config2, 2.5, basis_sites, 1.2));
+    processes.push_back(CustomRateProcess(config1, config2, 3.5, basis_sites, 2.0));
+
+    // Tasks for all processes at the first basis site of each cell.
+    std::vector<RateTask> tasks;
+    for (int p = 0; p < 3; ++p)
+    {
+        for (int index = 0; index < 4; index += 2)
+        {
+            RateTask t;
+            t.index   = index;
+            t.process = p;
+            t.rate    = 0.0;
+            tasks.push_back(t);
+        }
+    }
+
+    // Calculate the rates one by one.
+    const BatchRateCalc single_calculator(false, possible_types);
+    Interactions single_interactions(processes, false, single_calculator);
+    Matcher m1(4, 3);
+    std::vector<double> single_rates(tasks.size(), 0.0);
+    m1.updateRates(single_rates, tasks, single_interactions, config);
+    CPPUNIT_ASSERT_EQUAL( single_calculator.n_batch_calls_, 0 );
+
+    // And in a batch.
+    const BatchRateCalc batch_calculator(true, possible_types);
+    Interactions batch_interactions(processes, false, batch_calculator);
+    Matcher m2(4, 3);
+    std::vector<double> batch_rates(tasks.size(), 0.0);
+    m2.updateRates(batch_rates, tasks, batch_interactions, config);
+    CPPUNIT_ASSERT_EQUAL( batch_calculator.n_batch_calls_, 1 );
+
+    // Each task of the batch is counted as a callback of its process.
+    for (int p = 0; p < 3; ++p)
+    {
+        CPPUNIT_ASSERT_EQUAL( m1.rateStatistics().callbacks()[p], 2l );
+        CPPUNIT_ASSERT_EQUAL( m2.rateStatistics().callbacks()[p], 2l );
+    }
+
+    // The rates must be the same.
+    for (size_t i = 0; i < tasks.size(); ++i)
+    {
+        CPPUNIT_ASSERT_DOUBLES_EQUAL( batch_rates[i], single_rates[i], 1.0e-10 );
+    }
+
+    // The geometries have different lengths.
+    CPPUNIT_ASSERT( std::abs(single_rates[0] - 1.5) < std::abs(single_rates[4] - 3.5) );
+}
+
+
 // -------------------------------------------------------------------------- //
 //
 void Test_Matcher::testUpdateSingleRate()
@@ -1801,4 +2164,106 @@ void Test_Matcher::testUpdateSingleRate()
     // Test against the known reference.
     CPPUNIT_ASSERT_DOUBLES_EQUAL(ret_rate, std::pow(rate, 3.14159), 1.0e-12);
 
+    // The same with the types sent as type numbers.
+    const TypeNumbersRateCalculator tnrc;
+    const double ret_rate_numbers = m.updateSingleRate(index, *interactions.processes()[0], config, tnrc);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(ret_rate_numbers, std::pow(rate, 2.71828), 1.0e-12);
+
+}
+
+
+// -------------------------------------------------------------------------- //
+// This proxy class is part of the UpdateSingleRateBucketCounts test below.
+class BucketCountsRateCalculator : public RateCalculator {
+public:
+    BucketCountsRateCalculator() {}
+    virtual ~BucketCountsRateCalculator() {}
+    virtual bool typeNumbers() const override { return true; }
+    virtual double backendRateCallbackBucketCounts(const std::vector<double> & geometry,
+                                                   const int len,
+                                                   const std::vector<int> & counts_before,
+                                                   const std::vector<int> & counts_after,
+                                                   const std::vector<std::string> & type_names,
+                                                   const double rate_constant,
+                                                   const int process_number,
+                                                   const double global_x,
+                                                   const double global_y,
+                                                   const double global_z) const override
+        {
+            CPPUNIT_ASSERT_EQUAL(len, 2);
+            CPPUNIT_ASSERT_EQUAL(static_cast<int>(type_names.size()), 3);
+
+            // Two A and one B at the center and one B at the neighbour.
+            const int ref_before[6] = {0, 2, 1, 0, 0, 1};
+            // One A moved from the center and one B moved to the center.
+            const int ref_after[6]  = {0, 1, 2, 0, 1, 0};
+
+            CPPUNIT_ASSERT_EQUAL(static_cast<int>(counts_before.size()), 6);
+            CPPUNIT_ASSERT_EQUAL(static_cast<int>(counts_after.size()), 6);
+            for (int i = 0; i < 6; ++i)
+            {
+                CPPUNIT_ASSERT_EQUAL(counts_before[i], ref_before[i]);
+                CPPUNIT_ASSERT_EQUAL(counts_after[i], ref_after[i]);
+            }
+
+            CPPUNIT_ASSERT_EQUAL( process_number, 3 );
+
+            return 2.0 * rate_constant;
+        }
+};
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Matcher::testUpdateSingleRateBucketCounts()
+{
+    // One cell with two sites.
+    std::vector<std::vector<double> > coords(2, std::vector<double>(3, 0.0));
+    coords[1][0] = -0.5;
+    coords[1][1] = -0.5;
+    coords[1][2] = -0.5;
+
+    // Two A and one B at the first site, one B at the second.
+    std::vector<std::vector<std::string> > elements(2);
+    elements[0].push_back("A");
+    elements[0].push_back("A");
+    elements[0].push_back("B");
+    elements[1].push_back("B");
+
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    Configuration config(coords, elements, possible_types);
+
+    const std::vector<int> repetitions(3, 1);
+    const std::vector<bool> periodicity(3, false);
+    LatticeMap lattice_map(2, repetitions, periodicity);
+    config.initMatchLists(lattice_map, 13);
+
+    // A bucket process swapping an A at the center with a B at the neighbour.
+    std::vector<std::vector<std::string> > process_elements(2);
+    process_elements[0] = std::vector<std::string>(1, "A");
+    process_elements[1] = std::vector<std::string>(1, "B");
+    const Configuration config1(coords, process_elements, possible_types);
+    Configuration config2(coords, process_elements, possible_types);
+
+    std::vector<std::map<std::string, int> > update_info(2);
+    update_info[0]["A"] = -1;
+    update_info[0]["B"] =  1;
+    update_info[1]["A"] =  1;
+    update_info[1]["B"] = -1;
+    config2.setUpdateInfo(update_info);
+
+    const std::vector<int> basis_sites(1, 0);
+    const CustomRateProcess process(config1, config2, 1.5, basis_sites, 1.0,
+                                    std::vector<int>(0), std::vector<Coordinate>(0), 3);
+    CPPUNIT_ASSERT( process.bucketProcess() );
+
+    // Calculate the rate with the occupations as count matrices.
+    const Matcher m(2, 1);
+    const BucketCountsRateCalculator bcrc;
+    const double ret_rate = m.updateSingleRate(0, process, config, bcrc);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(ret_rate, 3.0, 1.0e-12);
 }
@@ -33,8 +33,11 @@ public:
     CPPUNIT_TEST( testCalculateMatchingProcess );
     CPPUNIT_TEST( testUpdateProcesses );
     CPPUNIT_TEST( testCalculateMatchingInteractions );
+    CPPUNIT_TEST( testCalculateMatchingCandidates );
     CPPUNIT_TEST( testUpdateRates );
+    CPPUNIT_TEST( testUpdateRatesBatch );
     CPPUNIT_TEST( testUpdateSingleRate );
+    CPPUNIT_TEST( testUpdateSingleRateBucketCounts );
     CPPUNIT_TEST_SUITE_END();
 
     void testConstruction();
@@ -46,8 +49,11 @@ public:
     void testCalculateMatchingProcess();
     void testUpdateProcesses();
     void testCalculateMatchingInteractions();
+    void testCalculateMatchingCandidates();
     void testUpdateRates();
+    void testUpdateRatesBatch();
     void testUpdateSingleRate();
+    void testUpdateSingleRateBucketCounts();
 
 };
 
@@ -0,0 +1,187 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_matchtree.h"
+
+// Include the files to test.
+#include "matchtree.h"
+
+#include <algorithm>
+
+
+// -------------------------------------------------------------------------- //
+// Helper function to setup a process match list entry.
+static ProcessBucketMatchListEntry processEntry(const int type,
+                                                const double distance,
+                                                const Coordinate & coordinate)
+{
+    ProcessBucketMatchListEntry entry;
+    entry.match_types = TypeBucket(3);
+    entry.match_types[type] = 1;
+    entry.update_types = TypeBucket(3);
+    entry.distance = distance;
+    entry.coordinate = coordinate;
+    entry.index = 0;
+    return entry;
+}
+
+
+// -------------------------------------------------------------------------- //
+// Helper function to setup a configuration match list entry.
+static ConfigBucketMatchListEntry configEntry(const int type,
+                                              const double distance,
+                                              const Coordinate & coordinate)
+{
+    ConfigBucketMatchListEntry entry;
+    entry.match_types = TypeBucket(3);
+    entry.match_types[type] = 1;
+    entry.distance = distance;
+    entry.x = coordinate.x();
+    entry.y = coordinate.y();
+    entry.z = coordinate.z();
+    entry.index = 0;
+    return entry;
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_MatchTree::testConstruction()
+{
+    // Construct an empty tree, with only the root node.
+    const MatchTree tree;
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(tree.nNodes()), 1);
+
+    // Nothing matches.
+    ConfigBucketMatchList config(1, configEntry(1, 0.0, Coordinate(0.0, 0.0, 0.0)));
+    std::vector<int> matches;
+    tree.match(config, matches);
+    CPPUNIT_ASSERT(matches.empty());
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_MatchTree::testAddProcess()
+{
+    const Coordinate c0(0.0, 0.0, 0.0);
+    const Coordinate c1(1.0, 0.0, 0.0);
+
+    // Two processes with the same central entry share the first node.
+    ProcessBucketMatchList m0(2);
+    m0[0] = processEntry(1, 0.0, c0);
+    m0[1] = processEntry(2, 1.0, c1);
+
+    ProcessBucketMatchList m1(2);
+    m1[0] = processEntry(1, 0.0, c0);
+    m1[1] = processEntry(1, 1.0, c1);
+
+    MatchTree tree;
+    tree.addProcess(0, m0);
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(tree.nNodes()), 3);
+    tree.addProcess(1, m1);
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(tree.nNodes()), 4);
+
+    // Identical match lists end at the same node.
+    tree.addProcess(2, m1);
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(tree.nNodes()), 4);
+
+    // A different central type gives a new branch.
+    ProcessBucketMatchList m2(1);
+    m2[0] = processEntry(2, 0.0, c0);
+    tree.addProcess(3, m2);
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(tree.nNodes()), 5);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_MatchTree::testMatch()
+{
+    const Coordinate c0(0.0, 0.0, 0.0);
+    const Coordinate c1(1.0, 0.0, 0.0);
+    const Coordinate c2(-1.0, 0.0, 0.0);
+
+    // Process 0: type 1 at the center and type 2 to the right.
+    ProcessBucketMatchList m0(2);
+    m0[0] = processEntry(1, 0.0, c0);
+    m0[1] = processEntry(2, 1.0, c1);
+
+    // Process 1: type 1 at the center, anything to the right, type 1 to the left.
+    ProcessBucketMatchList m1(3);
+    m1[0] = processEntry(1, 0.0, c0);
+    m1[1].initWildcard(configEntry(1, 1.0, c1));
+    m1[2] = processEntry(1, 1.0, c2);
+
+    // Process 2: type 2 at the center.
+    ProcessBucketMatchList m2(1);
+    m2[0] = processEntry(2, 0.0, c0);
+
+    // Process 3: type 1 at the center, longer than any configuration below.
+    ProcessBucketMatchList m3(4, processEntry(1, 0.0, c0));
+    m3[1] = processEntry(2, 1.0, c1);
+    m3[2] = processEntry(1, 1.0, c2);
+    m3[3] = processEntry(1, 2.0, Coordinate(2.0, 0.0, 0.0));
+
+    MatchTree tree;
+    tree.addProcess(0, m0);
+    tree.addProcess(1, m1);
+    tree.addProcess(2, m2);
+    tree.addProcess(3, m3);
+
+    std::vector<ProcessBucketMatchList> process_lists;
+    process_lists.push_back(m0);
+    process_lists.push_back(m1);
+    process_lists.push_back(m2);
+    process_lists.push_back(m3);
+
+    // Try all combinations of types in a three site configuration.
+    for (int t0 = 1; t0 < 3; ++t0)
+    {
+        for (int t1 = 1; t1 < 3; ++t1)
+        {
+            for (int t2 = 1; t2 < 3; ++t2)
+            {
+                ConfigBucketMatchList config(3);
+                config[0] = configEntry(t0, 0.0, c0);
+                config[1] = configEntry(t1, 1.0, c1);
+                config[2] = configEntry(t2, 1.0, c2);
+
+                std::vector<int> matches;
+                tree.match(config, matches);
+                std::sort(matches.begin(), matches.end());
+
+                // The same matches as when matching each process separately.
+                std::vector<int> ref_matches;
+                for (size_t p = 0; p < process_lists.size(); ++p)
+                {
+                    if (whateverMatch(process_lists[p], config))
+                    {
+                        ref_matches.push_back(p);
+                    }
+                }
+                CPPUNIT_ASSERT(matches == ref_matches);
+            }
+        }
+    }
+
+    // Check one case explicitly.
+    ConfigBucketMatchList config(3);
+    config[0] = configEntry(1, 0.0, c0);
+    config[1] = configEntry(2, 1.0, c1);
+    config[2] = configEntry(1, 1.0, c2);
+
+    std::vector<int> matches;
+    tree.match(config, matches);
+    std::sort(matches.begin(), matches.end());
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(matches.size()), 2);
+    CPPUNIT_ASSERT_EQUAL(matches[0], 0);
+    CPPUNIT_ASSERT_EQUAL(matches[1], 1);
+}
+
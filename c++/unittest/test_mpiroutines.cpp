@@ -92,6 +92,24 @@ void Test_MPIRoutines::testDetermineChunks()
         CPPUNIT_ASSERT_EQUAL( chunks[1].first, 7 );
         CPPUNIT_ASSERT_EQUAL( chunks[1].second, 6 );
     }
+
+    {
+        // The chunk of a single process is the same as from all chunks.
+        for (int mpi_size = 1; mpi_size < 8; ++mpi_size)
+        {
+            for (int vector_size = 0; vector_size < 30; ++vector_size)
+            {
+                const std::vector< std::pair<int,int> > chunks = determineChunks(mpi_size, vector_size);
+                for (int rank = 0; rank < mpi_size; ++rank)
+                {
+                    int start, n_take;
+                    determineChunk(rank, mpi_size, vector_size, start, n_take);
+                    CPPUNIT_ASSERT_EQUAL( start,  chunks[rank].first );
+                    CPPUNIT_ASSERT_EQUAL( n_take, chunks[rank].second );
+                }
+            }
+        }
+    }
 }
 
 
@@ -277,6 +295,11 @@ void Test_MPIRoutines::testSplitOverProcesses()
         CPPUNIT_ASSERT_EQUAL( local_data[1], global_data[my_start + 1] );
         CPPUNIT_ASSERT_EQUAL( local_data[2], global_data[my_start + 2] );
     }
+
+    // Split into a vector with previous content.
+    std::vector<int> local_data2(10, -1);
+    splitOverProcesses(global_data, local_data2, MPI_COMM_WORLD);
+    CPPUNIT_ASSERT( local_data2 == local_data );
 }
 
 
@@ -338,5 +361,10 @@ void Test_MPIRoutines::testJoinOverProcesses()
     {
         CPPUNIT_ASSERT_DOUBLES_EQUAL( new_global_ref[i], new_global[i], 1.0e-12 );
     }
+
+    // Join into a vector with previous content.
+    std::vector<int> new_global2(1, 17);
+    joinOverProcesses(local_data, new_global2, MPI_COMM_WORLD);
+    CPPUNIT_ASSERT( new_global2 == new_global );
 }
 
@@ -0,0 +1,352 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_pairratecalculator.h"
+
+// Include the files to test.
+#include "pairratecalculator.h"
+
+// Other inclusions.
+#include "latticemodel.h"
+#include "configuration.h"
+#include "latticemap.h"
+#include "interactions.h"
+#include "customrateprocess.h"
+#include "simulationtimer.h"
+#include "random.h"
+
+#include <cmath>
+#include <stdexcept>
+
+
+// -------------------------------------------------------------------------- //
+// The Ising model Metropolis rates of the IsingSpin functional test, for
+// reference.
+class IsingRateCalculator : public RateCalculator {
+
+public:
+
+    virtual double backendRateCallback(const std::vector<double> & geometry,
+                                       const int len,
+                                       const std::vector<std::string> & types_before,
+                                       const std::vector<std::string> & types_after,
+                                       const double rate_constant,
+                                       const int process_number,
+                                       const double global_x,
+                                       const double global_y,
+                                       const double global_z) const override
+    {
+        int n_same = 0;
+        int n_other = 0;
+        for (int i = 1; i < len; ++i)
+        {
+            if (types_before[i] == types_before[0])
+            {
+                ++n_same;
+            }
+            else
+            {
+                ++n_other;
+            }
+        }
+        return rate_constant * std::min(1.0, std::exp(-(n_same - n_other)));
+    }
+
+};
+
+
+// -------------------------------------------------------------------------- //
+// Pair energies on a line of three types for the tests.
+static PairRateCalculator lineCalculator(const std::vector<double> & barriers,
+                                         const std::vector<double> & alphas,
+                                         const double kT)
+{
+    std::vector<double> shells(2, 1.0);
+    shells[1] = 2.0;
+
+    std::vector<double> pair_energies(2*3*3, 0.0);
+    pair_energies[1*3 + 1] = -1.0;
+    pair_energies[1*3 + 2] =  0.5;
+    pair_energies[2*3 + 1] =  0.5;
+    pair_energies[2*3 + 2] = -2.0;
+    pair_energies[9 + 1*3 + 1] = 0.1;
+    pair_energies[9 + 1*3 + 2] = 0.2;
+    pair_energies[9 + 2*3 + 1] = 0.2;
+    pair_energies[9 + 2*3 + 2] = 0.3;
+
+    std::vector<double> site_energies(3, 0.0);
+    site_energies[2] = 1.0;
+
+    return PairRateCalculator(shells, 3, pair_energies, site_energies, barriers, alphas,
+                              kT, 5.0, true, std::vector<int>(0), 100);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_PairRateCalculator::testConstruction()
+{
+    const std::vector<double> barriers(2, 0.5);
+    const std::vector<double> alphas(2, 0.25);
+    const PairRateCalculator calculator = lineCalculator(barriers, alphas, 2.0);
+
+    CPPUNIT_ASSERT( calculator.typeNumbers() );
+    CPPUNIT_ASSERT( calculator.threadSafe() );
+    CPPUNIT_ASSERT( calculator.cacheRates() );
+    CPPUNIT_ASSERT( !calculator.batchRates() );
+    CPPUNIT_ASSERT_EQUAL( calculator.cacheSize(), 100 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.cutoff(), 5.0, 1.0e-12 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.kT(), 2.0, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(calculator.excludeFromCaching().size()), 0 );
+
+    // The tables.
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(calculator.shells().size()), 2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.shells()[1], 2.0, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(calculator.pairEnergies().size()), 18 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.pairEnergies()[8], -2.0, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(calculator.siteEnergies().size()), 3 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.siteEnergies()[2], 1.0, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(calculator.barriers().size()), 2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.barriers()[1], 0.5, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(calculator.alphas().size()), 2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.alphas()[0], 0.25, 1.0e-12 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_PairRateCalculator::testConstructionFail()
+{
+    const std::vector<double> shells(1, 1.0);
+    const std::vector<double> pair_energies(4, 0.0);
+    const std::vector<double> site_energies(2, 0.0);
+    const std::vector<double> barriers(1, 0.0);
+    const std::vector<int> exclude(0);
+
+    // This works.
+    PairRateCalculator(shells, 2, pair_energies, site_energies, barriers, barriers, 1.0, 1.0, false, exclude, 10);
+
+    // No shells.
+    CPPUNIT_ASSERT_THROW( PairRateCalculator(std::vector<double>(0), 2, pair_energies, site_energies, barriers,
+                                             barriers, 1.0, 1.0, false, exclude, 10),
+                          std::runtime_error );
+
+    // Shells not increasing.
+    CPPUNIT_ASSERT_THROW( PairRateCalculator(std::vector<double>(2, 1.0), 2, std::vector<double>(8, 0.0),
+                                             site_energies, barriers, barriers, 1.0, 1.0, false, exclude, 10),
+                          std::runtime_error );
+
+    // Table sizes not matching.
+    CPPUNIT_ASSERT_THROW( PairRateCalculator(shells, 2, std::vector<double>(3, 0.0), site_energies, barriers,
+                                             barriers, 1.0, 1.0, false, exclude, 10),
+                          std::runtime_error );
+    CPPUNIT_ASSERT_THROW( PairRateCalculator(shells, 2, pair_energies, std::vector<double>(3, 0.0), barriers,
+                                             barriers, 1.0, 1.0, false, exclude, 10),
+                          std::runtime_error );
+    CPPUNIT_ASSERT_THROW( PairRateCalculator(shells, 2, pair_energies, site_energies, barriers,
+                                             std::vector<double>(2, 0.0), 1.0, 1.0, false, exclude, 10),
+                          std::runtime_error );
+
+    // Zero temperature.
+    CPPUNIT_ASSERT_THROW( PairRateCalculator(shells, 2, pair_energies, site_energies, barriers,
+                                             barriers, 0.0, 1.0, false, exclude, 10),
+                          std::runtime_error );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_PairRateCalculator::testEnergyChange()
+{
+    const PairRateCalculator calculator = lineCalculator(std::vector<double>(0), std::vector<double>(0), 1.0);
+
+    // Three sites on a line and one far away.
+    std::vector<double> geometry(12, 0.0);
+    geometry[3] = 1.0;
+    geometry[6] = 2.0;
+    geometry[10] = 3.0;
+
+    // One changed site, interacting with one site in each shell.
+    std::vector<int> types_before(4, 2);
+    types_before[0] = 1;
+    types_before[1] = 1;
+    std::vector<int> types_after(types_before);
+    types_after[0] = 2;
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.energyChange(geometry, 3, types_before, types_after),
+                                  1.0 + 1.5 + 0.1, 1.0e-12 );
+
+    // The far site only changes its site energy.
+    types_after[3] = 1;
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.energyChange(geometry, 4, types_before, types_after),
+                                  1.0 + 1.5 + 0.1 - 1.0, 1.0e-12 );
+
+    // Two changed sites, with the pair between them counted once.
+    types_before[0] = 1;
+    types_before[1] = 2;
+    types_before[2] = 1;
+    types_after = types_before;
+    types_after[0] = 2;
+    types_after[1] = 1;
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.energyChange(geometry, 3, types_before, types_after),
+                                  1.0 + 0.1 - 1.0 - 1.5, 1.0e-12 );
+
+    // The wildcard type has no energy.
+    types_before[1] = 0;
+    types_before[2] = 0;
+    types_after[1] = 0;
+    types_after[2] = 0;
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.energyChange(geometry, 3, types_before, types_after),
+                                  1.0, 1.0e-12 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_PairRateCalculator::testBackendRateCallback()
+{
+    std::vector<double> barriers(2, 0.0);
+    barriers[1] = 1.0;
+    std::vector<double> alphas(2, 1.0);
+    alphas[1] = 0.5;
+    const PairRateCalculator calculator = lineCalculator(barriers, alphas, 2.0);
+
+    std::vector<double> geometry(9, 0.0);
+    geometry[3] = 1.0;
+    geometry[6] = 2.0;
+    const std::vector<std::string> type_names(3, "X");
+
+    // An energy change of 2.6.
+    std::vector<int> types_before(3, 1);
+    types_before[2] = 2;
+    std::vector<int> types_after(types_before);
+    types_after[0] = 2;
+
+    // Metropolis for process 0.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.backendRateCallbackTypeNumbers(geometry, 3, types_before, types_after,
+                                                                            type_names, 3.0, 0, 0.0, 0.0, 0.0),
+                                  3.0 * std::exp(-1.3), 1.0e-12 );
+
+    // The activation energy is never below the energy change.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.backendRateCallbackTypeNumbers(geometry, 3, types_before, types_after,
+                                                                            type_names, 3.0, 1, 0.0, 0.0, 0.0),
+                                  3.0 * std::exp(-1.3), 1.0e-12 );
+
+    // An energy change of -1.4.
+    types_before[1] = 2;
+    types_before[2] = 1;
+    types_after = types_before;
+    types_after[0] = 2;
+    types_after[1] = 1;
+
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.backendRateCallbackTypeNumbers(geometry, 3, types_before, types_after,
+                                                                            type_names, 3.0, 0, 0.0, 0.0, 0.0),
+                                  3.0, 1.0e-12 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.backendRateCallbackTypeNumbers(geometry, 3, types_before, types_after,
+                                                                            type_names, 3.0, 1, 0.0, 0.0, 0.0),
+                                  3.0 * std::exp(-0.15), 1.0e-12 );
+
+    // Processes without a model get the Metropolis rate.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( calculator.backendRateCallbackTypeNumbers(geometry, 3, types_before, types_after,
+                                                                            type_names, 3.0, 2, 0.0, 0.0, 0.0),
+                                  3.0, 1.0e-12 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_PairRateCalculator::testLatticeModel()
+{
+    // A square lattice of up and down spins.
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    const int nI = 8;
+    const int nJ = 8;
+    for (int i = 0; i < nI; ++i)
+    {
+        for (int j = 0; j < nJ; ++j)
+        {
+            std::vector<double> c(3, 0.0);
+            c[0] = i;
+            c[1] = j;
+            coordinates.push_back(c);
+            elements.push_back(std::vector<std::string>(1, ((i*j + i) % 3 == 0) ? "U" : "D"));
+        }
+    }
+
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["U"] = 1;
+    possible_types["D"] = 2;
+
+    // Flip U to D and D to U.
+    std::vector<CustomRateProcess> processes;
+    const std::vector<int> basis_sites(1, 0);
+    const std::vector<std::vector<double> > process_coordinates(1, std::vector<double>(3, 0.0));
+    for (int p = 0; p < 2; ++p)
+    {
+        const std::vector<std::vector<std::string> > elements1(1, std::vector<std::string>(1, (p == 0) ? "U" : "D"));
+        const std::vector<std::vector<std::string> > elements2(1, std::vector<std::string>(1, (p == 0) ? "D" : "U"));
+        const Configuration config1(process_coordinates, elements1, possible_types);
+        const Configuration config2(process_coordinates, elements2, possible_types);
+        processes.push_back(CustomRateProcess(config1, config2, 1.0, basis_sites, 1.0,
+                                              std::vector<int>(0), std::vector<Coordinate>(0),
+                                              p, true));
+    }
+
+    std::vector<int> repetitions(3, 1);
+    repetitions[0] = nI;
+    repetitions[1] = nJ;
+    std::vector<bool> periodicity(3, false);
+    periodicity[0] = true;
+    periodicity[1] = true;
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    // The Ising model with J = 1 as pair energies of +-J/2.
+    std::vector<double> pair_energies(9, 0.0);
+    pair_energies[1*3 + 1] = -0.5;
+    pair_energies[1*3 + 2] =  0.5;
+    pair_energies[2*3 + 1] =  0.5;
+    pair_energies[2*3 + 2] = -0.5;
+    const PairRateCalculator calculator(std::vector<double>(1, 1.0), 3, pair_energies, std::vector<double>(3, 0.0),
+                                        std::vector<double>(2, 0.0), std::vector<double>(2, 1.0), 1.0, 1.0,
+                                        true, std::vector<int>(0), 1000);
+    const Interactions interactions(processes, true, calculator);
+    Configuration configuration1(coordinates, elements, possible_types);
+    SimulationTimer timer1;
+    LatticeModel lattice_model1(configuration1, timer1, lattice_map, interactions);
+
+    // And the reference.
+    const IsingRateCalculator reference;
+    const Interactions reference_interactions(processes, true, reference);
+    Configuration configuration2(coordinates, elements, possible_types);
+    SimulationTimer timer2;
+    LatticeModel lattice_model2(configuration2, timer2, lattice_map, reference_interactions);
+
+    CPPUNIT_ASSERT( lattice_model1.interactions().totalRate() > 0.0 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( lattice_model1.interactions().totalRate(),
+                                  lattice_model2.interactions().totalRate(),
+                                  1.0e-10 );
+
+    // Also after the same steps.
+    seedRandom(false, 965434567);
+    for (int step = 0; step < 200; ++step)
+    {
+        lattice_model1.singleStep();
+    }
+    seedRandom(false, 965434567);
+    for (int step = 0; step < 200; ++step)
+    {
+        lattice_model2.singleStep();
+    }
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( lattice_model1.interactions().totalRate(),
+                                  lattice_model2.interactions().totalRate(),
+                                  1.0e-10 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( timer1.simulationTime(), timer2.simulationTime(), 1.0e-10 );
+}
+
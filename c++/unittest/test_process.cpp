@@ -942,6 +942,84 @@ void Test_Process::testAddAndRemoveSiteMultiplicity()
 }
 
 
+// -------------------------------------------------------------------------- //
+//
+void Test_Process::testUpdateSite()
+{
+    // Setup a valid possible types map.
+    std::map<std::string,int> possible_types;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+    possible_types["C"] = 0;
+
+    // Setup the two configurations.
+    std::vector<std::vector<std::string> > elements1;
+    elements1.push_back(std::vector<std::string>(1, "A"));
+    elements1.push_back(std::vector<std::string>(1, "B"));
+
+    std::vector<std::vector<std::string> > elements2;
+    elements2.push_back(std::vector<std::string>(1, "C"));
+    elements2.push_back(std::vector<std::string>(1, "B"));
+
+    // Setup coordinates.
+    std::vector<std::vector<double> > coords(2,std::vector<double>(3,0.0));
+    coords[1][0] =  1.0;
+    coords[1][1] =  1.3;
+    coords[1][2] = -4.4;
+
+    // The configurations.
+    const Configuration config1(coords, elements1, possible_types);
+    const Configuration config2(coords, elements2, possible_types);
+
+    // Construct the process.
+    const double rate = 2.0;
+    const std::vector<int> basis_sites(1,0);
+    Process process(config1, config2, rate, basis_sites);
+
+    // Add sites.
+    process.addSite(12);
+    process.addSite(199);
+    process.addSite(19);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(process.totalRate(), 6.0, 1.0e-12);
+
+    // Update the multiplicity of a site in place.
+    process.updateSite(199, 0.0, 3.0);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(process.totalRate(), 10.0, 1.0e-12);
+    CPPUNIT_ASSERT_EQUAL(static_cast<int>(process.nSites()), 3);
+    CPPUNIT_ASSERT_EQUAL(process.sites()[1], 199);
+
+    // The picking is now weighted by the multiplicity.
+    int counter199 = 0;
+    seedRandom(false, 97);
+    const int n_loop = 1000000;
+
+    for (int i = 0; i < n_loop; ++i)
+    {
+        if (process.pickSite() == 199)
+        {
+            ++counter199;
+        }
+    }
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 3.0/5.0, 1.0 * counter199 / n_loop,  1.0e-2);
+
+    // Set the multiplicity back and check that picking is uniform again.
+    process.updateSite(199);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL(process.totalRate(), 6.0, 1.0e-12);
+
+    counter199 = 0;
+    for (int i = 0; i < n_loop; ++i)
+    {
+        if (process.pickSite() == 199)
+        {
+            ++counter199;
+        }
+    }
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 1.0/3.0, 1.0 * counter199 / n_loop,  1.0e-2);
+
+    // DONE
+}
+
+
 // -------------------------------------------------------------------------- //
 //
 void Test_Process::testPickSite()
@@ -34,6 +34,7 @@ public:
     CPPUNIT_TEST( testAddAndRemoveSite );
     CPPUNIT_TEST( testClearSites );
     CPPUNIT_TEST( testAddAndRemoveSiteMultiplicity );
+    CPPUNIT_TEST( testUpdateSite );
     CPPUNIT_TEST( testPickSite );
     CPPUNIT_TEST( testPickSiteMultiplicity );
     CPPUNIT_TEST( testAffectedIndices );
@@ -52,6 +53,7 @@ public:
     void testAddAndRemoveSite();
     void testClearSites();
     void testAddAndRemoveSiteMultiplicity();
+    void testUpdateSite();
     void testPickSite();
     void testPickSiteMultiplicity();
     void testAffectedIndices();
@@ -0,0 +1,235 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_ratecalculatorlibrary.h"
+
+// Include the files to test.
+#include "ratecalculatorlibrary.h"
+
+// Other inclusions.
+#include "latticemodel.h"
+#include "configuration.h"
+#include "latticemap.h"
+#include "interactions.h"
+#include "customrateprocess.h"
+#include "simulationtimer.h"
+#include "random.h"
+
+#include <stdexcept>
+
+
+// -------------------------------------------------------------------------- //
+// The calculation of the example rate calculator plugin, for reference.
+class ReferenceRateCalculator : public RateCalculator {
+
+public:
+
+    virtual double backendRateCallback(const std::vector<double> & geometry,
+                                       const int len,
+                                       const std::vector<std::string> & types_before,
+                                       const std::vector<std::string> & types_after,
+                                       const double rate_constant,
+                                       const int process_number,
+                                       const double global_x,
+                                       const double global_y,
+                                       const double global_z) const override
+    {
+        int n_same = 0;
+        for (int i = 1; i < len; ++i)
+        {
+            if (types_before[i] == types_before[0])
+            {
+                ++n_same;
+            }
+        }
+        return rate_constant / (1.0 + n_same);
+    }
+
+};
+
+
+// -------------------------------------------------------------------------- //
+// Setup a small configuration of A and B.
+static Configuration setupConfiguration(std::vector<std::vector<double> > & coordinates,
+                                        std::vector<std::vector<std::string> > & elements,
+                                        std::map<std::string, int> & possible_types)
+{
+    const int nI = 30;
+    for (int i = 0; i < nI; ++i)
+    {
+        std::vector<double> c(3, 0.0);
+        c[0] = i;
+        coordinates.push_back(c);
+        elements.push_back(std::vector<std::string>(1, (i % 4 == 0) ? "B" : "A"));
+    }
+
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    return Configuration(coordinates, elements, possible_types);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateCalculatorLibrary::testConstruction()
+{
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    std::map<std::string, int> possible_types;
+    const Configuration configuration = setupConfiguration(coordinates, elements, possible_types);
+
+    // Load the example plugin built with the tests.
+    const RateCalculatorLibrary library(EXAMPLE_RATE_CALCULATOR_LIBRARY, configuration);
+    CPPUNIT_ASSERT_EQUAL( library.path(), std::string(EXAMPLE_RATE_CALCULATOR_LIBRARY) );
+
+    // The settings are those of the example calculator.
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( library.cutoff(), 1.0, 1.0e-12 );
+    CPPUNIT_ASSERT( library.cacheRates() );
+    CPPUNIT_ASSERT( library.threadSafe() );
+    CPPUNIT_ASSERT( !library.typeNumbers() );
+    CPPUNIT_ASSERT( !library.batchRates() );
+    CPPUNIT_ASSERT_EQUAL( library.cacheSize(), 100000 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(library.excludeFromCaching().size()), 0 );
+
+    // A second instance of the same library may be loaded at the same time.
+    const RateCalculatorLibrary library2(EXAMPLE_RATE_CALCULATOR_LIBRARY, configuration);
+    CPPUNIT_ASSERT( library2.cacheRates() );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateCalculatorLibrary::testConstructionFail()
+{
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    std::map<std::string, int> possible_types;
+    const Configuration configuration = setupConfiguration(coordinates, elements, possible_types);
+
+    // A library that does not exist.
+    CPPUNIT_ASSERT_THROW( RateCalculatorLibrary("./no_such_library.so", configuration),
+                          std::runtime_error );
+
+    // A file that is not a library.
+    CPPUNIT_ASSERT_THROW( RateCalculatorLibrary(__FILE__, configuration),
+                          std::runtime_error );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateCalculatorLibrary::testBackendRateCallback()
+{
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    std::map<std::string, int> possible_types;
+    const Configuration configuration = setupConfiguration(coordinates, elements, possible_types);
+
+    const RateCalculatorLibrary library(EXAMPLE_RATE_CALCULATOR_LIBRARY, configuration);
+
+    // Three atoms, two of them with the type of the central atom.
+    const std::vector<double> geometry(9, 0.0);
+    std::vector<std::string> types_before(3, "A");
+    const std::vector<std::string> types_after(3, "B");
+
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( library.backendRateCallback(geometry, 3, types_before, types_after,
+                                                              3.0, 0, 0.0, 0.0, 0.0),
+                                  1.0, 1.0e-12 );
+
+    // One of them.
+    types_before[2] = "B";
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( library.backendRateCallback(geometry, 3, types_before, types_after,
+                                                              3.0, 0, 0.0, 0.0, 0.0),
+                                  1.5, 1.0e-12 );
+
+    // The callbacks not overloaded by the example return the rate constant.
+    const std::vector<int> type_numbers(3, 1);
+    const std::vector<std::string> type_names(3, "A");
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( library.backendRateCallbackTypeNumbers(geometry, 3, type_numbers, type_numbers,
+                                                                         type_names, 3.0, 0, 0.0, 0.0, 0.0),
+                                  3.0, 1.0e-12 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateCalculatorLibrary::testLatticeModel()
+{
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+    std::map<std::string, int> possible_types;
+    const Configuration configuration = setupConfiguration(coordinates, elements, possible_types);
+
+    const RateCalculatorLibrary library(EXAMPLE_RATE_CALCULATOR_LIBRARY, configuration);
+
+    // An A swapping place with a B in either direction.
+    std::vector<CustomRateProcess> processes;
+    const std::vector<int> basis_sites(1, 0);
+    for (int p = 0; p < 2; ++p)
+    {
+        std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+        process_coordinates[1][0] = (p == 0) ? 1.0 : -1.0;
+        std::vector<std::vector<std::string> > elements1(2, std::vector<std::string>(1, "A"));
+        elements1[1][0] = "B";
+        std::vector<std::vector<std::string> > elements2(2, std::vector<std::string>(1, "B"));
+        elements2[1][0] = "A";
+        const Configuration config1(process_coordinates, elements1, possible_types);
+        const Configuration config2(process_coordinates, elements2, possible_types);
+        processes.push_back(CustomRateProcess(config1, config2, 2.0, basis_sites, library.cutoff(),
+                                              std::vector<int>(0), std::vector<Coordinate>(0),
+                                              p, library.cacheRates()));
+    }
+
+    std::vector<int> repetitions(3, 1);
+    repetitions[0] = 30;
+    std::vector<bool> periodicity(3, false);
+    periodicity[0] = true;
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    // A model with the rates from the library.
+    const Interactions interactions(processes, true, library);
+    Configuration configuration1(coordinates, elements, possible_types);
+    SimulationTimer timer1;
+    LatticeModel lattice_model1(configuration1, timer1, lattice_map, interactions);
+
+    // And one with the same calculator compiled into the tests.
+    const ReferenceRateCalculator reference;
+    const Interactions reference_interactions(processes, true, reference);
+    Configuration configuration2(coordinates, elements, possible_types);
+    SimulationTimer timer2;
+    LatticeModel lattice_model2(configuration2, timer2, lattice_map, reference_interactions);
+
+    // The rates differ from the rate constants but are the same in both models.
+    const Interactions & cpp_interactions = lattice_model1.interactions();
+    const double total_rate = cpp_interactions.totalRate();
+    const size_t n_sites = cpp_interactions.processes()[0]->nSites() + cpp_interactions.processes()[1]->nSites();
+    CPPUNIT_ASSERT( n_sites > 0 );
+    CPPUNIT_ASSERT( total_rate > 0.0 );
+    CPPUNIT_ASSERT( total_rate < 2.0 * n_sites );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( total_rate, lattice_model2.interactions().totalRate(), 1.0e-10 );
+
+    // Also after the same steps.
+    seedRandom(false, 1913);
+    for (int step = 0; step < 20; ++step)
+    {
+        lattice_model1.singleStep();
+    }
+    seedRandom(false, 1913);
+    for (int step = 0; step < 20; ++step)
+    {
+        lattice_model2.singleStep();
+    }
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( lattice_model1.interactions().totalRate(),
+                                  lattice_model2.interactions().totalRate(),
+                                  1.0e-10 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( timer1.simulationTime(), timer2.simulationTime(), 1.0e-10 );
+}
+
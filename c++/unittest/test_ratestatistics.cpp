@@ -0,0 +1,75 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_ratestatistics.h"
+
+// Include the files to test.
+#include "ratestatistics.h"
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateStatistics::testConstruction()
+{
+    // All counters start at zero.
+    const RateStatistics statistics(3);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(statistics.lookups().size()), 3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(statistics.hits().size()), 3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(statistics.inserts().size()), 3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(statistics.callbacks().size()), 3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(statistics.callbackTimes().size()), 3 );
+
+    for (int p = 0; p < 3; ++p)
+    {
+        CPPUNIT_ASSERT_EQUAL( statistics.lookups()[p], 0l );
+        CPPUNIT_ASSERT_EQUAL( statistics.hits()[p], 0l );
+        CPPUNIT_ASSERT_EQUAL( statistics.inserts()[p], 0l );
+        CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[p], 0l );
+        CPPUNIT_ASSERT_DOUBLES_EQUAL( statistics.callbackTimes()[p], 0.0, 1.0e-12 );
+    }
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateStatistics::testCountAndReset()
+{
+    RateStatistics statistics(3);
+
+    statistics.addLookup(0, true);
+    statistics.addLookup(0, false);
+    statistics.addLookup(2, false);
+    statistics.addInsert(2);
+    statistics.addCallback(0, 1.5);
+    statistics.addCallback(2, 0.25);
+    statistics.addCallback(2, 0.5);
+
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups()[0], 2l );
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups()[1], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups()[2], 1l );
+    CPPUNIT_ASSERT_EQUAL( statistics.hits()[0], 1l );
+    CPPUNIT_ASSERT_EQUAL( statistics.hits()[2], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.inserts()[0], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.inserts()[2], 1l );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[0], 1l );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[2], 2l );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( statistics.callbackTimes()[0], 1.5, 1.0e-12 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( statistics.callbackTimes()[1], 0.0, 1.0e-12 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( statistics.callbackTimes()[2], 0.75, 1.0e-12 );
+
+    // Reset.
+    statistics.reset();
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(statistics.lookups().size()), 3 );
+    CPPUNIT_ASSERT_EQUAL( statistics.lookups()[0], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.hits()[0], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.inserts()[2], 0l );
+    CPPUNIT_ASSERT_EQUAL( statistics.callbacks()[2], 0l );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( statistics.callbackTimes()[2], 0.0, 1.0e-12 );
+}
+
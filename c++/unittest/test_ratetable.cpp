@@ -11,6 +11,13 @@
 
 // Include the files to test.
 #include "ratetable.h"
+#include "random.h"
+
+#include <map>
+#include <cstdio>
+#include <cstdint>
+#include <fstream>
+#include <iterator>
 #include <stdexcept>
 
 // -------------------------------------------------------------------------- //
@@ -26,11 +33,13 @@ void Test_RateTable::testConstruction()
 //
 void Test_RateTable::testStored()
 {
-    // Test the function that determines if a values is stored for a given key.
+    // Test that looking up a key without a stored value gives a miss.
     RateTable rt;
 
     ratekey key = 8765434567643;
-    CPPUNIT_ASSERT_EQUAL( rt.stored(key), -1 );
+    double value = 3.0;
+    CPPUNIT_ASSERT( !rt.lookup(key, value) );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( value, 3.0, 1.0e-12 );
 }
 
 
@@ -44,14 +53,13 @@ void Test_RateTable::testStoreAndRetrieve()
     const double value = 1.23456;
     rt.store(key, value);
 
-    // Check that the key was added.
-    CPPUNIT_ASSERT( rt.stored(key) != -1 );
-
-    // Get the value.
-    const double ret_value = rt.retrieve(key);
+    // Check that the key was added and get the value.
+    double ret_value = 0.0;
+    CPPUNIT_ASSERT( rt.lookup(key, ret_value) );
 
     // Check that the value is identical to the value we stored.
     CPPUNIT_ASSERT_DOUBLES_EQUAL( ret_value, value, 1.0e-10 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt.size()), 1 );
 }
 
 
@@ -59,14 +67,15 @@ void Test_RateTable::testStoreAndRetrieve()
 //
 void Test_RateTable::testRetrieveFail()
 {
-    // Test that retrieve on an empty key fails.
+    // Test that looking up another key fails.
     RateTable rt;
     const ratekey key  = 8765434567643;
     const double value = 1.23456;
     rt.store(key, value);
 
     const ratekey new_key = 222222223;
-    CPPUNIT_ASSERT_THROW( rt.retrieve(new_key), std::out_of_range );
+    double ret_value = 0.0;
+    CPPUNIT_ASSERT( !rt.lookup(new_key, ret_value) );
 }
 
 
@@ -74,16 +83,289 @@ void Test_RateTable::testRetrieveFail()
 //
 void Test_RateTable::testStoreFail()
 {
-    // Test that storing on an existing key fails.
+    // Test that storing on an existing key overwrites the value.
     RateTable rt;
     const ratekey key  = 8765434567643;
-    const double value = 1.23456;
-    rt.store(key, value);
+    rt.store(key, 1.23456);
+    rt.store(key, 2.5);
+
+    double ret_value = 0.0;
+    CPPUNIT_ASSERT( rt.lookup(key, ret_value) );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( ret_value, 2.5, 1.0e-12 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt.size()), 1 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateTable::testCapacity()
+{
+    // The default capacity.
+    RateTable rt;
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt.capacity()), 100000 );
+
+    // Fill a table beyond its capacity.
+    RateTable rt10(10);
+    for (ratekey key = 0; key < 25; ++key)
+    {
+        rt10.store(key, 1.0 * key);
+    }
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt10.size()), 10 );
+
+    int n_found = 0;
+    for (ratekey key = 0; key < 25; ++key)
+    {
+        double value;
+        if (rt10.lookup(key, value))
+        {
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( value, 1.0 * key, 1.0e-12 );
+            ++n_found;
+        }
+    }
+    CPPUNIT_ASSERT_EQUAL( n_found, 10 );
+
+    // Setting the capacity removes all entries.
+    rt10.setCapacity(3);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt10.capacity()), 3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt10.size()), 0 );
+    double value;
+    CPPUNIT_ASSERT( !rt10.lookup(24, value) );
+
+    // So does clear.
+    rt10.store(7, 7.0);
+    rt10.clear();
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt10.size()), 0 );
+    CPPUNIT_ASSERT( !rt10.lookup(7, value) );
+
+    // Nothing is stored with zero capacity.
+    rt10.setCapacity(0);
+    rt10.store(7, 7.0);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt10.size()), 0 );
+    CPPUNIT_ASSERT( !rt10.lookup(7, value) );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateTable::testEviction()
+{
+    // Fill a table.
+    RateTable rt(4);
+    for (ratekey key = 1; key <= 4; ++key)
+    {
+        rt.store(key, 1.0 * key);
+    }
+
+    // Look up keys 1 and 3 so they are kept when the clock hand passes.
+    double value;
+    CPPUNIT_ASSERT( rt.lookup(1, value) );
+    CPPUNIT_ASSERT( rt.lookup(3, value) );
+
+    // The next store replaces the first entry not looked up.
+    rt.store(5, 5.0);
+    CPPUNIT_ASSERT( rt.lookup(1, value) );
+    CPPUNIT_ASSERT( !rt.lookup(2, value) );
+    CPPUNIT_ASSERT( rt.lookup(3, value) );
+    CPPUNIT_ASSERT( rt.lookup(4, value) );
+    CPPUNIT_ASSERT( rt.lookup(5, value) );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( value, 5.0, 1.0e-12 );
+
+    // All entries have been looked up since, so the clock hand goes around
+    // once clearing the flags and replaces the entry it started at, key 3.
+    rt.store(6, 6.0);
+    CPPUNIT_ASSERT( !rt.lookup(3, value) );
+    CPPUNIT_ASSERT( rt.lookup(1, value) );
+    CPPUNIT_ASSERT( rt.lookup(4, value) );
+    CPPUNIT_ASSERT( rt.lookup(5, value) );
+    CPPUNIT_ASSERT( rt.lookup(6, value) );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateTable::testRandomOperations()
+{
+    // Store and look up random keys in a small key range, so that the
+    // table is full and entries are replaced all the time. Every found
+    // value must be the latest stored for its key.
+    seedRandom(false, 9137);
+
+    RateTable rt(50);
+    std::map<ratekey, double> ref;
+
+    for (int i = 0; i < 20000; ++i)
+    {
+        const ratekey key = static_cast<ratekey>(randomDouble01() * 200) * 1234567891ul;
+        double value;
+
+        if (randomDouble01() < 0.5)
+        {
+            rt.store(key, 1.0 * i);
+            ref[key] = 1.0 * i;
+        }
+        else if (rt.lookup(key, value))
+        {
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( value, ref[key], 1.0e-12 );
+        }
 
-    // This should throw an error.
-    // CPPUNIT_ASSERT_THROW( rt.store(key, value), std::runtime_error );
+        CPPUNIT_ASSERT( rt.size() <= 50 );
+    }
 
-    // FIXME
+    // The table is full and all entries are found.
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt.size()), 50 );
+    int n_found = 0;
+    for (std::map<ratekey, double>::const_iterator it = ref.begin(); it != ref.end(); ++it)
+    {
+        double value;
+        if (rt.lookup(it->first, value))
+        {
+            CPPUNIT_ASSERT_DOUBLES_EQUAL( value, it->second, 1.0e-12 );
+            ++n_found;
+        }
+    }
+    CPPUNIT_ASSERT_EQUAL( n_found, 50 );
 }
 
 
+// -------------------------------------------------------------------------- //
+//
+void Test_RateTable::testStatistics()
+{
+    RateTable rt(2);
+    CPPUNIT_ASSERT_EQUAL( rt.lookups(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rt.hits(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rt.misses(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rt.inserts(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rt.evictions(), 0l );
+
+    // Miss, store, hit.
+    double value;
+    rt.lookup(1, value);
+    rt.store(1, 1.0);
+    rt.lookup(1, value);
+    rt.store(2, 2.0);
+
+    // Overwriting is not an insert.
+    rt.store(2, 2.5);
+
+    // Storing a third key evicts one.
+    rt.store(3, 3.0);
+    rt.lookup(4, value);
+
+    CPPUNIT_ASSERT_EQUAL( rt.lookups(), 3l );
+    CPPUNIT_ASSERT_EQUAL( rt.hits(), 1l );
+    CPPUNIT_ASSERT_EQUAL( rt.misses(), 2l );
+    CPPUNIT_ASSERT_EQUAL( rt.inserts(), 3l );
+    CPPUNIT_ASSERT_EQUAL( rt.evictions(), 1l );
+
+    // Reset the counters but keep the stored values.
+    rt.resetStatistics();
+    CPPUNIT_ASSERT_EQUAL( rt.lookups(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rt.hits(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rt.misses(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rt.inserts(), 0l );
+    CPPUNIT_ASSERT_EQUAL( rt.evictions(), 0l );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt.size()), 2 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateTable::testStoreAll()
+{
+    RateTable rt1;
+    rt1.store(11, 1.1);
+    rt1.store(12, 1.2);
+
+    RateTable rt2(10);
+    rt2.store(12, 3.0);
+    rt2.store(13, 1.3);
+
+    // Stored keys are overwritten.
+    rt2.storeAll(rt1);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt2.size()), 3 );
+
+    double value;
+    CPPUNIT_ASSERT( rt2.lookup(11, value) );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( value, 1.1, 1.0e-12 );
+    CPPUNIT_ASSERT( rt2.lookup(12, value) );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( value, 1.2, 1.0e-12 );
+    CPPUNIT_ASSERT( rt2.lookup(13, value) );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( value, 1.3, 1.0e-12 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_RateTable::testSaveAndLoad()
+{
+    const std::string filename("test_ratetable_save_and_load.bin");
+
+    // Save a table.
+    RateTable rt1;
+    for (ratekey key = 0; key < 100; ++key)
+    {
+        rt1.store(key * 987654321987ul, 0.5 * key);
+    }
+    rt1.save(filename, "fingerprint 1");
+
+    // Load it again.
+    RateTable rt2(3);
+    rt2.store(1, 1.0);
+    CPPUNIT_ASSERT( rt2.load(filename, "fingerprint 1") );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt2.size()), 100 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt2.capacity()), 100 );
+
+    double value;
+    CPPUNIT_ASSERT( !rt2.lookup(1, value) );
+    for (ratekey key = 0; key < 100; ++key)
+    {
+        CPPUNIT_ASSERT( rt2.lookup(key * 987654321987ul, value) );
+        CPPUNIT_ASSERT_DOUBLES_EQUAL( value, 0.5 * key, 1.0e-12 );
+    }
+
+    // A file written with another fingerprint is rejected.
+    RateTable rt3;
+    rt3.store(1, 1.0);
+    CPPUNIT_ASSERT( !rt3.load(filename, "fingerprint 2") );
+    CPPUNIT_ASSERT( !rt3.load(filename, "fingerprint") );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt3.size()), 1 );
+
+    // So is a truncated file.
+    std::ifstream in(filename.c_str(), std::ios::binary);
+    const std::string content((std::istreambuf_iterator<char>(in)), std::istreambuf_iterator<char>());
+    in.close();
+    std::ofstream out(filename.c_str(), std::ios::binary | std::ios::trunc);
+    out.write(content.data(), content.size() - 4);
+    out.close();
+    CPPUNIT_ASSERT( !rt3.load(filename, "fingerprint 1") );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt3.size()), 1 );
+
+    // Or a file with extra data at the end.
+    out.open(filename.c_str(), std::ios::binary | std::ios::trunc);
+    out.write(content.data(), content.size());
+    out.write(content.data(), 16);
+    out.close();
+    CPPUNIT_ASSERT( !rt3.load(filename, "fingerprint 1") );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt3.size()), 1 );
+
+    // Or a corrupt number of entries, here one where the size of the
+    // entries overflows to the size of the data in the file.
+    std::string corrupt(content);
+    const size_t n_entries_offset = content.size() - 100 * 16 - 8;
+    const uint64_t n_entries = (1ull << 60) + 100;
+    corrupt.replace(n_entries_offset, 8, reinterpret_cast<const char*>(&n_entries), 8);
+    out.open(filename.c_str(), std::ios::binary | std::ios::trunc);
+    out.write(corrupt.data(), corrupt.size());
+    out.close();
+    CPPUNIT_ASSERT( !rt3.load(filename, "fingerprint 1") );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(rt3.size()), 1 );
+
+    // And a missing file.
+    std::remove(filename.c_str());
+    CPPUNIT_ASSERT( !rt3.load(filename, "fingerprint 1") );
+
+    // Saving to a file that can not be written fails.
+    CPPUNIT_ASSERT_THROW( rt1.save("no/such/directory/rates.bin", "fingerprint 1"), std::runtime_error );
+}
+
@@ -29,6 +29,12 @@ public:
     CPPUNIT_TEST( testStoreAndRetrieve );
     CPPUNIT_TEST( testRetrieveFail );
     CPPUNIT_TEST( testStoreFail );
+    CPPUNIT_TEST( testCapacity );
+    CPPUNIT_TEST( testEviction );
+    CPPUNIT_TEST( testRandomOperations );
+    CPPUNIT_TEST( testStatistics );
+    CPPUNIT_TEST( testStoreAll );
+    CPPUNIT_TEST( testSaveAndLoad );
     CPPUNIT_TEST_SUITE_END();
 
     void testConstruction();
@@ -36,6 +42,12 @@ public:
     void testStoreAndRetrieve();
     void testRetrieveFail();
     void testStoreFail();
+    void testCapacity();
+    void testEviction();
+    void testRandomOperations();
+    void testStatistics();
+    void testStoreAll();
+    void testSaveAndLoad();
 };
 
 #endif
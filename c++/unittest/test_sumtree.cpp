@@ -0,0 +1,142 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_sumtree.h"
+
+// Include the files to test.
+#include "sumtree.h"
+#include "random.h"
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_SumTree::testConstruction()
+{
+    // Default construction.
+    SumTree tree0;
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree0.size()), 0 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree0.total(), 0.0, 1.0e-14 );
+
+    // Construct with a size that is not a power of two.
+    SumTree tree1(13);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree1.size()), 13 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree1.total(), 0.0, 1.0e-14 );
+
+    for (size_t i = 0; i < tree1.size(); ++i)
+    {
+        CPPUNIT_ASSERT_DOUBLES_EQUAL( tree1.value(i), 0.0, 1.0e-14 );
+    }
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_SumTree::testSetAndTotal()
+{
+    SumTree tree(5);
+
+    tree.set(0, 1.0);
+    tree.set(3, 2.5);
+    tree.set(4, 0.5);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.total(), 4.0, 1.0e-14 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.value(3), 2.5, 1.0e-14 );
+
+    // Overwrite a value.
+    tree.set(3, 7.0);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.total(), 8.5, 1.0e-14 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.value(3), 7.0, 1.0e-14 );
+
+    // Setting and resetting many times does not accumulate any error.
+    for (int i = 0; i < 10000; ++i)
+    {
+        tree.set(1, 1.0/3.0 * i);
+        tree.set(1, 0.0);
+    }
+    CPPUNIT_ASSERT_EQUAL( tree.total(), 8.5 );
+
+    // Clear.
+    tree.clear();
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.size()), 5 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.total(), 0.0, 1.0e-14 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_SumTree::testResize()
+{
+    SumTree tree(3);
+    tree.set(0, 1.0);
+    tree.set(1, 2.0);
+    tree.set(2, 3.0);
+
+    // Growing keeps the values.
+    tree.resize(11);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.size()), 11 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.total(), 6.0, 1.0e-14 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.value(2), 3.0, 1.0e-14 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.value(10), 0.0, 1.0e-14 );
+
+    tree.set(10, 4.0);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.total(), 10.0, 1.0e-14 );
+
+    // Shrinking removes the values.
+    tree.resize(2);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.size()), 2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.total(), 3.0, 1.0e-14 );
+
+    // Growing again gives zeros in the new slots.
+    tree.resize(4);
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.total(), 3.0, 1.0e-14 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.value(2), 0.0, 1.0e-14 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( tree.value(3), 0.0, 1.0e-14 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_SumTree::testPick()
+{
+    SumTree tree(6);
+    tree.set(0, 1.0);
+    tree.set(1, 2.0);
+    tree.set(3, 4.0);
+    tree.set(5, 1.0);
+
+    // Check the boundaries explicitly.
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(0.0)),       0 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(0.999)),     0 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(1.0)),       1 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(2.999)),     1 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(3.0)),       3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(6.999)),     3 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(7.0)),       5 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(7.999)),     5 );
+
+    // A value at or above the total never gives an empty slot.
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(8.0)),       5 );
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(tree.pick(8.0+1e-12)), 5 );
+
+    // Check the distribution.
+    seedRandom(false, 113);
+    std::vector<int> picked(6, 0);
+    const int n_loop = 1000000;
+    for (int i = 0; i < n_loop; ++i)
+    {
+        ++picked[tree.pick(randomDouble01() * tree.total())];
+    }
+
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 8.0*picked[0]/n_loop, 1.0, 1.0e-2 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 8.0*picked[1]/n_loop, 2.0, 1.0e-2 );
+    CPPUNIT_ASSERT_EQUAL( picked[2], 0 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 8.0*picked[3]/n_loop, 4.0, 1.0e-2 );
+    CPPUNIT_ASSERT_EQUAL( picked[4], 0 );
+    CPPUNIT_ASSERT_DOUBLES_EQUAL( 8.0*picked[5]/n_loop, 1.0, 1.0e-2 );
+}
+
@@ -0,0 +1,173 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_threadpool.h"
+
+// Include the files to test.
+#include "threadpool.h"
+
+#include <stdexcept>
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_ThreadPool::testResize()
+{
+    ThreadPool pool;
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(pool.size()), 0 );
+
+    pool.resize(3);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(pool.size()), 3 );
+
+    pool.resize(1);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(pool.size()), 1 );
+
+    ThreadPool pool2(2);
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(pool2.size()), 2 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_ThreadPool::testRun()
+{
+    ThreadPool pool(3);
+
+    std::vector<size_t> bounds(5, 0);
+    bounds[1] = 2;
+    bounds[2] = 5;
+    bounds[3] = 6;
+    bounds[4] = 9;
+
+    // Each chunk runs once, on its own thread.
+    std::vector<int> counts(9, 0);
+    std::vector<std::thread::id> ids(4);
+    pool.run(bounds,
+             [&](const size_t begin, const size_t end)
+             {
+                 for (size_t i = begin; i < end; ++i)
+                 {
+                     counts[i] += 1;
+                 }
+                 for (size_t c = 0; c < 4; ++c)
+                 {
+                     if (bounds[c] == begin)
+                     {
+                         ids[c] = std::this_thread::get_id();
+                     }
+                 }
+             });
+
+    for (size_t i = 0; i < counts.size(); ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( counts[i], 1 );
+    }
+
+    // The first chunk runs on the calling thread.
+    CPPUNIT_ASSERT( ids[0] == std::this_thread::get_id() );
+    CPPUNIT_ASSERT( ids[1] != ids[0] );
+    CPPUNIT_ASSERT( ids[2] != ids[0] );
+    CPPUNIT_ASSERT( ids[3] != ids[0] );
+    CPPUNIT_ASSERT( ids[1] != ids[2] );
+
+    // The worker threads are the same in the next run.
+    std::vector<std::thread::id> ids2(4);
+    pool.run(bounds,
+             [&](const size_t begin, const size_t)
+             {
+                 for (size_t c = 0; c < 4; ++c)
+                 {
+                     if (bounds[c] == begin)
+                     {
+                         ids2[c] = std::this_thread::get_id();
+                     }
+                 }
+             });
+
+    CPPUNIT_ASSERT( ids == ids2 );
+
+    // Starts more workers if needed and runs nested runs on the calling thread.
+    std::vector<size_t> bounds2(7, 0);
+    for (size_t i = 1; i < bounds2.size(); ++i)
+    {
+        bounds2[i] = i;
+    }
+
+    std::vector<int> nested(6, 0);
+    pool.run(bounds2,
+             [&](const size_t begin, const size_t)
+             {
+                 const std::thread::id id = std::this_thread::get_id();
+                 pool.run(bounds,
+                          [&](const size_t, const size_t)
+                          {
+                              if (std::this_thread::get_id() == id)
+                              {
+                                  nested[begin] += 1;
+                              }
+                          });
+             });
+
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(pool.size()), 5 );
+    for (size_t i = 0; i < nested.size(); ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( nested[i], 4 );
+    }
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_ThreadPool::testExceptions()
+{
+    ThreadPool pool(3);
+
+    std::vector<size_t> bounds(5, 0);
+    for (size_t i = 1; i < bounds.size(); ++i)
+    {
+        bounds[i] = 10*i;
+    }
+
+    // Exceptions on the workers and on the calling thread are rethrown
+    // after all chunks are done.
+    for (size_t failing = 0; failing < 4; ++failing)
+    {
+        std::vector<int> done(4, 0);
+        CPPUNIT_ASSERT_THROW( pool.run(bounds,
+                                       [&](const size_t begin, const size_t)
+                                       {
+                                           const size_t c = begin / 10;
+                                           done[c] = 1;
+                                           if (c == failing)
+                                           {
+                                               throw std::runtime_error("Failing chunk.");
+                                           }
+                                       }),
+                              std::runtime_error );
+
+        CPPUNIT_ASSERT_EQUAL( done[0] + done[1] + done[2] + done[3], 4 );
+    }
+
+    // The pool is still usable.
+    std::vector<int> counts(40, 0);
+    pool.run(bounds,
+             [&](const size_t begin, const size_t end)
+             {
+                 for (size_t i = begin; i < end; ++i)
+                 {
+                     counts[i] += 1;
+                 }
+             });
+
+    for (size_t i = 0; i < counts.size(); ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( counts[i], 1 );
+    }
+}
+
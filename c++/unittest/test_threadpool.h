@@ -0,0 +1,39 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+#ifndef __TEST_THREADPOOL__
+#define __TEST_THREADPOOL__
+
+#include <iostream>
+#include <string>
+
+#include <cppunit/TestCase.h>
+#include <cppunit/TestSuite.h>
+#include <cppunit/TestCaller.h>
+#include <cppunit/TestRunner.h>
+
+#include <cppunit/extensions/HelperMacros.h>
+
+class Test_ThreadPool : public CppUnit::TestCase {
+
+public:
+
+    CPPUNIT_TEST_SUITE( Test_ThreadPool );
+    CPPUNIT_TEST( testResize );
+    CPPUNIT_TEST( testRun );
+    CPPUNIT_TEST( testExceptions );
+    CPPUNIT_TEST_SUITE_END();
+
+    void testResize();
+    void testRun();
+    void testExceptions();
+
+};
+
+#endif
+
@@ -0,0 +1,261 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+// Include the test definition.
+#include "test_threads.h"
+
+// Include the files to test.
+#include "threads.h"
+
+// Other inclusions.
+#include "latticemodel.h"
+#include "configuration.h"
+#include "latticemap.h"
+#include "interactions.h"
+#include "random.h"
+#include "simulationtimer.h"
+
+#include <algorithm>
+#include <stdexcept>
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Threads::testSettings()
+{
+    // The default is serial execution.
+    CPPUNIT_ASSERT_EQUAL( numberOfThreads(), 1 );
+    CPPUNIT_ASSERT_EQUAL( threadThreshold(), 1000 );
+
+    setNumberOfThreads(4, 10);
+    CPPUNIT_ASSERT_EQUAL( numberOfThreads(), 4 );
+    CPPUNIT_ASSERT_EQUAL( threadThreshold(), 10 );
+
+    // Less than one thread means one.
+    setNumberOfThreads(0, -3);
+    CPPUNIT_ASSERT_EQUAL( numberOfThreads(), 1 );
+    CPPUNIT_ASSERT_EQUAL( threadThreshold(), 0 );
+
+    // Reset.
+    setNumberOfThreads(1, 1000);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Threads::testParallelFor()
+{
+    const size_t n_items = 1003;
+    std::vector<int> counts(n_items, 0);
+    std::vector<size_t> chunks;
+
+    // Serial below the threshold, as one chunk.
+    setNumberOfThreads(4, 2000);
+    parallelFor(n_items,
+                [&](const size_t begin, const size_t end)
+                {
+                    chunks.push_back(begin);
+                    for (size_t i = begin; i < end; ++i)
+                    {
+                        counts[i] += 1;
+                    }
+                });
+
+    CPPUNIT_ASSERT_EQUAL( static_cast<int>(chunks.size()), 1 );
+    for (size_t i = 0; i < n_items; ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( counts[i], 1 );
+    }
+
+    // Every item is visited exactly once also on several threads.
+    setNumberOfThreads(4, 10);
+    parallelFor(n_items,
+                [&](const size_t begin, const size_t end)
+                {
+                    for (size_t i = begin; i < end; ++i)
+                    {
+                        counts[i] += 1;
+                    }
+                });
+
+    for (size_t i = 0; i < n_items; ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( counts[i], 2 );
+    }
+
+    // More threads than items.
+    std::vector<int> few(3, 0);
+    setNumberOfThreads(8, 0);
+    parallelFor(few.size(),
+                [&](const size_t begin, const size_t end)
+                {
+                    for (size_t i = begin; i < end; ++i)
+                    {
+                        few[i] += 1;
+                    }
+                });
+
+    CPPUNIT_ASSERT_EQUAL( few[0], 1 );
+    CPPUNIT_ASSERT_EQUAL( few[1], 1 );
+    CPPUNIT_ASSERT_EQUAL( few[2], 1 );
+
+    // Reset.
+    setNumberOfThreads(1, 1000);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Threads::testParallelForExceptions()
+{
+    const size_t n_items = 100;
+    std::vector<int> counts(n_items, 0);
+
+    // An exception on a worker thread reaches the caller.
+    setNumberOfThreads(4, 0);
+    CPPUNIT_ASSERT_THROW( parallelFor(n_items,
+                                      [&](const size_t begin, const size_t)
+                                      {
+                                          if (begin != 0)
+                                          {
+                                              throw std::runtime_error("Worker chunk.");
+                                          }
+                                      }),
+                          std::runtime_error );
+
+    // So does an exception on the calling thread.
+    CPPUNIT_ASSERT_THROW( parallelFor(n_items,
+                                      [&](const size_t begin, const size_t)
+                                      {
+                                          if (begin == 0)
+                                          {
+                                              throw std::runtime_error("First chunk.");
+                                          }
+                                      }),
+                          std::runtime_error );
+
+    // The threads are still usable.
+    parallelFor(n_items,
+                [&](const size_t begin, const size_t end)
+                {
+                    for (size_t i = begin; i < end; ++i)
+                    {
+                        counts[i] += 1;
+                    }
+                });
+
+    for (size_t i = 0; i < n_items; ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( counts[i], 1 );
+    }
+
+    // Reset.
+    setNumberOfThreads(1, 1000);
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_Threads::testThreadedMatching()
+{
+    // Setup a system of A and B swapping places and check that running on
+    // several threads gives the same trajectory and matching as serially.
+    const int nI = 12;
+    const int nJ = 6;
+    const int nK = 6;
+
+    std::vector<std::vector<double> > coordinates;
+    std::vector<std::vector<std::string> > elements;
+
+    for (int i = 0; i < nI; ++i)
+    {
+        for (int j = 0; j < nJ; ++j)
+        {
+            for (int k = 0; k < nK; ++k)
+            {
+                std::vector<double> c(3);
+                c[0] = i;
+                c[1] = j;
+                c[2] = k;
+                coordinates.push_back(c);
+                const std::string element = ((i*5 + j*3 + k) % 4 == 0) ? "A" : "B";
+                elements.push_back(std::vector<std::string>(1, element));
+            }
+        }
+    }
+
+    std::map<std::string, int> possible_types;
+    possible_types["*"] = 0;
+    possible_types["A"] = 1;
+    possible_types["B"] = 2;
+
+    std::vector<int> repetitions(3);
+    repetitions[0] = nI;
+    repetitions[1] = nJ;
+    repetitions[2] = nK;
+    const std::vector<bool> periodicity(3, true);
+    const LatticeMap lattice_map(1, repetitions, periodicity);
+
+    // Swap an A with a B in each direction.
+    std::vector<Process> processes;
+    const std::vector<int> basis_sites(1, 0);
+
+    for (int p = 0; p < 6; ++p)
+    {
+        std::vector<std::vector<double> > process_coordinates(2, std::vector<double>(3, 0.0));
+        process_coordinates[1][p/2] = (p % 2 == 0) ? 1.0 : -1.0;
+
+        std::vector<std::vector<std::string> > process_elements1(2, std::vector<std::string>(1, "A"));
+        process_elements1[1][0] = "B";
+        std::vector<std::vector<std::string> > process_elements2(2, std::vector<std::string>(1, "B"));
+        process_elements2[1][0] = "A";
+
+        const Configuration c1(process_coordinates, process_elements1, possible_types);
+        const Configuration c2(process_coordinates, process_elements2, possible_types);
+        processes.push_back(Process(c1, c2, 1.0 + p, basis_sites));
+    }
+
+    // Run serially.
+    const Interactions interactions1(processes, true);
+    Configuration configuration1(coordinates, elements, possible_types);
+    SimulationTimer timer1;
+    seedRandom(false, 1234);
+    LatticeModel model1(configuration1, timer1, lattice_map, interactions1);
+
+    for (int step = 0; step < 100; ++step)
+    {
+        model1.singleStep();
+    }
+
+    // Run on four threads, with all work split over the threads.
+    setNumberOfThreads(4, 0);
+
+    const Interactions interactions2(processes, true);
+    Configuration configuration2(coordinates, elements, possible_types);
+    SimulationTimer timer2;
+    seedRandom(false, 1234);
+    LatticeModel model2(configuration2, timer2, lattice_map, interactions2);
+
+    for (int step = 0; step < 100; ++step)
+    {
+        model2.singleStep();
+    }
+
+    setNumberOfThreads(1, 1000);
+
+    // Check.
+    CPPUNIT_ASSERT( configuration1.elements() == configuration2.elements() );
+
+    for (size_t p = 0; p < processes.size(); ++p)
+    {
+        const std::vector<int> & sites1 = model1.interactions().processes()[p]->sites();
+        const std::vector<int> & sites2 = model2.interactions().processes()[p]->sites();
+        CPPUNIT_ASSERT( sites1 == sites2 );
+    }
+}
+
@@ -0,0 +1,41 @@
+/*
+  Copyright (c)  2016  Mikael Leetmaa
+
+  This file is part of the KMCLib project distributed under the terms of the
+  GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+*/
+
+
+#ifndef __TEST_THREADS__
+#define __TEST_THREADS__
+
+#include <iostream>
+#include <string>
+
+#include <cppunit/TestCase.h>
+#include <cppunit/TestSuite.h>
+#include <cppunit/TestCaller.h>
+#include <cppunit/TestRunner.h>
+
+#include <cppunit/extensions/HelperMacros.h>
+
+class Test_Threads : public CppUnit::TestCase {
+
+public:
+
+    CPPUNIT_TEST_SUITE( Test_Threads );
+    CPPUNIT_TEST( testSettings );
+    CPPUNIT_TEST( testParallelFor );
+    CPPUNIT_TEST( testParallelForExceptions );
+    CPPUNIT_TEST( testThreadedMatching );
+    CPPUNIT_TEST_SUITE_END();
+
+    void testSettings();
+    void testParallelFor();
+    void testParallelForExceptions();
+    void testThreadedMatching();
+
+};
+
+#endif
+
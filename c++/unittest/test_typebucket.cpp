@@ -379,3 +379,104 @@ void Test_TypeBucket::testAdd()
     CPPUNIT_ASSERT_EQUAL(t3[2], t1[2] + t2[2]);
 
 }
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_TypeBucket::testAssignmentOperator()
+{
+    TypeBucket tb1(4);
+    tb1[0] = 1;
+    tb1[3] = 7;
+
+    // Assign to a bucket of another size.
+    TypeBucket tb2(2);
+    tb2 = tb1;
+    CPPUNIT_ASSERT_EQUAL( tb2.size(), 4 );
+    CPPUNIT_ASSERT_EQUAL( tb2[0], 1 );
+    CPPUNIT_ASSERT_EQUAL( tb2[1], 0 );
+    CPPUNIT_ASSERT_EQUAL( tb2[3], 7 );
+    CPPUNIT_ASSERT( tb2.identical(tb1) );
+
+    // The copy is independent of the original.
+    tb1[0] = 2;
+    CPPUNIT_ASSERT_EQUAL( tb2[0], 1 );
+
+    // Self assignment.
+    tb2 = tb2;
+    CPPUNIT_ASSERT_EQUAL( tb2.size(), 4 );
+    CPPUNIT_ASSERT_EQUAL( tb2[3], 7 );
+}
+
+
+// -------------------------------------------------------------------------- //
+//
+void Test_TypeBucket::testInlineStorage()
+{
+    const int n_inline = KMCLIB_TYPE_BUCKET_INLINE_SIZE;
+    const int n_heap   = KMCLIB_TYPE_BUCKET_INLINE_SIZE + 5;
+
+    // Small buckets are inline, large ones on the heap.
+    TypeBucket small(3);
+    TypeBucket full(n_inline);
+    TypeBucket large(n_heap);
+    CPPUNIT_ASSERT( TypeBucket().isInline() );
+    CPPUNIT_ASSERT( small.isInline() );
+    CPPUNIT_ASSERT( full.isInline() );
+    CPPUNIT_ASSERT( !large.isInline() );
+
+    for (int i = 0; i < n_heap; ++i)
+    {
+        CPPUNIT_ASSERT_EQUAL( large[i], 0 );
+        large[i] = i;
+    }
+    small[2] = 4;
+
+    // Copies keep the storage kind.
+    const TypeBucket small_copy(small);
+    const TypeBucket large_copy(large);
+    CPPUNIT_ASSERT( small_copy.isInline() );
+    CPPUNIT_ASSERT( !large_copy.isInline() );
+    CPPUNIT_ASSERT( small_copy.identical(small) );
+    CPPUNIT_ASSERT( large_copy.identical(large) );
+    CPPUNIT_ASSERT_EQUAL( large_copy[n_heap-1], n_heap-1 );
+
+    // Assign a heap bucket to an inline bucket and back.
+    TypeBucket tb(3);
+    tb = large;
+    CPPUNIT_ASSERT( !tb.isInline() );
+    CPPUNIT_ASSERT( tb.identical(large) );
+    CPPUNIT_ASSERT( tb.match(large) );
+    tb[1] = 100;
+    CPPUNIT_ASSERT( !tb.identical(large) );
+    CPPUNIT_ASSERT( large.match(tb) );
+    CPPUNIT_ASSERT( !tb.match(large) );
+    CPPUNIT_ASSERT_EQUAL( large[1], 1 );
+
+    tb = small;
+    CPPUNIT_ASSERT( tb.isInline() );
+    CPPUNIT_ASSERT( tb.identical(small) );
+
+    // Shrinking within the inline storage leaves no trace of the old counts.
+    TypeBucket wide(n_inline);
+    for (int i = 0; i < n_inline; ++i)
+    {
+        wide[i] = 3;
+    }
+    wide = small;
+    CPPUNIT_ASSERT_EQUAL( wide.size(), 3 );
+    CPPUNIT_ASSERT( wide.identical(small) );
+    CPPUNIT_ASSERT( wide.match(small) );
+    CPPUNIT_ASSERT( small.match(wide) );
+
+    // Buckets of different sizes are not identical.
+    CPPUNIT_ASSERT( !TypeBucket(2).identical(TypeBucket(3)) );
+    CPPUNIT_ASSERT( !TypeBucket(n_heap).identical(TypeBucket(n_heap+1)) );
+    CPPUNIT_ASSERT( TypeBucket(n_heap).identical(TypeBucket(n_heap)) );
+
+    // Addition on the heap.
+    const TypeBucket sum = large.add(large_copy);
+    CPPUNIT_ASSERT( !sum.isInline() );
+    CPPUNIT_ASSERT_EQUAL( sum[n_heap-1], 2*(n_heap-1) );
+}
+
@@ -36,6 +36,8 @@ public:
     CPPUNIT_TEST( testComparisonOperator );
     CPPUNIT_TEST( testMatch );
     CPPUNIT_TEST( testAdd );
+    CPPUNIT_TEST( testAssignmentOperator );
+    CPPUNIT_TEST( testInlineStorage );
     CPPUNIT_TEST_SUITE_END();
 
     void testDefaultConstruction();
@@ -51,6 +53,7 @@ public:
     void testComparisonOperator();
     void testMatch();
     void testAdd();
+    void testInlineStorage();
 
 };
 
@@ -26,16 +26,24 @@
 #include "matchlist.h"
 #include "simulationtimer.h"
 #include "ratecalculator.h"
+#include "ratetable.h"
+#include "ratestatistics.h"
+#include "ratecalculatorlibrary.h"
+#include "functionratecalculator.h"
+#include "pairratecalculator.h"
 #include "mpicommons.h"
 #include "ontheflymsd.h"
 #include "random.h"
+#include "threads.h"
 %}
 
 // Use directors on the RateCalculator for using the python callback.
 %feature("director") SimpleDummyBaseClass;
 %feature("director") RateCalculator;
 
-// Exception handling for overloaded RateCalculators in Python.
+// Exception handling for overloaded RateCalculators in Python, and for
+// errors in the backend raised as RuntimeError.
+%include "exception.i"
 %feature("director:except") {
     if ($error != NULL) {
         throw Swig::DirectorMethodException();
@@ -44,6 +52,59 @@
 %exception {
     try { $action }
     catch (Swig::DirectorException &e) { SWIG_fail; }
+    catch (std::exception &e) { SWIG_exception(SWIG_RuntimeError, e.what()); }
+}
+
+// Send the geometries and type numbers to the Python rate calculators as
+// read-only memoryviews on the backend memory instead of as tuples. The
+// views are only valid during the callback.
+%typemap(directorin) const std::vector<double> & geometry,
+                     const std::vector<double> & geometries,
+                     const std::vector<double> & rate_constants,
+                     const std::vector<double> & global_coordinates {
+    static double empty__ = 0.0;
+    char* data__ = reinterpret_cast<char*>($1.empty() ? &empty__ : const_cast<double*>(&$1[0]));
+    $input = PyMemoryView_FromMemory(data__, $1.size()*sizeof(double), PyBUF_READ);
+}
+%typemap(directorin) const std::vector<int> & types_before,
+                     const std::vector<int> & types_after,
+                     const std::vector<int> & counts_before,
+                     const std::vector<int> & counts_after,
+                     const std::vector<int> & lengths,
+                     const std::vector<int> & process_numbers {
+    static int empty__ = 0;
+    char* data__ = reinterpret_cast<char*>($1.empty() ? &empty__ : const_cast<int*>(&$1[0]));
+    $input = PyMemoryView_FromMemory(data__, $1.size()*sizeof(int), PyBUF_READ);
+}
+
+// Read-only memoryviews on the configuration state, to be wrapped in numpy
+// arrays in Python without copying. The views are valid until the next step.
+%{
+static_assert(sizeof(Coordinate) == 3*sizeof(double), "The coordinates must be stored as x,y,z only.");
+
+static PyObject* readOnlyMemoryView(const void* data, const size_t size)
+{
+    static char empty__ = 0;
+    char* data__ = (size == 0) ? &empty__ : static_cast<char*>(const_cast<void*>(data));
+    return PyMemoryView_FromMemory(data__, size, PyBUF_READ);
+}
+%}
+%extend Configuration {
+    PyObject* typeCountsView() const {
+        const std::vector<int> & counts = $self->typeCounts();
+        return readOnlyMemoryView(counts.data(), counts.size()*sizeof(int));
+    }
+    PyObject* atomIDCoordinatesView() const {
+        const std::vector<Coordinate> & coordinates = $self->atomIDCoordinates();
+        return readOnlyMemoryView(coordinates.data(), coordinates.size()*sizeof(Coordinate));
+    }
+    PyObject* atomIDView() const {
+        const std::vector<int> & ids = $self->atomID();
+        return readOnlyMemoryView(ids.data(), ids.size()*sizeof(int));
+    }
+    PyObject* movedAtomIDsView() const {
+        return readOnlyMemoryView($self->movedAtomIDsStorage().data(), $self->nMovedAtomIDs()*sizeof(int));
+    }
 }
 
 // Include SWIG files for the std containers.
@@ -57,6 +118,7 @@
 %template(StdVectorStdVectorString) std::vector<std::vector<std::string> >;
 %template(StdVectorDouble) std::vector<double>;
 %template(StdVectorInt) std::vector<int>;
+%template(StdVectorLong) std::vector<long>;
 %template(StdVectorBool) std::vector<bool>;
 %template(StdVectorProcess) std::vector<Process>;
 %template(StdVectorProcessPtr) std::vector<Process*>;
@@ -86,9 +148,15 @@
 %include "matchlistentry.h"
 %include "simulationtimer.h"
 %include "ratecalculator.h"
+%include "ratetable.h"
+%include "ratestatistics.h"
+%include "ratecalculatorlibrary.h"
+%include "functionratecalculator.h"
+%include "pairratecalculator.h"
 %include "mpicommons.h"
 %include "ontheflymsd.h"
 %include "random.h"
+%include "threads.h"
 
 
 // This extends the Coordinate class with python indexing support.
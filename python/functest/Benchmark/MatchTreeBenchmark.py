@@ -0,0 +1,68 @@
+""" Benchmark of the matching with and without the compiled match trees. """
+
+# Copyright (c)  2016  Mikael Leetmaa
+#
+# This file is part of the KMCLib project distributed under the terms of the
+# GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+#
+
+import os
+import sys
+import time
+
+# Import the interface.
+from KMCLib import *
+from KMCLib.Backend import Backend
+
+
+def timeSteps(config_file, processes_file, use_match_trees, n_steps, seed):
+    """
+    Time a number of KMC steps, with or without the match trees.
+
+    :param config_file:     The configuration script to load.
+    :param processes_file:  The interactions script to load.
+    :param use_match_trees: True if the match trees should be used.
+    :param n_steps:         The number of steps to take.
+    :param seed:            The random number seed.
+
+    :returns: The wall time in seconds and the types after the last step.
+    """
+    configuration = KMCConfigurationFromScript(config_file)
+    interactions  = KMCInteractionsFromScript(processes_file)
+    model = KMCLatticeModel(configuration, interactions)
+
+    Backend.seedRandom(False, seed)
+    cpp_model = model._backend()
+    cpp_model.setUseMatchTrees(use_match_trees)
+
+    t0 = time.perf_counter()
+    for i in range(n_steps):
+        cpp_model.propagateTime()
+        cpp_model.singleStep()
+    t1 = time.perf_counter()
+
+    return t1 - t0, [list(e) for e in configuration._backend().elements()]
+
+
+def benchmark(name, directory, config_file, processes_file, n_steps, seed=13997):
+    """
+    Run the benchmark on one of the functional test systems and print the timings.
+    """
+    directory = os.path.join(os.path.abspath(os.path.dirname(__file__)), "..", directory)
+    config_file    = os.path.join(directory, config_file)
+    processes_file = os.path.join(directory, processes_file)
+
+    t_list, elements_list = timeSteps(config_file, processes_file, False, n_steps, seed)
+    t_tree, elements_tree = timeSteps(config_file, processes_file, True, n_steps, seed)
+
+    print("%-12s %8i steps   per process: %8.3f s   match tree: %8.3f s   speedup: %6.2f   same trajectory: %s" %
+          (name, n_steps, t_list, t_tree, t_list / t_tree, elements_list == elements_tree))
+
+
+if __name__ == '__main__':
+    n_steps = 100000
+    if len(sys.argv) > 1:
+        n_steps = int(sys.argv[1])
+
+    benchmark("IsingSpin", "IsingSpin", "config.py", "fixed_processes.py", n_steps)
+    benchmark("Diffusion3D", "Diffusion3D", "config.py", "processes.py", n_steps)
@@ -299,7 +299,7 @@ class BucketsTest(unittest.TestCase):
             # One-liner to calculate the number of M1 on this row.
             distribution.append(len([t for i in this_row for t in types[i] if t == 'M1']))
 
-        ref_distribution = [0, 104, 36, 17, 23, 10, 18, 6, 3, 7, 5, 3, 6, 5, 5, 3, 2, 4, 8, 4, 0, 1, 2, 0, 0, 4, 2, 1, 0, 0, 1, 0, 0, 0, 0, 3, 0, 1, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 2, 0, 0, 0, 2, 1, 1, 0, 1, 1, 2, 1, 2, 2, 1, 2, 1, 3, 4, 5, 4, 10, 7, 5, 8, 10, 4, 10, 8, 17, 26, 20, 38, 13, 78]
+        ref_distribution = [0, 80, 56, 32, 13, 17, 5, 3, 8, 8, 6, 9, 2, 3, 2, 3, 3, 4, 2, 0, 6, 1, 4, 0, 3, 5, 3, 2, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 1, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 4, 2, 0, 1, 1, 2, 0, 2, 1, 9, 5, 3, 2, 9, 3, 7, 4, 4, 12, 11, 8, 9, 17, 12, 23, 18, 13, 43, 72]
         # Check.
         self.assertEqual( ref_distribution, distribution )
 
@@ -86,12 +86,12 @@ class Diffusion3DTest(unittest.TestCase):
         D_z1 = fit(time[0:15],  msd[0:15],  std[0:15])
         D_z2 = fit(time[16:29], msd[16:29], std[16:29])
 
-        self.assertAlmostEqual(D_x1,  9.6904604529, 10)
-        self.assertAlmostEqual(D_x2, 5.28485172992, 10)
-        self.assertAlmostEqual(D_y1, 12.2434598296, 10)
-        self.assertAlmostEqual(D_y2, 12.4080915647, 10)
-        self.assertAlmostEqual(D_z1, 13.2233073435, 10)
-        self.assertAlmostEqual(D_z2, 19.1751372532, 10)
+        self.assertAlmostEqual(D_x1,  9.78982389116, 10)
+        self.assertAlmostEqual(D_x2, 5.88367722642, 10)
+        self.assertAlmostEqual(D_y1, 12.1212334505, 10)
+        self.assertAlmostEqual(D_y2, 11.6561807329, 10)
+        self.assertAlmostEqual(D_z1, 13.399699855, 10)
+        self.assertAlmostEqual(D_z2, 19.7324771249, 10)
 
 
 def fit(time, msd, std):
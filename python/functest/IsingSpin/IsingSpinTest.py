@@ -131,6 +131,34 @@ class IsingSpinTest(unittest.TestCase):
 
         t4 = time.perf_counter()
 
+        # --------------------------------------------------------------------
+        # Setup a calculation with the same rates from native pair
+        # interactions, with J = 1 as pair energies of +-J/2.
+
+        # Load the configuration and interactions.
+        configuration = KMCConfigurationFromScript("config.py")
+        interactions  = KMCInteractionsFromScript("custom_processes.py")
+
+        # Set the rate calculator.
+        interactions.setRateCalculator(rate_calculator=KMCPairRateCalculator(
+            types=["U", "D"],
+            shells=[1.0],
+            pair_energies=[[[-0.5, 0.5], [0.5, -0.5]]],
+            kT=1.0))
+
+        # Create the model.
+        model = KMCLatticeModel(configuration, interactions)
+
+        # Define the parameters.
+        control_parameters = KMCControlParameters(number_of_steps=1000000,
+                                                  dump_interval=10000,
+                                                  seed=seed)
+
+        # Run the simulation - save trajectory to 'custom_traj_pair.py'
+        model.run(control_parameters, trajectory_filename="custom_traj_pair.py")
+
+        t45 = time.perf_counter()
+
         # --------------------------------------------------------------------
         # Setup the same calculation with fixed rates.
 
@@ -169,6 +197,12 @@ class IsingSpinTest(unittest.TestCase):
             exec(compile(f.read(), "custom_traj_cpp_cache.py", 'exec'), global_dict, local_dict)
         elem_cache_cpp  = local_dict["types"][-1]
 
+        global_dict = {}
+        local_dict  = {}
+        with open("custom_traj_pair.py", "rb") as f:
+            exec(compile(f.read(), "custom_traj_pair.py", 'exec'), global_dict, local_dict)
+        elem_pair  = local_dict["types"][-1]
+
         global_dict = {}
         local_dict  = {}
         with open("fixed_traj.py", "rb") as f:
@@ -184,6 +218,9 @@ class IsingSpinTest(unittest.TestCase):
         d11 = len([e for e in elem_cache_cpp if e == "D"] )
         u11 = len([e for e in elem_cache_cpp if e == "U"] )
 
+        d12 = len([e for e in elem_pair if e == "D"] )
+        u12 = len([e for e in elem_pair if e == "U"] )
+
         d2 = len([e for e in elem_fixed if e == "D"] )
         u2 = len([e for e in elem_fixed if e == "U"] )
 
@@ -192,17 +229,22 @@ class IsingSpinTest(unittest.TestCase):
         print("Time for custom run (s):", t2-t1)
         print("Time for cache run  (s):", t3-t2)
         print("Time for cache C++ run (s):", t4-t3)
-        print("Time for fixed run  (s):", t5-t4)
-
-        self.assertEqual(d0,  3358)
-        self.assertEqual(d1,  3358)
-        self.assertEqual(d11, 3358)
-        self.assertEqual(d2,  3726)
-
-        self.assertEqual(u0,  6642)
-        self.assertEqual(u1,  6642)
-        self.assertEqual(u11, 6642)
-        self.assertEqual(u2,  6274)
+        print("Time for pair C++ run (s):", t45-t4)
+        print("Time for fixed run  (s):", t5-t45)
+
+        # The native pair interactions reproduce the custom rates.
+        self.assertEqual(d12, d0)
+        self.assertEqual(u12, u0)
+
+        self.assertEqual(d0,  3918)
+        self.assertEqual(d1,  3918)
+        self.assertEqual(d11, 3918)
+        self.assertEqual(d2,  4352)
+
+        self.assertEqual(u0,  6082)
+        self.assertEqual(u1,  6082)
+        self.assertEqual(u11, 6082)
+        self.assertEqual(u2,  5648)
 
         # --------------------------------------------------------------------
         # Now, plot the last configuration from each trajectory and compare
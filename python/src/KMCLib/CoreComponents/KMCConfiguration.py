@@ -16,6 +16,7 @@ from KMCLib.Utilities.ConversionUtilities import stringListToStdVectorStdVectorS
 from KMCLib.Utilities.ConversionUtilities import numpy2DArrayToStdVectorStdVectorDouble
 from KMCLib.Utilities.ConversionUtilities import stdVectorCoordinateToNumpy2DArray
 from KMCLib.Utilities.ConversionUtilities import bucketListToStdVectorStdVectorString
+from KMCLib.Utilities.ConversionUtilities import backendBufferToNumpy
 
 from KMCLib.Exceptions.Error import Error
 from KMCLib.Backend import Backend
@@ -29,7 +30,8 @@ class KMCConfiguration(object):
                  lattice=None,
                  types=None,
                  possible_types=None,
-                 default_type=None):
+                 default_type=None,
+                 compact_match_lists=False):
         """
         Constructor for the KMCConfiguration - the configuration object to use
         in the KMC simulations.
@@ -54,6 +56,13 @@ class KMCConfiguration(object):
                              given in long format i.e. [(0,0,1,0,'a'), (0,0,1,1,'b'), ...]
                              The default type will then be used for lattice sites
                              not specified in the types list.
+
+        :param compact_match_lists: If the match lists of the sites should be stored in
+                                    compact form, as one geometry template per basis point
+                                    and the neighbour indices of each site. This saves memory
+                                    for large lattices at the cost of generating the match
+                                    lists when used. Defaults to False.
+        :type compact_match_lists: bool
         """
         # Check that the lattice is of the correct type.
         if not isinstance(lattice,KMCLattice):
@@ -69,6 +78,11 @@ class KMCConfiguration(object):
         # Check and set the types.
         self.__checkAndSetTypes(types, default_type, possible_types)
 
+        # Check the compact match lists flag.
+        if not isinstance(compact_match_lists, bool):
+            raise Error("The 'compact_match_lists' flag given to the KMCConfiguration constructor must be True or False.")
+        self.__compact_match_lists = compact_match_lists
+
         # Wait with setting up the backend until we need it.
         self.__backend = None
 
@@ -243,6 +257,47 @@ class KMCConfiguration(object):
         """
         return stdVectorCoordinateToNumpy2DArray(self._backend().atomIDCoordinates())
 
+    def typeCountsView(self):
+        """
+        Query for a read-only view on the number of particles of each type
+        on each site in the backend, without copying. The view follows the
+        simulation and is valid until the next step.
+
+        :returns: An (n_sites, n_types) numpy array where column t counts the
+                  particles of the type with number t in possibleTypes().
+        """
+        view = self._backend().typeCountsView()
+        return backendBufferToNumpy(view, numpy.intc).reshape(self.__n_lattice_sites,
+                                                              len(self.__possible_types))
+
+    def atomIDCoordinatesView(self):
+        """
+        Query for a read-only view on the coordinates per atom id in the
+        backend, without copying. The view is valid until the next step.
+
+        :returns: An (n_atom_ids, 3) numpy array of float64.
+        """
+        view = self._backend().atomIDCoordinatesView()
+        return backendBufferToNumpy(view, numpy.float64).reshape(-1, 3)
+
+    def atomIDsView(self):
+        """
+        Query for a read-only view on the atom id at each lattice site in
+        the backend, without copying. The view is valid until the next step.
+
+        :returns: A numpy array with one atom id per site.
+        """
+        return backendBufferToNumpy(self._backend().atomIDView(), numpy.intc)
+
+    def movedAtomIDsView(self):
+        """
+        Query for a read-only view on the atom ids moved by the latest step
+        in the backend, without copying. The view is valid until the next step.
+
+        :returns: A numpy array with the moved atom ids.
+        """
+        return backendBufferToNumpy(self._backend().movedAtomIDsView(), numpy.intc)
+
     def sites(self):
         """
         Query function for the lattice sites.
@@ -259,6 +314,14 @@ class KMCConfiguration(object):
         """
         return self.__possible_types
 
+    def compactMatchLists(self):
+        """
+        Query for the compact match lists flag.
+
+        :returns: True if the match lists are stored in compact form.
+        """
+        return self.__compact_match_lists
+
     def particlesPerType(self):
         """
         Query function for the number of particles per type.
@@ -315,6 +378,7 @@ class KMCConfiguration(object):
             self.__backend = Backend.Configuration(cpp_coords,
                                                    cpp_types,
                                                    cpp_possible_types)
+            self.__backend.setCompactMatchLists(self.__compact_match_lists)
 
         # Return the backend.
         return self.__backend
@@ -397,7 +461,11 @@ class KMCConfiguration(object):
         configuration_string = variable_name + """ = KMCConfiguration(
     lattice=lattice,
     types=types,
-    possible_types=possible_types)
+    possible_types=possible_types"""
+        if self.__compact_match_lists:
+            configuration_string += """,
+    compact_match_lists=True"""
+        configuration_string += """)
 """
 
         # Add the comment.
@@ -22,7 +22,10 @@ class KMCControlParameters(object):
                  analysis_interval=None,
                  seed=None,
                  dump_time_interval=None,
-                 rng_type=None):
+                 rng_type=None,
+                 selection_type=None,
+                 number_of_threads=None,
+                 thread_threshold=None):
         """
         Constructuor for the KMCControlParameters object that
         holds all parameters controlling the flow of the KMC simulation.
@@ -71,6 +74,36 @@ class KMCControlParameters(object):
                          sure it works as you expect if you have a random device installed, since this
                          has not been tested with a random device by the KMCLib developers.
         :type rng_type: str
+
+        :param selection_type: The algorithm to use for selecting which process to
+                               perform in each step:
+
+                               'TREE' for picking from a binary tree of the process
+                               total rates, where only the processes that changed in
+                               the last step are updated, O(logN) in the number of
+                               processes (Default),
+                               'LINEAR' for picking from a cumulative table of the
+                               process total rates that is recalculated every step, O(N),
+                               'COMPOSITION_REJECTION' for picking a process and site
+                               together from bins of site rates grouped by powers of
+                               two, by composition-rejection, O(1) expected in the
+                               number of processes and sites. This is useful with
+                               custom rates spanning many orders of magnitude.
+
+                               All algorithms pick processes and sites with identical
+                               probabilities.
+        :type selection_type: str
+
+        :param number_of_threads: The number of threads to use for the matching
+                                  and for the rates of built in C++ rate calculators.
+                                  Rate calculators written in Python always run on a
+                                  single thread. The default value is 1.
+        :type number_of_threads: int
+
+        :param thread_threshold: The smallest number of matching or rate calculation
+                                 tasks to split over the threads. Smaller sets of tasks
+                                 are run on a single thread. The default value is 1000.
+        :type thread_threshold: int
         """
         # Check and set the number of steps.
         self.__number_of_steps = checkPositiveInteger(number_of_steps,
@@ -111,6 +144,20 @@ class KMCControlParameters(object):
         # Check and set the random number generator type.
         self.__rng_type  = self.__checkRngType(rng_type, "MT")
 
+        # Check and set the process selection type.
+        self.__selection_type = self.__checkSelectionType(selection_type, "TREE")
+
+        # Check and set the thread parallelism parameters.
+        self.__number_of_threads = checkPositiveInteger(number_of_threads,
+                                                        1,
+                                                        "number_of_threads")
+        if self.__number_of_threads < 1:
+            raise Error("The 'number_of_threads' parameter must be at least 1.")
+
+        self.__thread_threshold = checkPositiveInteger(thread_threshold,
+                                                       1000,
+                                                       "thread_threshold")
+
     def __checkRngType(self, rng_type, default):
         """
         Private helper function to check the random number generator input.
@@ -130,6 +177,23 @@ class KMCControlParameters(object):
 
         return rng_dict[rng_type]
 
+    def __checkSelectionType(self, selection_type, default):
+        """
+        Private helper function to check the process selection type input.
+        """
+        if selection_type is None:
+            selection_type = default
+
+        selection_dict = { "TREE"                  : Backend.TREE,
+                           "LINEAR"                : Backend.LINEAR,
+                           "COMPOSITION_REJECTION" : Backend.COMPOSITION_REJECTION,
+                           }
+
+        if not selection_type in selection_dict:
+            raise Error("'selection_type' input must be one of the supported types. Check the documentation for the list of supported types. Default is 'TREE'.")
+
+        return selection_dict[selection_type]
+
     def numberOfSteps(self):
         """
         Query for the number of steps.
@@ -184,3 +248,21 @@ class KMCControlParameters(object):
         """
         return self.__rng_type
 
+    def selectionType(self):
+        """
+        Query for the process selection type.
+        """
+        return self.__selection_type
+
+    def numberOfThreads(self):
+        """
+        Query for the number of threads.
+        """
+        return self.__number_of_threads
+
+    def threadThreshold(self):
+        """
+        Query for the thread threshold.
+        """
+        return self.__thread_threshold
+
@@ -10,6 +10,7 @@
 
 import numpy
 import inspect
+import os
 
 from KMCLib.CoreComponents.KMCLocalConfiguration import KMCLocalConfiguration
 from KMCLib.CoreComponents.KMCBaseProcess import KMCBaseProcess
@@ -17,7 +18,10 @@ from KMCLib.Utilities.CheckUtilities import checkSequence
 from KMCLib.Utilities.CheckUtilities import checkPositiveInteger
 from KMCLib.Utilities.CheckUtilities import checkSequenceOf
 from KMCLib.Utilities.ConversionUtilities import stdVectorStringToStringList
+from KMCLib.CoreComponents.KMCBucketProcess import KMCBucketProcess
 from KMCLib.PluginInterfaces.KMCRateCalculatorPlugin import KMCRateCalculatorPlugin
+from KMCLib.PluginInterfaces.KMCRateFunction import KMCRateFunction
+from KMCLib.PluginInterfaces.KMCPairRateCalculator import KMCPairRateCalculator
 from KMCLib.Exceptions.Error import Error
 from KMCLib.Backend import Backend
 from KMCLib.Backend import Custom
@@ -61,6 +65,9 @@ class KMCInteractions(object):
         # Set the rate calculator.
         self.__rate_calculator = None
         self.__rate_calculator_class = None
+        self.__rate_calculator_library = None
+        self.__rate_function = None
+        self.__pair_rate_calculator = None
         self.__builtin_custom = False
 
     def rateCalculator(self):
@@ -70,6 +77,13 @@ class KMCInteractions(object):
         """
         return self.__rate_calculator
 
+    def rateFunction(self):
+        """
+        Query for the rate function.
+        :returns: The stored KMCRateFunction, or None if no rate function is set.
+        """
+        return self.__rate_function
+
     # FIXME: NEEDS MORE TESTING
     def setRateCalculator(self,
                           rate_calculator=None):
@@ -78,9 +92,49 @@ class KMCInteractions(object):
         set before the backend is generated to take effect.
 
         :param rate_calculator:    A class inheriting from the
-                                   KMCRateCalculatorPlugin interface. If not given
-                                   the rates specified for each process will be used unmodified.
+                                   KMCRateCalculatorPlugin interface, the name of one of the
+                                   builtin custom calculators, or the path to a shared library
+                                   with a rate calculator implemented in C++, see the template
+                                   in KMCLib/c++/plugin. May also be a KMCRateFunction with a
+                                   C function to call for the rates, or a KMCPairRateCalculator
+                                   with tabulated pair interactions. If not given the rates
+                                   specified for each process will be used unmodified.
         """
+        self.__rate_calculator_library = None
+        self.__rate_function = None
+        self.__pair_rate_calculator = None
+        self.__builtin_custom = False
+
+        # A rate function is called directly from the backend.
+        if isinstance(rate_calculator, KMCRateFunction):
+            self.__rate_function = rate_calculator
+            self.__rate_calculator_str = "KMCRateFunction"
+            self.__rate_calculator_class = KMCRateFunction
+            self.__builtin_custom = True
+            return
+
+        # And so is a pair rate calculator.
+        if isinstance(rate_calculator, KMCPairRateCalculator):
+            self.__pair_rate_calculator = rate_calculator
+            self.__rate_calculator_str = "KMCPairRateCalculator"
+            self.__rate_calculator_class = KMCPairRateCalculator
+            self.__builtin_custom = True
+            return
+
+        # If the rate calculator given is a path to a shared library it is
+        # loaded when the backend is generated.
+        if isinstance(rate_calculator, str) and \
+                (os.sep in rate_calculator or os.path.splitext(rate_calculator)[1] in (".so", ".dylib")):
+
+            if not os.path.isfile(rate_calculator):
+                raise Error("The rate calculator library '%s' given to the KMCInteractions object does not exist."%(rate_calculator))
+
+            # Save the path for use in scripting.
+            self.__rate_calculator_library = os.path.abspath(rate_calculator)
+            self.__rate_calculator_str = repr(self.__rate_calculator_library)
+            self.__rate_calculator_class = Backend.RateCalculatorLibrary
+            self.__builtin_custom = True
+            return
 
         # If the rate calculator given is a string we should use one of the
         # builtin custom calculators.
@@ -172,6 +226,20 @@ be a class (not instantiated) inheriting from the KMCRateCalculatorPlugin. """
                 # Instantiate the rate calculator.
                 if self.__builtin_custom == False:
                     rate_calculator = self.__rate_calculator_class(configuration)
+                elif self.__rate_function is not None:
+                    if any([isinstance(p, KMCBucketProcess) for p in self.__processes]):
+                        raise Error("Bucket processes can not be used with a KMCRateFunction.")
+                    rate_calculator = self.__rate_function._backend()
+                elif self.__pair_rate_calculator is not None:
+                    if any([isinstance(p, KMCBucketProcess) for p in self.__processes]):
+                        raise Error("Bucket processes can not be used with a KMCPairRateCalculator.")
+                    rate_calculator = self.__pair_rate_calculator._backend(possible_types, self.__processes)
+                elif self.__rate_calculator_library is not None:
+                    try:
+                        rate_calculator = self.__rate_calculator_class(self.__rate_calculator_library,
+                                                                       configuration._backend())
+                    except RuntimeError as e:
+                        raise Error(str(e))
                 else:
                     rate_calculator = self.__rate_calculator_class(configuration._backend())
 
@@ -187,6 +255,10 @@ The 'rate_calculator' given to the KMCInteractions class must
 inherit from the KMCRateCalculatorPlugin class. It may not be
 the KMCRateCalculatorPlugin class itself. """
                         raise Error(msg)
+
+                    cache_size = rate_calculator.cacheSize()
+                    if not isinstance(cache_size, int) or isinstance(cache_size, bool) or cache_size < 1:
+                        raise Error("The cacheSize function of the 'rate_calculator' must return a positive integer.")
                 # Tests passed. Save the instantiated rate calculator on the class.
                 self.__rate_calculator = rate_calculator
 
@@ -8,6 +8,10 @@
 #
 
 
+import hashlib
+import inspect
+import os
+
 from KMCLib.Backend import Backend
 
 from KMCLib.CoreComponents.KMCConfiguration import KMCConfiguration
@@ -15,6 +19,7 @@ from KMCLib.CoreComponents.KMCInteractions import KMCInteractions
 from KMCLib.CoreComponents.KMCControlParameters import KMCControlParameters
 from KMCLib.PluginInterfaces.KMCAnalysisPlugin import KMCAnalysisPlugin
 from KMCLib.PluginInterfaces.KMCBreakerPlugin import KMCBreakerPlugin
+from KMCLib.PluginInterfaces.KMCRateCalculatorPlugin import KMCRateCalculatorPlugin
 from KMCLib.Exceptions.Error import Error
 from KMCLib.Utilities.Trajectory.LatticeTrajectory import LatticeTrajectory
 from KMCLib.Utilities.Trajectory.XYZTrajectory import XYZTrajectory
@@ -60,6 +65,9 @@ class KMCLatticeModel(object):
         # Set the backend to be generated at first query.
         self.__backend = None
 
+        # No cached rates to preload by default.
+        self.__rate_cache = None
+
         # Set the verbosity level of output to minimal.
         self.__verbosity_level = 0
 
@@ -79,11 +87,17 @@ class KMCLatticeModel(object):
             # Construct a timer.
             self.__cpp_timer = Backend.SimulationTimer()
 
+            # Load the cached rates of a previous run.
+            preloaded_rates = self.__loadRateCache()
+            if preloaded_rates is None:
+                preloaded_rates = Backend.RateTable(0)
+
             # Construct the backend object.
             self.__backend = Backend.LatticeModel(cpp_config,
                                                   self.__cpp_timer,
                                                   cpp_lattice_map,
-                                                  cpp_interactions)
+                                                  cpp_interactions,
+                                                  preloaded_rates)
         # Return.
         return self.__backend
 
@@ -92,7 +106,8 @@ class KMCLatticeModel(object):
             trajectory_filename=None,
             trajectory_type=None,
             analysis=None,
-            breakers=None):
+            breakers=None,
+            rate_cache=None):
         """
         Run the KMC lattice model simulation with specified parameters.
 
@@ -109,6 +124,13 @@ class KMCLatticeModel(object):
         :param analysis:            A list of instantiated analysis objects that should be used for on-the-fly analysis.
 
         :param breakers:            A list of instantiated breaker objects to break the Monte Carlo loop with a custom criterion.
+
+        :param rate_cache:          The filename of a file to store the cached custom rates in when the run is done.
+                                    If the file exists the rates are loaded from it when the model is set up,
+                                    provided that it was written for the same interactions and rate calculator.
+                                    For a KMCRateCalculatorPlugin only the source of the class and its cacheKey()
+                                    are checked, and a KMCRateFunction must be given a cache key.
+                                    Only used if the rate calculator caches rates.
         """
         # Check the input.
         if not isinstance(control_parameters, KMCControlParameters):
@@ -151,6 +173,15 @@ must be given as string."""
             msg = "Each element in the 'breakers' list must be an instance of KMCBreakerPlugin."
             breakers = checkSequenceOf(breakers, KMCBreakerPlugin, msg)
 
+        # Check the rate cache.
+        if rate_cache is not None:
+            if not isinstance(rate_cache, str):
+                raise Error("The 'rate_cache' input to the KMCLatticeModel run function must be given as string.")
+            rate_function = self.__interactions.rateFunction()
+            if rate_function is not None and rate_function.cacheKey() is None:
+                raise Error("The 'rate_cache' input to the KMCLatticeModel run function can only be used with a KMCRateFunction given a 'cache_key'.")
+            self.__rate_cache = rate_cache
+
         # Set and seed the backend random number generator.
         if not Backend.setRngType(control_parameters.rngType()):
             raise Error("DEVICE random number generator is not supported by your system, or the std::random_device in the standard C++ library you use is implemented using a pseudo random number generator (entropy=0).")
@@ -158,11 +189,28 @@ must be given as string."""
         Backend.seedRandom(control_parameters.timeSeed(),
                            control_parameters.seed())
 
+        # Set the threads to use, before the initial matching.
+        Backend.setNumberOfThreads(control_parameters.numberOfThreads(),
+                                   control_parameters.threadThreshold())
+
         # Construct the C++ lattice model.
         prettyPrint(" KMCLib: setting up the backend C++ object.")
 
+        # Load the cached rates of a previous run into a backend set up
+        # before, e.g. for the rate statistics, and re-match with them.
+        if self.__backend is not None and rate_cache is not None:
+            preloaded_rates = self.__loadRateCache()
+            if preloaded_rates is not None:
+                self.__backend.preloadRates(preloaded_rates)
+
         cpp_model = self._backend()
 
+        if rate_cache is not None and not self.__useRateCache():
+            prettyPrint(" KMCLib: WARNING: The rate calculator does not cache rates -> the rate cache is not used.")
+
+        # Set the process selection algorithm.
+        cpp_model.setSelectionType(control_parameters.selectionType())
+
         # Print the initial matching information if above the verbosity threshold.
         if self.__verbosity_level > 9:
             self.__printMatchInfo(cpp_model)
@@ -285,6 +333,61 @@ must be given as string."""
             for ap in analysis:
                 ap.finalize();
 
+            # Store the cached rates for the next run. All MPI processes
+            # have the same rates.
+            if rate_cache is not None and self.__useRateCache() and Backend.MPICommons.isMaster():
+                cpp_model.rateTable().save(rate_cache, self.__rateCacheFingerprint())
+
+    def rateStatistics(self):
+        """
+        Get the statistics of the custom rate cache and of the rate calculator
+        callbacks, counted since the model was set up or the statistics were
+        last reset.
+
+        :returns: A dict with the total number of cache "lookups", "hits",
+                  "misses", "inserts" and "evictions", together with the current
+                  "size" and the "capacity" of the cache. The "processes" entry is
+                  a dict from process number to a dict with the "lookups", "hits",
+                  "misses", "inserts" and "callbacks" of that process, and the
+                  total "callback_time" in seconds.
+        :rtype: dict
+        """
+        cpp_model = self._backend()
+        cpp_table = cpp_model.rateTable()
+        cpp_statistics = cpp_model.rateStatistics()
+
+        lookups = cpp_statistics.lookups()
+        hits = cpp_statistics.hits()
+        inserts = cpp_statistics.inserts()
+        callbacks = cpp_statistics.callbacks()
+        callback_times = cpp_statistics.callbackTimes()
+
+        processes = {}
+        for process_number in range(len(lookups)):
+            processes[process_number] = {
+                "lookups"       : lookups[process_number],
+                "hits"          : hits[process_number],
+                "misses"        : lookups[process_number] - hits[process_number],
+                "inserts"       : inserts[process_number],
+                "callbacks"     : callbacks[process_number],
+                "callback_time" : callback_times[process_number],
+                }
+
+        return {"lookups"   : cpp_table.lookups(),
+                "hits"      : cpp_table.hits(),
+                "misses"    : cpp_table.misses(),
+                "inserts"   : cpp_table.inserts(),
+                "evictions" : cpp_table.evictions(),
+                "size"      : cpp_table.size(),
+                "capacity"  : cpp_table.capacity(),
+                "processes" : processes}
+
+    def resetRateStatistics(self):
+        """
+        Set all counters and times of the rate statistics to zero.
+        """
+        self._backend().resetRateStatistics()
+
     def _script(self, variable_name="model"):
         """
         Generate a script representation of an instance.
@@ -315,6 +418,99 @@ must be given as string."""
         return configuration_script + interactions_script + \
             comment_string + lattice_model_string
 
+    def __useRateCache(self):
+        """
+        Private helper function to determine if a rate cache file is used.
+
+        :returns: True if a rate cache file is given and rates are cached.
+        """
+        rate_calculator = self.__interactions.rateCalculator()
+        return (self.__rate_cache is not None) and \
+            (rate_calculator is not None) and \
+            bool(rate_calculator.cacheRates())
+
+    def __loadRateCache(self):
+        """
+        Private helper function to load the cached rates of a previous run.
+
+        :returns: The loaded rates as a C++ RateTable, or None if there is no
+                  rate cache file to load.
+        """
+        if not (self.__useRateCache() and os.path.exists(self.__rate_cache)):
+            return None
+
+        preloaded_rates = Backend.RateTable(0)
+        if not preloaded_rates.load(self.__rate_cache, self.__rateCacheFingerprint()):
+            prettyPrint(" KMCLib: WARNING: The rate cache %s was written for another model and is not used."%(self.__rate_cache))
+            return None
+
+        prettyPrint(" KMCLib: loaded %i cached rates from %s"%(preloaded_rates.size(), self.__rate_cache))
+        if self.__rateCacheKey() is None and \
+                isinstance(self.__interactions.rateCalculator(), KMCRateCalculatorPlugin):
+            prettyPrint(" KMCLib: WARNING: The rate cache only checks the source of the rate calculator class. Define cacheKey() if the rates depend on anything else.")
+
+        return preloaded_rates
+
+    def __rateCacheFingerprint(self):
+        """
+        Private helper function for generating a fingerprint of everything
+        the cached rates depend on: the interactions, the possible types, the
+        unit cell, and the identity, source, settings and cache key of the
+        rate calculator.
+
+        :returns: The fingerprint as a string of hexadecimal digits.
+        """
+        rate_calculator = self.__interactions.rateCalculator()
+        calculator_class = rate_calculator.__class__
+
+        try:
+            calculator_source = inspect.getsource(calculator_class)
+        except (TypeError, OSError):
+            calculator_source = ""
+
+        # For a calculator loaded from a shared library the library itself
+        # takes the place of the source.
+        if isinstance(rate_calculator, Backend.RateCalculatorLibrary):
+            with open(rate_calculator.path(), "rb") as library:
+                calculator_source = rate_calculator.path() + hashlib.sha1(library.read()).hexdigest()
+
+        # For a pair rate calculator the tables take the place of the source.
+        if isinstance(rate_calculator, Backend.PairRateCalculator):
+            calculator_source = repr([tuple(rate_calculator.shells()),
+                                      tuple(rate_calculator.pairEnergies()),
+                                      tuple(rate_calculator.siteEnergies()),
+                                      tuple(rate_calculator.barriers()),
+                                      tuple(rate_calculator.alphas()),
+                                      rate_calculator.kT()])
+
+        lattice = self.__configuration.lattice()
+        data = [calculator_class.__module__ + "." + calculator_class.__name__,
+                calculator_source,
+                repr(rate_calculator.cutoff()),
+                repr(tuple(rate_calculator.excludeFromCaching())),
+                repr(self.__rateCacheKey()),
+                self.__interactions._script(),
+                repr(sorted(self.__configuration.possibleTypes().items())),
+                lattice.unitCell()._script(),
+                repr(lattice.periodic())]
+
+        return hashlib.sha1("\n".join(data).encode("utf-8")).hexdigest()
+
+    def __rateCacheKey(self):
+        """
+        Private helper function for getting the cache key of the rate calculator.
+
+        :returns: The cache key, or None if the rate calculator does not give one.
+        """
+        rate_function = self.__interactions.rateFunction()
+        if rate_function is not None:
+            return rate_function.cacheKey()
+
+        rate_calculator = self.__interactions.rateCalculator()
+        if isinstance(rate_calculator, KMCRateCalculatorPlugin):
+            return rate_calculator.cacheKey()
+        return None
+
     def __printMatchInfo(self, cpp_model):
         """ """
         """
@@ -0,0 +1,278 @@
+""" Module for the KMCPairRateCalculator class """
+
+
+# Copyright (c)  2016  Mikael Leetmaa
+#
+# This file is part of the KMCLib project distributed under the terms of the
+# GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+#
+
+
+import numpy
+
+from KMCLib.Backend import Backend
+from KMCLib.Exceptions.Error import Error
+from KMCLib.Utilities.CheckUtilities import checkSequenceOfPositiveIntegers
+
+
+class KMCPairRateCalculator(object):
+    """
+    Class for calculating the custom rates in the backend from pair
+    interactions in neighbour shells, without going through Python.
+
+    The energy change dE of a process is the change in the pair energies of
+    all pairs with at least one site changed by the process, plus the change
+    in the site energies of the changed sites. The pair energy of two sites
+    is taken from the first shell with a radius not smaller than their
+    distance, in primitive cell internal coordinates. The rate of process
+    number p is then
+
+        rate = rate_constant * exp(-Ea / kT),
+        Ea   = max(0, dE, barriers[p] + alphas[p] * dE),
+
+    such that a zero barrier and alpha one gives the Metropolis rate
+    rate_constant * min(1, exp(-dE / kT)), which are the defaults.
+    Bucket processes are not supported.
+    """
+
+    def __init__(self,
+                 types,
+                 shells,
+                 pair_energies,
+                 site_energies=None,
+                 barriers=None,
+                 alphas=None,
+                 kT=1.0,
+                 cache_rates=True,
+                 cache_size=100000,
+                 exclude_from_caching=None):
+        """
+        Constructor for the KMCPairRateCalculator.
+
+        :param types: The type names for the axes of the energy tables.
+                      Types of the configuration not listed here have no energy.
+        :type types: list of str
+
+        :param shells: The outer radius of each neighbour shell in increasing order.
+
+        :param pair_energies: The pair energies as an array with shape
+                              (len(shells), len(types), len(types)), symmetric
+                              in the two type axes.
+
+        :param site_energies: The site energy of each type. Defaults to zero.
+
+        :param barriers: The activation energy barrier of each process number. Defaults to zero.
+
+        :param alphas: The Bronsted-Evans-Polanyi coefficient of each process number. Defaults to one.
+
+        :param kT: The thermal energy, in the same unit as the energies. Defaults to 1.0.
+        :type kT: float
+
+        :param cache_rates: If the calculated rates should be cached. Defaults to True.
+        :type cache_rates: bool
+
+        :param cache_size: The maximum number of cached rates. Defaults to 100000.
+        :type cache_size: int
+
+        :param exclude_from_caching: The process numbers to exclude from the caching.
+        """
+        # Check the types.
+        if not isinstance(types, (list, tuple)) or len(types) == 0 or \
+                not all([isinstance(t, str) for t in types]) or len(set(types)) != len(types):
+            raise Error("The 'types' given to the KMCPairRateCalculator must be a list of unique type names.")
+        self.__types = tuple(types)
+        n_types = len(self.__types)
+
+        # Check the tables.
+        self.__shells = self.__floatArray(shells, "shells", 1)
+        if len(self.__shells) == 0 or self.__shells[0] <= 0.0 or \
+                numpy.any(self.__shells[1:] <= self.__shells[:-1]):
+            raise Error("The 'shells' given to the KMCPairRateCalculator must be positive and increasing.")
+
+        self.__pair_energies = self.__floatArray(pair_energies, "pair_energies", 3)
+        if self.__pair_energies.shape != (len(self.__shells), n_types, n_types):
+            raise Error("The 'pair_energies' given to the KMCPairRateCalculator must have the shape (len(shells), len(types), len(types)).")
+        if not numpy.allclose(self.__pair_energies, numpy.transpose(self.__pair_energies, (0, 2, 1))):
+            raise Error("The 'pair_energies' given to the KMCPairRateCalculator must be symmetric in the types.")
+
+        if site_energies is None:
+            site_energies = numpy.zeros(n_types)
+        self.__site_energies = self.__floatArray(site_energies, "site_energies", 1)
+        if len(self.__site_energies) != n_types:
+            raise Error("The 'site_energies' given to the KMCPairRateCalculator must have one entry per type.")
+
+        self.__barriers = None
+        if barriers is not None:
+            self.__barriers = self.__floatArray(barriers, "barriers", 1)
+
+        self.__alphas = None
+        if alphas is not None:
+            self.__alphas = self.__floatArray(alphas, "alphas", 1)
+
+        if self.__barriers is not None and self.__alphas is not None and \
+                len(self.__barriers) != len(self.__alphas):
+            raise Error("The 'barriers' and 'alphas' given to the KMCPairRateCalculator must have the same length.")
+
+        # Check the settings.
+        if not isinstance(kT, (float, int)) or isinstance(kT, bool) or kT <= 0.0:
+            raise Error("The 'kT' given to the KMCPairRateCalculator must be a positive number.")
+        self.__kT = float(kT)
+
+        if not isinstance(cache_rates, bool):
+            raise Error("The 'cache_rates' flag given to the KMCPairRateCalculator must be True or False.")
+        self.__cache_rates = cache_rates
+
+        if not isinstance(cache_size, int) or isinstance(cache_size, bool) or cache_size < 1:
+            raise Error("The 'cache_size' given to the KMCPairRateCalculator must be a positive integer.")
+        self.__cache_size = cache_size
+
+        if exclude_from_caching is None or (isinstance(exclude_from_caching, (list, tuple)) and len(exclude_from_caching) == 0):
+            self.__exclude_from_caching = ()
+        else:
+            msg = "The 'exclude_from_caching' given to the KMCPairRateCalculator must be a sequence of process numbers."
+            self.__exclude_from_caching = tuple(checkSequenceOfPositiveIntegers(exclude_from_caching, msg))
+
+    def __floatArray(self, table, name, ndim):
+        """
+        Private helper function to check and convert a table to a numpy array of floats.
+
+        :param table: The table to convert.
+
+        :param name: The parameter name to use in error messages.
+
+        :param ndim: The number of dimensions the table must have.
+
+        :returns: The table as a numpy array.
+        """
+        try:
+            array = numpy.array(table, dtype=float)
+        except (TypeError, ValueError):
+            array = None
+
+        if array is None or array.ndim != ndim or not numpy.all(numpy.isfinite(array)):
+            raise Error("The '%s' given to the KMCPairRateCalculator must be a %i-dimensional table of numbers."%(name, ndim))
+
+        return array
+
+    def types(self):
+        """
+        Query for the type names of the energy tables.
+
+        :returns: The type names.
+        :rtype: tuple
+        """
+        return self.__types
+
+    def shells(self):
+        """
+        Query for the shell radii.
+
+        :returns: The shell radii.
+        """
+        return self.__shells
+
+    def pairEnergies(self):
+        """
+        Query for the pair energies.
+
+        :returns: The pair energies per shell and pair of types.
+        """
+        return self.__pair_energies
+
+    def siteEnergies(self):
+        """
+        Query for the site energies.
+
+        :returns: The site energy per type.
+        """
+        return self.__site_energies
+
+    def kT(self):
+        """
+        Query for the thermal energy.
+
+        :returns: The thermal energy.
+        :rtype: float
+        """
+        return self.__kT
+
+    def cacheRates(self):
+        """
+        Query for the caching flag.
+
+        :returns: True if the rates should be cached.
+        :rtype: bool
+        """
+        return self.__cache_rates
+
+    def cacheSize(self):
+        """
+        Query for the maximum number of cached rates.
+
+        :returns: The cache size.
+        :rtype: int
+        """
+        return self.__cache_size
+
+    def excludeFromCaching(self):
+        """
+        Query for the process numbers excluded from the caching.
+
+        :returns: The process numbers.
+        :rtype: tuple
+        """
+        return self.__exclude_from_caching
+
+    def _backend(self, possible_types, processes):
+        """
+        Construct the C++ rate calculator for the given types and processes.
+
+        :param possible_types: A dict with the global mapping of type strings
+                               to integers.
+
+        :param processes: The processes of the interactions.
+
+        :returns: A new C++ rate calculator.
+        """
+        # The activation energy model of each process.
+        n_processes = len(processes)
+        barriers = numpy.zeros(n_processes) if self.__barriers is None else self.__barriers
+        alphas = numpy.ones(n_processes) if self.__alphas is None else self.__alphas
+        if len(barriers) != n_processes or len(alphas) != n_processes:
+            raise Error("The KMCPairRateCalculator must have one barrier and alpha per process.")
+
+        # Map the tables onto the type numbers of the configuration.
+        for t in self.__types:
+            if not t in possible_types:
+                raise Error("The type '%s' of the KMCPairRateCalculator is not a possible type of the configuration."%(t))
+
+        n_all = max(possible_types.values()) + 1
+        numbers = [possible_types[t] for t in self.__types]
+
+        pair_energies = numpy.zeros((len(self.__shells), n_all, n_all))
+        for i, number_i in enumerate(numbers):
+            for j, number_j in enumerate(numbers):
+                pair_energies[:, number_i, number_j] = self.__pair_energies[:, i, j]
+
+        site_energies = numpy.zeros(n_all)
+        site_energies[numbers] = self.__site_energies
+
+        # The geometry must reach the last shell around every site of the processes.
+        extent = max([numpy.max(numpy.linalg.norm(numpy.array(p.localConfigurations()[0].coordinates()), axis=1))
+                      for p in processes] + [0.0])
+        cutoff = float(self.__shells[-1] + extent + 1.0e-6)
+
+        try:
+            return Backend.PairRateCalculator(Backend.StdVectorDouble(list(self.__shells)),
+                                              n_all,
+                                              Backend.StdVectorDouble(list(pair_energies.flatten())),
+                                              Backend.StdVectorDouble(list(site_energies)),
+                                              Backend.StdVectorDouble(list(barriers)),
+                                              Backend.StdVectorDouble(list(alphas)),
+                                              self.__kT,
+                                              cutoff,
+                                              self.__cache_rates,
+                                              Backend.StdVectorInt(list(self.__exclude_from_caching)),
+                                              self.__cache_size)
+        except RuntimeError as e:
+            raise Error(str(e))
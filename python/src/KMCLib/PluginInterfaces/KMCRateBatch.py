@@ -0,0 +1,86 @@
+""" Module for the KMCRateBatch class """
+
+
+# Copyright (c)  2016  Mikael Leetmaa
+#
+# This file is part of the KMCLib project distributed under the terms of the
+# GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+#
+
+
+import numpy
+
+
+class KMCRateBatch(object):
+    """
+    Class for holding the local geometries and types of all processes
+    whose rates should be calculated together by the rates function of
+    a KMCRateCalculatorPlugin. All per-task data is stacked along the
+    first axis, and the geometries and types are padded to the length of
+    the longest geometry in the batch. The arrays are read-only views on
+    memory owned by the backend and are only valid during the call to the
+    rates function.
+    """
+
+    def __init__(self,
+                 coordinates,
+                 lengths,
+                 types_before,
+                 types_after,
+                 type_names,
+                 rate_constants,
+                 process_numbers,
+                 global_coordinates):
+        """
+        Constructor for the KMCRateBatch.
+
+        :param coordinates: The coordinates of the local geometry of each task as a
+                            (n_tasks, max_len, 3) numpy array in fractional units of
+                            the primitive cell, padded with zeros.
+
+        :param lengths: The number of atoms in the geometry of each task as a
+                        numpy array of integers.
+
+        :param types_before: The type numbers before the process as a (n_tasks, max_len)
+                             numpy array of integers, padded with -1.
+
+        :param types_after: The type numbers after the process as a (n_tasks, max_len)
+                            numpy array of integers, padded with -1.
+
+        :param type_names: The type names, such that type_names[t] is the name of
+                           type number t.
+
+        :param rate_constants: The rate constant of the process of each task.
+
+        :param process_numbers: The process number of each task.
+
+        :param global_coordinates: The global coordinate of the central index of
+                                   each task as a (n_tasks, 3) numpy array.
+        """
+        self.coordinates = coordinates
+        self.lengths = lengths
+        self.types_before = types_before
+        self.types_after = types_after
+        self.type_names = type_names
+        self.rate_constants = rate_constants
+        self.process_numbers = process_numbers
+        self.global_coordinates = global_coordinates
+
+    def size(self):
+        """
+        Query for the number of tasks in the batch.
+
+        :returns: The number of tasks.
+        """
+        return len(self.lengths)
+
+    def mask(self):
+        """
+        Get the mask of the atoms that are not padding.
+
+        :returns: A (n_tasks, max_len) numpy array of booleans, True for
+                  the atoms within the geometry of each task.
+        """
+        max_len = self.types_before.shape[1]
+        return numpy.arange(max_len)[numpy.newaxis, :] < self.lengths[:, numpy.newaxis]
+
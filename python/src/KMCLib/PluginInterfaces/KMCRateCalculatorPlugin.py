@@ -12,7 +12,10 @@ import numpy
 
 from KMCLib.Backend import Backend
 from KMCLib.Exceptions.Error import Error
+from KMCLib.PluginInterfaces.KMCRateBatch import KMCRateBatch
 from KMCLib.Utilities.ConversionUtilities import stdVectorTypeBucketToPython
+from KMCLib.Utilities.ConversionUtilities import backendBufferToNumpy
+from KMCLib.Utilities.ConversionUtilities import countMatrixToPython
 
 class KMCRateCalculatorPlugin(Backend.RateCalculator):
     """
@@ -32,6 +35,10 @@ class KMCRateCalculatorPlugin(Backend.RateCalculator):
         # Store member data on the class.
         self.configuration = configuration
 
+        # The type names as a numpy array for lookup of type numbers.
+        self.__type_names = None
+        self.__type_names_array = None
+
         # Call the custom setup.
         self.initialize()
 
@@ -61,7 +68,7 @@ class KMCRateCalculatorPlugin(Backend.RateCalculator):
 
         # Call and return the custom rate.
         global_coordinate = (global_x, global_y, global_z)
-        return self.rate(numpy.array(cpp_coords).reshape(coords_len,3),
+        return self.rate(backendBufferToNumpy(cpp_coords, numpy.float64).reshape(coords_len,3),
                          stdVectorTypeBucketToPython(occupations, types_map),
                          stdVectorTypeBucketToPython(occupations_after, types_map),
                          rate_constant,
@@ -84,15 +91,168 @@ class KMCRateCalculatorPlugin(Backend.RateCalculator):
         forward to the custom rate function.
         """
         # Call and return the custom rate.
-        # PERFORMME: Consider creating the numpy array in C++ if possible.
         global_coordinate = (global_x, global_y, global_z)
-        return self.rate(numpy.array(cpp_coords).reshape(coords_len,3),
+        return self.rate(backendBufferToNumpy(cpp_coords, numpy.float64).reshape(coords_len,3),
                          types_before,
                          types_after,
                          rate_constant,
                          process_number,
                          global_coordinate)
 
+    def backendRateCallbackTypeNumbers(self,
+                                       cpp_coords,
+                                       coords_len,
+                                       types_before,
+                                       types_after,
+                                       type_names,
+                                       rate_constant,
+                                       process_number,
+                                       global_x,
+                                       global_y,
+                                       global_z):
+        """
+        Function called from C++ to get the rate, with the types given as
+        type numbers. The coordinates are sent on as a read-only view on the
+        C++ memory and the type numbers are translated to the type names.
+        """
+        self.__updateTypeNames(type_names)
+        names = self.__type_names_array
+
+        # Call and return the custom rate.
+        global_coordinate = (global_x, global_y, global_z)
+        return self.rate(backendBufferToNumpy(cpp_coords, numpy.float64).reshape(coords_len,3),
+                         tuple(names[backendBufferToNumpy(types_before, numpy.intc)]),
+                         tuple(names[backendBufferToNumpy(types_after, numpy.intc)]),
+                         rate_constant,
+                         process_number,
+                         global_coordinate)
+
+    def backendRateCallbackBucketCounts(self,
+                                        cpp_coords,
+                                        coords_len,
+                                        counts_before,
+                                        counts_after,
+                                        type_names,
+                                        rate_constant,
+                                        process_number,
+                                        global_x,
+                                        global_y,
+                                        global_z):
+        """
+        Function called from C++ to get the rate of a bucket process, with the
+        occupations before and after the process given as count matrices.
+        The matrices are sent on as they are if the bucketCounts function
+        returns True, and converted to the bucket types format otherwise.
+        """
+        self.__updateTypeNames(type_names)
+
+        n_types = len(type_names)
+        occupations_before = backendBufferToNumpy(counts_before, numpy.intc).reshape(coords_len, n_types)
+        occupations_after  = backendBufferToNumpy(counts_after, numpy.intc).reshape(coords_len, n_types)
+
+        if not self.bucketCounts():
+            occupations_before = countMatrixToPython(occupations_before, type_names)
+            occupations_after  = countMatrixToPython(occupations_after, type_names)
+
+        # Call and return the custom rate.
+        global_coordinate = (global_x, global_y, global_z)
+        return self.rate(backendBufferToNumpy(cpp_coords, numpy.float64).reshape(coords_len,3),
+                         occupations_before,
+                         occupations_after,
+                         rate_constant,
+                         process_number,
+                         global_coordinate)
+
+    def __updateTypeNames(self, type_names):
+        """
+        Private helper to update the cached type names if they changed.
+
+        :param type_names: The type names sent from C++.
+        """
+        if type_names != self.__type_names:
+            self.__type_names = type_names
+            self.__type_names_array = numpy.array(type_names, dtype=object)
+
+    def countsToBuckets(self, counts):
+        """
+        Convert an occupation count matrix given to the rate function
+        to the bucket types format [[(n, "A"), ...], ...].
+
+        :param counts: The (n_sites, n_types) count matrix.
+
+        :returns: The occupations in the bucket types format.
+        """
+        return countMatrixToPython(counts, self.__type_names)
+
+    def typeNumbers(self):
+        """
+        Called from C++ to determine if the types should be sent as
+        type numbers to the backendRateCallbackTypeNumbers function.
+
+        :returns: True.
+        :rtype: bool
+        """
+        return True
+
+    def backendRateCallbackBatch(self,
+                                 cpp_coords,
+                                 max_len,
+                                 lengths,
+                                 types_before,
+                                 types_after,
+                                 type_names,
+                                 rate_constants,
+                                 process_numbers,
+                                 global_coordinates):
+        """
+        Function called from C++ to get the rates of all pending tasks
+        at once. The function recieves the stacked data from C++ and
+        parse it to a KMCRateBatch to send it forward to the custom rates function.
+        """
+        lengths = backendBufferToNumpy(lengths, numpy.intc)
+        n_tasks = len(lengths)
+        batch = KMCRateBatch(coordinates=backendBufferToNumpy(cpp_coords, numpy.float64).reshape(n_tasks, max_len, 3),
+                             lengths=lengths,
+                             types_before=backendBufferToNumpy(types_before, numpy.intc).reshape(n_tasks, max_len),
+                             types_after=backendBufferToNumpy(types_after, numpy.intc).reshape(n_tasks, max_len),
+                             type_names=tuple(type_names),
+                             rate_constants=backendBufferToNumpy(rate_constants, numpy.float64),
+                             process_numbers=backendBufferToNumpy(process_numbers, numpy.intc),
+                             global_coordinates=backendBufferToNumpy(global_coordinates, numpy.float64).reshape(n_tasks, 3))
+
+        rates = numpy.asarray(self.rates(batch), dtype=float)
+
+        if rates.shape != (n_tasks,):
+            raise Error("The rates(self, batch) function must return one rate per task in the batch.")
+
+        return rates.tolist()
+
+    def batchRates(self):
+        """
+        Called from C++ to determine if the rates should be calculated
+        for all pending tasks at once with the rates function. Do not
+        overload, this is determined by the presence of a custom rates function.
+
+        :returns: True if the rates function is overloaded.
+        :rtype: bool
+        """
+        return type(self).rates is not KMCRateCalculatorPlugin.rates
+
+    def bucketCounts(self):
+        """
+        Method for determining the format of the bucket occupations sent to
+        the rate function for bucket processes. Overload to return True to
+        get count matrices instead of the bucket types format, which avoids
+        the conversion for each rate calculation.
+
+        :returns: True to get the occupations as (n_sites, n_types) numpy
+                  arrays of integers where column t counts the particles of
+                  type number t, or False to get them in the bucket types
+                  format [[(n, "A"), ...], ...]. Defaults to False.
+        :rtype: bool
+        """
+        return False
+
     def initialize(self):
         """
         Called as the last statement in the base class constructor
@@ -113,11 +273,17 @@ class KMCRateCalculatorPlugin(Backend.RateCalculator):
         must provide an implementation of this function.
 
         :param coords: The coordinates of the configuration as a Nx3 numpy array
-                       in fractional units of the primitive cell.
+                       in fractional units of the primitive cell. The array is a
+                       read-only view on memory owned by the backend and is only
+                       valid during the call, make a copy to keep the coordinates.
 
         :param types_before: The types before the process, as tuple of strings.
+                             For bucket processes the occupations of the sites
+                             before the process, see the bucketCounts function.
 
         :param types_after: The types after the process, as tuple of strings.
+                            For bucket processes the occupations of the sites
+                            after the process, see the bucketCounts function.
 
         :param rate_constant: The rate constant associated with the process
                               to either update or replace.
@@ -131,6 +297,22 @@ class KMCRateCalculatorPlugin(Backend.RateCalculator):
         """
         raise NotImplementedError("The rate(self,...) API function in the 'KMCRateCalculator' base class must be overloaded when using a custom rate calculator.")
 
+    def rates(self, batch):
+        """
+        Optional batch version of the rate function. If a class inheriting
+        from the plugin base class provides an implementation of this function
+        it is called once with all processes whose rates are needed after a step,
+        instead of calling the rate function once per process. This allows
+        for vectorized rate expressions over the whole batch.
+
+        :param batch: The local geometries and types of all pending processes.
+        :type batch: KMCRateBatch
+
+        :returns: The custom rates of the processes as a numpy array of length
+                  batch.size(). Note that the returned rates must not be negative or zero.
+        """
+        raise NotImplementedError("The rates(self, batch) API function must be overloaded when using batch rate calculation.")
+
     def cutoff(self):
         """
         To determine the radial cutoff of the geometry around the central
@@ -157,6 +339,18 @@ class KMCRateCalculatorPlugin(Backend.RateCalculator):
         """
         return False
 
+    def cacheSize(self):
+        """
+        Method for determining the maximum number of cached rates. When the
+        cache is full the rates of the environments not seen for the longest
+        while are replaced. The method only takes effect if caching is enabled
+        with the cacheRates function.
+
+        :returns: The maximum number of cached rates, a positive integer. Defaults to 100000.
+        :rtype: int
+        """
+        return 100000
+
     def excludeFromCaching(self):
         """
         Method for exluding processes from the rate caching.
@@ -168,6 +362,19 @@ class KMCRateCalculatorPlugin(Backend.RateCalculator):
         """
         return ()
 
+    def cacheKey(self):
+        """
+        Method for identifying everything the rates depend on besides the
+        source of the rate calculator class, such as module level parameters,
+        helper functions or methods replaced at runtime. The key is included
+        in the fingerprint of a rate cache file, so that cached rates are only
+        loaded for the same key. Overload for custom behavior.
+
+        :returns: A string identifying the rate parameters, or None. Defaults to None.
+        :rtype: str
+        """
+        return None
+
 
 
 
@@ -0,0 +1,228 @@
+""" Module for the KMCRateFunction class """
+
+
+# Copyright (c)  2016  Mikael Leetmaa
+#
+# This file is part of the KMCLib project distributed under the terms of the
+# GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+#
+
+
+import ctypes
+import numpy
+
+from KMCLib.Backend import Backend
+from KMCLib.Exceptions.Error import Error
+from KMCLib.Utilities.CheckUtilities import checkSequenceOfPositiveIntegers
+
+
+class KMCRateFunction(object):
+    """
+    Class for giving the custom rates as a C function, called directly
+    from the backend without going through Python. The function can be a
+    compiled numba cfunc, a ctypes callback or a function in a shared library,
+    and must have the C signature
+
+        double rate(const double * geometry, int len,
+                    const int * types_before, const int * types_after,
+                    double rate_constant, int process_number,
+                    double global_x, double global_y, double global_z,
+                    void * user_data)
+
+    where geometry holds the x,y,z coordinates of the len atoms within the
+    cutoff, and the types are given as the type numbers of the possible
+    types of the configuration. The numba signature is given by SIGNATURE and
+    the ctypes prototype by CFUNCTYPE. Bucket processes are not supported.
+    Note that a rate cache file can not tell if the function or its user data
+    has changed, so a rate cache can only be used if a cache key is given.
+    """
+
+    # The numba cfunc signature of the function.
+    SIGNATURE = "float64(CPointer(float64), int32, CPointer(int32), CPointer(int32), " + \
+                "float64, int32, float64, float64, float64, voidptr)"
+
+    # The ctypes prototype of the function.
+    CFUNCTYPE = ctypes.CFUNCTYPE(ctypes.c_double,
+                                 ctypes.POINTER(ctypes.c_double),
+                                 ctypes.c_int,
+                                 ctypes.POINTER(ctypes.c_int),
+                                 ctypes.POINTER(ctypes.c_int),
+                                 ctypes.c_double,
+                                 ctypes.c_int,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_void_p)
+
+    def __init__(self,
+                 function,
+                 user_data=None,
+                 cutoff=None,
+                 cache_rates=False,
+                 cache_size=100000,
+                 exclude_from_caching=None,
+                 thread_safe=False,
+                 cache_key=None):
+        """
+        Constructor for the KMCRateFunction.
+
+        :param function: The function to call, as a ctypes function pointer, an object with
+                         an address attribute such as a numba cfunc, or the address itself.
+
+        :param user_data: Data to pass on to the function in each call, as a ctypes object,
+                          a numpy array or an address. If not given a null pointer is passed.
+
+        :param cutoff: The cutoff of the geometry around the central lattice site in primitive
+                       cell internal coordinates. Defaults to 1.0.
+        :type cutoff: float
+
+        :param cache_rates: If the calculated rates should be cached. Defaults to False.
+        :type cache_rates: bool
+
+        :param cache_size: The maximum number of cached rates. Defaults to 100000.
+        :type cache_size: int
+
+        :param exclude_from_caching: The process numbers to exclude from the caching.
+
+        :param thread_safe: If the function may be called from several threads at the same time.
+                            Must be False for ctypes callbacks implemented in Python. Defaults to False.
+        :type thread_safe: bool
+
+        :param cache_key: A string identifying the function and the user data, stored with the rates
+                          in a rate cache file. Cached rates are only loaded for the same key.
+                          Required for using a rate cache.
+        :type cache_key: str
+        """
+        # Keep the function and the user data alive as long as the addresses are used.
+        self.__function = function
+        self.__user_data = user_data
+
+        self.__function_address = self.__address(function, "function")
+        if self.__function_address == 0:
+            raise Error("The 'function' given to the KMCRateFunction may not be a null pointer.")
+
+        if user_data is None:
+            self.__user_data_address = 0
+        else:
+            self.__user_data_address = self.__address(user_data, "user_data")
+
+        # Check the settings.
+        if cutoff is None:
+            cutoff = 1.0
+        if not isinstance(cutoff, (float, int)) or isinstance(cutoff, bool) or cutoff <= 0.0:
+            raise Error("The 'cutoff' given to the KMCRateFunction must be a positive number.")
+        self.__cutoff = float(cutoff)
+
+        if not isinstance(cache_rates, bool):
+            raise Error("The 'cache_rates' flag given to the KMCRateFunction must be True or False.")
+        self.__cache_rates = cache_rates
+
+        if not isinstance(cache_size, int) or isinstance(cache_size, bool) or cache_size < 1:
+            raise Error("The 'cache_size' given to the KMCRateFunction must be a positive integer.")
+        self.__cache_size = cache_size
+
+        if exclude_from_caching is None or (isinstance(exclude_from_caching, (list, tuple)) and len(exclude_from_caching) == 0):
+            self.__exclude_from_caching = ()
+        else:
+            msg = "The 'exclude_from_caching' given to the KMCRateFunction must be a sequence of process numbers."
+            self.__exclude_from_caching = tuple(checkSequenceOfPositiveIntegers(exclude_from_caching, msg))
+
+        if not isinstance(thread_safe, bool):
+            raise Error("The 'thread_safe' flag given to the KMCRateFunction must be True or False.")
+        self.__thread_safe = thread_safe
+
+        if cache_key is not None and not isinstance(cache_key, str):
+            raise Error("The 'cache_key' given to the KMCRateFunction must be given as a string.")
+        self.__cache_key = cache_key
+
+    def __address(self, obj, name):
+        """
+        Private helper function to get the address of a function or data object.
+
+        :param obj: The object to get the address of.
+
+        :param name: The parameter name to use in error messages.
+
+        :returns: The address as an integer.
+        """
+        if isinstance(obj, (int, numpy.integer)) and not isinstance(obj, bool) and obj >= 0:
+            return int(obj)
+        elif isinstance(obj, (ctypes._CFuncPtr, ctypes._Pointer, ctypes.c_void_p, ctypes.c_char_p)):
+            address = ctypes.cast(obj, ctypes.c_void_p).value
+            return 0 if address is None else address
+        elif isinstance(obj, (ctypes._SimpleCData, ctypes.Structure, ctypes.Union, ctypes.Array)):
+            return ctypes.addressof(obj)
+        elif isinstance(obj, numpy.ndarray):
+            return obj.ctypes.data
+        elif hasattr(obj, "address") and isinstance(obj.address, (int, numpy.integer)):
+            return int(obj.address)
+
+        raise Error("The '%s' given to the KMCRateFunction must be a ctypes object, a numpy array, an object with an address attribute or an address."%(name))
+
+    def cutoff(self):
+        """
+        Query for the cutoff.
+
+        :returns: The cutoff.
+        :rtype: float
+        """
+        return self.__cutoff
+
+    def cacheRates(self):
+        """
+        Query for the caching flag.
+
+        :returns: True if the rates should be cached.
+        :rtype: bool
+        """
+        return self.__cache_rates
+
+    def cacheSize(self):
+        """
+        Query for the maximum number of cached rates.
+
+        :returns: The cache size.
+        :rtype: int
+        """
+        return self.__cache_size
+
+    def excludeFromCaching(self):
+        """
+        Query for the process numbers excluded from the caching.
+
+        :returns: The process numbers.
+        :rtype: tuple
+        """
+        return self.__exclude_from_caching
+
+    def threadSafe(self):
+        """
+        Query for the thread safe flag.
+
+        :returns: True if the function may be called from several threads at the same time.
+        :rtype: bool
+        """
+        return self.__thread_safe
+
+    def cacheKey(self):
+        """
+        Query for the cache key.
+
+        :returns: The cache key, or None if not given.
+        :rtype: str
+        """
+        return self.__cache_key
+
+    def _backend(self):
+        """
+        Construct the C++ rate calculator calling the function.
+
+        :returns: A new C++ rate calculator.
+        """
+        return Backend.FunctionRateCalculator(self.__function_address,
+                                              self.__user_data_address,
+                                              self.__cutoff,
+                                              self.__cache_rates,
+                                              Backend.StdVectorInt(list(self.__exclude_from_caching)),
+                                              self.__cache_size,
+                                              self.__thread_safe)
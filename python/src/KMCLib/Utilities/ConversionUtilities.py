@@ -276,5 +276,33 @@ def stdVectorTypeBucketToPython(cpp_vector, cpp_type_map):
     # Done.
     return types
 
+def backendBufferToNumpy(data, dtype):
+    """
+    Wrap data sent from C++ to a Python callback in a flat numpy array.
+    Memoryviews on backend memory are wrapped without copying, giving a
+    read-only array that is only valid during the callback. Other sequences
+    are copied.
+
+    :param data: The memoryview or sequence to wrap.
+    :param dtype: The numpy data type of the elements, numpy.float64 for
+                  std::vector<double> and numpy.intc for std::vector<int>.
+
+    :returns: The corresponding numpy array.
+    """
+    if isinstance(data, memoryview):
+        return numpy.frombuffer(data, dtype=dtype)
+    return numpy.array(data, dtype=dtype)
 
+def countMatrixToPython(counts, type_names):
+    """
+    Translate a matrix of particle counts per site and type to the
+    python format [[(n, "A"), ... ], ... ].
 
+    :param counts: The (n_sites, n_types) count matrix, where column t
+                   counts the particles of type number t.
+    :param type_names: The type names, such that type_names[t] is the
+                       name of type number t.
+    """
+    # Skip the wildcard in the first column.
+    return [[(n, type_names[t]) for t, n in enumerate(row) if t > 0 and n > 0]
+            for row in numpy.asarray(counts).tolist()]
@@ -31,6 +31,8 @@ from .Analysis.Composition import Composition
 from .Utilities.SaveAndReadUtilities import KMCInteractionsFromScript
 from .Utilities.SaveAndReadUtilities import KMCConfigurationFromScript
 from .PluginInterfaces.KMCRateCalculatorPlugin import KMCRateCalculatorPlugin
+from .PluginInterfaces.KMCRateFunction import KMCRateFunction
+from .PluginInterfaces.KMCPairRateCalculator import KMCPairRateCalculator
 from .PluginInterfaces.KMCAnalysisPlugin import KMCAnalysisPlugin
 from .PluginInterfaces.KMCBreakerPlugin import KMCBreakerPlugin
 from .Backend.Backend import MPICommons
@@ -38,8 +40,8 @@ from .Backend.Backend import MPICommons
 __all__ = ['KMCLocalConfiguration', 'KMCInteractions', 'KMCConfiguration',
            'KMCLattice', 'KMCLatticeModel', 'KMCUnitCell',
            'KMCControlParameters', 'KMCInteractionsFromScript',
-           'KMCConfigurationFromScript', 'KMCRateCalculatorPlugin',
-           'KMCAnalysisPlugin', 'KMCBreakerPlugin', 'KMCProcess',
+           'KMCConfigurationFromScript', 'KMCRateCalculatorPlugin', 'KMCRateFunction',
+           'KMCPairRateCalculator', 'KMCAnalysisPlugin', 'KMCBreakerPlugin', 'KMCProcess',
            'KMCBucketProcess', 'OnTheFlyMSD',
            'TimeStepDistribution', 'Composition',
            'ProcessStatistics', 'MPICommons']
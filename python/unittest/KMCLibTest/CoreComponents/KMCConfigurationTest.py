@@ -454,6 +454,76 @@ class KMCConfigurationTest(unittest.TestCase):
         # Check the type of the cpp backend.
         self.assertTrue(isinstance(cpp_backend, Backend.Configuration))
 
+    def testCompactMatchLists(self):
+        """ Test the compact match lists flag. """
+        unit_cell = KMCUnitCell(cell_vectors=numpy.eye(3),
+                                basis_points=[[0.0,0.0,0.0],
+                                              [0.5,0.5,0.5]])
+        lattice = KMCLattice(unit_cell=unit_cell,
+                             repetitions=(3,3,2),
+                             periodic=(True,True,False))
+        types = ["a","b","b"]*12
+
+        # The default.
+        config = KMCConfiguration(lattice=lattice,
+                                  types=types)
+        self.assertFalse(config.compactMatchLists())
+        self.assertFalse(config._backend().compactMatchLists())
+        self.assertTrue("compact_match_lists" not in config._script())
+
+        # Set on the backend.
+        config = KMCConfiguration(lattice=lattice,
+                                  types=types,
+                                  compact_match_lists=True)
+        self.assertTrue(config.compactMatchLists())
+        self.assertTrue(config._backend().compactMatchLists())
+        self.assertTrue("    possible_types=possible_types,\n    compact_match_lists=True)\n" in config._script())
+
+        # Wrong input.
+        self.assertRaises( Error, lambda : KMCConfiguration(lattice=lattice,
+                                                            types=types,
+                                                            compact_match_lists=1) )
+
+    def testViews(self):
+        """ Test the views on the backend state. """
+        unit_cell = KMCUnitCell(cell_vectors=numpy.eye(3),
+                                basis_points=[[0.0,0.0,0.0],
+                                              [0.5,0.5,0.5]])
+        lattice = KMCLattice(unit_cell=unit_cell,
+                             repetitions=(3,2,1),
+                             periodic=(True,True,False))
+        types = ["a","b","b","c"]*3
+        config = KMCConfiguration(lattice=lattice,
+                                  types=types,
+                                  possible_types=["a","b","c","d"])
+
+        # The type counts, with a column per type number.
+        counts = config.typeCountsView()
+        self.assertEqual(counts.shape, (12, 5))
+        self.assertEqual(counts.dtype, numpy.intc)
+        possible_types = config.possibleTypes()
+        for i, t in enumerate(types):
+            ref = numpy.zeros(5, dtype=int)
+            ref[possible_types[t]] = 1
+            self.assertEqual(list(counts[i]), list(ref))
+
+        # The atom ids and their coordinates.
+        coordinates = config.atomIDCoordinatesView()
+        self.assertEqual(coordinates.shape, (12, 3))
+        self.assertEqual(coordinates.dtype, numpy.float64)
+        self.assertTrue(numpy.allclose(coordinates, lattice.sites()))
+        self.assertEqual(list(config.atomIDsView()), list(range(12)))
+
+        # No atoms have moved yet.
+        self.assertEqual(len(config.movedAtomIDsView()), 0)
+
+        # The views can not be written to.
+        self.assertFalse(counts.flags.writeable)
+        self.assertFalse(coordinates.flags.writeable)
+        def write():
+            counts[0,0] = 1
+        self.assertRaises( ValueError, write )
+
     def testQueries(self):
         """ Test the configuration's query functions. """
         config = KMCConfiguration.__new__(KMCConfiguration)
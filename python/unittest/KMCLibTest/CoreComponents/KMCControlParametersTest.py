@@ -32,13 +32,19 @@ class KMCControlParametersTest(unittest.TestCase):
         self.assertEqual(control_params.seed(), 1)
         self.assertTrue(control_params.timeSeed())
         self.assertEqual(control_params.rngType(), Backend.MT)
+        self.assertEqual(control_params.selectionType(), Backend.TREE)
+        self.assertEqual(control_params.numberOfThreads(), 1)
+        self.assertEqual(control_params.threadThreshold(), 1000)
 
         # Non-default construction.
         control_params = KMCControlParameters(number_of_steps=2000000,
                                               dump_interval=1000,
                                               analysis_interval=888,
                                               seed=2013,
-                                              rng_type='DEVICE')
+                                              rng_type='DEVICE',
+                                              selection_type='LINEAR',
+                                              number_of_threads=4,
+                                              thread_threshold=50)
 
         # Check the values.
         self.assertEqual(control_params.numberOfSteps(), 2000000)
@@ -47,6 +53,9 @@ class KMCControlParametersTest(unittest.TestCase):
         self.assertEqual(control_params.seed(), 2013)
         self.assertFalse(control_params.timeSeed())
         self.assertEqual(control_params.rngType(), Backend.DEVICE)
+        self.assertEqual(control_params.selectionType(), Backend.LINEAR)
+        self.assertEqual(control_params.numberOfThreads(), 4)
+        self.assertEqual(control_params.threadThreshold(), 50)
 
     def testRngTypeInput(self):
         """ Test all valid values of the rng_type parameter. """
@@ -76,6 +85,28 @@ class KMCControlParametersTest(unittest.TestCase):
         self.assertRaises( Error,
                            lambda : KMCControlParameters(rng_type=123))
 
+    def testSelectionTypeInput(self):
+        """ Test all valid values of the selection_type parameter. """
+        control_params = KMCControlParameters()
+        self.assertEqual(control_params.selectionType(), Backend.TREE)
+
+        control_params = KMCControlParameters(selection_type='TREE')
+        self.assertEqual(control_params.selectionType(), Backend.TREE)
+
+        control_params = KMCControlParameters(selection_type='LINEAR')
+        self.assertEqual(control_params.selectionType(), Backend.LINEAR)
+
+        control_params = KMCControlParameters(selection_type='COMPOSITION_REJECTION')
+        self.assertEqual(control_params.selectionType(), Backend.COMPOSITION_REJECTION)
+
+        # Wrong value.
+        self.assertRaises( Error,
+                           lambda : KMCControlParameters(selection_type='ABC'))
+
+        # Wrong type.
+        self.assertRaises( Error,
+                           lambda : KMCControlParameters(selection_type=1))
+
     def testConstructionAndQuery2(self):
         """ Test the construction of the control parametes object with a dump time interval """
         # Non-default construction.
@@ -123,6 +154,10 @@ class KMCControlParametersTest(unittest.TestCase):
                            lambda : KMCControlParameters(number_of_steps=1,
                                                          analysis_interval=1,
                                                          dump_time_interval=-1234.0) )
+        self.assertRaises( Error,
+                           lambda : KMCControlParameters(number_of_threads=0) )
+        self.assertRaises( Error,
+                           lambda : KMCControlParameters(thread_threshold=-1) )
 
         # Wrong type.
         self.assertRaises( Error,
@@ -146,6 +181,8 @@ class KMCControlParametersTest(unittest.TestCase):
                            lambda : KMCControlParameters(number_of_steps=1,
                                                          analysis_interval=1,
                                                          dump_time_interval="1234.0") )
+        self.assertRaises( Error,
+                           lambda : KMCControlParameters(number_of_threads=2.0) )
 
 if __name__ == '__main__':
     unittest.main()
@@ -16,6 +16,10 @@ import os
 from KMCLib.CoreComponents.KMCLocalConfiguration import KMCLocalConfiguration
 from KMCLib.CoreComponents.KMCProcess import KMCProcess
 from KMCLib.CoreComponents.KMCBucketProcess import KMCBucketProcess
+from KMCLib.CoreComponents.KMCUnitCell import KMCUnitCell
+from KMCLib.CoreComponents.KMCLattice import KMCLattice
+from KMCLib.CoreComponents.KMCConfiguration import KMCConfiguration
+from KMCLib.CoreComponents.KMCLatticeModel import KMCLatticeModel
 from KMCLib.PluginInterfaces.KMCRateCalculatorPlugin import KMCRateCalculatorPlugin
 from KMCLib.Exceptions.Error import Error
 from KMCLib.Backend import Backend
@@ -27,6 +31,11 @@ from KMCLib.CoreComponents.KMCInteractions import KMCInteractions
 sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(__file__)), ".."))
 from TestUtilities.Plugins.CustomRateCalculator.CustomRateCalculator import CustomRateCalculator
 
+# The example rate calculator library built with the C++ tests.
+example_library = os.path.join(os.path.abspath(os.path.dirname(__file__)),
+                               "..", "..", "..", "..", "c++", "build", "plugin",
+                               "libexampleratecalculator.so")
+
 # Implementing the tests.
 class KMCInteractionsTest(unittest.TestCase):
     """ Class for testing the KMCInteractions class """
@@ -523,6 +532,109 @@ class KMCInteractionsTest(unittest.TestCase):
                                                                         coordinate[1],
                                                                         coordinate[2]), rate_constant, 12 )
 
+    def testBackendFailWrongCacheSize(self):
+        """ Test that the cache size of the rate calculator is checked. """
+        coords = [[1.0,2.0,3.4],[1.1,1.2,1.3]]
+        process = KMCProcess(coords, ["A","B"], ["B","A"], basis_sites=[0], rate_constant=3.5)
+        possible_types = {"A" : 1, "B" : 2}
+
+        # The configuration argument is used as the cache size.
+        class CacheSizeRateCalculator(KMCRateCalculatorPlugin):
+            def cacheSize(self):
+                return self.configuration
+
+        # A positive integer works, but not anything else.
+        for cache_size in [12, 0, -3, 1.5, "10", True, None]:
+            kmc_interactions = KMCInteractions(processes=[process],
+                                               implicit_wildcards=False)
+            kmc_interactions.setRateCalculator(rate_calculator=CacheSizeRateCalculator)
+
+            if cache_size == 12:
+                kmc_interactions._backend(possible_types, 1, cache_size)
+            else:
+                self.assertRaises( Error, lambda : kmc_interactions._backend(possible_types, 1, cache_size) )
+
+    def __chainConfiguration(self):
+        """ Helper function returning a chain of A and B. """
+        unit_cell = KMCUnitCell(cell_vectors=numpy.eye(3),
+                                basis_points=[[0.0,0.0,0.0]])
+        lattice = KMCLattice(unit_cell=unit_cell,
+                             repetitions=(12,1,1),
+                             periodic=(True,False,False))
+        types = ["B","A","A","A"]*3
+        return KMCConfiguration(lattice=lattice,
+                                types=types,
+                                possible_types=["A","B"])
+
+    def testRateCalculatorLibraryFail(self):
+        """ Test that a rate calculator library must exist and be loadable. """
+        coords = [[0.0,0.0,0.0],[1.0,0.0,0.0]]
+        process = KMCProcess(coords, ["A","B"], ["B","A"], basis_sites=[0], rate_constant=2.0)
+        kmc_interactions = KMCInteractions(processes=[process],
+                                           implicit_wildcards=True)
+
+        # A library that does not exist.
+        self.assertRaises( Error, lambda : kmc_interactions.setRateCalculator(rate_calculator="./no_such_library.so") )
+        self.assertRaises( Error, lambda : kmc_interactions.setRateCalculator(rate_calculator="no_such_library.so") )
+
+        # A file that is not a library fails when the backend is generated.
+        kmc_interactions.setRateCalculator(rate_calculator=os.path.abspath(__file__))
+        config = self.__chainConfiguration()
+        self.assertRaises( Error, lambda : kmc_interactions._backend(config.possibleTypes(), 1, config) )
+
+    @unittest.skipUnless(os.path.isfile(example_library), "The C++ tests are not built.")
+    def testRateCalculatorLibrary(self):
+        """ Test the backend with the example rate calculator library. """
+        coords = [[0.0,0.0,0.0],[1.0,0.0,0.0]]
+        process = KMCProcess(coords, ["A","B"], ["B","A"], basis_sites=[0], rate_constant=2.0)
+        kmc_interactions = KMCInteractions(processes=[process],
+                                           implicit_wildcards=True)
+        kmc_interactions.setRateCalculator(rate_calculator=example_library)
+
+        # The path is stored for scripting.
+        path = os.path.abspath(example_library)
+        self.assertEqual(kmc_interactions._KMCInteractions__rate_calculator_str, repr(path))
+
+        # Construct the backend.
+        config = self.__chainConfiguration()
+        cpp_interactions = kmc_interactions._backend(config.possibleTypes(), 1, config)
+
+        # The rate calculator is the one from the library.
+        rate_calculator = kmc_interactions.rateCalculator()
+        self.assertTrue(isinstance(rate_calculator, Backend.RateCalculatorLibrary))
+        self.assertEqual(rate_calculator.path(), path)
+        self.assertAlmostEqual(rate_calculator.cutoff(), 1.0, 12)
+        self.assertTrue(rate_calculator.cacheRates())
+        self.assertTrue(rate_calculator.threadSafe())
+
+        # The processes were set up with its settings.
+        cpp_process = cpp_interactions.processes()[0]
+        self.assertAlmostEqual(cpp_process.cutoff(), 1.0, 12)
+        self.assertTrue(cpp_process.cacheRate())
+
+        # Call the calculator in the library.
+        cpp_coords = Backend.StdVectorDouble([0.0]*9)
+        cpp_types1 = Backend.StdVectorString(["A","A","B"])
+        cpp_types2 = Backend.StdVectorString(["B","A","A"])
+        self.assertAlmostEqual( rate_calculator.backendRateCallback(cpp_coords,
+                                                                    3,
+                                                                    cpp_types1,
+                                                                    cpp_types2,
+                                                                    3.0,
+                                                                    0,
+                                                                    0.0,
+                                                                    0.0,
+                                                                    0.0), 1.5, 12 )
+
+        # In a lattice model each of the three A with a B to the right has
+        # one A neighbour, and half the rate constant as rate.
+        kmc_interactions = KMCInteractions(processes=[process],
+                                           implicit_wildcards=True)
+        kmc_interactions.setRateCalculator(rate_calculator=example_library)
+        model = KMCLatticeModel(configuration=self.__chainConfiguration(),
+                                interactions=kmc_interactions)
+        self.assertAlmostEqual( model._backend().interactions().totalRate(), 3.0, 12 )
+
     def testBackendNoFailWrongBasisMatch(self):
         """ Test for no failure when constructing backend with wrong n_basis """
         # A first process.
@@ -1267,6 +1267,46 @@ class KMCLatticeModelTest(unittest.TestCase):
         self.assertTrue(ap2.finalize_called)
         self.assertEqual(ap2.register_step_counts, 3)
 
+    def testRunWithConfigurationViews(self):
+        """ Test that the configuration views follow the steps. """
+        ab_flip_model = getValidModel()
+        control_parameters = KMCControlParameters(number_of_steps=200,
+                                                  dump_interval=500,
+                                                  analysis_interval=1)
+
+        # An analysis comparing the views with the copied state.
+        class ViewAnalysis(KMCAnalysisPlugin):
+            def __init__(self, test):
+                self.test = test
+                self.counts = None
+                self.n_steps = 0
+
+            def setup(self, step, time, configuration):
+                # The counts view is taken once and then follows the steps.
+                self.counts = configuration.typeCountsView()
+                self.test.assertEqual(self.counts.shape, (100, 3))
+                self.test.assertFalse(self.counts.flags.writeable)
+
+            def registerStep(self, step, time, configuration):
+                possible_types = configuration.possibleTypes()
+                types = configuration.types()
+                for t, n in possible_types.items():
+                    self.test.assertEqual(list(self.counts[:, n]), [int(e == t) for e in types])
+                self.test.assertEqual(list(configuration.movedAtomIDsView()),
+                                      list(configuration.movedAtomIDs()))
+                self.test.assertEqual(list(configuration.atomIDsView()), list(range(100)))
+                self.test.assertTrue(numpy.array_equal(configuration.atomIDCoordinatesView(),
+                                                       configuration.atomIDCoordinates()))
+                self.n_steps += 1
+
+        analysis = ViewAnalysis(self)
+        ab_flip_model.run(control_parameters, analysis=[analysis])
+
+        self.assertEqual(analysis.n_steps, 200)
+
+        # The steps have changed the types.
+        self.assertTrue(numpy.sum(analysis.counts[:, 1]) > 0)
+
     def testRunFailAnalysis(self):
         """ Test that the analyis plugins get called correctly. """
         # Cell.
@@ -1431,10 +1471,10 @@ steps.append(0)
 types.append(["B","B","B","B","B","B","B","B","B","B","B","B","B","B","B","B"])
 times.append(  1.9806556124e+01)
 steps.append(500)
-types.append(["B","B","B","B","A","A","B","A","B","B","A","A","A","B","B","B"])
+types.append(["B","B","B","B","B","A","A","A","B","B","A","B","B","A","A","B"])
 times.append(  4.0956826064e+01)
 steps.append(1000)
-types.append(["B","B","B","B","A","B","B","B","B","B","A","B","A","B","B","A"])
+types.append(["B","A","A","B","B","B","B","B","B","A","B","B","B","B","B","A"])
 """
 
         with open(lattice_trajectory_filename, "r") as t:
@@ -1464,18 +1504,18 @@ STEP 0
           16
     TIME 4.0956826064e+01
                 B   0.0000000000e+00 0.0000000000e+00 0.0000000000e+00  0
-                B   0.0000000000e+00 1.0000000000e+00 0.0000000000e+00  1
-                B   0.0000000000e+00 2.0000000000e+00 0.0000000000e+00  2
+                A   0.0000000000e+00 1.0000000000e+00 0.0000000000e+00  1
+                A   0.0000000000e+00 2.0000000000e+00 0.0000000000e+00  2
                 B   0.0000000000e+00 3.0000000000e+00 0.0000000000e+00  3
-                A   1.0000000000e+00 0.0000000000e+00 0.0000000000e+00  4
+                B   1.0000000000e+00 0.0000000000e+00 0.0000000000e+00  4
                 B   1.0000000000e+00 1.0000000000e+00 0.0000000000e+00  5
                 B   1.0000000000e+00 2.0000000000e+00 0.0000000000e+00  6
                 B   1.0000000000e+00 3.0000000000e+00 0.0000000000e+00  7
                 B   2.0000000000e+00 0.0000000000e+00 0.0000000000e+00  8
-                B   2.0000000000e+00 1.0000000000e+00 0.0000000000e+00  9
-                A   2.0000000000e+00 2.0000000000e+00 0.0000000000e+00  10
+                A   2.0000000000e+00 1.0000000000e+00 0.0000000000e+00  9
+                B   2.0000000000e+00 2.0000000000e+00 0.0000000000e+00  10
                 B   2.0000000000e+00 3.0000000000e+00 0.0000000000e+00  11
-                A   3.0000000000e+00 0.0000000000e+00 0.0000000000e+00  12
+                B   3.0000000000e+00 0.0000000000e+00 0.0000000000e+00  12
                 B   3.0000000000e+00 1.0000000000e+00 0.0000000000e+00  13
                 B   3.0000000000e+00 2.0000000000e+00 0.0000000000e+00  14
                 A   3.0000000000e+00 3.0000000000e+00 0.0000000000e+00  15
@@ -1483,40 +1523,40 @@ STEP 500
           16
     TIME 6.0746208388e+01
                 B   0.0000000000e+00 0.0000000000e+00 0.0000000000e+00  0
-                A   0.0000000000e+00 1.0000000000e+00 0.0000000000e+00  1
-                A   0.0000000000e+00 2.0000000000e+00 0.0000000000e+00  2
-                B   0.0000000000e+00 3.0000000000e+00 0.0000000000e+00  3
-                A   1.0000000000e+00 0.0000000000e+00 0.0000000000e+00  4
-                B   1.0000000000e+00 1.0000000000e+00 0.0000000000e+00  5
-                B   1.0000000000e+00 2.0000000000e+00 0.0000000000e+00  6
-                B   1.0000000000e+00 3.0000000000e+00 0.0000000000e+00  7
-                A   2.0000000000e+00 0.0000000000e+00 0.0000000000e+00  8
-                B   2.0000000000e+00 1.0000000000e+00 0.0000000000e+00  9
-                A   2.0000000000e+00 2.0000000000e+00 0.0000000000e+00  10
-                B   2.0000000000e+00 3.0000000000e+00 0.0000000000e+00  11
+                B   0.0000000000e+00 1.0000000000e+00 0.0000000000e+00  1
+                B   0.0000000000e+00 2.0000000000e+00 0.0000000000e+00  2
+                A   0.0000000000e+00 3.0000000000e+00 0.0000000000e+00  3
+                B   1.0000000000e+00 0.0000000000e+00 0.0000000000e+00  4
+                A   1.0000000000e+00 1.0000000000e+00 0.0000000000e+00  5
+                A   1.0000000000e+00 2.0000000000e+00 0.0000000000e+00  6
+                A   1.0000000000e+00 3.0000000000e+00 0.0000000000e+00  7
+                B   2.0000000000e+00 0.0000000000e+00 0.0000000000e+00  8
+                A   2.0000000000e+00 1.0000000000e+00 0.0000000000e+00  9
+                B   2.0000000000e+00 2.0000000000e+00 0.0000000000e+00  10
+                A   2.0000000000e+00 3.0000000000e+00 0.0000000000e+00  11
                 B   3.0000000000e+00 0.0000000000e+00 0.0000000000e+00  12
                 B   3.0000000000e+00 1.0000000000e+00 0.0000000000e+00  13
                 B   3.0000000000e+00 2.0000000000e+00 0.0000000000e+00  14
-                A   3.0000000000e+00 3.0000000000e+00 0.0000000000e+00  15
+                B   3.0000000000e+00 3.0000000000e+00 0.0000000000e+00  15
 STEP 1000
           16
     TIME 8.1896478328e+01
                 A   0.0000000000e+00 0.0000000000e+00 0.0000000000e+00  0
                 B   0.0000000000e+00 1.0000000000e+00 0.0000000000e+00  1
-                B   0.0000000000e+00 2.0000000000e+00 0.0000000000e+00  2
+                A   0.0000000000e+00 2.0000000000e+00 0.0000000000e+00  2
                 B   0.0000000000e+00 3.0000000000e+00 0.0000000000e+00  3
                 B   1.0000000000e+00 0.0000000000e+00 0.0000000000e+00  4
                 B   1.0000000000e+00 1.0000000000e+00 0.0000000000e+00  5
                 B   1.0000000000e+00 2.0000000000e+00 0.0000000000e+00  6
-                A   1.0000000000e+00 3.0000000000e+00 0.0000000000e+00  7
+                B   1.0000000000e+00 3.0000000000e+00 0.0000000000e+00  7
                 B   2.0000000000e+00 0.0000000000e+00 0.0000000000e+00  8
                 B   2.0000000000e+00 1.0000000000e+00 0.0000000000e+00  9
                 A   2.0000000000e+00 2.0000000000e+00 0.0000000000e+00  10
                 B   2.0000000000e+00 3.0000000000e+00 0.0000000000e+00  11
                 B   3.0000000000e+00 0.0000000000e+00 0.0000000000e+00  12
-                B   3.0000000000e+00 1.0000000000e+00 0.0000000000e+00  13
+                A   3.0000000000e+00 1.0000000000e+00 0.0000000000e+00  13
                 B   3.0000000000e+00 2.0000000000e+00 0.0000000000e+00  14
-                A   3.0000000000e+00 3.0000000000e+00 0.0000000000e+00  15
+                B   3.0000000000e+00 3.0000000000e+00 0.0000000000e+00  15
 """
 
         with open(xyz_trajectory_filename, "r") as t:
@@ -1626,6 +1666,384 @@ STEP 1000
         self.assertAlmostEqual(t_RANLUX48, 386.730028929, 5)
         self.assertAlmostEqual(t_MINSTD,   392.494055839, 5)
 
+    def testRunSelectionType(self):
+        """ Test that the process selection algorithms give consistent results. """
+        times = []
+        for selection_type in ["TREE", "LINEAR", "COMPOSITION_REJECTION"]:
+            # Cell.
+            cell_vectors = [[   1.000000e+00,   0.000000e+00,   0.000000e+00],
+                            [   0.000000e+00,   1.000000e+00,   0.000000e+00],
+                            [   0.000000e+00,   0.000000e+00,   1.000000e+00]]
+
+            basis_points = [[   0.000000e+00,   0.000000e+00,   0.000000e+00]]
+
+            unit_cell = KMCUnitCell(
+                cell_vectors=cell_vectors,
+                basis_points=basis_points)
+
+            # Lattice.
+            lattice = KMCLattice(
+                unit_cell=unit_cell,
+                repetitions=(4,4,1),
+                periodic=(True, True, False))
+
+            # Configuration.
+            types = ['B']*16
+            possible_types = ['A','B']
+            configuration = KMCConfiguration(
+                lattice=lattice,
+                types=types,
+                possible_types=possible_types)
+
+            # Interactions.
+            coordinates = [[   0.000000e+00,   0.000000e+00,   0.000000e+00]]
+            process_0 = KMCProcess(coordinates,
+                                   ['A'],
+                                   ['B'],
+                                   basis_sites=[0],
+                                   rate_constant=4.0)
+            process_1 = KMCProcess(coordinates,
+                                   ['B'],
+                                   ['A'],
+                                   basis_sites=[0],
+                                   rate_constant=1.0)
+
+            interactions = KMCInteractions([process_0, process_1])
+
+            # Run the model for 10000 steps.
+            ab_flip_model = KMCLatticeModel(configuration, interactions)
+            ab_flip_model.run(KMCControlParameters(number_of_steps=10000,
+                                                   dump_interval=5000,
+                                                   seed=2013,
+                                                   selection_type=selection_type))
+
+            # Get the simulation time and final types out.
+            times.append(ab_flip_model._KMCLatticeModel__cpp_timer.simulationTime())
+
+        # Check against the reference value for the MT rng.
+        self.assertAlmostEqual(times[0], 392.034039977, 5)
+        self.assertAlmostEqual(times[1], 392.034039977, 5)
+
+        # Composition-rejection uses the random numbers differently, but
+        # must give the same time within statistical fluctuations.
+        self.assertAlmostEqual(times[2], 389.235530701, 5)
+        self.assertAlmostEqual(times[2]/times[0], 1.0, 1)
+
+    def testRunThreads(self):
+        """ Test that running on several threads gives the same result as serially. """
+        results = []
+        for number_of_threads in [1, 4]:
+            # Cell.
+            cell_vectors = [[   1.000000e+00,   0.000000e+00,   0.000000e+00],
+                            [   0.000000e+00,   1.000000e+00,   0.000000e+00],
+                            [   0.000000e+00,   0.000000e+00,   1.000000e+00]]
+
+            basis_points = [[   0.000000e+00,   0.000000e+00,   0.000000e+00]]
+
+            unit_cell = KMCUnitCell(
+                cell_vectors=cell_vectors,
+                basis_points=basis_points)
+
+            # Lattice.
+            lattice = KMCLattice(
+                unit_cell=unit_cell,
+                repetitions=(8,8,1),
+                periodic=(True, True, False))
+
+            # Configuration.
+            types = ['A']*20 + ['B']*44
+            possible_types = ['A','B']
+            configuration = KMCConfiguration(
+                lattice=lattice,
+                types=types,
+                possible_types=possible_types)
+
+            # Interactions, swapping A and B along x.
+            coordinates = [[   0.000000e+00,   0.000000e+00,   0.000000e+00],
+                           [   1.000000e+00,   0.000000e+00,   0.000000e+00]]
+            process_0 = KMCProcess(coordinates,
+                                   ['A','B'],
+                                   ['B','A'],
+                                   basis_sites=[0],
+                                   rate_constant=4.0)
+            process_1 = KMCProcess(coordinates,
+                                   ['B','A'],
+                                   ['A','B'],
+                                   basis_sites=[0],
+                                   rate_constant=1.0)
+
+            interactions = KMCInteractions([process_0, process_1])
+
+            # Run the model with all work split over the threads.
+            model = KMCLatticeModel(configuration, interactions)
+            model.run(KMCControlParameters(number_of_steps=1000,
+                                           dump_interval=1000,
+                                           seed=2013,
+                                           number_of_threads=number_of_threads,
+                                           thread_threshold=0))
+
+            results.append((model._KMCLatticeModel__cpp_timer.simulationTime(),
+                            configuration.types()))
+
+        # Check.
+        self.assertAlmostEqual(results[0][0], results[1][0], 10)
+        self.assertEqual(results[0][1], results[1][1])
+
+    def testRunBatchRates(self):
+        """ Test that calculating custom rates in batches gives the same result as one by one. """
+        # Rate calculators counting the A in the local geometry, one by one
+        # and for all tasks at once.
+        class SingleRates(KMCRateCalculatorPlugin):
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, global_coordinate):
+                return rate_constant * (1.0 + len([t for t in types_before if t == "A"]))
+
+        class BatchRates(KMCRateCalculatorPlugin):
+            def initialize(self):
+                self.n_batches = 0
+            def rates(self, batch):
+                self.n_batches += 1
+                a = batch.type_names.index("A")
+                n_a = numpy.sum((batch.types_before == a) & batch.mask(), axis=1)
+                return batch.rate_constants * (1.0 + n_a)
+
+        results = []
+        for rate_calculator in [SingleRates, BatchRates]:
+            # Cell.
+            cell_vectors = [[   1.000000e+00,   0.000000e+00,   0.000000e+00],
+                            [   0.000000e+00,   1.000000e+00,   0.000000e+00],
+                            [   0.000000e+00,   0.000000e+00,   1.000000e+00]]
+
+            basis_points = [[   0.000000e+00,   0.000000e+00,   0.000000e+00]]
+
+            unit_cell = KMCUnitCell(
+                cell_vectors=cell_vectors,
+                basis_points=basis_points)
+
+            # Lattice.
+            lattice = KMCLattice(
+                unit_cell=unit_cell,
+                repetitions=(8,8,1),
+                periodic=(True, True, False))
+
+            # Configuration.
+            types = ['A']*20 + ['B']*44
+            possible_types = ['A','B']
+            configuration = KMCConfiguration(
+                lattice=lattice,
+                types=types,
+                possible_types=possible_types)
+
+            # Interactions, swapping A and B along x.
+            coordinates = [[   0.000000e+00,   0.000000e+00,   0.000000e+00],
+                           [   1.000000e+00,   0.000000e+00,   0.000000e+00]]
+            process_0 = KMCProcess(coordinates,
+                                   ['A','B'],
+                                   ['B','A'],
+                                   basis_sites=[0],
+                                   rate_constant=4.0)
+            process_1 = KMCProcess(coordinates,
+                                   ['B','A'],
+                                   ['A','B'],
+                                   basis_sites=[0],
+                                   rate_constant=1.0)
+
+            interactions = KMCInteractions([process_0, process_1])
+            interactions.setRateCalculator(rate_calculator)
+
+            model = KMCLatticeModel(configuration, interactions)
+            model.run(KMCControlParameters(number_of_steps=200,
+                                           dump_interval=200,
+                                           seed=2013))
+
+            results.append((model._KMCLatticeModel__cpp_timer.simulationTime(),
+                            configuration.types()))
+
+        # The batch function was used.
+        self.assertTrue(interactions.rateCalculator().n_batches > 0)
+
+        # Check.
+        self.assertAlmostEqual(results[0][0], results[1][0], 10)
+        self.assertEqual(results[0][1], results[1][1])
+
+    def testRateStatistics(self):
+        """ Test the statistics of the custom rate cache and callbacks. """
+        # A rate calculator counting the A in the local geometry, with
+        # a small cache for the first process only.
+        class CachedRates(KMCRateCalculatorPlugin):
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, global_coordinate):
+                return rate_constant * (1.0 + len([t for t in types_before if t == "A"]))
+            def cacheRates(self):
+                return True
+            def cacheSize(self):
+                return 4
+            def excludeFromCaching(self):
+                return (1,)
+
+        unit_cell = KMCUnitCell(cell_vectors=numpy.identity(3),
+                                basis_points=[[0.0, 0.0, 0.0]])
+        lattice = KMCLattice(unit_cell=unit_cell,
+                             repetitions=(8,8,1),
+                             periodic=(True, True, False))
+        configuration = KMCConfiguration(lattice=lattice,
+                                         types=['A']*20 + ['B']*44,
+                                         possible_types=['A','B'])
+
+        coordinates = [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]
+        process_0 = KMCProcess(coordinates, ['A','B'], ['B','A'], basis_sites=[0], rate_constant=4.0)
+        process_1 = KMCProcess(coordinates, ['B','A'], ['A','B'], basis_sites=[0], rate_constant=1.0)
+        interactions = KMCInteractions([process_0, process_1])
+        interactions.setRateCalculator(CachedRates)
+
+        model = KMCLatticeModel(configuration, interactions)
+        model.run(KMCControlParameters(number_of_steps=200,
+                                       dump_interval=200,
+                                       seed=2013))
+
+        statistics = model.rateStatistics()
+        self.assertEqual(statistics["capacity"], 4)
+        self.assertEqual(statistics["size"], 4)
+        self.assertTrue(statistics["hits"] > 0)
+        self.assertTrue(statistics["evictions"] > 0)
+        self.assertEqual(statistics["lookups"], statistics["hits"] + statistics["misses"])
+        self.assertEqual(sorted(statistics["processes"].keys()), [0, 1])
+
+        p0 = statistics["processes"][0]
+        p1 = statistics["processes"][1]
+        self.assertEqual(statistics["lookups"], p0["lookups"] + p1["lookups"])
+        self.assertEqual(statistics["hits"], p0["hits"])
+        self.assertEqual(p0["lookups"], p0["hits"] + p0["misses"])
+        self.assertEqual(p0["callbacks"], p0["misses"])
+        self.assertEqual(p0["inserts"], p0["callbacks"])
+        self.assertTrue(p0["callback_time"] > 0.0)
+
+        # The excluded process is never looked up or stored.
+        self.assertEqual(p1["lookups"], 0)
+        self.assertEqual(p1["hits"], 0)
+        self.assertEqual(p1["misses"], 0)
+        self.assertEqual(p1["inserts"], 0)
+        self.assertTrue(p1["callbacks"] > 0)
+
+        # Reset.
+        model.resetRateStatistics()
+        statistics = model.rateStatistics()
+        for key in ["lookups", "hits", "misses", "inserts", "evictions"]:
+            self.assertEqual(statistics[key], 0)
+            self.assertEqual(statistics["processes"][0].get(key, 0), 0)
+        self.assertEqual(statistics["processes"][1]["callback_time"], 0.0)
+        self.assertTrue(statistics["size"] > 0)
+
+    def testRunRateCache(self):
+        """ Test storing the cached rates and loading them in the next run. """
+        class CachedRates(KMCRateCalculatorPlugin):
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, global_coordinate):
+                return rate_constant * (1.0 + len([t for t in types_before if t == "A"]))
+            def cacheRates(self):
+                return True
+
+        class OtherCachedRates(CachedRates):
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, global_coordinate):
+                return rate_constant * (2.0 + len([t for t in types_before if t == "A"]))
+
+        class KeyedCachedRates(CachedRates):
+            scale = 1.0
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, global_coordinate):
+                return rate_constant * KeyedCachedRates.scale
+            def cacheKey(self):
+                return repr(KeyedCachedRates.scale)
+
+        class UnkeyedCachedRates(CachedRates):
+            scale = 1.0
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, global_coordinate):
+                return rate_constant * UnkeyedCachedRates.scale
+            def cacheKey(self):
+                return "unkeyed"
+
+        def setupModel(rate_calculator, rate_constant):
+            unit_cell = KMCUnitCell(cell_vectors=numpy.identity(3),
+                                    basis_points=[[0.0, 0.0, 0.0]])
+            lattice = KMCLattice(unit_cell=unit_cell,
+                                 repetitions=(8,8,1),
+                                 periodic=(True, True, False))
+            configuration = KMCConfiguration(lattice=lattice,
+                                             types=['A']*20 + ['B']*44,
+                                             possible_types=['A','B'])
+
+            coordinates = [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]
+            process_0 = KMCProcess(coordinates, ['A','B'], ['B','A'], basis_sites=[0], rate_constant=rate_constant)
+            process_1 = KMCProcess(coordinates, ['B','A'], ['A','B'], basis_sites=[0], rate_constant=1.0)
+            interactions = KMCInteractions([process_0, process_1])
+            interactions.setRateCalculator(rate_calculator)
+            return KMCLatticeModel(configuration, interactions), configuration
+
+        name = os.path.abspath(os.path.dirname(__file__))
+        name = os.path.join(name, "..", "TestUtilities", "Scratch")
+        rate_cache = os.path.join(name, "rate_cache.bin")
+        self.__files_to_remove.append(rate_cache)
+        control_parameters = KMCControlParameters(number_of_steps=200,
+                                                  dump_interval=200,
+                                                  seed=2013)
+
+        # The input must be a string.
+        model, configuration = setupModel(CachedRates, 4.0)
+        self.assertRaises( Error, lambda : model.run(control_parameters, rate_cache=123) )
+
+        # A first run calculates the rates and stores them.
+        model.run(control_parameters, rate_cache=rate_cache)
+        self.assertTrue(os.path.exists(rate_cache))
+        statistics = model.rateStatistics()
+        self.assertTrue(statistics["processes"][0]["callbacks"] > 0)
+        types = configuration.types()
+
+        # The same run again calculates no rates.
+        model, configuration = setupModel(CachedRates, 4.0)
+        model.run(control_parameters, rate_cache=rate_cache)
+        statistics = model.rateStatistics()
+        self.assertEqual(statistics["processes"][0]["callbacks"], 0)
+        self.assertEqual(statistics["processes"][1]["callbacks"], 0)
+        self.assertEqual(configuration.types(), types)
+
+        # But the cache is not used with another rate calculator,
+        model, configuration = setupModel(OtherCachedRates, 4.0)
+        model.run(control_parameters, rate_cache=rate_cache)
+        statistics = model.rateStatistics()
+        self.assertTrue(statistics["processes"][0]["callbacks"] > 0)
+
+        # or other interactions.
+        model, configuration = setupModel(CachedRates, 3.0)
+        model.run(control_parameters, rate_cache=rate_cache)
+        statistics = model.rateStatistics()
+        self.assertTrue(statistics["processes"][0]["callbacks"] > 0)
+
+        # The cache key covers what the source of the class does not.
+        model, configuration = setupModel(KeyedCachedRates, 4.0)
+        model.run(control_parameters, rate_cache=rate_cache)
+        model, configuration = setupModel(KeyedCachedRates, 4.0)
+        model.run(control_parameters, rate_cache=rate_cache)
+        statistics = model.rateStatistics()
+        self.assertEqual(statistics["processes"][0]["callbacks"], 0)
+
+        KeyedCachedRates.scale = 2.0
+        model, configuration = setupModel(KeyedCachedRates, 4.0)
+        model.run(control_parameters, rate_cache=rate_cache)
+        statistics = model.rateStatistics()
+        self.assertTrue(statistics["processes"][0]["callbacks"] > 0)
+
+        # The cache is loaded also if the backend was set up before the run.
+        # A scale not covered by the cache key shows which rates are used.
+        model, configuration = setupModel(UnkeyedCachedRates, 4.0)
+        model.run(control_parameters, rate_cache=rate_cache)
+        total_rate = model._backend().interactions().totalRate()
+
+        UnkeyedCachedRates.scale = 2.0
+        model, configuration = setupModel(UnkeyedCachedRates, 4.0)
+        model.rateStatistics()
+        model.resetRateStatistics()
+        model.run(control_parameters, rate_cache=rate_cache)
+        statistics = model.rateStatistics()
+        self.assertTrue(statistics["processes"][0]["hits"] > 0)
+        self.assertEqual(statistics["processes"][0]["callbacks"], 0)
+        self.assertAlmostEqual(model._backend().interactions().totalRate(), total_rate, 10)
+
     def testRunRngTypeDevice(self):
         """ Test to use the PRNG DEVICE. """
         # Cell.
@@ -0,0 +1,199 @@
+"""" Module for testing the KMCPairRateCalculator """
+
+
+# Copyright (c)  2016  Mikael Leetmaa
+#
+# This file is part of the KMCLib project distributed under the terms of the
+# GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+#
+
+
+import unittest
+import numpy
+
+from KMCLib.Backend import Backend
+from KMCLib.Exceptions.Error import Error
+from KMCLib.CoreComponents.KMCUnitCell import KMCUnitCell
+from KMCLib.CoreComponents.KMCLattice import KMCLattice
+from KMCLib.CoreComponents.KMCConfiguration import KMCConfiguration
+from KMCLib.CoreComponents.KMCProcess import KMCProcess
+from KMCLib.CoreComponents.KMCBucketProcess import KMCBucketProcess
+from KMCLib.CoreComponents.KMCInteractions import KMCInteractions
+from KMCLib.CoreComponents.KMCLatticeModel import KMCLatticeModel
+from KMCLib.PluginInterfaces.KMCRateCalculatorPlugin import KMCRateCalculatorPlugin
+
+# Import the module to test.
+from KMCLib.PluginInterfaces.KMCPairRateCalculator import KMCPairRateCalculator
+
+
+# The Ising model rates of the IsingSpin functional test.
+class IsingRateCalculator(KMCRateCalculatorPlugin):
+    def rate(self, geometry, elements_before, elements_after, rate_constant, process_number, global_coordinate):
+        neighbours = list(elements_before[1:5])
+        diff = neighbours.count(elements_before[0]) - (4 - neighbours.count(elements_before[0]))
+        return rate_constant * min(1.0, numpy.exp(-diff))
+
+    def cutoff(self):
+        return 1.0
+
+
+# Implementing the tests.
+class KMCPairRateCalculatorTest(unittest.TestCase):
+    """ Class for testing the KMCPairRateCalculator class """
+
+    def __isingCalculator(self, **kwargs):
+        """ Helper function returning the Ising model with J = 1. """
+        return KMCPairRateCalculator(types=["U","D"],
+                                     shells=[1.0],
+                                     pair_energies=[[[-0.5, 0.5],[0.5, -0.5]]],
+                                     **kwargs)
+
+    def __squareConfiguration(self):
+        """ Helper function returning a square lattice of up and down spins. """
+        unit_cell = KMCUnitCell(cell_vectors=numpy.eye(3),
+                                basis_points=[[0.0,0.0,0.0]])
+        lattice = KMCLattice(unit_cell=unit_cell,
+                             repetitions=(10,10,1),
+                             periodic=(True,True,False))
+        types = ["U" if (i*i + 3*i) % 7 < 3 else "D" for i in range(100)]
+        return KMCConfiguration(lattice=lattice,
+                                types=types,
+                                possible_types=["U","D"])
+
+    def __flipProcesses(self):
+        """ Helper function returning the spin flip processes. """
+        return [KMCProcess([[0.0,0.0,0.0]], ["U"], ["D"], basis_sites=[0], rate_constant=1.0),
+                KMCProcess([[0.0,0.0,0.0]], ["D"], ["U"], basis_sites=[0], rate_constant=1.0)]
+
+    def testConstruction(self):
+        """ Test the construction and the default settings. """
+        calculator = self.__isingCalculator()
+        self.assertEqual(calculator.types(), ("U","D"))
+        self.assertAlmostEqual(numpy.linalg.norm(calculator.shells() - numpy.array([1.0])), 0.0, 12)
+        self.assertEqual(calculator.pairEnergies().shape, (1,2,2))
+        self.assertAlmostEqual(numpy.linalg.norm(calculator.siteEnergies()), 0.0, 12)
+        self.assertAlmostEqual(calculator.kT(), 1.0, 12)
+        self.assertTrue(calculator.cacheRates())
+        self.assertEqual(calculator.cacheSize(), 100000)
+        self.assertEqual(calculator.excludeFromCaching(), ())
+
+        # With all settings given.
+        calculator = KMCPairRateCalculator(types=["A","B","C"],
+                                           shells=numpy.array([1.0, 1.5]),
+                                           pair_energies=numpy.ones((2,3,3)),
+                                           site_energies=[0.1, 0.2, 0.3],
+                                           barriers=[0.5, 0.6],
+                                           alphas=[0.5, 0.25],
+                                           kT=2,
+                                           cache_rates=False,
+                                           cache_size=12,
+                                           exclude_from_caching=[1])
+        self.assertAlmostEqual(calculator.kT(), 2.0, 12)
+        self.assertAlmostEqual(calculator.siteEnergies()[2], 0.3, 12)
+        self.assertFalse(calculator.cacheRates())
+        self.assertEqual(calculator.cacheSize(), 12)
+        self.assertEqual(calculator.excludeFromCaching(), (1,))
+
+    def testConstructionFail(self):
+        """ Test that the construction fails with wrong input. """
+        energies = [[[-0.5, 0.5],[0.5, -0.5]]]
+
+        # The types.
+        self.assertRaises( Error, lambda : KMCPairRateCalculator("UD", [1.0], energies) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","U"], [1.0], energies) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U",1], [1.0], energies) )
+
+        # The shells.
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [], energies) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [0.0], energies) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [[1.0]], energies) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [1.0, 1.0], energies*2) )
+
+        # The energies.
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [1.0], [[-0.5, 0.5],[0.5, -0.5]]) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [1.0, 2.0], energies) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [1.0], [[[-0.5, 0.5],[0.4, -0.5]]]) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [1.0], [[["a", 0.5],[0.5, -0.5]]]) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [1.0], energies, site_energies=[1.0]) )
+        self.assertRaises( Error, lambda : KMCPairRateCalculator(["U","D"], [1.0], energies,
+                                                                 barriers=[1.0], alphas=[0.5, 0.5]) )
+
+        # The settings.
+        self.assertRaises( Error, lambda : self.__isingCalculator(kT=0.0) )
+        self.assertRaises( Error, lambda : self.__isingCalculator(kT="1.0") )
+        self.assertRaises( Error, lambda : self.__isingCalculator(cache_rates=1) )
+        self.assertRaises( Error, lambda : self.__isingCalculator(cache_size=0) )
+        self.assertRaises( Error, lambda : self.__isingCalculator(exclude_from_caching=[-1]) )
+
+    def testBackend(self):
+        """ Test the construction of the backend calculator. """
+        calculator = KMCPairRateCalculator(types=["D","U"],
+                                           shells=[1.0, 1.5],
+                                           pair_energies=[[[1.0, 2.0],[2.0, 3.0]], [[4.0, 5.0],[5.0, 6.0]]],
+                                           site_energies=[0.5, 0.25],
+                                           barriers=[0.1, 0.2],
+                                           alphas=[0.3, 0.4],
+                                           kT=2.0,
+                                           cache_size=12,
+                                           exclude_from_caching=[1])
+        processes = [KMCProcess([[0.0,0.0,0.0]], ["U"], ["D"], basis_sites=[0], rate_constant=1.0),
+                     KMCProcess([[0.0,0.0,0.0],[1.0,1.0,0.0]], ["U","D"], ["D","U"], basis_sites=[0], rate_constant=1.0)]
+        possible_types = {"*" : 0, "U" : 1, "D" : 2, "X" : 3}
+        cpp_calculator = calculator._backend(possible_types, processes)
+
+        self.assertTrue(isinstance(cpp_calculator, Backend.PairRateCalculator))
+        self.assertTrue(cpp_calculator.typeNumbers())
+        self.assertTrue(cpp_calculator.threadSafe())
+        self.assertTrue(cpp_calculator.cacheRates())
+        self.assertEqual(cpp_calculator.cacheSize(), 12)
+        self.assertEqual(list(cpp_calculator.excludeFromCaching()), [1])
+        self.assertAlmostEqual(cpp_calculator.kT(), 2.0, 12)
+        self.assertEqual(list(cpp_calculator.barriers()), [0.1, 0.2])
+        self.assertEqual(list(cpp_calculator.alphas()), [0.3, 0.4])
+
+        # The geometry reaches the last shell around all sites of the processes.
+        self.assertAlmostEqual(cpp_calculator.cutoff(), 1.5 + numpy.sqrt(2.0), 5)
+
+        # The tables are mapped onto the type numbers, without energies for other types.
+        self.assertEqual(list(cpp_calculator.siteEnergies()), [0.0, 0.25, 0.5, 0.0])
+        pair_energies = numpy.array(cpp_calculator.pairEnergies()).reshape((2,4,4))
+        self.assertEqual(list(pair_energies[0,1]), [0.0, 3.0, 2.0, 0.0])
+        self.assertEqual(list(pair_energies[1,2]), [0.0, 5.0, 4.0, 0.0])
+        self.assertEqual(list(pair_energies[1,0]), [0.0, 0.0, 0.0, 0.0])
+        self.assertEqual(list(pair_energies[1,3]), [0.0, 0.0, 0.0, 0.0])
+
+        # There must be one barrier and alpha per process, and all types must be possible.
+        self.assertRaises( Error, lambda : calculator._backend(possible_types, processes[:1]) )
+        self.assertRaises( Error, lambda : calculator._backend({"*" : 0, "U" : 1}, processes) )
+
+    def testLatticeModel(self):
+        """ Test that the rates of the IsingSpin functional test are reproduced. """
+        interactions = KMCInteractions(processes=self.__flipProcesses(), implicit_wildcards=True)
+        interactions.setRateCalculator(self.__isingCalculator())
+        model = KMCLatticeModel(configuration=self.__squareConfiguration(),
+                                interactions=interactions)
+
+        reference_interactions = KMCInteractions(processes=self.__flipProcesses(), implicit_wildcards=True)
+        reference_interactions.setRateCalculator(IsingRateCalculator)
+        reference_model = KMCLatticeModel(configuration=self.__squareConfiguration(),
+                                          interactions=reference_interactions)
+
+        total_rate = model._backend().interactions().totalRate()
+        self.assertTrue(total_rate > 0.0)
+        self.assertAlmostEqual(total_rate, reference_model._backend().interactions().totalRate(), 10)
+
+    def testBucketProcessesFail(self):
+        """ Test that bucket processes can not be used with a pair rate calculator. """
+        process = KMCBucketProcess(coordinates=[[0.0,0.0,0.0],[1.0,0.0,0.0]],
+                                   minimum_match=["U","D"],
+                                   update=[[(-1,"U"),(1,"D")],[(1,"U"),(-1,"D")]],
+                                   basis_sites=[0],
+                                   rate_constant=1.0)
+        interactions = KMCInteractions(processes=[process])
+        interactions.setRateCalculator(self.__isingCalculator())
+        config = self.__squareConfiguration()
+        self.assertRaises( Error, lambda : interactions._backend(config.possibleTypes(), 1, config) )
+
+
+if __name__ == '__main__':
+    unittest.main()
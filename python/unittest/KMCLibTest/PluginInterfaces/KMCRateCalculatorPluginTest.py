@@ -15,6 +15,7 @@ import numpy
 # Import the module to test.
 from KMCLib.PluginInterfaces.KMCRateCalculatorPlugin import KMCRateCalculatorPlugin
 from KMCLib.Backend import Backend
+from KMCLib.Exceptions.Error import Error
 
 # Implementing the tests.
 class KMCRateCalculatorPluginTest(unittest.TestCase):
@@ -38,6 +39,26 @@ class KMCRateCalculatorPluginTest(unittest.TestCase):
         dummy_arg6 = "arg"
         self.assertRaises( NotImplementedError, lambda: calculator.rate(dummy_arg1, dummy_arg2, dummy_arg3, dummy_arg4, dummy_arg5, dummy_arg6) )
 
+    def testCallBaseClassRatesCall(self):
+        """ Test that we can't call the base class batch rates function """
+        calculator = KMCRateCalculatorPlugin("DummyConfig")
+        self.assertRaises( NotImplementedError, lambda: calculator.rates("batch") )
+
+    def testBatchRates(self):
+        """ Test that batch rates are used only if the rates function is overloaded. """
+        calculator = KMCRateCalculatorPlugin("DummyConfig")
+        self.assertFalse( calculator.batchRates() )
+
+        class RateCalc(KMCRateCalculatorPlugin):
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, coordinate):
+                return rate_constant
+        self.assertFalse( RateCalc("DummyConfig").batchRates() )
+
+        class BatchRateCalc(KMCRateCalculatorPlugin):
+            def rates(self, batch):
+                return batch.rate_constants
+        self.assertTrue( BatchRateCalc("DummyConfig").batchRates() )
+
     def testConstructionDerrivedClass(self):
         """ Test that we can construct a derrived class. """
         # Define a derrived class.
@@ -64,6 +85,19 @@ class KMCRateCalculatorPluginTest(unittest.TestCase):
         self.assertTrue(hasattr(rc, "cutoff"))
         self.assertTrue(rc.cutoff() is None)
 
+    def testCacheSize(self):
+        """ Test the default cache size of the base class. """
+        rc = KMCRateCalculatorPlugin("DummyConfig")
+        self.assertEqual(rc.cacheSize(), 100000)
+
+        # The same as for the C++ base class.
+        self.assertEqual(Backend.RateCalculator().cacheSize(), 100000)
+
+    def testCacheKey(self):
+        """ Test the default cache key of the base class. """
+        rc = KMCRateCalculatorPlugin("DummyConfig")
+        self.assertTrue(rc.cacheKey() is None)
+
     def testUsage(self):
         """ Test that the KMCRateCalculatorPlugin can be used in a simulation. """
         # To get the random numbers and process numbers returned.
@@ -160,6 +194,164 @@ class KMCRateCalculatorPluginTest(unittest.TestCase):
         # Check the reference coordinate.
         self.assertAlmostEqual( numpy.linalg.norm( global_xyz - numpy.array(ref_coordinates)), 0.0, 10 )
 
+    def testTypeNumbersCallback(self):
+        """ Test that the type numbers are sent on to the rate function as type names. """
+        ref_calls = []
+        class RateCalc(KMCRateCalculatorPlugin):
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, coordinate):
+                ref_calls.append((coords.copy(), types_before, types_after, process_number, coordinate))
+                return 2.0*rate_constant
+
+        calculator = RateCalc("DummyConfig")
+        self.assertTrue( calculator.typeNumbers() )
+
+        ret = calculator.backendRateCallbackTypeNumbers((0.0, 0.0, 0.0, 1.0, 0.5, 0.0),
+                                                        2,
+                                                        (1, 2),
+                                                        (2, 1),
+                                                        ("*", "A", "B"),
+                                                        1.5,
+                                                        11,
+                                                        0.1, 0.2, 0.3)
+        self.assertAlmostEqual( ret, 3.0, 12 )
+
+        coords, types_before, types_after, process_number, coordinate = ref_calls[0]
+        self.assertEqual( coords.tolist(), [[0.0, 0.0, 0.0], [1.0, 0.5, 0.0]] )
+        self.assertEqual( types_before, ("A", "B") )
+        self.assertEqual( types_after, ("B", "A") )
+        self.assertEqual( process_number, 11 )
+        self.assertEqual( coordinate, (0.1, 0.2, 0.3) )
+
+        # New type names are picked up.
+        calculator.backendRateCallbackTypeNumbers((0.0, 0.0, 0.0),
+                                                  1,
+                                                  (1,),
+                                                  (2,),
+                                                  ("*", "C", "D"),
+                                                  1.5,
+                                                  11,
+                                                  0.1, 0.2, 0.3)
+        self.assertEqual( ref_calls[1][1], ("C",) )
+        self.assertEqual( ref_calls[1][2], ("D",) )
+
+    def testBucketCountsCallback(self):
+        """ Test that the bucket count matrices are sent on to the rate function. """
+        ref_calls = []
+        class RateCalc(KMCRateCalculatorPlugin):
+            def rate(self, coords, occupations_before, occupations_after, rate_constant, process_number, coordinate):
+                ref_calls.append((occupations_before, occupations_after))
+                return rate_constant
+
+        class CountsRateCalc(RateCalc):
+            def bucketCounts(self):
+                return True
+
+        # Two sites with three types, wildcard first.
+        counts_before = (0, 2, 1, 0, 0, 1)
+        counts_after  = (0, 1, 2, 0, 1, 0)
+
+        # By default the occupations come in the bucket types format.
+        calculator = RateCalc("DummyConfig")
+        self.assertFalse( calculator.bucketCounts() )
+        ret = calculator.backendRateCallbackBucketCounts((0.0, 0.0, 0.0, 1.0, 0.0, 0.0),
+                                                         2,
+                                                         counts_before,
+                                                         counts_after,
+                                                         ("*", "A", "B"),
+                                                         1.5,
+                                                         2,
+                                                         0.0, 0.0, 0.0)
+        self.assertAlmostEqual( ret, 1.5, 12 )
+        self.assertEqual( ref_calls[0][0], [[(2, "A"), (1, "B")], [(1, "B")]] )
+        self.assertEqual( ref_calls[0][1], [[(1, "A"), (2, "B")], [(1, "A")]] )
+
+        # Or as count matrices.
+        calculator = CountsRateCalc("DummyConfig")
+        calculator.backendRateCallbackBucketCounts((0.0, 0.0, 0.0, 1.0, 0.0, 0.0),
+                                                   2,
+                                                   counts_before,
+                                                   counts_after,
+                                                   ("*", "A", "B"),
+                                                   1.5,
+                                                   2,
+                                                   0.0, 0.0, 0.0)
+        self.assertEqual( ref_calls[1][0].tolist(), [[0, 2, 1], [0, 0, 1]] )
+        self.assertEqual( ref_calls[1][1].tolist(), [[0, 1, 2], [0, 1, 0]] )
+
+        # That can be converted on request.
+        self.assertEqual( calculator.countsToBuckets(ref_calls[1][1]), [[(1, "A"), (2, "B")], [(1, "A")]] )
+
+    def testReadOnlyCoordinates(self):
+        """ Test that the coordinates from C++ are a read-only view on the backend memory. """
+        ref_flags = []
+        class RateCalc(KMCRateCalculatorPlugin):
+            def rate(self, coords, types_before, types_after, rate_constant, process_number, coordinate):
+                ref_flags.append((coords.flags.writeable, coords.flags.owndata, coords.shape))
+                return rate_constant
+
+        cpp_coords = Backend.StdVectorCoordinate()
+        cpp_coords.push_back(Backend.Coordinate(1.0,2.9,3.4))
+        cpp_coords.push_back(Backend.Coordinate(0.0,0.0,0.0))
+        cpp_types = Backend.StdVectorString(2, "A")
+
+        rate = Backend.getRate(RateCalc("DummyConfig"), cpp_coords, cpp_types, cpp_types, 3.5, 1, 0.0, 0.0, 0.0)
+        self.assertAlmostEqual( rate, 3.5, 12 )
+        self.assertEqual( ref_flags, [(False, False, (2, 3))] )
+
+    def testBatchCallback(self):
+        """ Test that the batch callback sends a correctly shaped batch to the rates function. """
+        ref_batches = []
+        class BatchRateCalc(KMCRateCalculatorPlugin):
+            def rates(self, batch):
+                ref_batches.append(batch)
+                return batch.rate_constants * batch.lengths
+
+        calculator = BatchRateCalc("DummyConfig")
+
+        # Two tasks with two and one atoms, padded to two.
+        geometries = (0.0, 0.0, 0.0, 1.0, 0.0, 0.0,
+                      0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        types_before = (1, 2, 2, -1)
+        types_after = (2, 1, 1, -1)
+        ret = calculator.backendRateCallbackBatch(geometries,
+                                                  2,
+                                                  (2, 1),
+                                                  types_before,
+                                                  types_after,
+                                                  ("*", "A", "B"),
+                                                  (1.5, 3.0),
+                                                  (4, 7),
+                                                  (0.1, 0.2, 0.3, 1.1, 1.2, 1.3))
+        self.assertAlmostEqual( ret[0], 3.0, 12 )
+        self.assertAlmostEqual( ret[1], 3.0, 12 )
+
+        batch = ref_batches[0]
+        self.assertEqual( batch.size(), 2 )
+        self.assertEqual( batch.coordinates.shape, (2, 2, 3) )
+        self.assertAlmostEqual( batch.coordinates[0,1,0], 1.0, 12 )
+        self.assertEqual( batch.types_before.tolist(), [[1, 2], [2, -1]] )
+        self.assertEqual( batch.types_after.tolist(), [[2, 1], [1, -1]] )
+        self.assertEqual( batch.mask().tolist(), [[True, True], [True, False]] )
+        self.assertEqual( batch.type_names, ("*", "A", "B") )
+        self.assertEqual( batch.process_numbers.tolist(), [4, 7] )
+        self.assertAlmostEqual( batch.global_coordinates[1,2], 1.3, 12 )
+
+        # Returning the wrong number of rates fails.
+        class WrongRateCalc(KMCRateCalculatorPlugin):
+            def rates(self, batch):
+                return [1.0]
+
+        calculator = WrongRateCalc("DummyConfig")
+        self.assertRaises( Error, lambda: calculator.backendRateCallbackBatch(geometries,
+                                                                            2,
+                                                                            (2, 1),
+                                                                            types_before,
+                                                                            types_after,
+                                                                            ("*", "A", "B"),
+                                                                            (1.5, 3.0),
+                                                                            (4, 7),
+                                                                            (0.1, 0.2, 0.3, 1.1, 1.2, 1.3)) )
+
 
 if __name__ == '__main__':
     unittest.main()
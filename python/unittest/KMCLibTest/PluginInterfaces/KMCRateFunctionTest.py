@@ -0,0 +1,245 @@
+"""" Module for testing the KMCRateFunction """
+
+
+# Copyright (c)  2016  Mikael Leetmaa
+#
+# This file is part of the KMCLib project distributed under the terms of the
+# GNU General Public License version 3, see <http://www.gnu.org/licenses/>.
+#
+
+
+import unittest
+import ctypes
+import numpy
+import os
+
+from KMCLib.Backend import Backend
+from KMCLib.Exceptions.Error import Error
+from KMCLib.CoreComponents.KMCUnitCell import KMCUnitCell
+from KMCLib.CoreComponents.KMCLattice import KMCLattice
+from KMCLib.CoreComponents.KMCConfiguration import KMCConfiguration
+from KMCLib.CoreComponents.KMCProcess import KMCProcess
+from KMCLib.CoreComponents.KMCBucketProcess import KMCBucketProcess
+from KMCLib.CoreComponents.KMCInteractions import KMCInteractions
+from KMCLib.CoreComponents.KMCLatticeModel import KMCLatticeModel
+from KMCLib.CoreComponents.KMCControlParameters import KMCControlParameters
+from KMCLib.PluginInterfaces.KMCRateCalculatorPlugin import KMCRateCalculatorPlugin
+
+# Import the module to test.
+from KMCLib.PluginInterfaces.KMCRateFunction import KMCRateFunction
+
+
+# A rate function scaling the rate constant with one plus the number of
+# atoms of type 1 before the process, and with the number in the user data.
+def scaledRate(geometry, length, types_before, types_after, rate_constant,
+               process_number, global_x, global_y, global_z, user_data):
+    n_ones = len([i for i in range(length) if types_before[i] == 1])
+    scale = ctypes.cast(user_data, ctypes.POINTER(ctypes.c_double))[0]
+    return rate_constant * (1.0 + n_ones) * scale
+
+scaled_rate = KMCRateFunction.CFUNCTYPE(scaledRate)
+
+
+# The same rates from a Python rate calculator.
+class ScaledRateCalculator(KMCRateCalculatorPlugin):
+    def rate(self, geometry, types_before, types_after, rate_constant, process_number, global_coordinate):
+        return rate_constant * (1.0 + list(types_before).count("A")) * 0.25
+
+    def cutoff(self):
+        return 2.0
+
+
+# Implementing the tests.
+class KMCRateFunctionTest(unittest.TestCase):
+    """ Class for testing the KMCRateFunction class """
+
+    def testConstruction(self):
+        """ Test the construction and the default settings. """
+        rate_function = KMCRateFunction(scaled_rate)
+        self.assertAlmostEqual(rate_function.cutoff(), 1.0, 12)
+        self.assertFalse(rate_function.cacheRates())
+        self.assertEqual(rate_function.cacheSize(), 100000)
+        self.assertEqual(rate_function.excludeFromCaching(), ())
+        self.assertFalse(rate_function.threadSafe())
+        self.assertTrue(rate_function.cacheKey() is None)
+
+        # With all settings given.
+        user_data = numpy.array([0.5])
+        rate_function = KMCRateFunction(scaled_rate,
+                                        user_data=user_data,
+                                        cutoff=2,
+                                        cache_rates=True,
+                                        cache_size=12,
+                                        exclude_from_caching=[1,3],
+                                        thread_safe=True,
+                                        cache_key="scaled 0.5")
+        self.assertAlmostEqual(rate_function.cutoff(), 2.0, 12)
+        self.assertTrue(rate_function.cacheRates())
+        self.assertEqual(rate_function.cacheSize(), 12)
+        self.assertEqual(rate_function.excludeFromCaching(), (1,3))
+        self.assertTrue(rate_function.threadSafe())
+        self.assertEqual(rate_function.cacheKey(), "scaled 0.5")
+
+        # The addresses of the function and the data.
+        address = ctypes.cast(scaled_rate, ctypes.c_void_p).value
+        self.assertEqual(rate_function._KMCRateFunction__function_address, address)
+        self.assertEqual(rate_function._KMCRateFunction__user_data_address, user_data.ctypes.data)
+
+        # The function may also be given by address or as an object with an
+        # address, such as a numba cfunc.
+        class CFunc(object):
+            def __init__(self, address):
+                self.address = address
+
+        rate_function = KMCRateFunction(address)
+        self.assertEqual(rate_function._KMCRateFunction__function_address, address)
+        rate_function = KMCRateFunction(CFunc(address))
+        self.assertEqual(rate_function._KMCRateFunction__function_address, address)
+
+        # And the user data by ctypes objects.
+        scale = ctypes.c_double(1.5)
+        rate_function = KMCRateFunction(scaled_rate, user_data=scale)
+        self.assertEqual(rate_function._KMCRateFunction__user_data_address, ctypes.addressof(scale))
+        rate_function = KMCRateFunction(scaled_rate, user_data=ctypes.pointer(scale))
+        self.assertEqual(rate_function._KMCRateFunction__user_data_address, ctypes.addressof(scale))
+
+    def testConstructionFail(self):
+        """ Test that the construction fails with wrong input. """
+        # The function.
+        self.assertRaises( Error, lambda : KMCRateFunction("scaledRate") )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaledRate) )
+        self.assertRaises( Error, lambda : KMCRateFunction(0) )
+        self.assertRaises( Error, lambda : KMCRateFunction(-12) )
+        self.assertRaises( Error, lambda : KMCRateFunction(True) )
+
+        # The user data.
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, user_data=[1.0]) )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, user_data=1.0) )
+
+        # The settings.
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, cutoff=0.0) )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, cutoff="1.0") )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, cache_rates=1) )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, cache_size=0) )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, cache_size=1.0) )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, exclude_from_caching=[-1]) )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, exclude_from_caching=1) )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, thread_safe=None) )
+        self.assertRaises( Error, lambda : KMCRateFunction(scaled_rate, cache_key=1) )
+
+    def testBackend(self):
+        """ Test that the backend calls the function. """
+        user_data = numpy.array([0.5])
+        rate_function = KMCRateFunction(scaled_rate,
+                                        user_data=user_data,
+                                        cutoff=1.5,
+                                        cache_rates=True,
+                                        cache_size=12,
+                                        exclude_from_caching=[1])
+        cpp_calculator = rate_function._backend()
+        self.assertTrue(isinstance(cpp_calculator, Backend.FunctionRateCalculator))
+        self.assertTrue(cpp_calculator.typeNumbers())
+        self.assertFalse(cpp_calculator.threadSafe())
+        self.assertTrue(cpp_calculator.cacheRates())
+        self.assertEqual(cpp_calculator.cacheSize(), 12)
+        self.assertAlmostEqual(cpp_calculator.cutoff(), 1.5, 12)
+        self.assertEqual(list(cpp_calculator.excludeFromCaching()), [1])
+
+        cpp_geometry = Backend.StdVectorDouble([0.0]*9)
+        cpp_types_before = Backend.StdVectorInt([1,2,1])
+        cpp_types_after = Backend.StdVectorInt([2,1,1])
+        cpp_type_names = Backend.StdVectorString(["*","A","B"])
+        rate = cpp_calculator.backendRateCallbackTypeNumbers(cpp_geometry, 3, cpp_types_before, cpp_types_after,
+                                                             cpp_type_names, 2.0, 0, 0.0, 0.0, 0.0)
+        self.assertAlmostEqual(rate, 3.0, 12)
+
+        # The data is read at each call.
+        user_data[0] = 2.0
+        rate = cpp_calculator.backendRateCallbackTypeNumbers(cpp_geometry, 3, cpp_types_before, cpp_types_after,
+                                                             cpp_type_names, 2.0, 0, 0.0, 0.0, 0.0)
+        self.assertAlmostEqual(rate, 12.0, 12)
+
+    def __chainConfiguration(self):
+        """ Helper function returning a chain of A and B. """
+        unit_cell = KMCUnitCell(cell_vectors=numpy.eye(3),
+                                basis_points=[[0.0,0.0,0.0]])
+        lattice = KMCLattice(unit_cell=unit_cell,
+                             repetitions=(20,1,1),
+                             periodic=(True,False,False))
+        types = ["B","A","A","B","A"]*4
+        return KMCConfiguration(lattice=lattice,
+                                types=types,
+                                possible_types=["A","B"])
+
+    def testLatticeModel(self):
+        """ Test the rates of a lattice model with a rate function. """
+        processes = [KMCProcess([[0.0,0.0,0.0],[1.0,0.0,0.0]], ["A","B"], ["B","A"], basis_sites=[0], rate_constant=1.0),
+                     KMCProcess([[0.0,0.0,0.0],[-1.0,0.0,0.0]], ["A","B"], ["B","A"], basis_sites=[0], rate_constant=2.0)]
+
+        # A model with the function.
+        user_data = numpy.array([0.25])
+        interactions = KMCInteractions(processes=processes)
+        interactions.setRateCalculator(KMCRateFunction(scaled_rate, user_data=user_data, cutoff=2.0))
+        model = KMCLatticeModel(configuration=self.__chainConfiguration(),
+                                interactions=interactions)
+
+        # And one with the same rates from Python.
+        reference_interactions = KMCInteractions(processes=processes)
+        reference_interactions.setRateCalculator(ScaledRateCalculator)
+        reference_model = KMCLatticeModel(configuration=self.__chainConfiguration(),
+                                          interactions=reference_interactions)
+
+        total_rate = model._backend().interactions().totalRate()
+        self.assertTrue(total_rate > 0.0)
+        self.assertAlmostEqual(total_rate, reference_model._backend().interactions().totalRate(), 10)
+
+    def testRateCache(self):
+        """ Test that a rate cache requires a cache key. """
+        processes = [KMCProcess([[0.0,0.0,0.0],[1.0,0.0,0.0]], ["A","B"], ["B","A"], basis_sites=[0], rate_constant=1.0)]
+        user_data = numpy.array([0.25])
+
+        name = os.path.abspath(os.path.dirname(__file__))
+        name = os.path.join(name, "..", "TestUtilities", "Scratch")
+        rate_cache = os.path.join(name, "rate_function_cache.bin")
+        control_parameters = KMCControlParameters(number_of_steps=10,
+                                                  dump_interval=10,
+                                                  seed=2013)
+
+        # Without a key the function or data may have changed since the cache was written.
+        interactions = KMCInteractions(processes=processes)
+        rate_function = KMCRateFunction(scaled_rate, user_data=user_data, cache_rates=True)
+        interactions.setRateCalculator(rate_function)
+        self.assertTrue(interactions.rateFunction() is rate_function)
+        model = KMCLatticeModel(configuration=self.__chainConfiguration(),
+                                interactions=interactions)
+        self.assertRaises( Error, lambda : model.run(control_parameters, rate_cache=rate_cache) )
+        self.assertFalse(os.path.exists(rate_cache))
+
+        # With a key the cache is used.
+        interactions = KMCInteractions(processes=processes)
+        interactions.setRateCalculator(KMCRateFunction(scaled_rate, user_data=user_data, cache_rates=True,
+                                                       cache_key="scaled 0.25"))
+        model = KMCLatticeModel(configuration=self.__chainConfiguration(),
+                                interactions=interactions)
+        try:
+            model.run(control_parameters, rate_cache=rate_cache)
+            self.assertTrue(os.path.exists(rate_cache))
+        finally:
+            if os.path.exists(rate_cache):
+                os.remove(rate_cache)
+
+    def testBucketProcessesFail(self):
+        """ Test that bucket processes can not be used with a rate function. """
+        process = KMCBucketProcess(coordinates=[[0.0,0.0,0.0],[1.0,0.0,0.0]],
+                                   minimum_match=["A","B"],
+                                   update=[[(-1,"A"),(1,"B")],[(1,"A"),(-1,"B")]],
+                                   basis_sites=[0],
+                                   rate_constant=1.0)
+        interactions = KMCInteractions(processes=[process])
+        interactions.setRateCalculator(KMCRateFunction(scaled_rate))
+        config = self.__chainConfiguration()
+        self.assertRaises( Error, lambda : interactions._backend(config.possibleTypes(), 1, config) )
+
+
+if __name__ == '__main__':
+    unittest.main()
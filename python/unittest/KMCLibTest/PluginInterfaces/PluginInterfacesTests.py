@@ -12,12 +12,16 @@ import unittest
 from .KMCBreakerPluginTest import KMCBreakerPluginTest
 from .KMCAnalysisPluginTest import KMCAnalysisPluginTest
 from .KMCRateCalculatorPluginTest import KMCRateCalculatorPluginTest
+from .KMCRateFunctionTest import KMCRateFunctionTest
+from .KMCPairRateCalculatorTest import KMCPairRateCalculatorTest
 
 def suite():
     suite = unittest.TestSuite(
         [unittest.TestLoader().loadTestsFromTestCase(KMCBreakerPluginTest),
          unittest.TestLoader().loadTestsFromTestCase(KMCAnalysisPluginTest),
          unittest.TestLoader().loadTestsFromTestCase(KMCRateCalculatorPluginTest),
+         unittest.TestLoader().loadTestsFromTestCase(KMCRateFunctionTest),
+         unittest.TestLoader().loadTestsFromTestCase(KMCPairRateCalculatorTest),
          ])
     return suite
 
@@ -23,6 +23,8 @@ from KMCLib.Utilities.ConversionUtilities import numpy2DArrayToStdVectorCoordina
 from KMCLib.Utilities.ConversionUtilities import stdVectorCoordinateToNumpy2DArray
 from KMCLib.Utilities.ConversionUtilities import toShortBucketsFormat
 from KMCLib.Utilities.ConversionUtilities import stdVectorTypeBucketToPython
+from KMCLib.Utilities.ConversionUtilities import backendBufferToNumpy
+from KMCLib.Utilities.ConversionUtilities import countMatrixToPython
 
 
 
@@ -239,6 +241,48 @@ class ConversionUtilitiesTest(unittest.TestCase):
         # Check.
         self.assertEqual(py_vector, ref_py_vector)
 
+    def testCountMatrixToPython(self):
+        """ Test the conversion of count matrices to the buckets format. """
+        self.assertEqual(countMatrixToPython(numpy.zeros((0, 3), dtype=int), ("*", "A", "B")), [])
+
+        counts = numpy.array([[0, 1, 0],
+                              [0, 0, 0],
+                              [0, 3, 1],
+                              [1, 4, 5]], dtype=numpy.intc)
+
+        ref_py_vector = [[(1,"A")],
+                         [],
+                         [(3,"A"), (1, "B")],
+                         [(4,"A"), (5, "B")]]
+
+        py_vector = countMatrixToPython(counts, ("*", "A", "B"))
+        self.assertEqual(py_vector, ref_py_vector)
+
+        # The counts are plain integers.
+        self.assertTrue(isinstance(py_vector[0][0][0], int))
+
+    def testBackendBufferToNumpy(self):
+        """ Test the wrapping of backend buffers and sequences in numpy arrays. """
+        # A memoryview is wrapped without copying, read-only.
+        data = numpy.array([1.0, 2.0, 3.5])
+        view = memoryview(data.tobytes())
+        array = backendBufferToNumpy(view, numpy.float64)
+        self.assertEqual(array.tolist(), [1.0, 2.0, 3.5])
+        self.assertFalse(array.flags.writeable)
+        self.assertTrue(array.base is not None)
+
+        ints = numpy.array([3, -1, 2], dtype=numpy.intc)
+        array = backendBufferToNumpy(memoryview(ints.tobytes()), numpy.intc)
+        self.assertEqual(array.tolist(), [3, -1, 2])
+
+        # Other sequences are copied.
+        array = backendBufferToNumpy((1, 2), numpy.intc)
+        self.assertEqual(array.tolist(), [1, 2])
+        self.assertEqual(array.dtype, numpy.intc)
+
+        array = backendBufferToNumpy(Backend.StdVectorDouble(2, 1.5), numpy.float64)
+        self.assertEqual(array.tolist(), [1.5, 1.5])
+
 
 if __name__ == '__main__':
     unittest.main()